@@ -2,11 +2,26 @@ import streamlit as st
 import os
 import requests
 import json
+from contextlib import closing
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from src.utils import extraction, preprocessing
 from src.session_state import initialize_session_state
-from src.utils.llm_service import LLMService
+from src.services.llm_service import LLMService
+from src.services.llm_router import HEDGE_AFTER_S, ROUTING_MODE, ROUTING_MODES, LLMRouter
+from src.utils import session_store, warmup, tracing
+from src.utils.fragments import fragment
+from src.utils.label_matching import match_labels
+from src.utils.json_stream import JSONObjectStream
+from src.utils import structured_output, grouped_extraction
+from src.utils import prompt_layout
+from src.utils.prompt_layout import PrefixContextCache
+from src.utils import llm_metrics
+from src.utils.llm_metrics import llm_task
+from src.components.metrics_panel import llm_metrics_panel
+from src.components.trace_panel import trace_summary_panel
+from src.components.summary import render_summary
+from src.components.downloads import deferred_download
 import plotly.express as px
 from openai import Client
 from openai_agents import Agent, function_tool
@@ -14,6 +29,20 @@ from pydantic import BaseModel, Field
 
 st.set_page_config(page_title="Vacalyser Wizard", layout="wide")
 
+@st.cache_resource(show_spinner=False)
+def _start_model_warmup():
+    """Kick off model warm-up once per server process (runs in a background thread)."""
+    return warmup.start_warmup()
+
+_start_model_warmup()
+
+@st.cache_resource(show_spinner=False)
+def _start_metrics_exporter():
+    """Serve /metrics once per server process when VACALYSER_METRICS_PORT is set."""
+    return llm_metrics.serve_metrics()
+
+_start_metrics_exporter()
+
 client = Client()   # liest automatisch OPENAI_API_KEY
 
 # Load environment variables (e.g., for API keys)
@@ -22,6 +51,11 @@ load_dotenv()
 # Initialize API Keys from environment or Streamlit secrets
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY") or st.secrets.get("OPENAI_API_KEY")
 OLLAMA_API_URL = os.getenv("OLLAMA_API_URL") or st.secrets.get("OLLAMA_API_URL", "http://127.0.0.1:11434")
+# Upper bound for the discovery answer; streaming stops as soon as the JSON object is complete.
+DISCOVERY_MAX_TOKENS = int(os.getenv("VACALYSER_DISCOVERY_MAX_TOKENS", "2048"))
+# Send the field schema with extraction requests (OpenAI response_format / Ollama format).
+STRUCTURED_OUTPUT = os.getenv("VACALYSER_STRUCTURED_OUTPUT", "1").lower() not in ("0", "false", "no")
+EXTRACTION_MODES = ["Single prompt (streaming)", "Per step (parallel)"]
 
 # Model selection at start
 provider = st.radio(
@@ -32,20 +66,45 @@ provider = st.radio(
     help="Local uses an Ollama server running a LLaMA model."
 )
 provider_key = "ollama" if provider.startswith("Local") else "openai"
+ROUTING_LABELS = {
+    "single": "Selected model only",
+    "failover": "Fail over to the other model",
+    "hedge": "Hedge slow answers",
+}
+routing = st.radio(
+    "If the model is slow or unavailable",
+    options=list(ROUTING_LABELS),
+    format_func=ROUTING_LABELS.get,
+    index=ROUTING_MODES.index(ROUTING_MODE) if ROUTING_MODE in ROUTING_MODES else 0,
+    horizontal=True,
+    help=f"Failover sends a failed request to the other model; hedging also does so when no answer "
+         f"has started after {HEDGE_AFTER_S:g} s and uses whichever finishes first."
+)
 
-# Instantiate LLM service based on selection
-try:
-    llm = LLMService(
-        provider=provider_key,
+def _llm_service(key: str) -> LLMService:
+    return LLMService(
+        provider=key,
         ollama_api_url=OLLAMA_API_URL or "http://127.0.0.1:11434",
         ollama_model="llama3.2:3b",
         client = Client(),
         openai_org=st.secrets.get("OPENAI_ORGANIZATION"),
-        openai_model="gpt-4o"
+        openai_model="gpt-4o",
+        context_cache=st.session_state.setdefault("_ollama_context", PrefixContextCache()),
     )
+
+# Instantiate LLM service based on selection
+try:
+    primary_llm = _llm_service(provider_key)
 except Exception as e:
     st.error(f"Failed to initialize language model: {e}")
     st.stop()
+secondary_llm = None
+if routing != "single":
+    try:
+        secondary_llm = _llm_service("openai" if provider_key == "ollama" else "ollama")
+    except Exception as e:
+        st.warning(f"Fallback model unavailable, using the selected model only: {e}")
+llm = LLMRouter(primary_llm, secondary_llm, mode=routing)
 
 # Helper functions
 def apply_base_styling():
@@ -59,14 +118,30 @@ def show_sidebar_links():
     """Add sidebar title and info (static navigation hints or branding)."""
     st.sidebar.title("Vacalyser Wizard")
     st.sidebar.info("Use the steps below to create a job vacancy.")
+    warmup_state = warmup.get_state()
+    if warmup_state == "failed":
+        st.sidebar.caption("⚠️ Model warm-up failed – the embedding model or index could not be loaded.")
+    elif warmup_state != "ready":
+        st.sidebar.caption("⏳ Models are still warming up – the first analysis may be slower.")
+    if os.getenv("VACALYSER_SHOW_METRICS", "").lower() in ("1", "true", "yes"):
+        llm_metrics_panel()
+    if is_debug_mode():
+        trace_summary_panel(st.session_state.get("_discovery_trace_id", ""))
+
+def is_debug_mode() -> bool:
+    """Debug mode: VACALYSER_DEBUG=1 or ?debug=1 in the URL."""
+    if os.getenv("VACALYSER_DEBUG", "").lower() in ("1", "true", "yes"):
+        return True
+    return st.query_params.get("debug", "") in ("1", "true")
 
 def get_from_session_state(key, default=None):
     """Safely get a value from st.session_state."""
     return st.session_state.get(key, default)
 
 def store_in_state(key, value):
-    """Store a value in st.session_state."""
+    """Store a value in st.session_state (and persist the key)."""
     st.session_state[key] = value
+    session_store.track(key)
 
 def parse_file(uploaded_file, file_name: str = "") -> str:
     """
@@ -282,7 +357,8 @@ def start_discovery_page():
             f"Output JSON only with the specified keys."
         )
         try:
-            llm_response = llm.complete(prompt=prompt)
+            with llm_task("discovery"):
+                llm_response = llm.complete(prompt=prompt)
         except Exception as e:
             st.error(f"Analysis failed: {e}")
             return
@@ -304,7 +380,7 @@ def start_discovery_page():
         st.success("Information extracted and fields populated.")
         # Proceed to next step automatically
         st.session_state["wizard_step"] = 2
-        st.experimental_rerun()
+        st.rerun()
 
 # Wizard Step 2: Basic Job & Company Info
 def render_step_2():
@@ -537,20 +613,9 @@ if st.session_state.get("generated_prep"):
 
 # Attempt to import PDF generator
 try:
-    from fpdf import FPDF
+    from src.utils.export_utils import text_pdf_bytes
 except ImportError:
-    FPDF = None
-
-def text_to_pdf_bytes(text: str) -> bytes:
-    """Convert text to PDF bytes (simple layout). Returns None if FPDF not available."""
-    if not FPDF:
-        return None
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    # Multi-cell to handle multi-line text
-    pdf.multi_cell(0, 10, text)
-    return pdf.output(dest='S').encode('latin-1', errors='ignore')
+    text_pdf_bytes = None
 
 def parse_file(uploaded_file) -> str:
     """Read uploaded file (pdf/docx/txt) and return text."""
@@ -575,47 +640,8 @@ def parse_file(uploaded_file) -> str:
 
 def match_and_store_keys(raw_text: str):
     """Find known labels in raw_text and store their values in session_state."""
-    label_map = {
-        "job_title": "Job Title:", "company_name": "Company Name:", "brand_name": "Brand Name:",
-        "headquarters_location": "HQ Location:", "company_website": "Company Website:",
-        "date_of_employment_start": "Date of Employment Start:", "job_type": "Job Type:",
-        "contract_type": "Contract Type:", "job_level": "Job Level:", "city": "City",
-        "team_structure": "Team Structure:", "role_description": "Role Description:",
-        "reports_to": "Reports To:", "supervises": "Supervises:", "role_type": "Role Type:",
-        "role_priority_projects": "Priority Projects:", "travel_requirements": "Travel Requirements:",
-        "work_schedule": "Work Schedule:", "role_keywords": "Role Keywords:",
-        "decision_making_authority": "Decision Making Authority:", "role_performance_metrics": "Role Performance Metrics:",
-        "task_list": "Task List:", "key_responsibilities": "Key Responsibilities:",
-        "technical_tasks": "Technical Tasks:", "managerial_tasks": "Managerial Tasks:",
-        "administrative_tasks": "Administrative Tasks:", "customer_facing_tasks": "Customer-Facing Tasks:",
-        "internal_reporting_tasks": "Internal Reporting Tasks:", "performance_tasks": "Performance Tasks:",
-        "innovation_tasks": "Innovation Tasks:", "task_prioritization": "Task Prioritization:",
-        "hard_skills": "Hard Skills:", "soft_skills": "Soft Skills:",
-        "must_have_skills": "Must-Have Skills:", "nice_to_have_skills": "Nice-to-Have Skills:",
-        "certifications_required": "Certifications Required:", "language_requirements": "Language Requirements:",
-        "tool_proficiency": "Tool Proficiency:", "domain_expertise": "Domain Expertise:",
-        "leadership_competencies": "Leadership Competencies:", "technical_stack": "Technical Stack:",
-        "industry_experience": "Industry Experience:", "analytical_skills": "Analytical Skills:",
-        "communication_skills": "Communication Skills:", "project_management_skills": "Project Management Skills:",
-        "soft_requirement_details": "Additional Soft Requirements:", "visa_sponsorship": "Visa Sponsorship:",
-        "salary_range": "Salary Range:", "currency": "Currency:", "pay_frequency": "Pay Frequency:",
-        "commission_structure": "Commission Structure:", "bonus_scheme": "Bonus Scheme:",
-        "vacation_days": "Vacation Days:", "flexible_hours": "Flexible Hours:",
-        "remote_work_policy": "Remote Work Policy:", "relocation_assistance": "Relocation Assistance:",
-        "childcare_support": "Childcare Support:", "recruitment_steps": "Recruitment Steps:",
-        "recruitment_timeline": "Recruitment Timeline:", "number_of_interviews": "Number of Interviews:",
-        "interview_format": "Interview Format:", "assessment_tests": "Assessment Tests:",
-        "onboarding_process_overview": "Onboarding Process Overview:", "recruitment_contact_email": "Recruitment Contact Email:",
-        "recruitment_contact_phone": "Recruitment Contact Phone:", "application_instructions": "Application Instructions:"
-    }
-    for key, label in label_map.items():
-        if label in raw_text:
-            try:
-                value = raw_text.split(label, 1)[1].split("\n", 1)[0].strip()
-            except Exception:
-                value = raw_text.split(label, 1)[-1].strip()
-            if value:
-                st.session_state[key] = value
+    for key, value in match_labels(raw_text).items():
+        st.session_state[key] = value
 
 def start_discovery_page():
     """Step 1: Start Discovery."""
@@ -630,60 +656,172 @@ def start_discovery_page():
     with col2:
         uploaded_file = st.file_uploader("Upload Job Description (PDF, DOCX, TXT)", type=["pdf", "docx", "txt"])
         if uploaded_file:
-            raw_text = parse_file(uploaded_file)
-            st.session_state["uploaded_file"] = raw_text
+            # The uploader keeps the file across reruns: parse (and trace) it once per upload.
+            upload_id = getattr(uploaded_file, "file_id", None) or f"{uploaded_file.name}:{uploaded_file.size}"
+            if st.session_state.get("_uploaded_file_id") != upload_id:
+                with tracing.span("discovery.upload") as sp:
+                    with tracing.span("extract_file", file_type=os.path.splitext(uploaded_file.name)[1].lower(),
+                                      bytes=uploaded_file.size):
+                        raw_text = parse_file(uploaded_file)
+                    sp.set("text_chars", len(raw_text))
+                st.session_state["uploaded_file"] = raw_text
+                st.session_state["_uploaded_file_id"] = upload_id
             st.success("File uploaded successfully.")
+    st.radio("Extraction mode", EXTRACTION_MODES, key="_extraction_mode", horizontal=True,
+             index=0 if os.getenv("VACALYSER_EXTRACTION_MODE", "") == "single" else 1,
+             help="Per step sends one short prompt per wizard step in parallel, so long answers are not cut off.")
     if st.button("Analyze Sources"):
-        raw_text = st.session_state.get("uploaded_file", "")
-        # If no file text, try URL
-        if not raw_text:
-            url = st.session_state.get("input_url", "").strip()
-            if url and url != "http://www.":
-                if not url.lower().startswith("http"):
-                    url = "https://" + url
-                try:
+        with tracing.span("discovery") as root:
+            st.session_state["_discovery_trace_id"] = getattr(root, "trace_id", "")
+            done = _analyze_sources(root)
+        if not done:
+            return
+        st.success("Information extracted and fields populated.")
+        st.session_state["wizard_step"] = 2
+        st.rerun()
+
+def _analyze_sources(root) -> bool:
+    """
+    Body of "Analyze Sources", one span per stage under the `discovery` root.
+    Returns False when there was nothing to analyze or the LLM call failed.
+    """
+    raw_text = st.session_state.get("uploaded_file", "")
+    root.set("source", "file" if raw_text else "url")
+    # If no file text, try URL
+    if not raw_text:
+        url = st.session_state.get("input_url", "").strip()
+        if url and url != "http://www.":
+            if not url.lower().startswith("http"):
+                url = "https://" + url
+            try:
+                with tracing.span("fetch_url", url=url) as sp:
                     resp = requests.get(url, timeout=10)
                     resp.raise_for_status()
+                    sp.set("status", resp.status_code)
+                    sp.set("bytes", len(resp.content))
+                with tracing.span("parse_html"):
                     soup = BeautifulSoup(resp.text, "html.parser")
                     for tag in soup(["script", "style"]):
                         tag.decompose()
                     text = soup.get_text(separator="\n")
                     lines = [line.strip() for line in text.splitlines() if line.strip()]
                     raw_text = "\n".join(lines)
-                except Exception as e:
-                    st.error(f"Failed to fetch URL content: {e}")
-                    raw_text = ""
-        if not raw_text:
-            st.warning("Please enter a valid URL or upload a file before analysis.")
-            return
-        # LLM extraction prompt
-        fields_to_extract = [k for k in st.session_state.keys() if k not in ("wizard_step", "input_url", "uploaded_file", 
-                                                                            "target_group_analysis", "generated_job_ad", 
-                                                                            "generated_interview_prep", "generated_email_template", 
-                                                                            "generated_boolean_query")]
-        prompt = (
-            f"Extract the following information from the job description below and return as JSON with these keys: {fields_to_extract}.\n\n"
-            f"{raw_text}\n\nOutput JSON:"
-        )
-        try:
-            llm_response = llm.complete(prompt=prompt)
-        except Exception as e:
-            st.error(f"Analysis failed: {e}")
-            return
-        if llm_response:
-            try:
-                extracted = json.loads(llm_response)
-            except json.JSONDecodeError:
-                extracted = {}
-            if isinstance(extracted, dict):
-                for k, v in extracted.items():
+            except Exception as e:
+                st.error(f"Failed to fetch URL content: {e}")
+                raw_text = ""
+    if not raw_text:
+        st.warning("Please enter a valid URL or upload a file before analysis.")
+        return False
+    root.set("text_chars", len(raw_text))
+    # LLM extraction prompt
+    fields_to_extract = [k for k in st.session_state.keys() if not k.startswith("_") and k not in ("wizard_step", "input_url", "uploaded_file",
+                                                                        "target_group_analysis", "generated_job_ad",
+                                                                        "generated_interview_prep", "generated_email_template",
+                                                                        "generated_boolean_query")]
+    if st.session_state.get("_extraction_mode") == EXTRACTION_MODES[1]:
+        done = _extract_per_step(raw_text, fields_to_extract)
+    else:
+        done = _extract_single_prompt(raw_text, fields_to_extract)
+    if not done:
+        return False
+    # Fallback keyword matching
+    with tracing.span("match_and_store_keys"):
+        match_and_store_keys(raw_text)
+    return True
+
+def _extract_single_prompt(raw_text: str, fields_to_extract: list) -> bool:
+    """One streamed prompt for every field; False when the LLM call failed."""
+    prompt = (
+        f"Extract the following information from the job description below and return as JSON with these keys: {fields_to_extract}.\n\n"
+        f"{raw_text}\n\nOutput JSON:"
+    )
+    # Stream the answer and fill fields as each top-level key closes; stop as soon
+    # as the object is complete or every requested key has arrived.
+    parser = JSONObjectStream(fields_to_extract)
+    schema = structured_output.json_schema(fields_to_extract) if STRUCTURED_OUTPUT else None
+    progress = st.progress(0.0, text="Waiting for the model…")
+    try:
+        with tracing.span("llm_call", prompt_chars=len(prompt), streaming=True) as sp, llm_task("discovery"), \
+                closing(llm.stream(prompt=prompt, max_tokens=DISCOVERY_MAX_TOKENS, schema=schema)) as chunks:
+            for chunk in chunks:
+                for k, v in parser.feed(chunk):
+                    v = structured_output.to_text(v)
                     if k in st.session_state and v is not None:
                         st.session_state[k] = v
-        # Fallback keyword matching
-        match_and_store_keys(raw_text)
-        st.success("Information extracted and fields populated.")
-        st.session_state["wizard_step"] = 2
-        st.experimental_rerun()
+                    progress.progress(min(len(parser.fields) / max(len(fields_to_extract), 1), 1.0),
+                                      text=f"Extracted {len(parser.fields)} of {len(fields_to_extract)} fields – {k}")
+                if parser.done:
+                    break
+            sp.set("response_chars", len(parser.text))
+            sp.set("fields", len(parser.fields))
+            sp.set("stopped_early", parser.done)
+    except Exception as e:
+        st.error(f"Analysis failed: {e}")
+        return False
+    finally:
+        progress.empty()
+    extracted = {}
+    with tracing.span("json_parse") as sp, llm_task("discovery"):
+        try:
+            extracted = None
+            if parser.done:
+                try:
+                    extracted = structured_output.validate_fields(parser.fields, fields_to_extract)
+                    structured_output.record_parse(True)
+                except structured_output.ExtractionParseError:
+                    pass  # repair() re-validates, records the failure and asks again
+            if extracted is None:
+                # Truncated, malformed or invalid answer: resend the request with the model's
+                # output and the error, and ask again (bounded).
+                extracted, repairs = structured_output.repair(
+                    parser.text, fields_to_extract,
+                    lambda p, sc: llm.complete(prompt=p, max_tokens=DISCOVERY_MAX_TOKENS, schema=sc if schema else None),
+                    request=prompt,
+                )
+                sp.set("repair_round_trips", repairs)
+        except structured_output.ExtractionParseError as e:
+            st.warning(f"Could not read structured data from the model ({e}); falling back to label matching.")
+        except Exception as e:
+            st.warning(f"Repair request failed ({e}); falling back to label matching.")
+        extracted = extracted or {}
+        sp.set("keys", len(extracted))
+    for k, v in extracted.items():
+        if k in st.session_state:
+            st.session_state[k] = v
+    return True
+
+def _extract_per_step(raw_text: str, fields_to_extract: list) -> bool:
+    """
+    One short prompt per wizard step (STEP_KEYS), run concurrently; fields are
+    filled as each group finishes. False when every group failed.
+    """
+    groups = grouped_extraction.key_groups(fields_to_extract)
+    progress = st.progress(0.0, text=f"Extracting {len(groups)} field groups…")
+    finished, filled, failed = 0, 0, []
+    with tracing.span("llm_call", mode="per_step", groups=len(groups)) as sp:
+        for result in grouped_extraction.iter_grouped(
+            raw_text, fields_to_extract,
+            lambda p, max_tokens, schema: llm.complete(prompt=p, max_tokens=max_tokens, schema=schema),
+            use_schema=STRUCTURED_OUTPUT, task="discovery",
+        ):
+            finished += 1
+            if result.error:
+                failed.append(result.name)
+            for k, v in result.fields.items():
+                if k in st.session_state:
+                    st.session_state[k] = v
+            filled += len(result.fields)
+            progress.progress(finished / len(groups),
+                              text=f"{result.name}: {len(result.fields)} of {len(result.keys)} fields")
+        sp.set("fields", filled)
+        sp.set("failed_groups", len(failed))
+    progress.empty()
+    if failed and len(failed) == len(groups):
+        st.error("Analysis failed for every field group.")
+        return False
+    if failed:
+        st.warning(f"Some field groups could not be extracted: {', '.join(failed)}")
+    return True
 
 def render_step_2():
     st.title("Step 2: Basic Job & Company Info")
@@ -770,6 +908,47 @@ def render_step_7():
     st.text_input("Recruitment Contact Phone", key="recruitment_contact_phone", placeholder="Contact phone for applicants")
     st.text_area("Application Instructions", key="application_instructions", placeholder="How to apply (e.g. apply on website or send CV)")
 
+def _generate(task: str, state_key: str, what: str) -> None:
+    """Run one step-8 generator and keep its output in session_state[state_key]."""
+    p = prompt_layout.build_prompt(st.session_state, task)
+    try:
+        with llm_task(task):
+            result = llm.complete(prompt=p.text, prefix=p.prefix)
+    except Exception as e:
+        st.error(f"Failed to generate {what}: {e}")
+        result = ""
+    st.session_state[state_key] = result.strip()
+
+@fragment
+def _generator_tab(task: str, button_label: str, state_key: str, title: str, height: int, what: str):
+    """One AI-output tab of step 8; its button reruns only this tab."""
+    if st.button(button_label):
+        _generate(task, state_key, what)
+    if st.session_state.get(state_key):
+        st.text_area(title, value=st.session_state[state_key], height=height)
+        # Download buttons
+        txt_data = st.session_state[state_key]
+        file_stem = state_key.replace("generated_", "")
+        st.download_button("Download as TXT", data=txt_data, file_name=f"{file_stem}.txt")
+        if text_pdf_bytes:  # rendered only when asked for, then served from the export cache
+            deferred_download("Download as PDF", "pdf", txt_data, text_pdf_bytes,
+                              file_name=f"{file_stem}.pdf", mime="application/pdf")
+
+@fragment
+def _email_panel():
+    if st.button("Generate Outreach Email"):
+        _generate("outreach_email", "generated_email_template", "email")
+    if st.session_state.get('generated_email_template'):
+        st.text_area("Email Template", value=st.session_state['generated_email_template'], height=150)
+        st.download_button("Download Email as TXT", data=st.session_state['generated_email_template'], file_name="email_template.txt")
+
+@fragment
+def _boolean_search_panel():
+    if st.button("Generate Boolean Search Query"):
+        _generate("boolean_search", "generated_boolean_query", "search query")
+    if st.session_state.get('generated_boolean_query'):
+        st.code(st.session_state['generated_boolean_query'], language="")
+
 def render_step_8():
     st.title("Step 8: Additional Information & Final Review")
     st.subheader("Additional Metadata")
@@ -790,198 +969,25 @@ def render_step_8():
     st.text_area("Comments (Internal)", key="comments_internal", placeholder="Internal comments or notes")
     # Final summary preview
     st.subheader("Final Summary (Preview)")
-    # Basic job info
-    st.markdown(f"**Job Title:** {st.session_state['job_title']}")
-    st.markdown(f"**Company Name:** {st.session_state['company_name']}")
-    st.markdown(f"**Brand Name:** {st.session_state['brand_name']}")
-    st.markdown(f"**HQ Location:** {st.session_state['headquarters_location']}")
-    st.markdown(f"**Company Website:** {st.session_state['company_website']}")
-    st.markdown(f"**Start Date:** {st.session_state['date_of_employment_start']}")
-    st.markdown(f"**Job Type:** {st.session_state['job_type']}")
-    st.markdown(f"**Contract Type:** {st.session_state['contract_type']}")
-    st.markdown(f"**Job Level:** {st.session_state['job_level']}")
-    st.markdown(f"**Job Location (City):** {st.session_state['city']}")
-    st.markdown(f"**Team Structure:** {st.session_state['team_structure']}")
-    st.markdown("---")
-    # Role info
-    st.markdown(f"**Role Description:** {st.session_state['role_description']}")
-    st.markdown(f"**Reports To:** {st.session_state['reports_to']}")
-    st.markdown(f"**Supervises:** {st.session_state['supervises']}")
-    st.markdown(f"**Role Type:** {st.session_state['role_type']}")
-    st.markdown(f"**Priority Projects:** {st.session_state['role_priority_projects']}")
-    st.markdown(f"**Travel Requirements:** {st.session_state['travel_requirements']}")
-    st.markdown(f"**Work Schedule:** {st.session_state['work_schedule']}")
-    st.markdown(f"**Role Keywords:** {st.session_state['role_keywords']}")
-    st.markdown(f"**Decision Making Authority:** {st.session_state['decision_making_authority']}")
-    st.markdown(f"**Performance Metrics:** {st.session_state['role_performance_metrics']}")
-    st.markdown("---")
-    # Tasks & responsibilities
-    st.markdown(f"**General Task List:** {st.session_state['task_list']}")
-    st.markdown(f"**Key Responsibilities:** {st.session_state['key_responsibilities']}")
-    st.markdown(f"**Technical Tasks:** {st.session_state['technical_tasks']}")
-    st.markdown(f"**Managerial Tasks:** {st.session_state['managerial_tasks']}")
-    st.markdown(f"**Administrative Tasks:** {st.session_state['administrative_tasks']}")
-    st.markdown(f"**Customer-Facing Tasks:** {st.session_state['customer_facing_tasks']}")
-    st.markdown(f"**Internal Reporting Tasks:** {st.session_state['internal_reporting_tasks']}")
-    st.markdown(f"**Performance-Related Tasks:** {st.session_state['performance_tasks']}")
-    st.markdown(f"**Innovation Tasks:** {st.session_state['innovation_tasks']}")
-    st.markdown(f"**Task Prioritization:** {st.session_state['task_prioritization']}")
-    st.markdown("---")
-    # Skills & competencies
-    st.markdown(f"**Hard Skills:** {st.session_state['hard_skills']}")
-    st.markdown(f"**Soft Skills:** {st.session_state['soft_skills']}")
-    st.markdown(f"**Must-Have Skills:** {st.session_state['must_have_skills']}")
-    st.markdown(f"**Nice-to-Have Skills:** {st.session_state['nice_to_have_skills']}")
-    st.markdown(f"**Certifications Required:** {st.session_state['certifications_required']}")
-    st.markdown(f"**Language Requirements:** {st.session_state['language_requirements']}")
-    st.markdown(f"**Tool Proficiency:** {st.session_state['tool_proficiency']}")
-    st.markdown(f"**Domain Expertise:** {st.session_state['domain_expertise']}")
-    st.markdown(f"**Leadership Competencies:** {st.session_state['leadership_competencies']}")
-    st.markdown(f"**Technical Stack:** {st.session_state['technical_stack']}")
-    st.markdown(f"**Industry Experience:** {st.session_state['industry_experience']}")
-    st.markdown(f"**Analytical Skills:** {st.session_state['analytical_skills']}")
-    st.markdown(f"**Communication Skills:** {st.session_state['communication_skills']}")
-    st.markdown(f"**Project Management Skills:** {st.session_state['project_management_skills']}")
-    st.markdown(f"**Additional Soft Requirements:** {st.session_state['soft_requirement_details']}")
-    st.markdown(f"**Visa Sponsorship:** {st.session_state['visa_sponsorship']}")
-    st.markdown("---")
-    # Compensation & benefits
-    st.markdown(f"**Salary Range:** {st.session_state['salary_range']} {st.session_state['currency']}")
-    st.markdown(f"**Pay Frequency:** {st.session_state['pay_frequency']}")
-    st.markdown(f"**Commission Structure:** {st.session_state['commission_structure']}")
-    st.markdown(f"**Bonus Scheme:** {st.session_state['bonus_scheme']}")
-    st.markdown(f"**Vacation Days:** {st.session_state['vacation_days']}")
-    st.markdown(f"**Flexible Hours:** {st.session_state['flexible_hours']}")
-    st.markdown(f"**Remote Work Policy:** {st.session_state['remote_work_policy']}")
-    st.markdown(f"**Relocation Assistance:** {st.session_state['relocation_assistance']}")
-    st.markdown(f"**Childcare Support:** {st.session_state['childcare_support']}")
-    st.markdown("---")
-    # Recruitment process
-    st.markdown(f"**Recruitment Steps:** {st.session_state['recruitment_steps']}")
-    st.markdown(f"**Recruitment Timeline:** {st.session_state['recruitment_timeline']}")
-    st.markdown(f"**Number of Interviews:** {st.session_state['number_of_interviews']}")
-    st.markdown(f"**Interview Format:** {st.session_state['interview_format']}")
-    st.markdown(f"**Assessment Tests:** {st.session_state['assessment_tests']}")
-    st.markdown(f"**Onboarding Process Overview:** {st.session_state['onboarding_process_overview']}")
-    st.markdown(f"**Contact Email:** {st.session_state['recruitment_contact_email']}")
-    st.markdown(f"**Contact Phone:** {st.session_state['recruitment_contact_phone']}")
-    st.markdown(f"**Application Instructions:** {st.session_state['application_instructions']}")
-    st.markdown("---")
-    # Additional metadata
-    st.markdown(f"**Parsed Data (Raw):** {st.session_state['parsed_data_raw']}")
-    st.markdown(f"**Language of Ad:** {st.session_state['language_of_ad']}")
-    st.markdown(f"**Translation Required:** {st.session_state['translation_required']}")
-    st.markdown(f"**Employer Branding Elements:** {st.session_state['employer_branding_elements']}")
-    st.markdown(f"**Desired Publication Channels:** {st.session_state['desired_publication_channels']}")
-    st.markdown(f"**Internal Job ID:** {st.session_state['internal_job_id']}")
-    st.markdown(f"**Ad Seniority Tone:** {st.session_state['ad_seniority_tone']}")
-    st.markdown(f"**Ad Length Preference:** {st.session_state['ad_length_preference']}")
-    st.markdown(f"**Deadline Urgency:** {st.session_state['deadline_urgency']}")
-    st.markdown(f"**Company Awards:** {st.session_state['company_awards']}")
-    st.markdown(f"**Diversity & Inclusion Statement:** {st.session_state['diversity_inclusion_statement']}")
-    st.markdown(f"**Legal Disclaimers:** {st.session_state['legal_disclaimers']}")
-    st.markdown(f"**Social Media Links:** {st.session_state['social_media_links']}")
-    st.markdown(f"**Video Introduction Option:** {st.session_state['video_introduction_option']}")
-    st.markdown(f"**Comments (Internal):** {st.session_state['comments_internal']}")
+    render_summary()                      # one markdown block, rebuilt only when a field changed
     st.info("Review the information above. You can go back to edit, or generate the final outputs now.")
     # AI-Generated Outputs
     st.subheader("AI-Generated Outputs")
     tab1, tab2, tab3 = st.tabs(["Target Group Analysis", "Job Advertisement", "Interview Prep"])
     with tab1:
-        if st.button("Generate Target Group Analysis"):
-            # Prepare prompt for target group analysis
-            job_title = st.session_state['job_title']
-            company = st.session_state['company_name']
-            level = st.session_state['job_level']
-            must_skills = st.session_state['must_have_skills']
-            # Compose prompt
-            prompt_tga = (f"Position: {job_title}\n"
-                          + (f"Company: {company}\n" if company else "")
-                          + (f"Level: {level}\n" if level else "")
-                          + (f"Required Skills: {must_skills}\n" if must_skills else "")
-                          + "Provide an analysis of the target candidate group for this position, including the ideal candidate profile (background, experience, skills, motivations) and how to attract them.")
-            try:
-                result = llm.complete(prompt=prompt_tga)
-            except Exception as e:
-                st.error(f"Failed to generate analysis: {e}")
-                result = ""
-            st.session_state['target_group_analysis'] = result.strip()
-        if st.session_state.get('target_group_analysis'):
-            st.text_area("Target Group Analysis", value=st.session_state['target_group_analysis'], height=200)
-            # Download buttons
-            txt_data = st.session_state['target_group_analysis']
-            st.download_button("Download as TXT", data=txt_data, file_name="target_group_analysis.txt")
-            pdf_bytes = text_to_pdf_bytes(txt_data)
-            if pdf_bytes:
-                st.download_button("Download as PDF", data=pdf_bytes, file_name="target_group_analysis.pdf", mime="application/pdf")
+        _generator_tab("target_group_analysis", "Generate Target Group Analysis", "target_group_analysis",
+                       "Target Group Analysis", 200, "analysis")
     with tab2:
-        if st.button("Generate Job Advertisement"):
-            # Prepare prompt for job ad
-            jt = st.session_state['job_title']; cn = st.session_state['company_name']; loc = st.session_state['city']
-            rd = st.session_state['role_description']; kr = st.session_state['key_responsibilities']
-            req_skills = st.session_state['must_have_skills'] or st.session_state['hard_skills']
-            tone = st.session_state['ad_seniority_tone']; length = st.session_state['ad_length_preference']
-            # Summarize benefits from state
-            benefits = []
-            if st.session_state['flexible_hours'] in ["Yes", "Partial/Flex Schedule"]: benefits.append("flexible working hours")
-            if st.session_state['remote_work_policy'] in ["Hybrid", "Full Remote"]: benefits.append(f"{st.session_state['remote_work_policy']} work options")
-            if st.session_state['relocation_assistance'] == "Yes": benefits.append("relocation assistance")
-            if st.session_state['childcare_support'] == "Yes": benefits.append("childcare support")
-            if st.session_state['vacation_days']: benefits.append(f"{st.session_state['vacation_days']} paid vacation days")
-            benefits_str = ", ".join(benefits)
-            prompt_ad = (
-                f"Write a job advertisement for the following position:\n"
-                f"Job Title: {jt}\n" + (f"Company: {cn}\n" if cn else "") + (f"Location: {loc}\n" if loc else "") +
-                (f"Role Description: {rd}\n" if rd else "") + (f"Key Responsibilities: {kr}\n" if kr else "") +
-                (f"Required Skills: {req_skills}\n" if req_skills else "") +
-                (f"Benefits: {benefits_str}\n" if benefits_str else "") +
-                f"Tone: {tone}. Length: {length}.\n"
-                "The ad should be engaging and include a brief company intro, role responsibilities, required qualifications, any benefits, and a call to action.")
-            try:
-                result = llm.complete(prompt=prompt_ad)
-            except Exception as e:
-                st.error(f"Failed to generate job ad: {e}")
-                result = ""
-            st.session_state['generated_job_ad'] = result.strip()
-        if st.session_state.get('generated_job_ad'):
-            st.text_area("Job Advertisement", value=st.session_state['generated_job_ad'], height=250)
-            txt_data = st.session_state['generated_job_ad']
-            st.download_button("Download as TXT", data=txt_data, file_name="job_ad.txt")
-            pdf_bytes = text_to_pdf_bytes(txt_data)
-            if pdf_bytes:
-                st.download_button("Download as PDF", data=pdf_bytes, file_name="job_ad.pdf", mime="application/pdf")
+        _generator_tab("job_ad", "Generate Job Advertisement", "generated_job_ad",
+                       "Job Advertisement", 250, "job ad")
     with tab3:
-        if st.button("Generate Interview Prep Guide"):
-            # Prepare prompt for interview prep
-            jt = st.session_state['job_title']; kr = st.session_state['key_responsibilities']
-            must_skills = st.session_state['must_have_skills']; soft_sk = st.session_state['soft_skills']
-            prompt_prep = (
-                f"You are preparing to interview candidates for the position of {jt}. "
-                "Based on the job description, create an interview preparation guide for the interviewer. "
-                "Include:\n1. A brief overview of what to look for in a candidate.\n"
-                "2. 5-10 key interview questions (technical and behavioral) to assess required skills and competencies.\n"
-                "3. For each question, notes on what a good answer should include.\n"
-            )
-            # Provide some context from the spec if available
-            if kr: prompt_prep += f"Key Responsibilities: {kr}\n"
-            if must_skills: prompt_prep += f"Must-Have Skills: {must_skills}\n"
-            if soft_sk: prompt_prep += f"Desired Soft Skills: {soft_sk}\n"
-            try:
-                result = llm.complete(prompt=prompt_prep)
-            except Exception as e:
-                st.error(f"Failed to generate interview prep: {e}")
-                result = ""
-            st.session_state['generated_interview_prep'] = result.strip()
-        if st.session_state.get('generated_interview_prep'):
-            st.text_area("Interview Preparation Guide", value=st.session_state['generated_interview_prep'], height=300)
-            txt_data = st.session_state['generated_interview_prep']
-            st.download_button("Download as TXT", data=txt_data, file_name="interview_prep.txt")
-            pdf_bytes = text_to_pdf_bytes(txt_data)
-            if pdf_bytes:
-                st.download_button("Download as PDF", data=pdf_bytes, file_name="interview_prep.pdf", mime="application/pdf")
+        _generator_tab("interview_prep", "Generate Interview Prep Guide", "generated_interview_prep",
+                       "Interview Preparation Guide", 300, "interview prep")
     # Export session data as JSON
-    export_data = {k: v for k, v in st.session_state.items() if k != "uploaded_file"}
-    st.download_button("Download All Data (JSON)", data=json.dumps(export_data, indent=2), file_name="vacalyser_session.json", mime="application/json")
+    export_data = session_store.export_fields(st.session_state)
+    deferred_download("Download All Data (JSON)", "json", export_data,
+                      lambda data: json.dumps(data, indent=2).encode("utf-8"),
+                      file_name="vacalyser_session.json", mime="application/json")
     # Additional Tools
     st.subheader("Additional Tools (Optional)")
     # Responsibility Triangle Visualization
@@ -1002,41 +1008,14 @@ def render_step_8():
         st.write("*Responsibility distribution will display here once task details are provided.*")
     # Email Template Generator
     with st.expander("Email Template Generator"):
-        if st.button("Generate Outreach Email"):
-            jt = st.session_state['job_title']; cn = st.session_state['company_name']
-            prompt_email = (
-                f"Write a concise, professional recruitment email to a potential candidate for the position of {jt} at {cn if cn else 'our company'}. "
-                "Introduce the company briefly, highlight the role's key points (responsibilities or benefits), and include a friendly call to action to apply."
-            )
-            try:
-                result = llm.complete(prompt=prompt_email)
-            except Exception as e:
-                st.error(f"Failed to generate email: {e}")
-                result = ""
-            st.session_state['generated_email_template'] = result.strip()
-        if st.session_state.get('generated_email_template'):
-            st.text_area("Email Template", value=st.session_state['generated_email_template'], height=150)
-            st.download_button("Download Email as TXT", data=st.session_state['generated_email_template'], file_name="email_template.txt")
+        _email_panel()
     # Boolean Search Generator
     with st.expander("Boolean Search Query Generator"):
-        if st.button("Generate Boolean Search Query"):
-            jt = st.session_state['job_title']; must_skills = st.session_state['must_have_skills']
-            prompt_bool = (
-                f"Generate a Boolean search string to find resumes for a {jt} role "
-                + (f"requiring skills: {must_skills}. " if must_skills else "")
-                + "Use AND, OR, and NOT operators appropriately."
-            )
-            try:
-                result = llm.complete(prompt=prompt_bool)
-            except Exception as e:
-                st.error(f"Failed to generate search query: {e}")
-                result = ""
-            st.session_state['generated_boolean_query'] = result.strip()
-        if st.session_state.get('generated_boolean_query'):
-            st.code(st.session_state['generated_boolean_query'], language="")
+        _boolean_search_panel()
 
 def main():
     # ---------- Session & UI-Grundlagen ----------
+    session_store.restore(st.session_state)   # gespeicherte Felder (?sid=…) zurückholen
     initialize_session_state()           # Session-Keys anlegen
     apply_base_styling()
     show_sidebar_links()
@@ -1049,31 +1028,35 @@ def main():
         step = 1
     st.session_state["wizard_step"] = step      # garantiert int
 
-    # ---------- Router ----------
-    PAGES = {
-        1: start_discovery_page,
-        2: render_step_2,
-        3: render_step_3,
-        4: render_step_4,
-        5: render_step_5,
-        6: render_step_6,
-        7: render_step_7,
-        8: render_step_8,
-    }
-    PAGES[step]()                         # passende Seite rendern
+    try:
+        # ---------- Router ----------
+        PAGES = {
+            1: start_discovery_page,
+            2: render_step_2,
+            3: render_step_3,
+            4: render_step_4,
+            5: render_step_5,
+            6: render_step_6,
+            7: render_step_7,
+            8: render_step_8,
+        }
+        PAGES[step]()                         # passende Seite rendern
 
-    # ---------- Navigation ----------
-    col_back, col_next = st.columns(2)
+        # ---------- Navigation ----------
+        col_back, col_next = st.columns(2)
 
-    with col_back:
-        if step > 1 and st.button("⬅️ Back", key="btn_back"):
-            st.session_state["wizard_step"] = int(step - 1)
-            st.experimental_rerun()
+        with col_back:
+            if step > 1 and st.button("⬅️ Back", key="btn_back"):
+                st.session_state["wizard_step"] = int(step - 1)
+                st.rerun()
 
-    with col_next:
-        if step < 8 and st.button("Next ➡", key="btn_next"):
-            st.session_state["wizard_step"] = int(step + 1)
-            st.experimental_rerun()
+        with col_next:
+            if step < 8 and st.button("Next ➡", key="btn_next"):
+                st.session_state["wizard_step"] = int(step + 1)
+                st.rerun()
+    finally:
+        # geänderte Felder sichern – auch wenn st.rerun() den Lauf abbricht
+        session_store.autosave(st.session_state)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+# benchmarks/bench_hot_paths.py
+"""
+Benchmark cases for the project's hot paths.
+Each factory returns a `Case` whose setup builds fixtures once, outside the timed loop.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import pickle
+import tempfile
+from typing import List
+
+from benchmarks import corpus
+from benchmarks.harness import Case
+
+# functions.py / src.utils.llm_service refuse to import without a key;
+# benchmarks never reach the API, so a placeholder is enough.
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+
+
+class _Upload(io.BytesIO):
+    """Stand-in for Streamlit's UploadedFile (a BytesIO with a name)."""
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+def _match_labels(size: str) -> Case:
+    def setup():
+        from src.utils.label_matching import match_labels
+        text = corpus.job_ad_text(size)
+        return lambda: match_labels(text)
+    return Case("match_labels", "extraction", size, setup)
+
+
+def _parse_model_json(size: str) -> Case:
+    def setup():
+        from functions import parse_model_json
+        text = corpus.model_response(size)
+        return lambda: parse_model_json(text)
+    return Case("parse_model_json", "extraction", size, setup)
+
+
+def _stream_json(size: str) -> Case:
+    def setup():
+        from src.utils.json_stream import JSONObjectStream
+        text = corpus.model_response(size)
+        chunks = [text[i:i + 8] for i in range(0, len(text), 8)]  # ~token-sized deltas
+
+        def run():
+            parser = JSONObjectStream()
+            for chunk in chunks:
+                parser.feed(chunk)
+            return parser.fields
+        return run
+    return Case("json_stream", "extraction", size, setup)
+
+
+def _clean_text(size: str, variant: str) -> Case:
+    def setup():
+        if variant == "extraction":
+            from src.utils.extraction import clean_text
+        else:
+            from src.utils.preprocessing import clean_text
+        text = corpus.job_ad_text(size)
+        return lambda: clean_text(text)
+    return Case(f"clean_text.{variant}", "text", size, setup)
+
+
+def _file_extractor(size: str, kind: str) -> Case:
+    def setup():
+        from src.utils import extraction
+        data = {"pdf": corpus.pdf_bytes, "docx": corpus.docx_bytes, "txt": corpus.txt_bytes}[kind](size)
+        fn = {"pdf": extraction.extract_text_from_pdf, "docx": extraction.extract_text_from_docx,
+              "txt": extraction.extract_text_from_txt}[kind]
+        return lambda: fn(_Upload(data, f"upload.{kind}"))
+    return Case(f"extract_{kind}", "files", size, setup)
+
+
+def _pypdf_extractor(size: str) -> Case:
+    def setup():
+        import functions
+        tmp = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+        tmp.write(corpus.pdf_bytes(size))
+        tmp.close()
+        return lambda: functions.extract_text_from_pdf(tmp.name)
+    return Case("extract_pdf.pypdf2", "files", size, setup)
+
+
+_N_VECTORS = {"small": 1_000, "medium": 10_000, "large": 100_000}
+
+
+def _search_faiss(size: str) -> Case:
+    def setup():
+        import faiss
+        import rag_helpers
+        n = _N_VECTORS[size]
+        tmpdir = tempfile.mkdtemp(prefix="bench_faiss_")
+        index = faiss.IndexFlatL2(768)
+        index.add(corpus.random_vectors(n))
+        rag_helpers.INDEX_PATH = os.path.join(tmpdir, "index.faiss")
+        rag_helpers.MAPPING_PATH = os.path.join(tmpdir, "index.pkl")
+        faiss.write_index(index, rag_helpers.INDEX_PATH)
+        with open(rag_helpers.MAPPING_PATH, "wb") as f:
+            pickle.dump({str(k): v for k, v in corpus.excerpt_mapping(n).items()}, f)
+        rag_helpers.INDEX_LOADED = False
+        rag_helpers.init_faiss_index()
+        return lambda: rag_helpers.search_faiss("senior kubernetes engineer", top_k=5)
+    return Case("search_faiss", "retrieval", size, setup, heavy=True, params={"vectors": _N_VECTORS[size]})
+
+
+def _vector_store(size: str, op: str) -> Case:
+    def setup():
+        from src.utils import vector_store
+        n = _N_VECTORS[size]
+        tmpdir = tempfile.mkdtemp(prefix="bench_vs_")
+        vector_store.VECTOR_BASE_DIR = tmpdir
+        vector_store.INDEX_FILE = os.path.join(tmpdir, "job_index.faiss")
+        vector_store.DATA_FILE = os.path.join(tmpdir, "job_vectors.pkl")
+        index = vector_store.init_index(dim=768)
+        index.add(corpus.random_vectors(n))
+        vector_store.save_index(index, [{"id": i} for i in range(n)])
+        vec = corpus.random_vectors(1, seed=1)
+        if op == "add":
+            return lambda: vector_store.add_vector(vec, {"id": "bench"})
+        return lambda: vector_store.query_vector(vec, top_k=5)
+    return Case(f"vector_store.{op}", "retrieval", size, setup, params={"vectors": _N_VECTORS[size]})
+
+
+def _render_template(size: str) -> Case:
+    def setup():
+        from src.utils.email_templates import render_template
+        ctx = corpus.template_context()
+        return lambda: render_template("Candidate Outreach", ctx)
+    return Case("render_template", "templates", size, setup)
+
+
+def build_cases(sizes: List[str]) -> List[Case]:
+    cases: List[Case] = []
+    for size in sizes:
+        cases += [
+            _match_labels(size),
+            _parse_model_json(size),
+            _stream_json(size),
+            _clean_text(size, "extraction"),
+            _clean_text(size, "preprocessing"),
+            _file_extractor(size, "pdf"),
+            _pypdf_extractor(size),
+            _file_extractor(size, "docx"),
+            _file_extractor(size, "txt"),
+            _search_faiss(size),
+            _vector_store(size, "add"),
+            _vector_store(size, "query"),
+        ]
+    cases.append(_render_template("small"))  # input size is fixed by the template
+    return cases
@@ -0,0 +1,110 @@
+# benchmarks/bulk_export.py
+"""
+Bulk export (src/utils/bulk_export.py): throughput of rendering 1,000 job
+specs into a zip archive, in-process and across process pools, and how much
+memory the parent holds while streaming.
+
+Specs are corpus spec dicts with every other one carrying a generated job
+ad. Per run:
+
+  specs/s     specs rendered and written per second (all requested formats)
+  MiB/s       rendered bytes per second (before zip compression)
+  zip MiB     archive size
+  peak MiB    parent's peak Python allocation (tracemalloc, separate run over
+              a quarter of the specs); does not grow with the spec count
+              because files are written as chunks arrive
+
+Every archive must hold one file per spec and format plus the ads, and the
+JSON of a sample spec must round-trip (exit 1 if not).
+
+    python -m benchmarks.bulk_export
+    python -m benchmarks.bulk_export --specs 1000 --workers 0 2 4 --formats json pdf --out bulk.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+import zipfile
+from typing import Dict, Sequence
+
+from benchmarks import corpus
+
+
+def _spec(i: int) -> Dict[str, str]:
+    spec = corpus.spec_dict(i)
+    spec["generated_job_ad"] = corpus.paragraph(corpus._rng(i), 150) if i % 2 else ""
+    return spec
+
+
+def _check(path: str, n: int, formats: Sequence[str]) -> bool:
+    from src.utils.bulk_export import file_stem
+    from src.utils.job_spec import JobSpec
+
+    with zipfile.ZipFile(path) as archive:
+        if len(archive.namelist()) != n * len(formats) + n // 2:
+            return False
+        if "json" not in formats:
+            return True
+        sample = n // 3
+        spec = JobSpec.from_state(_spec(sample))
+        return json.loads(archive.read(f"{file_stem(spec, sample)}.json")) == spec.to_dict()
+
+
+def run(n_specs: int, worker_counts: Sequence[int], formats: Sequence[str],
+        chunk_size: int) -> Dict[str, Dict[str, float]]:
+    from src.utils import export_utils  # noqa: F401  (imported before tracing)
+    from src.utils.bulk_export import bulk_export
+
+    report = {}
+    for workers in worker_counts:
+        directory = tempfile.mkdtemp(prefix="bench_bulk_")
+        path = os.path.join(directory, "export.zip")
+        stats = bulk_export(map(_spec, range(n_specs)), path, formats, workers, chunk_size)
+        # tracing slows in-process rendering, so memory is measured in a second, shorter run
+        tracemalloc.start()
+        bulk_export(map(_spec, range(max(1, n_specs // 4))), os.path.join(directory, "traced.zip"),
+                    formats, workers, chunk_size)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        report["in-process" if workers == 0 else f"{workers} workers"] = {
+            "specs_per_s": stats["specs"] / stats["seconds"],
+            "mib_per_s": stats["bytes"] / 2**20 / stats["seconds"],
+            "seconds": stats["seconds"],
+            "zip_mib": os.path.getsize(path) / 2**20,
+            "peak_mib": peak / 2**20,
+            "exact": stats["specs"] == n_specs and _check(path, n_specs, formats),
+        }
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--specs", type=int, default=1_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, os.cpu_count() or 1])
+    parser.add_argument("--formats", nargs="+", choices=["json", "docx", "pdf"], default=["json", "docx", "pdf"])
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--out", help="write the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.specs, list(dict.fromkeys(args.workers)), args.formats, args.chunk_size)
+    print(f"{args.specs} specs, formats {', '.join(args.formats)}, {os.cpu_count()} CPU(s)")
+    print(f"{'':<12} {'specs/s':>8} {'MiB/s':>7} {'total s':>8} {'zip MiB':>8} {'peak MiB':>9} exact")
+    for name, r in report.items():
+        print(f"{name:<12} {r['specs_per_s']:>8.1f} {r['mib_per_s']:>7.2f} {r['seconds']:>8.1f} "
+              f"{r['zip_mib']:>8.1f} {r['peak_mib']:>9.1f} {'yes' if r['exact'] else 'NO'}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": report}, f, indent=2)
+    if not all(r["exact"] for r in report.values()):
+        print("FAIL: an archive is missing files or holds a different spec", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
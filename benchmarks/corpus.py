@@ -0,0 +1,127 @@
+# benchmarks/corpus.py
+"""
+Deterministic synthetic corpora for the benchmarks (job ads, model replies,
+uploaded files, vectors). Everything is generated from a seed – no fixtures on disk.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import random
+from typing import Dict, List
+
+from src.utils.label_matching import LABEL_MAP
+
+# Approximate number of filler paragraphs per size class (~100 words each).
+SIZES: Dict[str, int] = {"small": 5, "medium": 50, "large": 500}
+
+_WORDS = (
+    "team data platform customer agile cloud python sql analytics pipeline stakeholder "
+    "reporting quality delivery kubernetes docker aws azure finance sap controlling budget "
+    "leadership mentoring roadmap strategy security compliance process automation testing "
+    "design communication ownership growth hybrid remote office benefits pension training "
+    "responsibility experience degree english german fluent excellent strong motivated"
+).split()
+
+SKILLS = [
+    "Python", "SQL", "Kubernetes", "Docker", "AWS", "Azure", "Terraform", "Java", "Go",
+    "SAP FI/CO", "Excel", "Power BI", "Tableau", "Scrum", "Kanban", "Spark", "Airflow",
+    "React", "TypeScript", "Stakeholder Management", "Negotiation", "Public Speaking",
+]
+
+
+def _rng(seed: int) -> random.Random:
+    return random.Random(seed)
+
+
+def paragraph(rng: random.Random, words: int = 100) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def job_ad_text(size: str = "small", seed: int = 0) -> str:
+    """A job ad with every known label line scattered between filler paragraphs."""
+    rng = _rng(seed)
+    labels = list(LABEL_MAP.items())
+    paras = [paragraph(rng) for _ in range(SIZES[size])]
+    lines: List[str] = []
+    for i, (key, label) in enumerate(labels):
+        lines.append(f"{label} {key.replace('_', ' ')} value {rng.randint(1, 999)}")
+        if paras:
+            lines.append(paras[i % len(paras)])
+    lines.extend(paras[len(labels):])
+    return "\n".join(lines)
+
+
+def spec_dict(seed: int = 0, keys: List[str] = None) -> Dict[str, str]:
+    """A flat job-spec dict like the wizard keeps in session_state."""
+    rng = _rng(seed)
+    keys = keys or list(LABEL_MAP)
+    spec = {k: paragraph(rng, rng.randint(3, 25)) for k in keys}
+    spec["job_title"] = f"Senior {rng.choice(['Data', 'Cloud', 'Finance', 'Backend'])} Engineer"
+    spec["must_have_skills"] = ", ".join(rng.sample(SKILLS, 5))
+    return spec
+
+
+def model_response(size: str = "small", seed: int = 0) -> str:
+    """LLM-style reply: prose + ```json fence + nested JSON object + trailing prose."""
+    rng = _rng(seed)
+    n_keys = {"small": 10, "medium": 40, "large": 80}[size]
+    payload = spec_dict(seed, list(LABEL_MAP)[:n_keys])
+    payload["benefits"] = {"health": paragraph(rng, 8), "learning": [paragraph(rng, 5) for _ in range(3)]}
+    return ("Sure! Here is the extracted information:\n```json\n"
+            + json.dumps(payload, indent=2)
+            + "\n```\nLet me know if you need anything else.")
+
+
+def txt_bytes(size: str = "small", seed: int = 0) -> bytes:
+    return job_ad_text(size, seed).encode("utf-8")
+
+
+def docx_bytes(size: str = "small", seed: int = 0) -> bytes:
+    import docx
+
+    document = docx.Document()
+    for line in job_ad_text(size, seed).splitlines():
+        document.add_paragraph(line)
+    buf = io.BytesIO()
+    document.save(buf)
+    return buf.getvalue()
+
+
+def pdf_bytes(size: str = "small", seed: int = 0) -> bytes:
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=10)
+    pdf.multi_cell(0, 5, job_ad_text(size, seed))
+    out = pdf.output(dest="S")
+    return out.encode("latin-1") if isinstance(out, str) else bytes(out)
+
+
+def template_context(seed: int = 0) -> Dict[str, str]:
+    rng = _rng(seed)
+    return {
+        "JOB_TITLE": "Senior Data Engineer", "COMPANY": "TechCorp", "FIRST_NAME": "Alex",
+        "SKILL": rng.choice(SKILLS), "INDUSTRY": "FinTech", "DATE": "2025-06-01",
+    }
+
+
+def random_vectors(n: int, dim: int = 768, seed: int = 0):
+    import numpy as np
+
+    return np.random.default_rng(seed).random((n, dim), dtype=np.float32)
+
+
+def excerpt_mapping(n: int, seed: int = 0) -> Dict[int, Dict[str, str]]:
+    """Id → document mapping in the same shape as vector_databases/index.pkl (+ excerpt)."""
+    rng = _rng(seed)
+    return {
+        i: {
+            "file_name": f"{10_000_000 + i}.pdf",
+            "category": rng.choice(["ACCOUNTANT", "ENGINEERING", "HR", "SALES"]),
+            "excerpt": f"{', '.join(rng.sample(SKILLS, 3))}. {paragraph(rng, 40)}",
+        }
+        for i in range(n)
+    }
@@ -0,0 +1,166 @@
+# benchmarks/embedding_backends.py
+"""
+CPU embedding backends (src/utils/embeddings.py) compared with the fp32
+SentenceTransformer: load time, resident memory, queries/sec and parity.
+
+Every backend runs in its own subprocess so RSS is not shared:
+
+  rss MiB      resident memory after loading and encoding (peak, VmHWM)
+  load s       time to import + load the encoder
+  q/s          single-query encodes per second (what search_faiss does)
+  batch/s      sentences per second when encoding in batches of 32
+  cos min      lowest cosine similarity to the torch embedding of a query
+  top5         share of the torch top-5 neighbours (in a torch-built index)
+               that the backend's query embedding also retrieves
+
+    python -m benchmarks.embedding_backends --onnx-dir vector_databases/mpnet-onnx
+    python -m benchmarks.embedding_backends --offline      # no hub access
+With --offline an untrained MPNet of the same shape is built locally; timing
+and memory are representative, parity numbers only roughly so.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks import corpus
+
+BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+
+
+def _texts(n: int, seed: int, words: int) -> List[str]:
+    rng = corpus._rng(seed)
+    return [corpus.paragraph(rng, words) for _ in range(n)]
+
+
+def _rss_mib() -> float:
+    with open("/proc/self/status", encoding="ascii") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def worker(args) -> int:
+    """Load one backend, time it and write its query embeddings to --emb-out."""
+    start = time.perf_counter()
+    from src.utils.embeddings import load_encoder
+    encoder = load_encoder(args.worker, model_name=args.model, onnx_dir=args.onnx_dir)
+    load_s = time.perf_counter() - start
+    queries = _texts(args.queries, seed=1, words=12)
+    docs = _texts(args.docs, seed=2, words=60)
+
+    encoder.encode(queries[:2])  # warm-up
+    start = time.perf_counter()
+    q_emb = np.stack([encoder.encode([q])[0] for q in queries])
+    q_per_s = len(queries) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    encoder.encode(docs, batch_size=32)
+    batch_per_s = len(docs) / (time.perf_counter() - start)
+    np.save(args.emb_out, q_emb)
+    json.dump({"backend": encoder.backend, "fallback": encoder.fallback, "load_s": load_s, "q_per_s": q_per_s,
+               "batch_per_s": batch_per_s, "rss_mib": _rss_mib(),
+               "torch_imported": "torch" in sys.modules}, sys.stdout)
+    return 0
+
+
+def _offline_model(path: str) -> str:
+    """Untrained MPNet with all-mpnet-base-v2's shape, wrapped as a SentenceTransformer."""
+    from sentence_transformers import SentenceTransformer, models
+    from tokenizers import Tokenizer, decoders, models as tok_models, normalizers, pre_tokenizers, processors, trainers
+    from transformers import MPNetConfig, MPNetModel, PreTrainedTokenizerFast
+
+    specials = ["<s>", "<pad>", "</s>", "<unk>", "<mask>"]
+    wp = Tokenizer(tok_models.WordPiece(unk_token="<unk>"))
+    wp.normalizer = normalizers.BertNormalizer(lowercase=True)
+    wp.pre_tokenizer = pre_tokenizers.BertPreTokenizer()
+    wp.decoder = decoders.WordPiece()
+    wp.train_from_iterator(_texts(300, seed=9, words=80), trainers.WordPieceTrainer(vocab_size=8000,
+                                                                                    special_tokens=specials))
+    wp.post_processor = processors.TemplateProcessing(
+        single="<s> $A </s>", special_tokens=[("<s>", wp.token_to_id("<s>")), ("</s>", wp.token_to_id("</s>"))])
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=wp, bos_token="<s>", eos_token="</s>", pad_token="<pad>",
+                                        unk_token="<unk>", mask_token="<mask>", model_max_length=512)
+    tokenizer.model_input_names = ["input_ids", "attention_mask"]
+    hf_dir = os.path.join(path, "hf")
+    MPNetModel(MPNetConfig(vocab_size=30527, pad_token_id=tokenizer.pad_token_id)).save_pretrained(hf_dir)
+    tokenizer.save_pretrained(hf_dir)
+    transformer = models.Transformer(hf_dir, max_seq_length=384)
+    st_dir = os.path.join(path, "st")
+    SentenceTransformer(modules=[transformer, models.Pooling(768, "mean"), models.Normalize()]).save(st_dir)
+    return st_dir
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="sentence-transformers/all-mpnet-base-v2")
+    parser.add_argument("--onnx-dir", help="existing export; default: export --model to a temp dir first")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--docs", type=int, default=256, help="sentences for the batch throughput and the index")
+    parser.add_argument("--offline", action="store_true", help="use an untrained local MPNet instead of --model")
+    parser.add_argument("--out", help="write the comparison as JSON")
+    parser.add_argument("--worker", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--emb-out", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.worker:
+        return worker(args)
+
+    tmp = tempfile.mkdtemp(prefix="vacalyser-bench-emb-")
+    if args.offline:
+        import torch
+        torch.manual_seed(0)
+        args.model = _offline_model(tmp)
+    if not args.onnx_dir and any(b.startswith("onnx") for b in args.backends):
+        from tools.export_embedding_model import export
+        args.onnx_dir = os.path.join(tmp, "onnx")
+        export(args.model, args.onnx_dir)
+
+    report: Dict[str, Dict] = {}
+    embeddings: Dict[str, np.ndarray] = {}
+    for backend in dict.fromkeys(["torch"] + args.backends):  # torch first: it is the parity reference
+        emb_path = os.path.join(tmp, f"{backend}.npy")
+        cmd = [sys.executable, "-m", "benchmarks.embedding_backends", "--worker", backend, "--emb-out", emb_path,
+               "--model", args.model, "--onnx-dir", args.onnx_dir or "", "--queries", str(args.queries),
+               "--docs", str(args.docs)]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(proc.stderr[-2000:], file=sys.stderr)
+            return 1
+        report[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+        embeddings[backend] = np.load(emb_path)
+
+    from src.utils.embeddings import TorchEncoder
+    ref = embeddings["torch"]
+    index = TorchEncoder(args.model).encode(_texts(args.docs, seed=2, words=60) + _texts(args.queries, seed=1, words=12))
+    ref_top = np.argsort(-ref @ index.T, axis=1)[:, :5]
+    for backend, emb in embeddings.items():
+        cos = np.sum(ref * emb, axis=1) / (np.linalg.norm(ref, axis=1) * np.linalg.norm(emb, axis=1))
+        top = np.argsort(-emb @ index.T, axis=1)[:, :5]
+        report[backend].update(cos_min=float(cos.min()), cos_mean=float(cos.mean()),
+                               top5=float(np.mean([len(set(a) & set(b)) / 5 for a, b in zip(ref_top, top)])))
+
+    print(f"{args.model}, {args.queries} queries, {args.docs} batch sentences, {os.cpu_count()} CPU(s)")
+    print(f"{'backend':<10} {'rss MiB':>8} {'load s':>7} {'q/s':>7} {'batch/s':>8} {'cos min':>8} {'top5':>6} torch")
+    for backend, r in report.items():
+        print(f"{backend:<10} {r['rss_mib']:>8.0f} {r['load_s']:>7.1f} {r['q_per_s']:>7.1f} {r['batch_per_s']:>8.1f} "
+              f"{r['cos_min']:>8.4f} {r['top5']:>6.1%} {'yes' if r['torch_imported'] else 'no'}"
+              + (f"  ({r['fallback']})" if r["fallback"] else ""))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "backends": report}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
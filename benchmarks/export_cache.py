@@ -0,0 +1,162 @@
+# benchmarks/export_cache.py
+"""
+Export cache (src/utils/export_cache.py): what the downloads on step 8 cost
+per rerun when every artefact is rendered eagerly, against deferred,
+content-hashed rendering — and whether the LRU stays within its bounds.
+
+  render ms     one render of each artefact (generated text as PDF, the spec
+                as DOCX / PDF / JSON)
+  eager ms      per rerun: render the three tab PDFs and the JSON export, as
+                the page did
+  deferred µs   per rerun: hash the same contents and look them up; nothing
+                is rendered until a download is prepared
+  hit µs        per rerun once all four were prepared (cache hits)
+
+The LRU part pushes many distinct artefacts through a small cache and
+checks the entry and byte bounds and that hits return the rendered bytes.
+The session part runs the JSON export of step 8 in Streamlit's AppTest:
+after "Prepare", the download button must survive further reruns (the
+export's content hash must not change) and the file must hold no widget
+keys (exit 1 if any check fails).
+
+    python -m benchmarks.export_cache
+    python -m benchmarks.export_cache --reruns 50 --out exports.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict
+
+from benchmarks import corpus
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SESSION_PAGE = f"""import sys
+sys.path.insert(0, {ROOT!r})
+import json
+import streamlit as st
+from benchmarks import corpus
+from src.components.downloads import deferred_download
+from src.utils import session_store
+
+if "job_title" not in st.session_state:
+    st.session_state.update(corpus.spec_dict(9), generated_job_ad="Generated ad")
+deferred_download("Download All Data (JSON)", "json", session_store.export_fields(st.session_state),
+                  lambda data: json.dumps(data, indent=2).encode("utf-8"),
+                  file_name="vacalyser_session.json", mime="application/json")
+"""
+
+
+def _ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(reruns: int, artefacts: int) -> Dict[str, Dict[str, float]]:
+    from src.utils import export_utils
+    from src.utils.export_cache import ExportCache, content_key
+
+    rng = corpus._rng(9)
+    spec = corpus.spec_dict(9)
+    texts = [" ".join(corpus.paragraph(rng, 120) for _ in range(6)) for _ in range(3)]
+    session = {**spec, **{f"generated_{i}": t for i, t in enumerate(texts)}}
+    renders = {
+        "text pdf": lambda: export_utils.text_pdf_bytes(texts[0]),
+        "spec docx": lambda: export_utils.word_bytes(spec),
+        "spec pdf": lambda: export_utils.pdf_bytes(spec),
+        "session json": lambda: export_utils.json_bytes(session),
+    }
+    report: Dict[str, Dict[str, float]] = {"render_ms": {name: _ms(fn, 5) for name, fn in renders.items()}}
+
+    def eager():
+        for t in texts:
+            export_utils.text_pdf_bytes(t)
+        export_utils.json_bytes(session)
+
+    cache = ExportCache()
+    items = [("pdf", t, export_utils.text_pdf_bytes) for t in texts] + [("json", session, export_utils.json_bytes)]
+
+    def deferred():
+        for fmt, content, _ in items:
+            cache.get(content_key(fmt, content))
+
+    def hits():
+        for fmt, content, render in items:
+            cache.get_or_render(content_key(fmt, content), lambda: render(content))
+
+    report["per_rerun"] = {"eager_ms": _ms(eager, reruns), "deferred_us": _ms(deferred, reruns) * 1000}
+    hits()  # prepare all four once
+    report["per_rerun"]["hit_us"] = _ms(hits, reruns) * 1000
+
+    small = ExportCache(max_items=32, max_bytes=24 * 1024)
+    within, correct = True, True
+    for i in range(artefacts):
+        text = f"{i} " + corpus.paragraph(rng, 60)
+        key = content_key("pdf", text)
+        data = small.get_or_render(key, lambda: export_utils.text_pdf_bytes(text))
+        within &= len(small) <= small.max_items and small.nbytes <= small.max_bytes
+        again = small.get(key)
+        correct &= again is None or again == data
+    report["lru"] = {**small.stats(), "artefacts": artefacts, "within_bounds": within, "hits_exact": correct}
+    report["session"] = _session_export()
+    return report
+
+
+def _session_export() -> Dict[str, bool]:
+    """Prepare the session JSON on a step-8-like page, then rerun twice."""
+    from streamlit.testing.v1 import AppTest
+
+    from src.utils import session_store
+    from src.utils.export_cache import content_key, get_export_cache
+
+    at = AppTest.from_string(_SESSION_PAGE).run()
+    at.button[0].click().run()
+    at.run().run()
+    state = at.session_state.filtered_state
+    data = get_export_cache().get(content_key("json", session_store.export_fields(state)))
+    exported = json.loads(data) if data else {}
+    return {"kept_after_rerun": len(at.get("download_button")) == 1,
+            "no_widget_keys": bool(exported) and not any(k.startswith("prepare_") for k in exported)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--artefacts", type=int, default=200, help="distinct artefacts pushed through the LRU")
+    parser.add_argument("--out", help="write the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.reruns, args.artefacts)
+    print("render ms: " + ", ".join(f"{name} {ms:.1f}" for name, ms in report["render_ms"].items()))
+    r = report["per_rerun"]
+    print(f"per rerun: eager {r['eager_ms']:.1f} ms, deferred {r['deferred_us']:.0f} µs, "
+          f"after preparing {r['hit_us']:.0f} µs")
+    lru = report["lru"]
+    print(f"LRU: {lru['artefacts']} artefacts → {lru['entries']}/{lru['max_items']} entries, "
+          f"{lru['bytes'] / 1024:.0f}/{lru['max_bytes'] / 1024:.0f} KiB")
+    session = report["session"]
+    print(f"session export: download kept after rerun {session['kept_after_rerun']}, "
+          f"no widget keys {session['no_widget_keys']}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": report}, f, indent=2)
+    if not (lru["within_bounds"] and lru["hits_exact"]):
+        print("FAIL: the export cache exceeded its bounds or returned other bytes", file=sys.stderr)
+        return 1
+    if not all(session.values()):
+        print("FAIL: the session export changed across reruns or contains widget keys", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# benchmarks/extraction_modes.py
+"""
+Compare discovery extraction modes against the local stub LLM server:
+
+  single    – one streamed prompt for every key (the wizard's default path),
+              with the same salvage + bounded repair the wizard applies
+  per_step  – one short prompt per STEP_KEYS group, run concurrently
+
+Reported per mode: completeness (share of requested keys filled), wall-clock
+seconds per document, LLM calls and output tokens.
+
+    python -m benchmarks.extraction_modes --docs 5
+    python -m benchmarks.extraction_modes --single-max-tokens 2048 --max-concurrency 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from contextlib import closing
+from typing import Dict, List
+
+from benchmarks import corpus
+from tools.stub_llm_server import add_config_arguments, config_from_args, start_stub_server
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+
+
+def run_single(svc, raw_text: str, keys: List[str], max_tokens: int, use_schema: bool) -> Dict[str, str]:
+    from src.utils import structured_output
+    from src.utils.json_stream import JSONObjectStream
+
+    prompt = (
+        f"Extract the following information from the job description below and return as JSON with these keys: {keys}.\n\n"
+        f"{raw_text}\n\nOutput JSON:"
+    )
+    schema = structured_output.json_schema(keys) if use_schema else None
+    parser = JSONObjectStream(keys)
+    with closing(svc.stream(prompt=prompt, max_tokens=max_tokens, schema=schema)) as chunks:
+        for chunk in chunks:
+            parser.feed(chunk)
+            if parser.done:
+                break
+    fields = {k: v for k, v in parser.fields.items() if v is not None}
+    if not parser.done:
+        try:
+            repaired, _ = structured_output.repair(
+                parser.text, keys, lambda p, sc: svc.complete(prompt=p, max_tokens=max_tokens, schema=schema and sc),
+                request=prompt)
+            fields.update(repaired)
+        except structured_output.ExtractionParseError:
+            pass
+    return fields
+
+
+def run_per_step(svc, raw_text: str, keys: List[str], use_schema: bool, workers: int) -> Dict[str, str]:
+    from src.utils import grouped_extraction
+
+    out = grouped_extraction.extract_grouped(
+        raw_text, keys, lambda p, max_tokens, schema: svc.complete(prompt=p, max_tokens=max_tokens, schema=schema),
+        use_schema=use_schema, max_workers=workers)
+    return out["fields"]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=5, help="job ads per mode")
+    parser.add_argument("--size", choices=list(corpus.SIZES), default="small")
+    parser.add_argument("--provider", choices=["ollama", "openai"], default="ollama")
+    parser.add_argument("--single-max-tokens", type=int, default=256,
+                        help="output budget of the single prompt (the local path uses 256)")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent group requests")
+    parser.add_argument("--no-schema", action="store_true", help="do not send the JSON schema")
+    parser.add_argument("--out", help="write the comparison as JSON")
+    add_config_arguments(parser)
+    parser.set_defaults(latency_ms=150.0, tokens_per_sec=60.0, max_concurrency=4, completion_tokens=4096)
+    args = parser.parse_args(argv)
+
+    server = start_stub_server(config_from_args(args))
+    os.environ["OPENAI_BASE_URL"] = f"{server.url}/v1"
+
+    from src.services.llm_service import LLMService
+    from src.utils import llm_metrics, structured_output
+    from src.utils.llm_metrics import llm_task
+
+    svc = LLMService(provider=args.provider, ollama_api_url=server.url, ollama_model="llama3.2:3b",
+                     openai_model="gpt-4o")
+    keys = structured_output.extraction_keys()
+    use_schema = not args.no_schema
+    report: Dict[str, Dict] = {}
+
+    for mode in ("single", "per_step"):
+        completeness: List[float] = []
+        seconds: List[float] = []
+        for doc in range(args.docs):
+            raw_text = corpus.job_ad_text(args.size, seed=doc)
+            start = time.perf_counter()
+            with llm_task(f"bench.{mode}"):
+                if mode == "single":
+                    fields = run_single(svc, raw_text, keys, args.single_max_tokens, use_schema)
+                else:
+                    fields = run_per_step(svc, raw_text, keys, use_schema, args.workers)
+            seconds.append(time.perf_counter() - start)
+            completeness.append(len([k for k in keys if k in fields]) / len(keys))
+        rows = [r for r in llm_metrics.snapshot() if r["task"] == f"bench.{mode}"]
+        report[mode] = {
+            "completeness": statistics.fmean(completeness),
+            "seconds_per_doc": statistics.fmean(seconds),
+            "llm_calls_per_doc": sum(r["calls"] for r in rows) / args.docs,
+            "output_tokens_per_doc": sum(r["completion_tokens"] for r in rows) / args.docs,
+            "prompt_tokens_per_doc": sum(r["prompt_tokens"] for r in rows) / args.docs,
+        }
+    server.shutdown()
+
+    print(f"{len(keys)} keys, {args.docs} docs, provider {args.provider}, schema {'on' if use_schema else 'off'}, "
+          f"stub {args.latency_ms:.0f} ms TTFT / {args.tokens_per_sec:.0f} tok/s / {args.max_concurrency} slots")
+    print(f"{'mode':<10} {'complete':>9} {'s/doc':>8} {'calls':>6} {'out tok':>8} {'in tok':>8}")
+    for mode, r in report.items():
+        print(f"{mode:<10} {r['completeness']:>9.1%} {r['seconds_per_doc']:>8.2f} {r['llm_calls_per_doc']:>6.1f} "
+              f"{r['output_tokens_per_doc']:>8.0f} {r['prompt_tokens_per_doc']:>8.0f}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "keys": len(keys), "modes": report}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+# benchmarks/fragment_reruns.py
+"""
+Fragment-scoped reruns (src/utils/fragments.py): server CPU, latency and
+traffic of a click on a step-8-like page, with the clicked region rerun as a
+real Streamlit fragment against a full rerun of the page.
+
+The page is modelled on step 8: the form widgets of the wizard fields, the
+summary, three generator tabs and the email panel (through @fragment), with
+an instant stand-in for the LLM. Each variant starts its own
+`streamlit run` server and is driven over the app's websocket the way the
+browser does it: the click is a rerun request carrying the button's trigger
+and, for a widget inside a fragment, the fragment id.
+
+  full page     VACALYSER_FRAGMENTS=0: the click reruns the page script
+  fragment      the click reruns only the email panel
+
+  cpu ms        server process CPU time per click (mean, from /proc; Linux)
+  wall ms       click to script_finished (median)
+  deltas        elements the server sends back per click
+
+Both variants must produce the same generated email, and the fragment
+variant must finish its clicks as fragment runs (exit 1 if not).
+
+    python -m benchmarks.fragment_reruns
+    python -m benchmarks.fragment_reruns --clicks 100 --out fragments.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PAGE_SCRIPT = f"""import sys
+sys.path.insert(0, {ROOT!r})
+from benchmarks.fragment_reruns import page
+page()
+"""
+
+
+def _email_panel():
+    import streamlit as st
+
+    if st.button("Generate Outreach Email"):
+        st.session_state["generated_email_template"] = f"Hello! ({st.session_state.get('job_title', '')})"
+    if st.session_state.get("generated_email_template"):
+        st.text_area("Email Template", value=st.session_state["generated_email_template"], height=150)
+        st.download_button("Download Email as TXT", data=st.session_state["generated_email_template"],
+                           file_name="email_template.txt")
+
+
+def page():
+    """The page script each benchmark server runs."""
+    import streamlit as st
+    from src.components.summary import render_summary
+    from src.config.keys import STEP_KEYS
+    from src.utils.fragments import fragment
+
+    st.session_state.setdefault("job_title", "Data Engineer")
+    for step in range(2, 9):
+        for key in STEP_KEYS[step]:
+            st.text_input(key.replace("_", " ").capitalize(), key=key)
+    render_summary()
+    for tab, label in zip(st.tabs(["Target Group Analysis", "Job Advertisement", "Interview Prep"]),
+                          ["Generate Target Group Analysis", "Generate Job Advertisement",
+                           "Generate Interview Prep Guide"]):
+        with tab:
+            st.button(label)
+    with st.expander("Email Template Generator"):
+        fragment(_email_panel)()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")  # utime + stime
+
+
+async def _clicks(port: int, pid: int, n: int, warmup: int) -> Dict:
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+    from tornado.websocket import websocket_connect
+
+    for _ in range(150):
+        try:
+            ws = await websocket_connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"])
+            break
+        except OSError:
+            await asyncio.sleep(0.2)
+    else:
+        raise RuntimeError(f"streamlit did not start on port {port}")
+
+    async def rerun(widgets=(), fragment_id: str = "") -> List:
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.widget_states.widgets.extend(widgets)
+        if fragment_id:
+            msg.rerun_script.fragment_id = fragment_id
+        await ws.write_message(msg.SerializeToString(), binary=True)
+        received = []
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await ws.read_message())
+            received.append(fwd)
+            # a rerun_fragment() inside the run ends it early and starts the fragment again
+            if fwd.WhichOneof("type") == "script_finished" and fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                return received
+
+    def elements(msgs, kind):
+        return [m.delta for m in msgs if m.WhichOneof("type") == "delta"
+                and m.delta.new_element.WhichOneof("type") == kind]
+
+    first = await rerun()
+    button = next(d for d in elements(first, "button") if d.new_element.button.label == "Generate Outreach Email")
+    click = WidgetState(id=button.new_element.button.id, trigger_value=True)
+    wall, deltas, outcomes, email = [], [], set(), ""
+    for i in range(warmup + n):
+        if i == warmup:
+            cpu_start = _cpu_seconds(pid)
+        start = time.perf_counter()
+        msgs = await rerun([click], button.fragment_id)
+        if i >= warmup:
+            wall.append((time.perf_counter() - start) * 1000)
+            deltas.append(sum(m.WhichOneof("type") == "delta" for m in msgs))
+            outcomes.add(msgs[-1].script_finished)
+        email = next((d.new_element.text_area.default for d in elements(msgs, "text_area")), email)
+    cpu = (_cpu_seconds(pid) - cpu_start) / n * 1000
+    ws.close()
+    return {"cpu_ms": cpu, "wall_ms": statistics.median(wall), "deltas": statistics.median(deltas),
+            "fragment_runs": outcomes == {ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY}, "email": email}
+
+
+def _serve_and_click(script: str, fragments: bool, n: int, warmup: int) -> Dict:
+    port = _free_port()
+    env = {**os.environ, "VACALYSER_FRAGMENTS": "1" if fragments else "0", "VACALYSER_SESSION_STORE": "0"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", script, "--server.headless", "true",
+         "--server.port", str(port), "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        return asyncio.run(_clicks(port, server.pid, n, warmup))
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def run(n_clicks: int, warmup: int = 5) -> Dict[str, Dict]:
+    import streamlit
+
+    with tempfile.TemporaryDirectory(prefix="bench_fragments_") as directory:
+        script = os.path.join(directory, "page.py")
+        with open(script, "w", encoding="utf-8") as f:
+            f.write(_PAGE_SCRIPT)
+        report = {"full page": _serve_and_click(script, False, n_clicks, warmup),
+                  "fragment": _serve_and_click(script, True, n_clicks, warmup)}
+    report["fragment"]["exact"] = (bool(report["fragment"]["email"])
+                                   and report["fragment"]["email"] == report["full page"]["email"])
+    report["streamlit"] = streamlit.__version__
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clicks", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5, help="clicks before measuring")
+    parser.add_argument("--out", help="write the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    from src.utils.fragments import FRAGMENTS
+
+    if not FRAGMENTS:
+        print("FAIL: this Streamlit has no fragments (or VACALYSER_FRAGMENTS=0)", file=sys.stderr)
+        return 1
+    report = run(args.clicks, args.warmup)
+    print(f"{args.clicks} clicks, streamlit {report['streamlit']}")
+    print(f"{'':<10} {'cpu ms':>7} {'wall ms':>8} {'deltas':>7}")
+    for name in ("full page", "fragment"):
+        r = report[name]
+        print(f"{name:<10} {r['cpu_ms']:>7.2f} {r['wall_ms']:>8.2f} {r['deltas']:>7.0f}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": report}, f, indent=2)
+    frag = report["fragment"]
+    if not (frag["exact"] and frag["fragment_runs"]):
+        print("FAIL: the fragment click gave a different email or did not run as a fragment", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# benchmarks/harness.py
+"""
+Minimal timing harness: measure callables, write machine-readable results
+and compare them against a saved baseline.
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class Case:
+    """One benchmark: `setup()` builds fixtures and returns the zero-arg callable to time."""
+    name: str
+    group: str
+    size: str
+    setup: Callable[[], Callable[[], Any]]
+    heavy: bool = False                 # needs model downloads / large deps
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f"{self.group}.{self.name}[{self.size}]"
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5, number: Optional[int] = None,
+            min_time: float = 0.2) -> Dict[str, float]:
+    """
+    Time fn like timeit: pick `number` so one repeat takes >= min_time,
+    then run `repeat` rounds. All figures are seconds per call.
+    """
+    fn()  # warm caches / lazy imports outside the timed region
+    if number is None:
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time or number >= 1_000_000:
+                break
+            number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    per_call: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - start) / number)
+
+    median = statistics.median(per_call)
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min": min(per_call),
+        "median": median,
+        "mean": statistics.fmean(per_call),
+        "stdev": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        "ops_per_sec": (1.0 / median) if median else float("inf"),
+    }
+
+
+def run_cases(cases: List[Case], repeat: int = 5, min_time: float = 0.2,
+              log: Callable[[str], None] = print) -> List[Dict[str, Any]]:
+    """Set up and measure every case; failures are recorded, not raised."""
+    results = []
+    for case in cases:
+        entry: Dict[str, Any] = {"key": case.key, "group": case.group, "name": case.name,
+                                 "size": case.size, "params": case.params}
+        try:
+            fn = case.setup()
+            entry.update(measure(fn, repeat=repeat, min_time=min_time))
+            log(f"{case.key:<55} {entry['median'] * 1e3:>10.3f} ms  ({entry['ops_per_sec']:.1f} ops/s)")
+        except Exception as exc:
+            entry["error"] = f"{type(exc).__name__}: {exc}"
+            log(f"{case.key:<55} ERROR {entry['error']}")
+        results.append(entry)
+    return results
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save_results(path: str, results: List[Dict[str, Any]]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    return {r["key"]: r for r in payload.get("results", []) if "median" in r}
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            threshold: float = 0.15) -> List[Dict[str, Any]]:
+    """
+    Compare medians against the baseline. A case regresses when it is more than
+    `threshold` (fractional) slower; faster by the same margin counts as improved.
+    A case that raised is "error", whether or not the baseline has it.
+    """
+    rows = []
+    for r in results:
+        base = baseline.get(r["key"])
+        if "median" not in r or base is None:
+            rows.append({"key": r["key"], "status": "error" if "median" not in r else "new"})
+            continue
+        ratio = r["median"] / base["median"] if base["median"] else float("inf")
+        if ratio > 1 + threshold:
+            status = "regressed"
+        elif ratio < 1 - threshold:
+            status = "improved"
+        else:
+            status = "unchanged"
+        rows.append({"key": r["key"], "baseline": base["median"], "current": r["median"],
+                     "ratio": ratio, "status": status})
+    return rows
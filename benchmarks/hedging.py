@@ -0,0 +1,126 @@
+# benchmarks/hedging.py
+"""
+Tail latency of the LLM routing modes (src/services/llm_router.py) against two
+stub backends: a local "Ollama" stub whose requests sometimes stall before the
+first token, and an "OpenAI" stub that is slower on average but steady.
+
+Scenarios:
+  tail   the local stub stalls --slow-rate of its requests by --slow-ms
+  down   nothing listens at the local URL (Ollama not running)
+
+Each routing mode (single / failover / hedge) sends the same requests with
+--concurrency workers. Reported: p50 / p95 / p99 / max seconds, failed
+requests, the share answered by the secondary, and the hedge requests started.
+
+    python -m benchmarks.hedging --requests 60 --slow-rate 0.1 --slow-ms 8000
+    python -m benchmarks.hedging --hedge-after 1.0 --out hedging.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from tools.stub_llm_server import StubConfig, percentile, start_stub_server
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+
+MODES = ("single", "failover", "hedge")
+
+
+def _dead_url() -> str:
+    """A local URL nothing listens on (connection refused)."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+def run(args, mode: str, local_url: str, openai_url: str) -> Dict:
+    from src.services.llm_router import LLMRouter
+    from src.services.llm_service import LLMService
+    from src.utils import llm_metrics, resilience
+
+    os.environ["OPENAI_BASE_URL"] = f"{openai_url}/v1"
+    llm_metrics.reset()
+    resilience.reset()
+    primary = LLMService(provider="ollama", ollama_api_url=local_url, ollama_model="llama3.2:3b")
+    secondary = LLMService(provider="openai", openai_model="gpt-4o-mini")
+    router = LLMRouter(primary, secondary, mode=mode, hedge_after_s=args.hedge_after)
+
+    def one(i: int):
+        start = time.perf_counter()
+        try:
+            text = router.complete(prompt=f"Summarise job posting #{i} in two sentences.", max_tokens=args.max_tokens)
+            failed = text.startswith("Error:")  # LLMService's Ollama convention for HTTP failures
+        except Exception:
+            failed = True
+        return time.perf_counter() - start, failed
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(one, range(args.requests)))
+    latencies = sorted(r[0] for r in results)
+    return {
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "p99_s": percentile(latencies, 99),
+        "max_s": latencies[-1],
+        "failed": sum(r[1] for r in results),
+        "secondary_share": llm_metrics.counter_value("llm_route_total", winner="secondary") / args.requests,
+        "hedges": llm_metrics.counter_value("llm_hedge_requests_total"),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-tokens", type=int, default=32)
+    parser.add_argument("--hedge-after", type=float, default=1.5, help="first-token budget of the primary (s)")
+    parser.add_argument("--local-latency-ms", type=float, default=300.0)
+    parser.add_argument("--remote-latency-ms", type=float, default=700.0)
+    parser.add_argument("--slow-rate", type=float, default=0.1, help="share of local requests that stall")
+    parser.add_argument("--slow-ms", type=float, default=8000.0, help="extra first-token delay of a stall")
+    parser.add_argument("--scenarios", nargs="+", choices=["tail", "down"], default=["tail", "down"])
+    parser.add_argument("--out", help="write the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    remote = start_stub_server(StubConfig(latency_ms=args.remote_latency_ms, jitter_ms=100.0, tokens_per_sec=200.0,
+                                          completion_tokens=args.max_tokens, max_concurrency=32, seed=1))
+    report: Dict[str, Dict[str, Dict]] = {}
+    for scenario in args.scenarios:
+        report[scenario] = {}
+        for mode in MODES:
+            local = None
+            if scenario == "tail":
+                local = start_stub_server(StubConfig(
+                    latency_ms=args.local_latency_ms, jitter_ms=50.0, tokens_per_sec=200.0,
+                    completion_tokens=args.max_tokens, max_concurrency=args.concurrency * 2,
+                    slow_rate=args.slow_rate, slow_ms=args.slow_ms, seed=7))
+            report[scenario][mode] = run(args, mode, local.url if local else _dead_url(), remote.url)
+            if local:
+                local.shutdown()
+    remote.shutdown()
+
+    print(f"{args.requests} requests x {args.concurrency} workers; local {args.local_latency_ms:.0f} ms TTFT, "
+          f"{args.slow_rate:.0%} stall +{args.slow_ms / 1000:.0f} s; remote {args.remote_latency_ms:.0f} ms; "
+          f"hedge after {args.hedge_after:g} s")
+    print(f"{'scenario':<9} {'mode':<9} {'p50 s':>6} {'p95 s':>6} {'p99 s':>6} {'max s':>6} {'failed':>6} "
+          f"{'remote':>7} {'hedges':>6}")
+    for scenario, modes in report.items():
+        for mode, r in modes.items():
+            print(f"{scenario:<9} {mode:<9} {r['p50_s']:>6.2f} {r['p95_s']:>6.2f} {r['p99_s']:>6.2f} "
+                  f"{r['max_s']:>6.2f} {r['failed']:>6} {r['secondary_share']:>7.0%} {r['hedges']:>6.0f}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "scenarios": report}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+# benchmarks/hybrid_search.py
+"""
+Hybrid retrieval (BM25 + FAISS fused by reciprocal rank, src/utils/bm25.py)
+against dense-only search.
+
+Latency (synthetic mapping excerpts, random 768-d vectors for the flat FAISS
+index, so no encoder is needed): per corpus size, BM25 build / load seconds,
+lexical query ms, postings touched per query (share of the corpus) and the
+dense FAISS search ms it is fused with.
+
+Quality: exact skill-name queries ("Kubernetes", "SAP FI/CO", ...) over a
+smaller corpus embedded with the real encoder; a document is relevant when
+its excerpt lists the skill. Reported per mode: P@5, nDCG@10 and MRR.
+
+    python -m benchmarks.hybrid_search
+    python -m benchmarks.hybrid_search --sizes 1000 100000 --quality-docs 2000 --backend onnx-int8
+    python -m benchmarks.hybrid_search --offline       # no hub: latency only is meaningful
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from benchmarks import corpus
+
+
+def _ms(fn, repeat: int = 5) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def latency(sizes: Sequence[int]) -> Dict[int, Dict[str, float]]:
+    import faiss
+    from src.utils import bm25
+
+    report = {}
+    queries = corpus.SKILLS
+    for n in sizes:
+        mapping = corpus.excerpt_mapping(n)
+        start = time.perf_counter()
+        index = bm25.BM25Index.build(mapping)
+        build_s = time.perf_counter() - start
+        path = os.path.join(tempfile.mkdtemp(prefix="bench_bm25_"), "index.bm25.npz")
+        index.save(path)
+        start = time.perf_counter()
+        bm25.BM25Index.load(path)
+        load_s = time.perf_counter() - start
+        flat = faiss.IndexFlatL2(768)
+        flat.add(corpus.random_vectors(n))
+        q = corpus.random_vectors(1, seed=1)
+        dense = [int(i) for i in flat.search(q, 50)[1][0]]
+        lexical = [d for d, _ in index.search(queries[0], 50)]
+        report[n] = {
+            "build_s": build_s,
+            "load_s": load_s,
+            "file_mib": os.path.getsize(path) / 2**20,
+            "lexical_ms": statistics.fmean(_ms(lambda: index.search(qs, 50)) for qs in queries),
+            "postings_share": statistics.fmean(index.postings_touched(qs) / n for qs in queries),
+            "dense_search_ms": _ms(lambda: flat.search(q, 50)),
+            "fusion_ms": _ms(lambda: bm25.reciprocal_rank_fusion([dense, lexical], top_k=10)),
+        }
+    return report
+
+
+def _ndcg(ranked: List[int], relevant: set, k: int = 10) -> float:
+    dcg = sum(1 / math.log2(i + 2) for i, d in enumerate(ranked[:k]) if d in relevant)
+    ideal = sum(1 / math.log2(i + 2) for i in range(min(k, len(relevant))))
+    return dcg / ideal if ideal else 0.0
+
+
+def quality(n_docs: int, backend: str, model: str) -> Dict[str, Dict[str, float]]:
+    from src.utils import bm25
+    from src.utils.embeddings import load_encoder
+
+    mapping = corpus.excerpt_mapping(n_docs, seed=3)
+    encoder = load_encoder(backend, model_name=model)
+    doc_ids = list(mapping)
+    doc_emb = encoder.encode([mapping[i]["excerpt"] for i in doc_ids], batch_size=32)
+    index = bm25.BM25Index.build(mapping)
+    depth = 50
+    scores: Dict[str, Dict[str, List[float]]] = {m: {"p5": [], "ndcg10": [], "mrr": []}
+                                                 for m in ("dense", "lexical", "hybrid")}
+    for skill in corpus.SKILLS:
+        relevant = {i for i in doc_ids if skill.lower() in mapping[i]["excerpt"].lower()}
+        if not relevant:
+            continue
+        q = encoder.encode([skill])[0]
+        dense = [doc_ids[j] for j in np.argsort(-(doc_emb @ q))[:depth]]
+        lexical = [d for d, _ in index.search(skill, depth)]
+        rankings = {"dense": dense, "lexical": lexical,
+                    "hybrid": [d for d, _ in bm25.reciprocal_rank_fusion([dense, lexical], top_k=depth)]}
+        for mode, ranked in rankings.items():
+            scores[mode]["p5"].append(len([d for d in ranked[:5] if d in relevant]) / 5)
+            scores[mode]["ndcg10"].append(_ndcg(ranked, relevant))
+            first = next((r for r, d in enumerate(ranked, start=1) if d in relevant), None)
+            scores[mode]["mrr"].append(1 / first if first else 0.0)
+    return {mode: {k: statistics.fmean(v) for k, v in m.items()} for mode, m in scores.items()}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--quality-docs", type=int, default=1_000, help="0 skips the quality comparison")
+    parser.add_argument("--backend", default="torch", help="embedding backend for the quality run")
+    parser.add_argument("--model", default="sentence-transformers/all-mpnet-base-v2")
+    parser.add_argument("--offline", action="store_true", help="untrained local encoder (dense quality is noise)")
+    parser.add_argument("--out", help="write the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    report = {"latency": latency(args.sizes)}
+    print(f"{'docs':>8} {'build s':>8} {'load s':>7} {'MiB':>6} {'bm25 ms':>8} {'postings':>9} "
+          f"{'faiss ms':>9} {'rrf ms':>7}")
+    for n, r in report["latency"].items():
+        print(f"{n:>8} {r['build_s']:>8.2f} {r['load_s']:>7.3f} {r['file_mib']:>6.1f} {r['lexical_ms']:>8.3f} "
+              f"{r['postings_share']:>9.2%} {r['dense_search_ms']:>9.3f} {r['fusion_ms']:>7.3f}")
+
+    if args.quality_docs:
+        if args.offline:
+            import torch
+            from benchmarks.embedding_backends import _offline_model
+            torch.manual_seed(0)
+            args.model = _offline_model(tempfile.mkdtemp(prefix="vacalyser-bench-emb-"))
+        report["quality"] = quality(args.quality_docs, args.backend, args.model)
+        print(f"\nquality: {len(corpus.SKILLS)} skill-name queries, {args.quality_docs} docs, "
+              f"{'untrained encoder (dense numbers are not meaningful)' if args.offline else args.model}")
+        print(f"{'mode':<8} {'P@5':>6} {'nDCG@10':>8} {'MRR':>6}")
+        for mode, r in report["quality"].items():
+            print(f"{mode:<8} {r['p5']:>6.3f} {r['ndcg10']:>8.3f} {r['mrr']:>6.3f}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), **{k: {str(n): v for n, v in r.items()} for k, r in report.items()}},
+                      f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# benchmarks/job_spec.py
+"""
+JobSpec (src/utils/job_spec.py) against the dict approach it replaces:
+memory per spec and (de)serialisation speed.
+
+Each spec fills about two thirds of the fields with corpus text. "dict" is
+what prompts and exports did — a dict copy of the session (spec fields plus
+the ~40 other keys a session carries) and json.dumps(indent=2) / json.loads.
+
+  KiB/spec   memory retained per spec (tracemalloc, field strings excluded:
+             both approaches share them with the session)
+  build µs   dict(session) copy vs JobSpec.from_state(session)
+  enc µs     encode one spec;  dec µs  decode it again
+  bytes      encoded size
+  diff µs    fields changed between two versions (dict comprehension vs JobSpec.diff)
+
+Round trips must reproduce the spec (exit 1 if not).
+
+    python -m benchmarks.job_spec
+    python -m benchmarks.job_spec --specs 20000 --out job_spec.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+from benchmarks import corpus
+
+
+def _sessions(n: int) -> List[Dict[str, str]]:
+    from src.utils.job_spec import FIELDS
+
+    rng = corpus._rng(5)
+    words = [corpus.paragraph(rng, rng.randint(2, 30)) for _ in range(500)]
+    extra = [f"widget_{i}" for i in range(40)]
+    return [{**{f: rng.choice(words) if rng.random() < 0.66 else "" for f in FIELDS},
+             **{k: rng.choice(words) for k in extra}} for _ in range(n)]
+
+
+def _per_item_us(fn, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+
+def _retained_kib(build, sessions) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(s) for s in sessions]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / len(sessions) / 1024
+
+
+def run(n_specs: int) -> Dict[str, Dict[str, float]]:
+    from src.utils import job_spec
+    from src.utils.job_spec import FIELDS, JobSpec
+
+    sessions = _sessions(n_specs)
+    specs = [JobSpec.from_state(s) for s in sessions]
+    dicts = [dict(s) for s in sessions]
+    edited = [s.replace(city="Berlin", salary_range="60-70k") for s in specs]
+    edited_dicts = [{**d, "city": "Berlin", "salary_range": "60-70k"} for d in dicts]
+
+    report = {}
+    encoded = [json.dumps(d, indent=2) for d in dicts]
+    report["dict + json indent=2"] = {
+        "kib_per_spec": _retained_kib(dict, sessions),
+        "build_us": _per_item_us(dict, sessions),
+        "enc_us": _per_item_us(lambda d: json.dumps(d, indent=2), dicts),
+        "dec_us": _per_item_us(json.loads, encoded),
+        "bytes": statistics.fmean(len(e.encode("utf-8")) for e in encoded),
+        "diff_us": _per_item_us(lambda p: {k: v for k, v in p[0].items() if p[1].get(k) != v},
+                                list(zip(edited_dicts, dicts))),
+        "exact": all(json.loads(e) == d for e, d in zip(encoded, dicts)),
+    }
+    codecs = {"JobSpec + json": None}
+    if job_spec.msgpack is not None:
+        codecs["JobSpec + msgpack"] = job_spec.msgpack
+    saved = job_spec.msgpack
+    try:
+        for name, codec in codecs.items():
+            job_spec.msgpack = codec
+            blobs = [job_spec.dumps(s) for s in specs]
+            report[name] = {
+                "kib_per_spec": _retained_kib(JobSpec.from_state, sessions),
+                "build_us": _per_item_us(JobSpec.from_state, sessions),
+                "enc_us": _per_item_us(job_spec.dumps, specs),
+                "dec_us": _per_item_us(job_spec.loads, blobs),
+                "bytes": statistics.fmean(len(b) for b in blobs),
+                "diff_us": _per_item_us(lambda p: p[0].diff(p[1]), list(zip(edited, specs))),
+                "exact": all(job_spec.loads(b) == s for b, s in zip(blobs, specs))
+                         and all(e.diff(s).keys() <= {"city", "salary_range"} for e, s in zip(edited, specs))
+                         and all(s.values_tuple() == tuple(d[f] for f in FIELDS) for s, d in zip(specs, dicts)),
+            }
+    finally:
+        job_spec.msgpack = saved
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--specs", type=int, default=5_000)
+    parser.add_argument("--out", help="write the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.specs)
+    print(f"{args.specs} specs")
+    print(f"{'':<22} {'KiB/spec':>9} {'build µs':>9} {'enc µs':>7} {'dec µs':>7} {'bytes':>7} {'diff µs':>8} exact")
+    for name, r in report.items():
+        print(f"{name:<22} {r['kib_per_spec']:>9.2f} {r['build_us']:>9.1f} {r['enc_us']:>7.1f} {r['dec_us']:>7.1f} "
+              f"{r['bytes']:>7.0f} {r['diff_us']:>8.1f} {'yes' if r['exact'] else 'NO'}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": report}, f, indent=2)
+    if not all(r["exact"] for r in report.values()):
+        print("FAIL: a JobSpec round trip or diff did not reproduce the spec", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+# benchmarks/local_batching.py
+"""
+Throughput of the local transformers pipeline on CPU: one prompt per call vs
+the dynamic BatchingScheduler (src/utils/batching.py).
+
+  sequential   one pipeline call per prompt, one after another
+  threads      --concurrency sessions calling the pipeline directly (the old
+               per-session path: calls contend for the same cores)
+  batched-N    the same sessions submitting through the scheduler, batch size N
+
+Reported per mode: prompts/s, p50 / p95 seconds per prompt, mean batch size.
+Needs transformers + torch (requirements.txt); the first run downloads --model.
+Without hub access, --offline builds an untrained distilgpt2-sized model and a
+small BPE tokenizer locally (same compute per token, meaningless text).
+
+    python -m benchmarks.local_batching --model distilgpt2 --prompts 32
+    python -m benchmarks.local_batching --batch-sizes 4 8 16 --max-new-tokens 64 --threads 4
+    python -m benchmarks.local_batching --offline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from benchmarks import corpus
+from tools.stub_llm_server import percentile
+
+
+def _timed(fn: Callable[[str], str], prompts: List[str], concurrency: int) -> Dict[str, float]:
+    def one(prompt: str) -> float:
+        start = time.perf_counter()
+        fn(prompt)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        latencies = [one(p) for p in prompts]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(one, prompts))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {"prompts_per_s": len(prompts) / wall, "p50_s": percentile(latencies, 50),
+            "p95_s": percentile(latencies, 95), "wall_s": wall}
+
+
+def _offline_model(path: str) -> str:
+    """Untrained GPT-2 with distilgpt2's shape (6 layers, 768 wide) plus a BPE tokenizer fitted on the corpus."""
+    from tokenizers import Tokenizer, models, pre_tokenizers, trainers
+    from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+    rng = corpus._rng(1)
+    texts = [corpus.job_ad_text("small", seed=i) for i in range(50)] + [corpus.paragraph(rng, 200) for _ in range(50)]
+    bpe = Tokenizer(models.BPE(unk_token="<|endoftext|>"))
+    bpe.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    bpe.train_from_iterator(texts, trainers.BpeTrainer(vocab_size=8000, special_tokens=["<|endoftext|>"]))
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=bpe, eos_token="<|endoftext|>", bos_token="<|endoftext|>")
+    config = GPT2Config(vocab_size=50257, n_layer=6, n_embd=768, n_head=12,
+                        bos_token_id=tokenizer.eos_token_id, eos_token_id=tokenizer.eos_token_id)
+    GPT2LMHeadModel(config).save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return path
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="distilgpt2")
+    parser.add_argument("--prompts", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8, help="simultaneous sessions")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--window-ms", type=float, default=20.0)
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0: torch default)")
+    parser.add_argument("--offline", action="store_true", help="use an untrained local model instead of --model")
+    parser.add_argument("--out", help="write the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        import torch
+        from transformers import pipeline
+    except ImportError:
+        print("transformers and torch are required: pip install transformers torch", file=sys.stderr)
+        return 2
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    from src.utils import llm_metrics
+    from src.utils.batching import BatchingScheduler, pipeline_batch_fn
+
+    if args.offline:
+        torch.manual_seed(0)
+        args.model = _offline_model(tempfile.mkdtemp(prefix="vacalyser-bench-model-"))
+    pipe = pipeline("text-generation", model=args.model, device=-1)
+    batch_fn = pipeline_batch_fn(pipe)
+    rng = corpus._rng(0)
+    # short prompts of varying length, so batches need padding like real ones
+    prompts = [f"Job ad summary: {corpus.paragraph(rng, 8 + i % 24)}" for i in range(args.prompts)]
+    gen = dict(max_new_tokens=args.max_new_tokens, temperature=0.7)
+    batch_fn(prompts[:2], **gen)  # warm-up
+
+    report: Dict[str, Dict[str, float]] = {}
+    report["sequential"] = _timed(lambda p: batch_fn([p], **gen)[0], prompts, 1)
+    report["threads"] = _timed(lambda p: batch_fn([p], **gen)[0], prompts, args.concurrency)
+    for size in args.batch_sizes:
+        llm_metrics.reset()
+        scheduler = BatchingScheduler(batch_fn, max_batch_size=size, window_s=args.window_ms / 1000,
+                                      name=f"bench-{size}")
+        r = _timed(lambda p: scheduler.submit(p, **gen), prompts, args.concurrency)
+        batches = llm_metrics.counter_value("local_batches_total")
+        r["mean_batch"] = llm_metrics.counter_value("local_batch_prompts_total") / batches if batches else 0.0
+        report[f"batched-{size}"] = r
+
+    print(f"{args.model}, {args.prompts} prompts, {args.concurrency} sessions, {args.max_new_tokens} new tokens, "
+          f"torch threads {torch.get_num_threads()}")
+    print(f"{'mode':<12} {'prompts/s':>9} {'p50 s':>7} {'p95 s':>7} {'batch':>6}")
+    base = report["sequential"]["prompts_per_s"]
+    for mode, r in report.items():
+        print(f"{mode:<12} {r['prompts_per_s']:>9.2f} {r['p50_s']:>7.2f} {r['p95_s']:>7.2f} "
+              f"{r.get('mean_batch', 1.0):>6.1f}   x{r['prompts_per_s'] / base:.2f}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "modes": report}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+# benchmarks/prompt_prefix.py
+"""
+Prompt-prefix reuse for the step-8 generators, measured against the stub LLM
+server (which models Ollama's per-slot KV prefix cache and OpenAI's prompt
+cache, see tools/stub_llm_server.py).
+
+Each session runs the five step-8 generators back to back on one job spec:
+
+  legacy            the prompts as app.py built them before prompt_layout
+                    (task text first, a different subset/order of fields each)
+  canonical         prompt_layout: shared job-context prefix + task suffix
+  canonical+context canonical, plus Ollama `context` reuse (priming call)
+
+Reported per layout: prompt tokens sent, tokens served from cache, tokens the
+server had to evaluate, stub prompt-processing seconds, and billed input
+tokens for OpenAI (cached tokens at 50%).
+
+    python -m benchmarks.prompt_prefix --sessions 5
+    python -m benchmarks.prompt_prefix --provider openai --field-words 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Mapping
+
+from benchmarks import corpus
+from tools.stub_llm_server import add_config_arguments, config_from_args, start_stub_server
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+
+# Free-text fields that are long in real specs (several sentences each).
+LONG_FIELDS = ["role_description", "key_responsibilities", "hard_skills", "soft_skills"]
+TASKS = ["target_group_analysis", "job_ad", "interview_prep", "outreach_email", "boolean_search"]
+
+
+def legacy_prompt(s: Mapping, task: str) -> str:
+    """The step-8 prompts as app.py composed them before the stable prefix layout."""
+    g = lambda k: s.get(k) or ""  # noqa: E731
+    if task == "target_group_analysis":
+        return (f"Position: {g('job_title')}\n"
+                + (f"Company: {g('company_name')}\n" if g('company_name') else "")
+                + (f"Level: {g('job_level')}\n" if g('job_level') else "")
+                + (f"Required Skills: {g('must_have_skills')}\n" if g('must_have_skills') else "")
+                + "Provide an analysis of the target candidate group for this position, including the ideal "
+                  "candidate profile (background, experience, skills, motivations) and how to attract them.")
+    if task == "job_ad":
+        req_skills = g('must_have_skills') or g('hard_skills')
+        return (f"Write a job advertisement for the following position:\n"
+                f"Job Title: {g('job_title')}\n" + (f"Company: {g('company_name')}\n" if g('company_name') else "")
+                + (f"Location: {g('city')}\n" if g('city') else "")
+                + (f"Role Description: {g('role_description')}\n" if g('role_description') else "")
+                + (f"Key Responsibilities: {g('key_responsibilities')}\n" if g('key_responsibilities') else "")
+                + (f"Required Skills: {req_skills}\n" if req_skills else "")
+                + f"Tone: {g('ad_seniority_tone')}. Length: {g('ad_length_preference')}.\n"
+                "The ad should be engaging and include a brief company intro, role responsibilities, required "
+                "qualifications, any benefits, and a call to action.")
+    if task == "interview_prep":
+        p = (f"You are preparing to interview candidates for the position of {g('job_title')}. "
+             "Based on the job description, create an interview preparation guide for the interviewer. "
+             "Include:\n1. A brief overview of what to look for in a candidate.\n"
+             "2. 5-10 key interview questions (technical and behavioral) to assess required skills and competencies.\n"
+             "3. For each question, notes on what a good answer should include.\n")
+        if g('key_responsibilities'):
+            p += f"Key Responsibilities: {g('key_responsibilities')}\n"
+        if g('must_have_skills'):
+            p += f"Must-Have Skills: {g('must_have_skills')}\n"
+        if g('soft_skills'):
+            p += f"Desired Soft Skills: {g('soft_skills')}\n"
+        return p
+    if task == "outreach_email":
+        return (f"Write a concise, professional recruitment email to a potential candidate for the position of "
+                f"{g('job_title')} at {g('company_name') or 'our company'}. Introduce the company briefly, highlight "
+                "the role's key points (responsibilities or benefits), and include a friendly call to action to apply.")
+    return (f"Generate a Boolean search string to find resumes for a {g('job_title')} role "
+            + (f"requiring skills: {g('must_have_skills')}. " if g('must_have_skills') else "")
+            + "Use AND, OR, and NOT operators appropriately.")
+
+
+def run_layout(args, layout: str) -> Dict[str, float]:
+    from src.services import llm_service
+    from src.utils import prompt_layout
+
+    server = start_stub_server(config_from_args(args))
+    os.environ["OPENAI_BASE_URL"] = f"{server.url}/v1"
+    llm_service.OLLAMA_CONTEXT_REUSE = layout == "canonical+context"
+    start = time.perf_counter()
+    for session in range(args.sessions):
+        state = corpus.spec_dict(seed=session)
+        state.update(ad_seniority_tone="Formal", ad_length_preference="Detailed")
+        if args.field_words:
+            rng = corpus._rng(session)
+            state.update({k: corpus.paragraph(rng, args.field_words) for k in LONG_FIELDS})
+        svc = llm_service.LLMService(provider=args.provider, ollama_api_url=server.url, ollama_model="llama3.2:3b",
+                                     openai_model="gpt-4o", context_cache=prompt_layout.PrefixContextCache())
+        for task in TASKS:
+            if layout == "legacy":
+                svc.complete(prompt=legacy_prompt(state, task), max_tokens=args.max_tokens)
+            else:
+                p = prompt_layout.build_prompt(state, task)
+                svc.complete(prompt=p.text, prefix=p.prefix, max_tokens=args.max_tokens)
+    wall = time.perf_counter() - start
+    stats = server.stats.snapshot()
+    server.shutdown()
+    sent, cached = stats["prompt_tokens"], stats["cached_prompt_tokens"]
+    return {
+        "requests": sum(stats["requests"].values()),
+        "prompt_tokens": sent,
+        "cached_tokens": cached,
+        "evaluated_tokens": sent - cached,
+        "prefill_s": stats["prefill_seconds"],
+        "billed_input_tokens": sent - cached + 0.5 * cached,
+        "wall_s": wall,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=5, help="job specs, five generators each")
+    parser.add_argument("--provider", choices=["ollama", "openai"], default="ollama")
+    parser.add_argument("--max-tokens", type=int, default=64)
+    parser.add_argument("--field-words", type=int, default=0,
+                        help="length of the long free-text fields (0: corpus spec values, 3-25 words)")
+    parser.add_argument("--out", help="write the comparison as JSON")
+    add_config_arguments(parser)
+    parser.set_defaults(latency_ms=50.0, jitter_ms=0.0, tokens_per_sec=0.0, prefill_tokens_per_sec=1000.0)
+    args = parser.parse_args(argv)
+
+    layouts: List[str] = ["legacy", "canonical"] + (["canonical+context"] if args.provider == "ollama" else [])
+    report = {layout: run_layout(args, layout) for layout in layouts}
+
+    print(f"{args.sessions} sessions x {len(TASKS)} generators, provider {args.provider}, "
+          f"long fields {args.field_words or 'corpus'} words, "
+          f"stub prefill {args.prefill_tokens_per_sec:.0f} tok/s, {args.max_concurrency} slot(s)")
+    print(f"{'layout':<18} {'calls':>5} {'sent':>7} {'cached':>7} {'evaluated':>9} {'prefill s':>9} "
+          f"{'billed':>8} {'wall s':>7}")
+    for layout, r in report.items():
+        print(f"{layout:<18} {r['requests']:>5} {r['prompt_tokens']:>7} {r['cached_tokens']:>7} "
+              f"{r['evaluated_tokens']:>9} {r['prefill_s']:>9.2f} {r['billed_input_tokens']:>8.0f} {r['wall_s']:>7.2f}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "layouts": report}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
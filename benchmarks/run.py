@@ -0,0 +1,68 @@
+# benchmarks/run.py
+"""
+Run the hot-path benchmark suite.
+
+    python -m benchmarks.run                                  # all sizes, print table
+    python -m benchmarks.run --sizes small --out bench.json   # machine-readable output
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --threshold 0.2
+
+With --compare the exit code is 1 when any case regressed beyond the threshold
+or raised, so the command can gate a deploy.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import sys
+
+from benchmarks import corpus
+from benchmarks.bench_hot_paths import build_cases
+from benchmarks.harness import compare, load_results, run_cases, save_results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=list(corpus.SIZES), choices=list(corpus.SIZES))
+    parser.add_argument("--only", default="*", help="glob on case keys, e.g. 'files.*' or '*parse*'")
+    parser.add_argument("--skip-heavy", action="store_true", help="skip cases that load the embedding model")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing round")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--save-baseline", help="write results JSON as the new baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    cases = [c for c in build_cases(args.sizes)
+             if fnmatch.fnmatch(c.key, args.only) and not (args.skip_heavy and c.heavy)]
+    results = run_cases(cases, repeat=args.repeat, min_time=args.min_time)
+
+    for path in (args.out, args.save_baseline):
+        if path:
+            save_results(path, results)
+
+    if not args.compare:
+        return 0
+
+    rows = compare(results, load_results(args.compare), args.threshold)
+    print()
+    print(f"{'case':<55} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}  status")
+    for row in rows:
+        if "ratio" in row:
+            print(f"{row['key']:<55} {row['baseline'] * 1e3:>12.3f} {row['current'] * 1e3:>12.3f} "
+                  f"{row['ratio']:>7.2f}  {row['status']}")
+        else:
+            print(f"{row['key']:<55} {'-':>12} {'-':>12} {'-':>7}  {row['status']}")
+    regressed = [r for r in rows if r["status"] == "regressed"]
+    errors = [r for r in rows if r["status"] == "error"]
+    if regressed:
+        print(f"\n{len(regressed)} case(s) regressed by more than {args.threshold:.0%}.")
+    if errors:
+        print(f"\n{len(errors)} case(s) raised: {', '.join(r['key'] for r in errors)}")
+    return 1 if regressed or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# benchmarks/session_store.py
+"""
+Durable wizard sessions (src/utils/session_store.py): what autosaving costs
+per rerun, how much it writes, and how long a restore takes — dirty-field
+upserts against writing the whole session as one JSON snapshot per rerun.
+
+A simulated session holds every SESSION_KEY plus the list fields the pages
+keep (tasks, skills, benefits), with a large job ad as the uploaded text.
+Each rerun edits 0-2 small fields, like typing into the wizard; about a
+third change nothing (button clicks, navigation). Like Streamlit, which runs
+every rerun on a new ScriptRunner thread, each autosave runs on a new thread.
+
+  payload KiB   field bytes handed to SQLite over the run
+  db KiB        bytes the process wrote to disk (/proc/self/io wchar, WAL + db)
+  rerun µs      median autosave cost per rerun (diff + write)
+  idle µs       median cost of a rerun that changed nothing
+  restore ms    loading the session back into a fresh state dict
+
+The restored state must equal the final state (exit 1 if not).
+
+    python -m benchmarks.session_store
+    python -m benchmarks.session_store --reruns 2000 --size large --out sessions.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict
+
+from benchmarks import corpus
+
+
+def _wchar() -> int:
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("wchar"))
+    except (OSError, StopIteration):
+        return 0
+
+
+def _session(size: str) -> Dict[str, Any]:
+    from src.session_state import SESSION_KEYS
+
+    rng = corpus._rng(3)
+    state: Dict[str, Any] = {key: corpus.paragraph(rng, rng.randint(2, 12)) for key in SESSION_KEYS}
+    state["wizard_step"] = 4
+    state["uploaded_file"] = corpus.job_ad_text(size)
+    state["tasks"] = [corpus.paragraph(rng, 10) for _ in range(15)]
+    state["must_have_hard"] = rng.sample(corpus.SKILLS, 8)
+    state["benefits"] = {"health": corpus.paragraph(rng, 8), "learning": [corpus.paragraph(rng, 5)] * 3}
+    return state
+
+
+def _on_new_thread(fn) -> float:
+    """Run fn on a fresh thread (a Streamlit rerun); returns its duration in µs, thread start excluded."""
+    elapsed = []
+
+    def target():
+        start = time.perf_counter()
+        fn()
+        elapsed.append((time.perf_counter() - start) * 1e6)
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+    return elapsed[0]
+
+
+def _edit(state: Dict[str, Any], rng: random.Random) -> None:
+    for _ in range(rng.choice((0, 1, 1, 2))):
+        key = rng.choice(["job_title", "salary_range", "wizard_step", "tasks", "must_have_hard", "company_name"])
+        if key == "wizard_step":
+            state[key] = rng.randint(1, 8)
+        elif isinstance(state.get(key), list):
+            state[key] = state[key][1:] + [rng.choice(corpus.SKILLS)]
+        else:
+            state[key] = f"{state.get(key, '')[:40]}{rng.choice('abcdefgh')}"
+
+
+def run(reruns: int, size: str) -> Dict[str, Dict[str, float]]:
+    from src.utils import session_store
+    from src.utils.session_store import DirtyTracker, SessionStore, autosave, persisted_keys
+
+    for key in ("tasks", "must_have_hard", "benefits"):
+        session_store.track(key)
+    report = {}
+    for mode in ("dirty fields", "full snapshot"):
+        directory = tempfile.mkdtemp(prefix="bench_sessions_")
+        store = session_store._store = SessionStore(os.path.join(directory, "sessions.db"))
+        state = _session(size)
+        state["_session_sid"], state["_session_tracker"] = "bench", DirtyTracker()
+        keys = sorted(persisted_keys())
+        rng = random.Random(11)
+        timings, idle, written_payload = [], [], []
+        wchar = _wchar()
+
+        def save():
+            if mode == "dirty fields":
+                written_payload.append(autosave(state))
+            else:
+                blob = json.dumps({k: state[k] for k in keys if k in state}, ensure_ascii=False,
+                                  separators=(",", ":"))
+                written_payload.append(store.save("bench", {"__snapshot__": blob}))
+
+        for _ in range(reruns):
+            before = dict(state)
+            _edit(state, rng)
+            elapsed = _on_new_thread(save)
+            timings.append(elapsed)
+            if all(state[k] is before[k] for k in keys if k in state):
+                idle.append(elapsed)
+        written = _wchar() - wchar
+
+        fresh = SessionStore(store.path)
+        start = time.perf_counter()
+        loaded = fresh.load("bench")
+        if mode == "full snapshot":
+            loaded = loaded["__snapshot__"]
+        restore_ms = (time.perf_counter() - start) * 1000
+        expected = json.loads(json.dumps({k: state[k] for k in keys if k in state}))
+        report[mode] = {
+            "payload_kib": sum(written_payload) / 1024, "disk_kib": written / 1024,
+            "rerun_us": statistics.median(timings), "idle_us": statistics.median(idle) if idle else 0.0,
+            "restore_ms": restore_ms, "exact": loaded == expected,
+        }
+    session_store._store = None
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", type=int, default=500)
+    parser.add_argument("--size", choices=sorted(corpus.SIZES), default="medium")
+    parser.add_argument("--out", help="write the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.reruns, args.size)
+    print(f"{args.reruns} reruns, {args.size} uploaded document")
+    print(f"{'':<14} {'payload KiB':>12} {'db KiB':>9} {'rerun µs':>9} {'idle µs':>8} {'restore ms':>11} exact")
+    for name, r in report.items():
+        print(f"{name:<14} {r['payload_kib']:>12.1f} {r['disk_kib']:>9.1f} {r['rerun_us']:>9.1f} "
+              f"{r['idle_us']:>8.1f} {r['restore_ms']:>11.2f} {'yes' if r['exact'] else 'NO'}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": report}, f, indent=2)
+    if not all(r["exact"] for r in report.values()):
+        print("FAIL: the restored session differs from the saved one", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
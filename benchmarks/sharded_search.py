@@ -0,0 +1,117 @@
+# benchmarks/sharded_search.py
+"""
+Sharded vector index (src/utils/sharded_index.py) against one flat FAISS
+file: query latency with thread-pool fan-out, lazy loading, and the cost of
+adding documents. Random 768-d vectors, so no encoder is needed.
+
+Per shard count:
+
+  write s      time to partition and write the shard set
+  open ms      ShardedIndex() (manifest + id table; no shard loaded yet)
+  first ms     first query, which loads every shard it touches
+  q ms         median single-query latency after loading (fan-out)
+  seq ms       the same queries searching shard by shard on one thread
+  add ms       appending 10 documents (only their shards are rewritten)
+  exact        top-k ids equal to the flat index's (the run fails if not)
+
+    python -m benchmarks.sharded_search
+    python -m benchmarks.sharded_search --docs 500000 --shards 1 4 16 --out shards.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, Sequence
+
+import numpy as np
+
+from benchmarks import corpus
+
+
+def _median_ms(fn, queries) -> float:
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(n_docs: int, shard_counts: Sequence[int], n_queries: int, k: int) -> Dict[str, Dict[str, float]]:
+    import faiss
+    from src.utils.sharded_index import ShardedIndex, merge_topk, write_shards
+
+    vectors = corpus.random_vectors(n_docs)
+    mapping = {i: {"file_name": f"{10_000_000 + i // 4}.pdf", "chunk": i % 4} for i in range(n_docs)}
+    queries = [corpus.random_vectors(1, seed=100 + i) for i in range(n_queries)]
+    flat = faiss.IndexFlatL2(vectors.shape[1])
+    flat.add(vectors)
+    report = {"flat": {"q_ms": _median_ms(lambda q: flat.search(q, k), queries), "exact": True}}
+    expected = [flat.search(q, k)[1] for q in queries]
+
+    for n in shard_counts:
+        directory = tempfile.mkdtemp(prefix="bench_shards_")
+        start = time.perf_counter()
+        write_shards(vectors, mapping, directory, n_shards=n)
+        write_s = time.perf_counter() - start
+        start = time.perf_counter()
+        index = ShardedIndex(directory)
+        open_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        index.search(queries[0], k)
+        first_ms = (time.perf_counter() - start) * 1000
+        exact = all(np.array_equal(index.search(q, k)[1], e) for q, e in zip(queries, expected))
+
+        def sequential(q):
+            return merge_topk([index._search_shard(s, q, k) for s in range(index.n_shards)], k)
+
+        start = time.perf_counter()
+        index.add(corpus.random_vectors(10, seed=7), [{"file_name": f"new-{i}.pdf"} for i in range(10)])
+        add_ms = (time.perf_counter() - start) * 1000
+        report[f"{n} shards"] = {
+            "write_s": write_s, "open_ms": open_ms, "first_ms": first_ms,
+            "q_ms": _median_ms(lambda q: index.search(q, k), queries),
+            "seq_ms": _median_ms(sequential, queries),
+            "add_ms": add_ms, "exact": exact,
+            "shard_mib": sum(os.path.getsize(os.path.join(directory, e["index"]))
+                             for e in index.manifest["shards"]) / n / 2**20,
+        }
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200_000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--out", help="write the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.docs, args.shards, args.queries, args.top_k)
+    print(f"{args.docs} vectors, top-{args.top_k}, {os.cpu_count()} CPU(s)")
+    print(f"{'':<10} {'write s':>8} {'open ms':>8} {'first ms':>9} {'q ms':>7} {'seq ms':>7} {'add ms':>8} "
+          f"{'MiB/shard':>10} exact")
+    for name, r in report.items():
+        if name == "flat":
+            print(f"{name:<10} {'':>8} {'':>8} {'':>9} {r['q_ms']:>7.2f}")
+            continue
+        print(f"{name:<10} {r['write_s']:>8.2f} {r['open_ms']:>8.2f} {r['first_ms']:>9.1f} {r['q_ms']:>7.2f} "
+              f"{r['seq_ms']:>7.2f} {r['add_ms']:>8.1f} {r['shard_mib']:>10.1f} {'yes' if r['exact'] else 'NO'}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": report}, f, indent=2)
+    if not all(r["exact"] for r in report.values()):
+        print("FAIL: sharded top-k differs from the flat index", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# benchmarks/singleflight.py
+"""
+Single-flight coalescing under duplicate load, checked against the stub LLM
+server.
+
+Many threads issue the same few prompts at the same moment (the "same job URL
+analysed by several recruiters" / double-click case) through
+src.services.llm_service.LLMService, once with coalescing on and once off.
+
+Reported per run: caller count, requests that reached the server, coalesced
+callers, wall seconds. The command also checks, and exits 1 if any check fails:
+
+  * with coalescing on the server sees exactly one request per distinct prompt
+  * every caller of a prompt gets the same text
+  * llm_cache_hits_total == callers - distinct prompts
+  * an exception raised by the leader reaches every waiting caller
+
+    python -m benchmarks.singleflight --threads 64 --distinct 4
+    python -m benchmarks.singleflight --provider openai --latency-ms 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from tools.stub_llm_server import add_config_arguments, config_from_args, start_stub_server
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+
+
+def run(args, enabled: bool) -> Dict:
+    from src.services.llm_service import LLMService
+    from src.utils import llm_metrics, singleflight
+
+    server = start_stub_server(config_from_args(args))
+    os.environ["OPENAI_BASE_URL"] = f"{server.url}/v1"
+    singleflight.SINGLEFLIGHT_ENABLED = enabled
+    llm_metrics.reset()
+    prompts = [f"Extract the job title from posting #{i} and return it as JSON." for i in range(args.distinct)]
+    barrier = threading.Barrier(args.threads)
+
+    def caller(i: int) -> str:
+        # one service per caller, as each Streamlit session builds its own
+        svc = LLMService(provider=args.provider, ollama_api_url=server.url, ollama_model="llama3.2:3b",
+                         openai_model="gpt-4o")
+        barrier.wait()
+        return svc.complete(prompt=prompts[i % args.distinct], max_tokens=args.max_tokens, temperature=0)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        answers = list(pool.map(caller, range(args.threads)))
+    wall = time.perf_counter() - start
+    stats = server.stats.snapshot()
+    server.shutdown()
+    by_prompt: Dict[int, set] = {}
+    for i, text in enumerate(answers):
+        by_prompt.setdefault(i % args.distinct, set()).add(text)
+    return {
+        "callers": args.threads,
+        "server_requests": sum(stats["requests"].values()),
+        "coalesced": sum(r["cache_hits"] for r in llm_metrics.snapshot()),
+        "consistent": all(len(texts) == 1 for texts in by_prompt.values()),
+        "wall_s": wall,
+    }
+
+
+def error_fanout(threads: int) -> bool:
+    """The leader's exception must reach every follower (no provider needed)."""
+    from src.utils.singleflight import SingleFlight
+
+    group, release = SingleFlight(), threading.Event()
+    calls: List[int] = []
+
+    def failing():
+        calls.append(1)
+        release.wait(5)
+        raise ValueError("provider down")
+
+    def caller(_):
+        try:
+            group.do("same-key", failing)
+        except ValueError as exc:
+            return str(exc)
+        return "no error"
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = [pool.submit(caller, i) for i in range(threads)]
+        while group.in_flight() == 0:
+            time.sleep(0.001)
+        time.sleep(0.05)  # let the followers queue up behind the leader
+        release.set()
+        outcomes = [f.result() for f in futures]
+    return len(calls) < threads and all(o == "provider down" for o in outcomes)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32, help="concurrent callers")
+    parser.add_argument("--distinct", type=int, default=4, help="distinct prompts among them")
+    parser.add_argument("--provider", choices=["ollama", "openai"], default="ollama")
+    parser.add_argument("--max-tokens", type=int, default=32)
+    parser.add_argument("--out", help="write the comparison as JSON")
+    add_config_arguments(parser)
+    parser.set_defaults(latency_ms=300.0, jitter_ms=0.0, max_concurrency=4)
+    args = parser.parse_args(argv)
+
+    report = {"singleflight": run(args, True), "no_singleflight": run(args, False)}
+    on = report["singleflight"]
+    checks = {
+        "one server request per distinct prompt": on["server_requests"] == args.distinct,
+        "same answer for every caller of a prompt": on["consistent"],
+        "coalesced counter = callers - distinct": on["coalesced"] == args.threads - args.distinct,
+        "leader exception reaches all callers": error_fanout(min(args.threads, 16)),
+    }
+
+    print(f"{args.threads} callers, {args.distinct} distinct prompts, provider {args.provider}, "
+          f"stub {args.latency_ms:.0f} ms TTFT / {args.max_concurrency} slots")
+    print(f"{'run':<16} {'callers':>7} {'server req':>10} {'coalesced':>9} {'wall s':>7}")
+    for name, r in report.items():
+        print(f"{name:<16} {r['callers']:>7} {r['server_requests']:>10} {r['coalesced']:>9.0f} {r['wall_s']:>7.2f}")
+    for name, ok in checks.items():
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "runs": report, "checks": checks}, f, indent=2)
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+# benchmarks/skill_autocomplete.py
+"""
+Skill autocomplete (src/utils/skill_index.py): prefix lookup latency over
+large synthetic taxonomies, against a linear scan of every skill name.
+
+Skills are 1-3 word names from a generated vocabulary (plus the corpus
+skills), weighted at random. Queries are prefixes of 1-6 characters of a
+random word of a random skill, so short, very common prefixes are included.
+The scan baseline checks every word start of every skill and sorts the
+matches the same way; its ranking must equal the index's (exit 1 if not).
+
+    python -m benchmarks.skill_autocomplete
+    python -m benchmarks.skill_autocomplete --sizes 100000 300000 --queries 5000 --out autocomplete.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List, Sequence
+
+from benchmarks import corpus
+
+_SYLLABLES = ("ka", "lo", "mi", "net", "ser", "da", "ta", "pro", "log", "sys", "ops", "flow", "ri", "an",
+              "ly", "tic", "con", "tro", "ver", "sec", "cloud", "form", "mark", "ge", "in", "fra")
+
+
+def taxonomy(n: int, seed: int = 0) -> Dict[str, float]:
+    rng = random.Random(seed)
+    words = sorted({"".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+                    for _ in range(max(200, n // 20))})
+    skills = {s: rng.uniform(0, 5) for s in corpus.SKILLS}
+    while len(skills) < n:
+        skills[" ".join(rng.choice(words) for _ in range(rng.choice((1, 2, 2, 3))))] = rng.uniform(0, 5)
+    return skills
+
+
+def _queries(skills: List[str], n: int, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        word = rng.choice(rng.choice(skills).split())
+        out.append(word[: rng.randint(1, min(6, len(word)))])
+    return out
+
+
+def _rank_key(index, i: int, key: str):
+    from src.utils.skill_index import normalize
+
+    return (not normalize(index.skills[i]).startswith(key), -float(index.weights[i]), len(index.skills[i]))
+
+
+def _scan(index, prefix: str, limit: int) -> List[tuple]:
+    """Linear baseline: every skill, every word start; returns the ranking keys of the best `limit`."""
+    from src.utils.skill_index import _WORD_START, normalize
+
+    key = normalize(prefix)
+    hits = []
+    for i, name in enumerate(index.skills):
+        norm = normalize(name)
+        if any(norm.startswith(key, m.start()) for m in _WORD_START.finditer(norm)):
+            hits.append(_rank_key(index, i, key))
+    return sorted(hits)[:limit]
+
+
+def _percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def run(sizes: Sequence[int], n_queries: int, scan_queries: int, limit: int) -> Dict[int, Dict[str, float]]:
+    from src.utils.skill_index import SkillIndex
+
+    report = {}
+    for n in sizes:
+        skills = taxonomy(n)
+        start = time.perf_counter()
+        index = SkillIndex(skills)
+        build_s = time.perf_counter() - start
+        queries = _queries(index.skills, n_queries)
+        timings = []
+        for q in queries:
+            start = time.perf_counter()
+            index.complete(q, limit)
+            timings.append((time.perf_counter() - start) * 1e6)
+        short = [t for q, t in zip(queries, timings) if len(q) <= 2]
+        scan_ms, mismatches = [], 0
+        ids = {name: i for i, name in enumerate(index.skills)}
+        for q in queries[:scan_queries]:
+            start = time.perf_counter()
+            expected = _scan(index, q, limit)
+            scan_ms.append((time.perf_counter() - start) * 1000)
+            # compare ranking keys, not names: equal keys may tie-break differently
+            key = q.casefold()
+            mismatches += expected != [_rank_key(index, ids[s], key) for s in index.complete(q, limit)]
+        report[n] = {
+            "build_s": build_s,
+            "keys": len(index.keys),
+            "precomputed_prefixes": len(index._tops),
+            "p50_us": statistics.median(timings),
+            "p99_us": _percentile(timings, 0.99),
+            "max_us": max(timings),
+            "short_prefix_p99_us": _percentile(short, 0.99) if short else 0.0,
+            "scan_ms": statistics.fmean(scan_ms) if scan_ms else 0.0,
+            "mismatches": int(mismatches),
+        }
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--scan-queries", type=int, default=30, help="queries also answered by the linear scan")
+    parser.add_argument("--limit", type=int, default=8)
+    parser.add_argument("--out", help="write the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.queries, args.scan_queries, args.limit)
+    print(f"{'skills':>8} {'keys':>8} {'tops':>6} {'build s':>8} {'p50 µs':>7} {'p99 µs':>7} {'max µs':>7} "
+          f"{'≤2ch p99':>9} {'scan ms':>8}")
+    for n, r in report.items():
+        print(f"{n:>8} {r['keys']:>8} {r['precomputed_prefixes']:>6} {r['build_s']:>8.2f} {r['p50_us']:>7.1f} "
+              f"{r['p99_us']:>7.1f} {r['max_us']:>7.1f} {r['short_prefix_p99_us']:>9.1f} {r['scan_ms']:>8.1f}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "sizes": {str(n): r for n, r in report.items()}}, f, indent=2)
+    failed = sum(r["mismatches"] for r in report.values())
+    if failed:
+        print(f"FAIL: {failed} queries where the index and the linear scan disagree", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# benchmarks/skill_vocab.py
+"""
+rag_suggestions: precomputed skill vocabulary (src/utils/skill_vocab.py)
+against the old path (search the index, split the top-3 excerpts on
+whitespace).
+
+Per corpus size (synthetic mapping excerpts):
+
+  build s      offline vocabulary build (phrase extraction, no embeddings)
+  phrases      vocabulary size; KiB is the .npz with 768-d float16 embeddings
+  old ms       top-3 retrieval (BM25, no encoder needed) + excerpt split
+  lexical ms   vocabulary lookup without an encoder
+  dense ms     vocabulary lookup with a query embedding (the encode itself
+               is excluded: both paths pay it once)
+  old/new prec share of suggestions that are skill names from the corpus
+
+    python -m benchmarks.skill_vocab
+    python -m benchmarks.skill_vocab --sizes 1000 10000 --out skill_vocab.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from benchmarks import corpus
+from benchmarks.hybrid_search import _ms
+
+QUERIES = ["tasks for data engineer", "responsibilities for role", "challenges for role", "SAP", "Power BI",
+           "stakeholder management", "cloud platform engineer"]
+
+
+class _VectorEncoder:
+    """Deterministic random unit vectors per text: isolates lookup cost from model inference."""
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        rows = [np.random.default_rng(zlib.crc32(t.encode())).standard_normal(768) for t in texts]
+        return np.asarray(rows, dtype=np.float32)
+
+
+def _old_suggestions(index, mapping, query: str) -> List[str]:
+    tokens = []
+    for doc_id, _ in index.search(query, 3):
+        for t in mapping[doc_id]["excerpt"].split():
+            t = t.strip(",.!?;:-").strip()
+            if t:
+                tokens.append(t)
+    return tokens
+
+
+def _precision(suggestions: List[List[str]]) -> float:
+    skills = {s.lower() for s in corpus.SKILLS}
+    flat = [s for row in suggestions for s in row]
+    return sum(s.lower() in skills for s in flat) / len(flat) if flat else 0.0
+
+
+def run(sizes: Sequence[int], top_k: int) -> Dict[int, Dict[str, float]]:
+    from src.utils import bm25
+    from src.utils.skill_vocab import SkillVocab, excerpt_texts
+
+    encoder = _VectorEncoder()
+    report = {}
+    for n in sizes:
+        mapping = corpus.excerpt_mapping(n)
+        start = time.perf_counter()
+        vocab = SkillVocab.build(excerpt_texts(mapping))
+        build_s = time.perf_counter() - start
+        vocab.embeddings = encoder.encode(vocab.phrases).astype(np.float16)
+        path = os.path.join(tempfile.mkdtemp(prefix="bench_vocab_"), "skill_vocab.npz")
+        vocab.save(path)
+        vocab = SkillVocab.load(path)
+        index = bm25.BM25Index.build(mapping)
+        q_emb = {q: encoder.encode([q]) for q in QUERIES}
+
+        class _Cached:
+            def encode(self, texts, batch_size=32):
+                return q_emb[texts[0]]
+
+        report[n] = {
+            "build_s": build_s,
+            "phrases": len(vocab),
+            "file_kib": os.path.getsize(path) / 1024,
+            "old_ms": statistics.fmean(_ms(lambda: _old_suggestions(index, mapping, q)) for q in QUERIES),
+            "lexical_ms": statistics.fmean(_ms(lambda: vocab.suggest(q, top_k)) for q in QUERIES),
+            "dense_ms": statistics.fmean(_ms(lambda: vocab.suggest(q, top_k, encoder=_Cached())) for q in QUERIES),
+            "old_precision": _precision([_old_suggestions(index, mapping, q) for q in QUERIES]),
+            "new_precision": _precision([vocab.suggest(q, top_k) for q in QUERIES]),
+        }
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--top-k", type=int, default=15)
+    parser.add_argument("--out", help="write the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.top_k)
+    print(f"{'docs':>7} {'build s':>8} {'phrases':>8} {'KiB':>6} {'old ms':>7} {'lexical ms':>11} {'dense ms':>9} "
+          f"{'old prec':>9} {'new prec':>9}")
+    for n, r in report.items():
+        print(f"{n:>7} {r['build_s']:>8.2f} {r['phrases']:>8} {r['file_kib']:>6.0f} {r['old_ms']:>7.3f} "
+              f"{r['lexical_ms']:>11.3f} {r['dense_ms']:>9.3f} {r['old_precision']:>9.1%} {r['new_precision']:>9.1%}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "sizes": {str(n): r for n, r in report.items()}}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+# benchmarks/step8_summary.py
+"""
+Step-8 summary (src/components/summary.py): rerun time of the summary with
+one st.markdown call per field (as render_step_8 did) against the single
+cached markdown block.
+
+Both scripts run under Streamlit's AppTest, so a rerun includes script
+execution and element serialisation, with a fully filled session. Reruns
+alternate between "nothing changed" (a click elsewhere on the page) and an
+edit of one field.
+
+  elements   elements the summary adds to the page
+  idle ms    median rerun where no field changed
+  edit ms    median rerun after one field changed
+  build µs   summary_markdown() alone, uncached / cache hit
+
+The single block must render exactly the text of the per-field calls, and
+values full of markdown syntax (headings, rules, unmatched "**", code,
+HTML) must stay inside their own field: one paragraph and one bold label
+per field, the six section rules and nothing else (exit 1 if not).
+
+    python -m benchmarks.step8_summary
+    python -m benchmarks.step8_summary --reruns 100 --out step8.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from typing import Dict
+
+from benchmarks import corpus
+
+
+def _per_field_script(values):
+    import streamlit as st
+    from src.components.summary import SUMMARY_SECTIONS, literal_markdown
+
+    for key, value in values.items():
+        st.session_state.setdefault(key, value)
+    if st.session_state.get("_edit"):
+        st.session_state["city"] = f"City {st.session_state['_edit']}"
+    for i, (_, fields) in enumerate(SUMMARY_SECTIONS):
+        if i:
+            st.markdown("---")
+        for label, keys in fields:
+            st.markdown(f"**{label}:** {' '.join(literal_markdown(st.session_state[k]) for k in keys)}")
+
+
+def _single_block_script(values):
+    import streamlit as st
+    from src.components.summary import render_summary
+
+    for key, value in values.items():
+        st.session_state.setdefault(key, value)
+    if st.session_state.get("_edit"):
+        st.session_state["city"] = f"City {st.session_state['_edit']}"
+    render_summary()
+
+
+def _time_reruns(script, values, reruns: int):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_function(script, args=(values,), default_timeout=30)
+    at.run()
+    idle, edit = [], []
+    for i in range(reruns):
+        changed = i % 2 == 1
+        at.session_state["_edit"] = i if changed else 0
+        start = time.perf_counter()
+        at.run()
+        (edit if changed else idle).append((time.perf_counter() - start) * 1000)
+    return at, statistics.median(idle), statistics.median(edit)
+
+
+def _text(at) -> str:
+    return "\n\n".join(m.value for m in at.markdown)
+
+
+_HOSTILE = "# Heading\n\n---\nSome **bold and `tick\n\n    indented\n1. item\n- bullet\n> quote\n<div>x</div> $x$\nRole\n==="
+
+
+def _contained(values) -> bool:
+    """Every field stays one paragraph with one bold label when all values are hostile."""
+    from markdown_it import MarkdownIt
+    from src.components.summary import SUMMARY_SECTIONS, summary_markdown
+
+    html = MarkdownIt("commonmark").render(summary_markdown({k: _HOSTILE for k in values}))
+    n_fields = sum(len(fields) for _, fields in SUMMARY_SECTIONS)
+    return (html.count("<p>") == html.count("<strong>") == n_fields
+            and html.count("<hr") == len(SUMMARY_SECTIONS) - 1
+            and not re.search(r"<(h\d|pre|code|li|blockquote|div)\b", html))
+
+
+def run(reruns: int) -> Dict[str, Dict[str, float]]:
+    from src.components.summary import SUMMARY_SECTIONS, cached_summary_markdown, summary_markdown
+
+    rng = corpus._rng(8)
+    values = {k: corpus.paragraph(rng, rng.randint(2, 40))
+              for _, fields in SUMMARY_SECTIONS for _, keys in fields for k in keys}
+    report = {}
+    texts = {}
+    for name, script in (("per-field calls", _per_field_script), ("single block", _single_block_script)):
+        at, idle_ms, edit_ms = _time_reruns(script, values, reruns)
+        texts[name] = _text(at)
+        report[name] = {"elements": len(at.markdown), "idle_ms": idle_ms, "edit_ms": edit_ms}
+
+    state = dict(values)
+    n = 2000
+    start = time.perf_counter()
+    for _ in range(n):
+        summary_markdown(state)
+    uncached = (time.perf_counter() - start) / n * 1e6
+    cached_summary_markdown(state)
+    start = time.perf_counter()
+    for _ in range(n):
+        cached_summary_markdown(state)
+    hit = (time.perf_counter() - start) / n * 1e6
+    report["per-field calls"]["build_us"] = 0.0
+    report["single block"].update(build_us=uncached, hit_us=hit)
+    report["single block"]["exact"] = texts["per-field calls"] == texts["single block"]
+    report["single block"]["contained"] = _contained(values)
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", type=int, default=40)
+    parser.add_argument("--out", help="write the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.reruns)
+    print(f"{args.reruns} reruns")
+    print(f"{'':<16} {'elements':>9} {'idle ms':>8} {'edit ms':>8}")
+    for name, r in report.items():
+        print(f"{name:<16} {r['elements']:>9} {r['idle_ms']:>8.2f} {r['edit_ms']:>8.2f}")
+    single = report["single block"]
+    print(f"summary_markdown: {single['build_us']:.1f} µs uncached, {single['hit_us']:.1f} µs cache hit")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": report}, f, indent=2)
+    if not single["exact"]:
+        print("FAIL: the single block renders different text than the per-field calls", file=sys.stderr)
+        return 1
+    if not single["contained"]:
+        print("FAIL: a value's markdown leaked out of its field", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,12 @@ import PyPDF2
 import docx
 from dotenv import load_dotenv
 
+from src.utils import session_store, tracing
+from src.utils.json_stream import parse_json_object
+from src.utils.structured_output import ExtractionParseError, json_schema, ollama_format, repair
+from src.utils.llm_metrics import llm_task, track_llm_call
+from src.utils.resilience import LLMError
+
 # Load .env file
 load_dotenv()
 
@@ -19,9 +25,11 @@ if not openai_key:
 
 def store_in_state(key, value):
     """
-    Shortcut for st.session_state[key] = value.
+    Shortcut for st.session_state[key] = value. The key is persisted by the
+    session store from now on.
     """
     st.session_state[key] = value
+    session_store.track(key)
 
 def get_from_session_state(key, default=None):
     """
@@ -110,77 +118,91 @@ def extract_content_from_url(url):
 ##################################
 # LLaMA Non-Stream
 ##################################
-def fetch_from_llama(prompt: str, model="llama3.2:3b", num_ctx=512) -> str:
+def fetch_from_llama(prompt: str, model="llama3.2:3b", num_ctx=2048, format=None) -> str:
     """
     Non-stream approach to local LLaMA (Ollama).
     We parse line-by-line JSON from server, 
     appending the 'response' field each time.
+    format: "json" or a JSON schema to constrain the answer (Ollama `format`).
     """
-    url = "http://127.0.0.1:11434/api/generate"
+    url = f"{os.getenv('OLLAMA_API_URL', 'http://127.0.0.1:11434')}/api/generate"
     payload = {
         "model": model,
         "prompt": prompt,
-        "num_ctx": num_ctx,
-        "num_predict": 256,
-        "stream": False
+        "stream": False,
+        "options": {"num_ctx": num_ctx, "num_predict": 256},   # Ollama reads these only from "options"
     }
-    try:
-        r = requests.post(url, json=payload, timeout=120)
-        r.raise_for_status()
-        lines = r.text.strip().splitlines()
-        final_text = []
-        for line in lines:
-            try:
-                data = json.loads(line)
-            except json.JSONDecodeError:
-                st.warning(f"Could not parse line as JSON:\n{line[:100]}")
-                continue
-            if "response" in data:
-                final_text.append(data["response"])
-        if not final_text:
-            st.error("No 'response' in local LLaMA output.")
+    if format:
+        payload["format"] = format
+    with track_llm_call("ollama", model, prompt) as call:
+        try:
+            r = requests.post(url, json=payload, timeout=120)
+            r.raise_for_status()
+            lines = r.text.strip().splitlines()
+            final_text = []
+            for line in lines:
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    st.warning(f"Could not parse line as JSON:\n{line[:100]}")
+                    continue
+                if "response" in data:
+                    final_text.append(data["response"])
+                call.set_ollama_stats(data)
+            if not final_text:
+                call.error = True
+                st.error("No 'response' in local LLaMA output.")
+                return ""
+            call.completion = "".join(final_text)
+            return call.completion
+        except requests.exceptions.RequestException as e:
+            call.error = True
+            st.error(f"Local LLaMA error: {e}")
             return ""
-        return "".join(final_text)
-    except requests.exceptions.RequestException as e:
-        st.error(f"Local LLaMA error: {e}")
-        return ""
 
 ##################################
 # JSON Parsing & 'Analyse'
 ##################################
 def parse_model_json(text: str):
     """
-    If we want only valid JSON, we find the first { ... } in text. 
+    If we want only valid JSON, we find the first balanced { ... } in text
+    (nested objects and braces inside strings are fine).
     """
     cleaned = text.replace("```json","").replace("```","").strip()
-    matches = re.findall(r"\{.*?\}", cleaned, re.DOTALL)
-    if not matches:
-        return None
-    try:
-        return json.loads(matches[0])
-    except:
-        return None
+    return parse_json_object(cleaned)
+
+DISCOVERY_KEYS = [
+    "company_name", "location", "company_website", "technologies_used",
+    "travel_required", "remote_policy", "tasks", "salary_range",
+    "benefits", "learning_opportunities", "health_benefits",
+]
 
 def analyze_uploaded_sources():
     """
     Combine URL + file content from session, 
     prompt the LLM for JSON job details, 
     parse & store them in session state.
-    """
-    combined_text = ""
-    input_url = get_from_session_state("input_url","")
-    if input_url:
-        combined_text += extract_content_from_url(input_url)
-
-    file_content = get_from_session_state("uploaded_file",{})
-    if file_content and "job_description" in file_content:
-        combined_text += "\n" + file_content["job_description"]
-
-    if not combined_text.strip():
-        st.warning("No text found to analyse.")
-        return
-
-    extraction_prompt = f"""
+    Each stage is recorded as a span of one `analyze_uploaded_sources` trace.
+    """
+    with tracing.span("analyze_uploaded_sources") as root:
+        combined_text = ""
+        input_url = get_from_session_state("input_url","")
+        if input_url:
+            with tracing.span("fetch_url", url=input_url) as sp:
+                page_text = extract_content_from_url(input_url)
+                sp.set("text_chars", len(page_text))
+            combined_text += page_text
+
+        file_content = get_from_session_state("uploaded_file",{})
+        if file_content and "job_description" in file_content:
+            combined_text += "\n" + file_content["job_description"]
+
+        if not combined_text.strip():
+            st.warning("No text found to analyse.")
+            return
+        root.set("text_chars", len(combined_text))
+
+        extraction_prompt = f"""
     You are an AI that extracts structured job or company details from the text below.
     Return ONLY valid JSON with these keys:
       "company_name","location","company_website","technologies_used",
@@ -192,19 +214,34 @@ def analyze_uploaded_sources():
     {combined_text}
     """
 
-    choice = st.session_state.get("llm_choice","openai_3.5")
-    if choice.startswith("openai"):
-        from llm_choice import get_llm
-        response_text = get_llm()(extraction_prompt)
-    else:
-        response_text = fetch_from_llama(extraction_prompt)
-
-    parsed_data = parse_model_json(response_text)
-    if not parsed_data:
-        st.error("❌ Failed to parse JSON from AI response.")
-        return
-
-    for k, v in parsed_data.items():
-        store_in_state(k, v)
+        choice = st.session_state.get("llm_choice","openai_3.5")
+        if choice.startswith("openai"):
+            from llm_choice import get_llm
+            llm = get_llm()
+        else:
+            llm = lambda p, schema=None: fetch_from_llama(p, format=ollama_format(schema) if schema else None)
+        try:
+            with tracing.span("llm_call", provider=choice, prompt_chars=len(extraction_prompt)) as sp, llm_task("discovery"):
+                response_text = llm(extraction_prompt, schema=json_schema(DISCOVERY_KEYS))
+                sp.set("response_chars", len(response_text or ""))
+
+            # Validate against the schema; on failure ask the model to repair its answer (bounded).
+            with tracing.span("json_parse") as sp, llm_task("discovery"):
+                try:
+                    parsed_data, repairs = repair(response_text, DISCOVERY_KEYS, lambda p, sc: llm(p, schema=sc),
+                                                 request=extraction_prompt)
+                    sp.set("repair_round_trips", repairs)
+                except ExtractionParseError:
+                    parsed_data = None
+        except LLMError as e:
+            st.error(f"❌ LLM request failed: {e}")
+            return
+        if not parsed_data:
+            st.error("❌ Failed to parse JSON from AI response.")
+            return
+
+        with tracing.span("store_in_state", keys=len(parsed_data)):
+            for k, v in parsed_data.items():
+                store_in_state(k, v)
 
     st.success("✅ Successfully auto-filled fields from text!")
@@ -5,6 +5,9 @@ import openai
 from functions import fetch_from_llama
 import os
 from dotenv import load_dotenv
+from src.utils.llm_metrics import track_llm_call
+from src.utils.resilience import call_with_resilience
+from src.utils.structured_output import ollama_format, openai_response_format
 
 def get_llm():
     """
@@ -19,26 +22,40 @@ def get_llm():
     else:
         return _fetch_local_llama
 
-def _fetch_openai_chat(prompt: str) -> str:
-    """
-    Uses openai.ChatCompletion with the API key from .env file.
-    """
-    openai.api_key = os.getenv("OPENAI_API_KEY")
+_openai_client = None
+
 
-    if not openai.api_key:
-        raise ValueError("❌ Missing OpenAI API Key. Check `.env` file.")
+def _client():
+    """Shared OpenAI (v1) client; retries and rate limiting come from src.utils.resilience."""
+    global _openai_client
+    if _openai_client is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("❌ Missing OpenAI API Key. Check `.env` file.")
+        _openai_client = openai.OpenAI(api_key=api_key, max_retries=0)
+    return _openai_client
 
-    try:
-        response = openai.ChatCompletion.create(
+
+def _fetch_openai_chat(prompt: str, schema: dict = None) -> str:
+    """
+    Chat completion with the API key from .env file.
+    schema: optional JSON schema; the answer is then constrained to JSON.
+    Raises an LLMError subclass when the request fails.
+    """
+    client = _client()
+    with track_llm_call("openai", "gpt-3.5-turbo", prompt) as call:
+        extra = {"response_format": openai_response_format(schema, "gpt-3.5-turbo")} if schema else {}
+        response = call_with_resilience("openai", "gpt-3.5-turbo", lambda: client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
-        )
-        return response.choices[0].message["content"]
-    except Exception as e:
-        return f"OpenAI error: {e}"
+            **extra,
+        ), prompt=prompt)
+        call.set_usage(response)
+        call.completion = response.choices[0].message.content or ""
+        return call.completion
 
-def _fetch_local_llama(prompt: str) -> str:
+def _fetch_local_llama(prompt: str, schema: dict = None) -> str:
     """
     If the user wants local LLaMA, call fetch_from_llama from functions.py.
     """
-    return fetch_from_llama(prompt)
+    return fetch_from_llama(prompt, format=ollama_format(schema) if schema else None)
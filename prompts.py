@@ -1,6 +1,7 @@
 # prompts.py
 
 from llm_choice import fetch_from_llama
+from src.utils.llm_metrics import llm_task
 from dotenv import load_dotenv
 import os
 
@@ -27,7 +28,8 @@ def generate_job_ad(session_data):
     Benefits: {benefits}
     Make it engaging and concise. Return a plain text version.
     """
-    return fetch_from_llama(prompt)
+    with llm_task("job_ad"):
+        return fetch_from_llama(prompt)
 
 def generate_interview_guide(job_details: dict, perspective: str = "HR") -> str:
     """
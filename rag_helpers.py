@@ -2,59 +2,136 @@
 
 import os
 import pickle
+import threading
 import faiss
 import numpy as np
 import streamlit as st
-from sentence_transformers import SentenceTransformer
+from src.utils import bm25, sharded_index, skill_vocab
+from src.utils.embeddings import load_encoder
 from dotenv import load_dotenv
 import os
 
 load_dotenv()  # Load environment variables from .env
 INDEX_PATH = "vector_databases/index.faiss"
 MAPPING_PATH = "vector_databases/index.pkl"
+SHARDS_DIR = os.getenv("VACALYSER_SHARDS_DIR", "vector_databases/shards")  # used instead when it holds a shard set
+SEARCH_MODE = os.getenv("VACALYSER_SEARCH_MODE", "hybrid")  # hybrid | dense | lexical
 
 EMBEDDING_MODEL = None
 FAISS_INDEX = None
 INDEX_LOADED = False
+SHARDED = False  # FAISS_INDEX came from SHARDS_DIR; search_faiss re-resolves it per call
+MAPPING = None
+BM25_INDEX = None
+INDEX_ERROR = None  # why the index is not loaded, shown by search_faiss
+_INIT_LOCK = threading.Lock()  # warm-up thread and user sessions may race here
+
+def _bm25_path() -> str:
+    """The lexical index lives next to the FAISS index (index.faiss → index.bm25.npz)."""
+    return os.path.splitext(INDEX_PATH)[0] + ".bm25.npz"
 
 def init_faiss_index():
     """
     One-time load of the embedding model 
     and the FAISS index from local disk.
+    The encoder backend (torch / int8 / onnx / onnx-int8) follows
+    VACALYSER_EMBEDDING_BACKEND, see src/utils/embeddings.py.
+    The mapping and its BM25 index are loaded (or built) alongside.
+    A shard set in SHARDS_DIR (src/utils/sharded_index.py) takes precedence:
+    its shards and their mappings load lazily on first search, and the
+    lexical side of hybrid search is off (it would need every mapping).
+    search_faiss looks the shard set up again on every call, so a rewrite
+    by another process (which deletes the old shard files) is picked up.
+    A missing index sets INDEX_ERROR; build it with python -m tools.build_index.
     """
-    global EMBEDDING_MODEL, FAISS_INDEX, INDEX_LOADED
-    if EMBEDDING_MODEL is None:
-        EMBEDDING_MODEL = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
-    if not INDEX_LOADED and os.path.exists(INDEX_PATH):
-        FAISS_INDEX = faiss.read_index(INDEX_PATH)
-        INDEX_LOADED = True
-
-def search_faiss(query:str, top_k=3):
+    global EMBEDDING_MODEL, FAISS_INDEX, INDEX_LOADED, SHARDED, MAPPING, BM25_INDEX, INDEX_ERROR
+    with _INIT_LOCK:
+        if EMBEDDING_MODEL is None:
+            EMBEDDING_MODEL = load_encoder()
+        if not INDEX_LOADED and sharded_index.is_shard_set(SHARDS_DIR):
+            INDEX_ERROR = None
+            FAISS_INDEX = sharded_index.open_shard_set(SHARDS_DIR)
+            MAPPING, BM25_INDEX = FAISS_INDEX.mapping, None
+            INDEX_LOADED = SHARDED = True
+        elif not INDEX_LOADED and not os.path.exists(INDEX_PATH):
+            INDEX_ERROR = (f"{INDEX_PATH} not found. Build it with "
+                           f"`python -m tools.build_index <corpus dir>` and restart the app.")
+        elif not INDEX_LOADED:
+            INDEX_ERROR = None
+            FAISS_INDEX = faiss.read_index(INDEX_PATH)
+            MAPPING, BM25_INDEX = None, None
+            if os.path.exists(MAPPING_PATH):
+                with open(MAPPING_PATH, "rb") as f:
+                    MAPPING = pickle.load(f)
+                BM25_INDEX = bm25.load_or_build(_bm25_path(), MAPPING, MAPPING_PATH)
+            INDEX_LOADED = True
+
+def _mapping_entry(mapping, idx: int):
+    # pickled mappings use int or str keys depending on how they were built
+    doc = mapping.get(idx)
+    if doc is None:
+        doc = mapping.get(str(idx))
+    return dict(doc) if doc is not None else None
+
+def search_faiss(query:str, top_k=3, mode=None):
     """
     Encodes the query using our model, 
     does a top_k search in the FAISS index,
     retrieves matching docs from the mapping.
+    mode: "hybrid" (default, VACALYSER_SEARCH_MODE) fuses the dense ranking with
+    BM25 over the mapping excerpts by reciprocal rank; "dense" / "lexical" use one.
     """
     init_faiss_index()
+    mode = mode or SEARCH_MODE
     if not FAISS_INDEX or EMBEDDING_MODEL is None:
-        st.warning("FAISS index or embedding model not loaded.")
+        st.warning(INDEX_ERROR or "FAISS index or embedding model not loaded.")
         return []
 
-    q_emb = EMBEDDING_MODEL.encode([query]).astype(np.float32)
-    distances, indices = FAISS_INDEX.search(q_emb, top_k)
-
-    if not os.path.exists(MAPPING_PATH):
+    index, mapping = FAISS_INDEX, MAPPING
+    if SHARDED:
+        # cached by manifest mtime; a stale instance would point at deleted shard files
+        index = sharded_index.open_shard_set(SHARDS_DIR) or index
+        mapping = index.mapping
+    if mapping is None:
         st.warning("Index mapping file not found.")
         return []
 
-    with open(MAPPING_PATH,"rb") as f:
-        mapping = pickle.load(f)
+    depth = top_k if mode == "dense" else max(top_k * 10, 50)  # candidates per ranking before fusion
+    dense, lexical = {}, {}
+    if mode != "lexical":
+        q_emb = EMBEDDING_MODEL.encode([query]).astype(np.float32)
+        distances, indices = index.search(q_emb, depth)
+        dense = {int(idx): float(dist) for dist, idx in zip(distances[0], indices[0]) if idx >= 0}
+    if mode != "dense" and BM25_INDEX is not None:
+        lexical = dict(BM25_INDEX.search(query, depth))
+
+    if mode == "hybrid":
+        ranked = bm25.reciprocal_rank_fusion([list(dense), list(lexical)], top_k=top_k)
+    else:
+        ranked = [(idx, None) for idx in (dense if mode == "dense" else lexical)][:top_k]
 
     results = []
-    for dist, idx in zip(distances[0], indices[0]):
-        key = str(idx)
-        if key in mapping:
-            doc_info = mapping[key]
-            doc_info["distance"] = float(dist)
-            results.append(doc_info)
+    for idx, fused in ranked:
+        doc_info = _mapping_entry(mapping, idx)
+        if doc_info is None:
+            continue
+        if idx in dense:
+            doc_info["distance"] = dense[idx]
+        if idx in lexical:
+            doc_info["bm25"] = lexical[idx]
+        if fused is not None:
+            doc_info["rrf"] = fused
+        results.append(doc_info)
     return results
+
+def suggest_skills(query: str, top_k=15, exclude=None):
+    """
+    Ranked phrases from the precomputed skill vocabulary
+    (tools/build_skill_vocab.py, src/utils/skill_vocab.py).
+    Returns None when no vocabulary has been built, so callers can fall back.
+    """
+    vocab = skill_vocab.get_vocab()
+    if vocab is None:
+        return None
+    init_faiss_index()
+    return vocab.suggest(query, top_k=top_k, encoder=EMBEDDING_MODEL, exclude=exclude)
@@ -0,0 +1,32 @@
+# src/components/downloads.py
+
+from typing import Any, Callable, Optional
+
+import streamlit as st
+
+from src.utils.export_cache import content_key, get_export_cache
+
+
+def deferred_download(label: str, fmt: str, content: Any, render: Callable[[Any], Optional[bytes]],
+                      file_name: str, mime: Optional[str] = None, key: Optional[str] = None) -> None:
+    """
+    Download button whose payload is only rendered when asked for.
+
+    If render(content) is already in the export cache the download button is
+    shown straight away. Otherwise a "Prepare …" button stands in for it; the
+    click renders the artefact once (cached by format and content hash) and
+    shows the real download button. Nothing is rendered for downloads nobody
+    asks for, and an unchanged artefact is never rendered twice.
+    """
+    cache = get_export_cache()
+    ckey = content_key(fmt, content)
+    data = cache.get(ckey)
+    if data is None:
+        if not st.button(f"Prepare {label[0].lower()}{label[1:]}", key=f"prepare_{key or file_name}"):
+            return
+        with st.spinner(f"Rendering {file_name} …"):
+            data = cache.get_or_render(ckey, lambda: render(content))
+        if data is None:
+            st.warning(f"{file_name} could not be rendered.")
+            return
+    st.download_button(label, data=data, file_name=file_name, mime=mime, key=key)
@@ -2,6 +2,26 @@
 
 import streamlit as st
 
+from src.utils.skill_index import complete_skills
+
+
+def skill_autocomplete(label: str, key: str, exclude=(), limit: int = 8):
+    """
+    Text input with ranked skill completions (taxonomy + corpus, see
+    src/utils/skill_index.py) shown as buttons underneath.
+    Returns (typed text, clicked completion or None).
+    """
+    typed = st.text_input(label, key=key)
+    picked = None
+    completions = complete_skills(typed, limit=limit, exclude=exclude) if typed.strip() else []
+    if completions:
+        cols = st.columns(min(len(completions), 4))
+        for i, skill in enumerate(completions):
+            if cols[i % len(cols)].button(skill, key=f"{key}_completion_{i}"):
+                picked = skill
+    return typed, picked
+
+
 def drag_drop_skills_component():
     """
     Simple demonstration of collecting must-have vs. nice-to-have skills in separate text areas.
@@ -21,6 +41,14 @@ def drag_drop_skills_component():
     must_have_list = [skill.strip() for skill in must_have_raw.split("\n") if skill.strip()]
     nice_have_list = [skill.strip() for skill in nice_have_raw.split("\n") if skill.strip()]
 
+    # Look up a skill and add it to either list
+    target = st.radio("Add found skills to", ["Must-Have", "Nice-to-Have"], horizontal=True, key="dd_skill_target")
+    _, picked = skill_autocomplete("Find a skill:", key="dd_skill_search", exclude=must_have_list + nice_have_list)
+    if picked:
+        (must_have_list if target == "Must-Have" else nice_have_list).append(picked)
+
     # Store them
     st.session_state["must_have_skills"] = "\n".join(must_have_list)
     st.session_state["nice_to_have_skills"] = "\n".join(nice_have_list)
+    if picked:
+        st.rerun()
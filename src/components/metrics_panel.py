@@ -0,0 +1,61 @@
+# src/components/metrics_panel.py
+
+import streamlit as st
+
+from src.utils import llm_metrics
+
+
+def llm_metrics_panel():
+    """
+    Sidebar expander with per-task LLM call counts, latency and token usage
+    for this server process.
+    """
+    rows = llm_metrics.snapshot()
+    with st.sidebar.expander("LLM metrics", expanded=False):
+        if not rows:
+            st.caption("No LLM calls yet.")
+            return
+        calls = sum(r["calls"] for r in rows)
+        errors = sum(r["errors"] for r in rows)
+        tokens = sum(r["prompt_tokens"] + r["completion_tokens"] for r in rows)
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Calls", calls)
+        c2.metric("Errors", errors)
+        c3.metric("Tokens", tokens)
+        st.dataframe(
+            [
+                {
+                    "task": r["task"],
+                    "model": f"{r['provider']}/{r['model']}",
+                    "calls": r["calls"],
+                    "avg s": round(r["mean_latency_s"], 2),
+                    "prompt tok": r["prompt_tokens"],
+                    "cached tok": r["cached_prompt_tokens"],
+                    "compl. tok": r["completion_tokens"],
+                    "errors": r["errors"],
+                }
+                for r in rows
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+        repairs = llm_metrics.counter_value("structured_repair_round_trips_total")
+        parsed = llm_metrics.counter_value("structured_parse_total")
+        if parsed:
+            failed = llm_metrics.counter_value("structured_parse_total", outcome="failed")
+            st.caption(f"Structured output: {failed / parsed:.0%} parse failures, {repairs:.0f} repair round trip(s)")
+        retries = llm_metrics.counter_value("llm_retries_total")
+        throttled = llm_metrics.counter_value("llm_throttle_seconds_total")
+        rejected = llm_metrics.counter_value("llm_circuit_rejections_total")
+        if retries or throttled or rejected:
+            st.caption(f"Resilience: {retries:.0f} retries, {throttled:.1f}s throttled, "
+                       f"{rejected:.0f} call(s) rejected by an open circuit")
+        coalesced = sum(r["cache_hits"] for r in rows)
+        if coalesced:
+            st.caption(f"Coalesced: {coalesced} call(s) joined an identical call already in flight")
+        st.download_button(
+            "Download (Prometheus)",
+            data=llm_metrics.render_prometheus(),
+            file_name="vacalyser_llm_metrics.prom",
+            mime="text/plain",
+        )
@@ -0,0 +1,158 @@
+# src/components/summary.py
+"""
+Step-8 "Final Summary" as one markdown block.
+
+The summary used to be ~80 st.markdown calls, one element (and one protobuf
+delta) per field on every rerun. It is now declared once in SUMMARY_SECTIONS
+— (heading comment, [(label, field keys)]) — built in one pass and sent as a
+single element. The built text is kept in session_state with the JobSpec it
+was built from; a rerun where no summary field changed reuses it.
+
+Values are escaped (literal_markdown) and their line breaks kept inside the
+field's paragraph: in one shared block, a value starting with "#", a "---"
+line or an unmatched "**" would otherwise reformat every field after it.
+"""
+
+from __future__ import annotations
+
+from typing import List, Mapping, MutableMapping, Optional, Tuple
+
+import streamlit as st
+
+from src.utils.job_spec import JobSpec
+
+_CACHE_KEY = "_summary_markdown"
+_MARKDOWN_SYNTAX = "\\`*_{}[]()#+-.!|<>~$="  # backslash first, so added escapes are not escaped again
+
+SUMMARY_SECTIONS: List[Tuple[str, List[Tuple[str, Tuple[str, ...]]]]] = [
+    ("Basic job info", [
+        ("Job Title", ("job_title",)),
+        ("Company Name", ("company_name",)),
+        ("Brand Name", ("brand_name",)),
+        ("HQ Location", ("headquarters_location",)),
+        ("Company Website", ("company_website",)),
+        ("Start Date", ("date_of_employment_start",)),
+        ("Job Type", ("job_type",)),
+        ("Contract Type", ("contract_type",)),
+        ("Job Level", ("job_level",)),
+        ("Job Location (City)", ("city",)),
+        ("Team Structure", ("team_structure",)),
+    ]),
+    ("Role info", [
+        ("Role Description", ("role_description",)),
+        ("Reports To", ("reports_to",)),
+        ("Supervises", ("supervises",)),
+        ("Role Type", ("role_type",)),
+        ("Priority Projects", ("role_priority_projects",)),
+        ("Travel Requirements", ("travel_requirements",)),
+        ("Work Schedule", ("work_schedule",)),
+        ("Role Keywords", ("role_keywords",)),
+        ("Decision Making Authority", ("decision_making_authority",)),
+        ("Performance Metrics", ("role_performance_metrics",)),
+    ]),
+    ("Tasks & responsibilities", [
+        ("General Task List", ("task_list",)),
+        ("Key Responsibilities", ("key_responsibilities",)),
+        ("Technical Tasks", ("technical_tasks",)),
+        ("Managerial Tasks", ("managerial_tasks",)),
+        ("Administrative Tasks", ("administrative_tasks",)),
+        ("Customer-Facing Tasks", ("customer_facing_tasks",)),
+        ("Internal Reporting Tasks", ("internal_reporting_tasks",)),
+        ("Performance-Related Tasks", ("performance_tasks",)),
+        ("Innovation Tasks", ("innovation_tasks",)),
+        ("Task Prioritization", ("task_prioritization",)),
+    ]),
+    ("Skills & competencies", [
+        ("Hard Skills", ("hard_skills",)),
+        ("Soft Skills", ("soft_skills",)),
+        ("Must-Have Skills", ("must_have_skills",)),
+        ("Nice-to-Have Skills", ("nice_to_have_skills",)),
+        ("Certifications Required", ("certifications_required",)),
+        ("Language Requirements", ("language_requirements",)),
+        ("Tool Proficiency", ("tool_proficiency",)),
+        ("Domain Expertise", ("domain_expertise",)),
+        ("Leadership Competencies", ("leadership_competencies",)),
+        ("Technical Stack", ("technical_stack",)),
+        ("Industry Experience", ("industry_experience",)),
+        ("Analytical Skills", ("analytical_skills",)),
+        ("Communication Skills", ("communication_skills",)),
+        ("Project Management Skills", ("project_management_skills",)),
+        ("Additional Soft Requirements", ("soft_requirement_details",)),
+        ("Visa Sponsorship", ("visa_sponsorship",)),
+    ]),
+    ("Compensation & benefits", [
+        ("Salary Range", ("salary_range", "currency")),
+        ("Pay Frequency", ("pay_frequency",)),
+        ("Commission Structure", ("commission_structure",)),
+        ("Bonus Scheme", ("bonus_scheme",)),
+        ("Vacation Days", ("vacation_days",)),
+        ("Flexible Hours", ("flexible_hours",)),
+        ("Remote Work Policy", ("remote_work_policy",)),
+        ("Relocation Assistance", ("relocation_assistance",)),
+        ("Childcare Support", ("childcare_support",)),
+    ]),
+    ("Recruitment process", [
+        ("Recruitment Steps", ("recruitment_steps",)),
+        ("Recruitment Timeline", ("recruitment_timeline",)),
+        ("Number of Interviews", ("number_of_interviews",)),
+        ("Interview Format", ("interview_format",)),
+        ("Assessment Tests", ("assessment_tests",)),
+        ("Onboarding Process Overview", ("onboarding_process_overview",)),
+        ("Contact Email", ("recruitment_contact_email",)),
+        ("Contact Phone", ("recruitment_contact_phone",)),
+        ("Application Instructions", ("application_instructions",)),
+    ]),
+    ("Additional metadata", [
+        ("Parsed Data (Raw)", ("parsed_data_raw",)),
+        ("Language of Ad", ("language_of_ad",)),
+        ("Translation Required", ("translation_required",)),
+        ("Employer Branding Elements", ("employer_branding_elements",)),
+        ("Desired Publication Channels", ("desired_publication_channels",)),
+        ("Internal Job ID", ("internal_job_id",)),
+        ("Ad Seniority Tone", ("ad_seniority_tone",)),
+        ("Ad Length Preference", ("ad_length_preference",)),
+        ("Deadline Urgency", ("deadline_urgency",)),
+        ("Company Awards", ("company_awards",)),
+        ("Diversity & Inclusion Statement", ("diversity_inclusion_statement",)),
+        ("Legal Disclaimers", ("legal_disclaimers",)),
+        ("Social Media Links", ("social_media_links",)),
+        ("Video Introduction Option", ("video_introduction_option",)),
+        ("Comments (Internal)", ("comments_internal",)),
+    ]),
+]
+
+
+def literal_markdown(value) -> str:
+    """`value` as literal inline text: markdown syntax escaped, lines joined by hard breaks."""
+    text = str(value)
+    for ch in _MARKDOWN_SYNTAX:
+        if ch in text:
+            text = text.replace(ch, "\\" + ch)
+    if "\n" in text or "\r" in text:
+        text = "  \n".join(line.strip() for line in text.splitlines() if line.strip())
+    return text.strip()
+
+
+def summary_markdown(spec: Mapping) -> str:
+    """The whole summary: one "**Label:** value" paragraph per field, sections split by rules."""
+    sections = []
+    for _, fields in SUMMARY_SECTIONS:
+        sections.append("\n\n".join(
+            f"**{label}:** {' '.join(literal_markdown(spec.get(k, '')) for k in keys)}" for label, keys in fields))
+    return "\n\n---\n\n".join(sections)
+
+
+def cached_summary_markdown(state: MutableMapping) -> str:
+    """summary_markdown() of the state's JobSpec, rebuilt only when a field changed."""
+    spec = JobSpec.from_state(state)
+    cached = state.get(_CACHE_KEY)
+    if cached is not None and not spec.diff(cached[0]):
+        return cached[1]
+    text = summary_markdown(spec)
+    state[_CACHE_KEY] = (spec, text)
+    return text
+
+
+def render_summary(state: Optional[MutableMapping] = None) -> None:
+    """Render the final summary as a single markdown element."""
+    st.markdown(cached_summary_markdown(st.session_state if state is None else state))
@@ -0,0 +1,21 @@
+# src/components/trace_panel.py
+
+import streamlit as st
+
+from src.utils import tracing
+
+
+def trace_summary_panel(trace_id: str = "", name: str = "discovery"):
+    """
+    Sidebar expander showing where the time went in this session's traced
+    pipeline run (`trace_id`). The recent-trace buffer is process-wide, so
+    there is no fallback to another session's newest trace.
+    """
+    trace = tracing.get_trace(trace_id) if trace_id else None
+    with st.sidebar.expander(f"Trace: {name}", expanded=True):
+        if trace is None:
+            st.caption("No trace recorded yet.")
+            return
+        st.metric("Total", f"{trace['duration_ms'] / 1000:.2f} s")
+        st.dataframe(tracing.summarize(trace), hide_index=True, use_container_width=True)
+        st.caption(f"trace_id {trace['trace_id']}")
@@ -50,6 +50,17 @@ STEP_KEYS: dict[int, list[str]] = {
     ],
 }
 
+STEP_TITLES: dict[int, str] = {
+    1: "Discovery",
+    2: "Job & Company",
+    3: "Role Definition",
+    4: "Tasks & Responsibilities",
+    5: "Skills & Competencies",
+    6: "Compensation & Benefits",
+    7: "Recruitment Process",
+    8: "Additional & Summary",
+}
+
 # Runtime-generated artefacts (not shown in UI steps)
 GENERATED_KEYS: list[str] = [
     "generated_job_ad", "generated_interview_prep", "generated_email_template",
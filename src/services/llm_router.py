@@ -0,0 +1,202 @@
+# src/services/llm_router.py
+"""
+Routing between two LLM backends (typically local Ollama and OpenAI).
+
+    llm = LLMRouter(primary=LLMService(provider="ollama", ...),
+                    secondary=LLMService(provider="openai", ...),
+                    mode="hedge", hedge_after_s=3.0)
+    llm.complete(prompt=...)          # same interface as LLMService
+
+Modes:
+  single    only the primary (what the provider radio always did)
+  failover  the primary; if it fails (connection refused, HTTP error, open
+            circuit …) the same request goes to the secondary
+  hedge     the primary; if it has not produced a first token within
+            `hedge_after_s`, or fails, the request is also sent to the
+            secondary. complete() takes whichever answer finishes first,
+            stream() whichever backend starts streaming first; the other
+            request is cancelled (its response is closed at the next chunk).
+
+Both attempts are streamed in worker threads, so the first token can be
+observed; the task label and trace context of the caller are carried over.
+Outcomes go to llm_metrics as llm_route_total{mode,winner} and
+llm_hedge_requests_total{reason=slow|error}.
+
+Defaults come from VACALYSER_LLM_ROUTING (single|failover|hedge) and
+VACALYSER_HEDGE_AFTER_S.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import queue
+import threading
+import time
+from typing import Iterator, List, Optional
+
+from src.utils import llm_metrics
+from src.utils.singleflight import coalesce, request_key
+
+ROUTING_MODES = ("single", "failover", "hedge")
+ROUTING_MODE = os.getenv("VACALYSER_LLM_ROUTING", "single")
+HEDGE_AFTER_S = float(os.getenv("VACALYSER_HEDGE_AFTER_S", "3.0"))
+
+_END = object()
+
+
+class _Attempt:
+    """One streamed request in a worker thread; chunks are buffered for whoever wins."""
+
+    def __init__(self, role: str, service, kwargs: dict, changed: threading.Event):
+        self.role = role
+        self.service = service
+        self.parts: List[str] = []
+        self.chunks: "queue.Queue" = queue.Queue()
+        self.first_token = threading.Event()
+        self.done = threading.Event()
+        self.cancelled = threading.Event()
+        self.error: Optional[BaseException] = None
+        self._changed = changed
+        ctx = contextvars.copy_context()
+        threading.Thread(target=ctx.run, args=(self._run, kwargs), name=f"llm-{role}", daemon=True).start()
+
+    @property
+    def provider(self) -> str:
+        return getattr(self.service, "provider", self.role)
+
+    @property
+    def ok(self) -> bool:
+        return self.done.is_set() and self.error is None and not self.cancelled.is_set()
+
+    @property
+    def failed(self) -> bool:
+        return self.done.is_set() and self.error is not None
+
+    def _run(self, kwargs: dict) -> None:
+        gen = self.service.stream(**kwargs)
+        try:
+            for chunk in gen:
+                if self.cancelled.is_set():
+                    break
+                self.parts.append(chunk)
+                self.chunks.put(chunk)
+                if not self.first_token.is_set():
+                    self.first_token.set()
+                    self._changed.set()
+        except Exception as exc:
+            self.error = exc
+        finally:
+            gen.close()
+            self.chunks.put(_END)
+            self.done.set()
+            self._changed.set()
+
+    def cancel(self) -> None:
+        if not self.done.is_set():
+            self.cancelled.set()
+            llm_metrics.increment("llm_hedge_cancelled_total", 1, "Routed requests cancelled after losing a race.",
+                                  provider=self.provider)
+
+    def text(self) -> str:
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return "".join(self.parts).strip()
+
+    def iter_chunks(self) -> Iterator[str]:
+        while True:
+            chunk = self.chunks.get()
+            if chunk is _END:
+                break
+            yield chunk
+        if self.error is not None:
+            raise self.error
+
+
+class LLMRouter:
+    """Duck-types LLMService (complete / stream) over a primary and a secondary backend."""
+
+    def __init__(self, primary, secondary=None, mode: str = ROUTING_MODE, hedge_after_s: float = HEDGE_AFTER_S):
+        if mode not in ROUTING_MODES:
+            raise ValueError(f"Unsupported routing mode {mode!r}. Choose one of {', '.join(ROUTING_MODES)}.")
+        self.primary = primary
+        self.secondary = secondary
+        self.mode = mode if secondary is not None else "single"
+        self.hedge_after_s = hedge_after_s
+        self.provider = getattr(primary, "provider", "")
+
+    # ------------------------------------------------------------------ public API
+    def complete(self, prompt: str, system_message: str = None, max_tokens: int = 256, temperature: float = 0.7,
+                 schema: Optional[dict] = None, prefix: Optional[str] = None) -> str:
+        """Like LLMService.complete(); see the module docstring for what each mode does."""
+        if self.mode == "single":
+            return self.primary.complete(prompt=prompt, system_message=system_message, max_tokens=max_tokens,
+                                         temperature=temperature, schema=schema, prefix=prefix)
+        kwargs = dict(prompt=prompt, system_message=system_message, max_tokens=max_tokens,
+                      temperature=temperature, schema=schema, prefix=prefix)
+        key = request_key("router", self.mode, self._name(self.primary), self._name(self.secondary),
+                          system_message, prompt, max_tokens, temperature, schema, prefix)
+        return coalesce(key, lambda: self._race(kwargs, until="done").text(), provider="router", model=self.mode)
+
+    def stream(self, prompt: str, system_message: str = None, max_tokens: int = 256, temperature: float = 0.7,
+               schema: Optional[dict] = None, prefix: Optional[str] = None) -> Iterator[str]:
+        """Like LLMService.stream(); the backend that starts streaming first is used."""
+        kwargs = dict(prompt=prompt, system_message=system_message, max_tokens=max_tokens,
+                      temperature=temperature, schema=schema, prefix=prefix)
+        if self.mode == "single":
+            yield from self.primary.stream(**kwargs)
+            return
+        winner = self._race(kwargs, until="first_token")
+        try:
+            yield from winner.iter_chunks()
+        finally:
+            winner.cancel()  # the consumer stopped early (e.g. the JSON object was complete)
+
+    # ------------------------------------------------------------------ routing
+    @staticmethod
+    def _name(service) -> str:
+        provider = getattr(service, "provider", "")
+        model = getattr(service, "openai_model" if provider == "openai" else "ollama_model", "")
+        return f"{provider}/{model}"
+
+    def _race(self, kwargs: dict, until: str) -> _Attempt:
+        """
+        Run the primary, bring in the secondary when the mode calls for it and
+        return the winning attempt. `until` is "done" (complete) or
+        "first_token" (stream); an attempt that fails never wins.
+        """
+        changed = threading.Event()
+        attempts = [_Attempt("primary", self.primary, kwargs, changed)]
+        deadline = time.monotonic() + self.hedge_after_s if self.mode == "hedge" else None
+        while True:
+            for a in attempts:
+                if a.ok or (until == "first_token" and a.first_token.is_set() and not a.failed):
+                    for other in attempts:
+                        if other is not a:
+                            other.cancel()
+                    llm_metrics.increment("llm_route_total", 1, "Routed LLM requests by mode and winning backend.",
+                                          mode=self.mode, winner=a.role, provider=a.provider)
+                    return a
+            if all(a.failed for a in attempts):
+                if len(attempts) == 1 and self.secondary is not None:
+                    self._hedge(attempts, kwargs, changed, "error")
+                    continue
+                llm_metrics.increment("llm_route_total", 1, "Routed LLM requests by mode and winning backend.",
+                                      mode=self.mode, winner="none", provider="")
+                raise attempts[-1].error
+            primary = attempts[0]
+            if (len(attempts) == 1 and deadline is not None and not primary.first_token.is_set()
+                    and time.monotonic() >= deadline):
+                self._hedge(attempts, kwargs, changed, "slow")
+                continue
+            timeout = None
+            if len(attempts) == 1 and deadline is not None and not primary.first_token.is_set():
+                timeout = max(0.0, deadline - time.monotonic())
+            changed.wait(timeout)
+            changed.clear()
+
+    def _hedge(self, attempts: List[_Attempt], kwargs: dict, changed: threading.Event, reason: str) -> None:
+        llm_metrics.increment("llm_hedge_requests_total", 1, "Requests also sent to the secondary backend.",
+                              mode=self.mode, reason=reason, provider=getattr(self.secondary, "provider", ""))
+        attempts.append(_Attempt("secondary", self.secondary, kwargs, changed))
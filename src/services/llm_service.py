@@ -1,11 +1,24 @@
 import os
 import json
 import requests
+from typing import Any, Iterator, Optional
+
+from src.utils.llm_metrics import track_llm_call
+from src.utils.prompt_layout import PRIME_INSTRUCTION, PrefixContextCache
+from src.utils.resilience import call_with_resilience
+from src.utils.singleflight import coalesce, request_key
+from src.utils.structured_output import ollama_format, openai_response_format
+
+# Evaluate a shared prompt prefix once per session and pass Ollama's `context` on.
+# Off by default: current Ollama detokenizes `context` into the prompt, so the
+# runner's KV prefix match gives the same reuse without the priming call.
+OLLAMA_CONTEXT_REUSE = os.getenv("VACALYSER_OLLAMA_CONTEXT_REUSE", "0") == "1"
 
 class LLMService:
     """Service to interact with either OpenAI or a local LLM (via Ollama)."""
     def __init__(self, provider: str = "openai", openai_api_key: str = "", openai_org: str = "", openai_model: str = "gpt-3.5-turbo", 
-                 ollama_api_url: str = "http://127.0.0.1:11434", ollama_model: str = "llama2:3b"):
+                 ollama_api_url: str = "http://127.0.0.1:11434", ollama_model: str = "llama2:3b", client: Optional[Any] = None,
+                 context_cache: Optional[PrefixContextCache] = None):
         """
         Initialize the LLM service.
         provider: "openai" or "ollama"
@@ -14,20 +27,26 @@ class LLMService:
         openai_model: model name for OpenAI (e.g., "gpt-4" or "gpt-3.5-turbo")
         ollama_api_url: base URL for Ollama local model API
         ollama_model: model name for local LLM via Ollama
+        client: pre-built OpenAI (v1) client; created from the key/org if omitted.
+                The base URL follows OPENAI_BASE_URL, so a local stub can stand in.
+        context_cache: where Ollama prefix contexts are kept (one per user session);
+                       without it every prompt is sent in full.
         """
         self.provider = provider
         self.openai_model = openai_model
         self.ollama_url = ollama_api_url
         self.ollama_model = ollama_model
+        self.client = None
+        self.context_cache = context_cache
         if provider == "openai":
-            try:
-                import openai
-            except ImportError:
-                raise ImportError("OpenAI library not installed.")
-            if openai_api_key:
-                openai.api_key = openai_api_key
-            if openai_org:
-                openai.organization = openai_org
+            if client is None:
+                try:
+                    from openai import OpenAI
+                except ImportError:
+                    raise ImportError("OpenAI library not installed.")
+                client = OpenAI(api_key=openai_api_key or None, organization=openai_org or None)
+            # Retries, backoff and rate limiting are done by src.utils.resilience.
+            self.client = client.with_options(max_retries=0) if hasattr(client, "with_options") else client
             self.openai_model = openai_model
         elif provider == "ollama":
             # For local, ensure requests is available (requests imported above)
@@ -36,48 +55,173 @@ class LLMService:
         else:
             raise ValueError("Unsupported LLM provider. Choose 'openai' or 'ollama'.")
 
-    def complete(self, prompt: str, system_message: str = None, max_tokens: int = 256, temperature: float = 0.7) -> str:
+    def complete(self, prompt: str, system_message: str = None, max_tokens: int = 256, temperature: float = 0.7,
+                 schema: Optional[dict] = None, prefix: Optional[str] = None) -> str:
         """
         Generate a completion for the given prompt using the specified LLM provider and model.
         For OpenAI, uses ChatCompletion API. For Ollama (local), uses its HTTP API.
+        schema: JSON schema the answer must follow (OpenAI response_format / Ollama format).
+        prefix: leading part of `prompt` shared by several calls (see prompt_layout).
+                OpenAI caches it on its own; for Ollama its context is evaluated
+                once and reused, and only the rest of the prompt is sent.
+        Identical requests already in flight (any session) are joined, not re-sent.
         """
+        model = self.openai_model if self.provider == "openai" else self.ollama_model
+        key = request_key(self.provider, model, self.ollama_url if self.provider == "ollama" else "",
+                          system_message, prompt, max_tokens, temperature, schema)
+        return coalesce(key, lambda: self._complete(prompt, system_message, max_tokens, temperature, schema, prefix),
+                        provider=self.provider, model=model)
+
+    def _complete(self, prompt: str, system_message: Optional[str], max_tokens: int, temperature: float,
+                  schema: Optional[dict], prefix: Optional[str]) -> str:
         if self.provider == "openai":
-            import openai
             messages = []
             if system_message:
                 messages.append({"role": "system", "content": system_message})
             messages.append({"role": "user", "content": prompt})
-            response = openai.ChatCompletion.create(
-                model=self.openai_model,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=temperature
-            )
-            return response["choices"][0]["message"]["content"].strip()
+            with track_llm_call("openai", self.openai_model, prompt) as call:
+                response = call_with_resilience("openai", self.openai_model, lambda: self.client.chat.completions.create(
+                    model=self.openai_model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **self._openai_format(schema)
+                ), prompt=prompt, max_tokens=max_tokens)
+                call.set_usage(response)
+                call.completion = (response.choices[0].message.content or "").strip()
+            return call.completion
         elif self.provider == "ollama":
             url = f"{self.ollama_url}/api/generate"
-            payload = {
-                "model": self.ollama_model,
-                "prompt": prompt,
-                "num_ctx": 2048,
-                "num_predict": max_tokens,
-                "temperature": temperature,
-                "stream": False
-            }
-            try:
-                res = requests.post(url, json=payload, timeout=120)
-                res.raise_for_status()
-            except requests.RequestException as e:
-                return f"Error: {e}"
-            lines = res.text.strip().splitlines()
-            output_text = ""
-            for line in lines:
+            payload = self._ollama_payload(prompt, max_tokens, temperature, schema, stream=False)
+            if prefix and prompt.startswith(prefix):
+                context = self._prefix_context(prefix)
+                if context:
+                    payload.update(prompt=prompt[len(prefix):].strip(), context=context)
+            with track_llm_call("ollama", self.ollama_model, prompt) as call:
                 try:
-                    data = json.loads(line)
-                    if "response" in data:
-                        output_text += data["response"]
-                except json.JSONDecodeError:
-                    continue
-            return output_text.strip()
+                    res = requests.post(url, json=payload, timeout=120)
+                    res.raise_for_status()
+                except requests.RequestException as e:
+                    call.error = True
+                    return f"Error: {e}"
+                lines = res.text.strip().splitlines()
+                output_text = ""
+                for line in lines:
+                    try:
+                        data = json.loads(line)
+                        if "response" in data:
+                            output_text += data["response"]
+                        call.set_ollama_stats(data)
+                    except json.JSONDecodeError:
+                        continue
+                call.completion = output_text.strip()
+            return call.completion
         else:
             return ""
+
+    def stream(self, prompt: str, system_message: str = None, max_tokens: int = 256, temperature: float = 0.7,
+               schema: Optional[dict] = None, prefix: Optional[str] = None) -> Iterator[str]:
+        """
+        Like complete(), but yields the text as it is generated.
+        Closing the generator early (e.g. once all wanted JSON keys have
+        arrived) closes the HTTP response so the server can stop generating.
+        """
+        if self.provider == "openai":
+            messages = []
+            if system_message:
+                messages.append({"role": "system", "content": system_message})
+            messages.append({"role": "user", "content": prompt})
+            with track_llm_call("openai", self.openai_model, prompt) as call:
+                # Only opening the stream is retried; a stream that breaks midway is not replayed.
+                response = call_with_resilience("openai", self.openai_model, lambda: self.client.chat.completions.create(
+                    model=self.openai_model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **self._openai_format(schema)
+                ), prompt=prompt, max_tokens=max_tokens)
+                parts = []
+                try:
+                    for chunk in response:
+                        call.set_usage(chunk)
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            parts.append(chunk.choices[0].delta.content)
+                            yield chunk.choices[0].delta.content
+                finally:
+                    response.close()
+                    call.completion = "".join(parts)
+        elif self.provider == "ollama":
+            url = f"{self.ollama_url}/api/generate"
+            payload = self._ollama_payload(prompt, max_tokens, temperature, schema, stream=True)
+            if prefix and prompt.startswith(prefix):
+                context = self._prefix_context(prefix)
+                if context:
+                    payload.update(prompt=prompt[len(prefix):].strip(), context=context)
+            with track_llm_call("ollama", self.ollama_model, prompt) as call:
+                parts = []
+                try:
+                    with requests.post(url, json=payload, timeout=120, stream=True) as res:
+                        res.raise_for_status()
+                        for line in res.iter_lines():
+                            if not line:
+                                continue
+                            try:
+                                data = json.loads(line)
+                            except json.JSONDecodeError:
+                                continue
+                            call.set_ollama_stats(data)
+                            if data.get("response"):
+                                parts.append(data["response"])
+                                yield data["response"]
+                except requests.RequestException:
+                    call.error = True
+                    raise
+                finally:
+                    call.completion = "".join(parts)
+
+    def _ollama_payload(self, prompt: str, max_tokens: int, temperature: float, schema: Optional[dict],
+                        stream: bool) -> dict:
+        payload = {
+            "model": self.ollama_model,
+            "prompt": prompt,
+            "stream": stream,
+            # Ollama reads generation settings only from "options"
+            "options": {"num_ctx": 2048, "num_predict": max_tokens, "temperature": temperature},
+        }
+        if schema:
+            payload["format"] = ollama_format(schema)
+        return payload
+
+    def _prefix_context(self, prefix: str) -> Optional[list]:
+        """
+        Ollama `context` (token ids) after evaluating `prefix` as its own turn.
+        Evaluated on first use and kept in the session's PrefixContextCache;
+        None when reuse is off or the priming call fails (send the full prompt).
+        """
+        if not OLLAMA_CONTEXT_REUSE or self.context_cache is None:
+            return None
+        context = self.context_cache.get(self.ollama_model, prefix)
+        if context is not None:
+            return context
+        prime = prefix + PRIME_INSTRUCTION
+        payload = {"model": self.ollama_model, "prompt": prime, "stream": False,
+                   "options": {"num_ctx": 2048, "num_predict": 4, "temperature": 0}}
+        with track_llm_call("ollama", self.ollama_model, prime, task="prompt_prefix") as call:
+            try:
+                res = requests.post(f"{self.ollama_url}/api/generate", json=payload, timeout=120)
+                res.raise_for_status()
+                data = res.json()
+            except (requests.RequestException, ValueError):
+                call.error = True
+                return None
+            call.set_ollama_stats(data)
+            call.completion = data.get("response", "")
+        context = data.get("context")
+        if context:
+            self.context_cache.put(self.ollama_model, prefix, context)
+        return context or None
+
+    def _openai_format(self, schema: Optional[dict]) -> dict:
+        return {"response_format": openai_response_format(schema, self.openai_model)} if schema else {}
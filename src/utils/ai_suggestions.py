@@ -1,6 +1,7 @@
 # ai_suggestions.py
 import streamlit as st
 from src.services.llm_service import LLMService
+from src.utils.llm_metrics import llm_task
 
 def suggest_improvements_for_job_description(job_description: str) -> str:
     """
@@ -11,7 +12,8 @@ def suggest_improvements_for_job_description(job_description: str) -> str:
     llm = LLMService()
     prompt = f"Please review the job description below and suggest improvements:\n\n{job_description}"
     try:
-        return llm.complete(prompt=prompt, system_message="You are an AI assistant.")
+        with llm_task("jd_improvements"):
+            return llm.complete(prompt=prompt, system_message="You are an AI assistant.")
     except Exception as e:
         st.error(f"Error getting suggestions: {e}")
         return ""
@@ -0,0 +1,168 @@
+# src/utils/batching.py
+"""
+Dynamic batching for the local Hugging-Face text-generation pipeline.
+
+A transformers pipeline runs one forward pass per generated token; on CPU a
+batch of 8 padded prompts costs far less than 8 separate passes, but every
+session used to call the pipeline with its own single prompt. Callers now
+submit to a per-pipeline BatchingScheduler instead:
+
+    text = scheduler_for(pipe).submit(prompt, max_new_tokens=256, temperature=0.7)
+
+One worker thread per pipeline takes the oldest waiting prompt, waits up to
+VACALYSER_LOCAL_BATCH_WINDOW_MS for more prompts with the same generation
+parameters (up to VACALYSER_LOCAL_BATCH_SIZE), runs them as one left-padded
+batch and hands each caller its own output. While a batch runs new prompts
+queue up, so under load batches fill without waiting for the window.
+VACALYSER_LOCAL_BATCH_SIZE=1 runs the prompts one at a time.
+
+Batches are counted in llm_metrics as local_batches_total and
+local_batch_prompts_total (mean batch size = prompts / batches).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.utils import llm_metrics
+
+BATCH_SIZE = int(os.getenv("VACALYSER_LOCAL_BATCH_SIZE", "8"))
+BATCH_WINDOW_S = float(os.getenv("VACALYSER_LOCAL_BATCH_WINDOW_MS", "20")) / 1000
+
+BatchFn = Callable[..., List[str]]
+
+
+class _Request:
+    __slots__ = ("prompt", "future", "enqueued")
+
+    def __init__(self, prompt: str):
+        self.prompt = prompt
+        self.future: Future = Future()
+        self.enqueued = time.monotonic()
+
+
+class BatchingScheduler:
+    """
+    Collects prompts for `window_s` and runs them through `batch_fn(prompts, **params)`,
+    which must return one output per prompt in the same order. Only prompts with
+    equal generation parameters share a batch.
+    """
+
+    def __init__(self, batch_fn: BatchFn, max_batch_size: int = BATCH_SIZE, window_s: float = BATCH_WINDOW_S,
+                 name: str = "local"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.window_s = window_s
+        self.name = name
+        self._cv = threading.Condition()
+        self._pending: Dict[Tuple[Tuple[str, Any], ...], List[_Request]] = {}
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, prompt: str, **params: Any) -> str:
+        """Queue `prompt` and block until its batch has run; errors of the batch are re-raised."""
+        req = _Request(prompt)
+        key = tuple(sorted(params.items()))
+        with self._cv:
+            self._pending.setdefault(key, []).append(req)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._loop, name=f"batcher-{self.name}", daemon=True)
+                self._worker.start()
+            self._cv.notify()
+        return req.future.result()
+
+    def _next_batch(self) -> Tuple[Dict[str, Any], List[_Request]]:
+        with self._cv:
+            while not self._pending:
+                self._cv.wait()
+            # the group whose oldest prompt has waited longest goes first
+            key = min(self._pending, key=lambda k: self._pending[k][0].enqueued)
+            deadline = self._pending[key][0].enqueued + self.window_s
+            while len(self._pending[key]) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cv.wait(remaining)
+            group = self._pending[key]
+            batch, rest = group[:self.max_batch_size], group[self.max_batch_size:]
+            if rest:
+                self._pending[key] = rest
+            else:
+                del self._pending[key]
+        return dict(key), batch
+
+    def _loop(self) -> None:
+        while True:
+            params, batch = self._next_batch()
+            llm_metrics.increment("local_batches_total", 1, "Batches run through a local pipeline.", model=self.name)
+            llm_metrics.increment("local_batch_prompts_total", len(batch), "Prompts run in local pipeline batches.",
+                                  model=self.name)
+            try:
+                outputs = self.batch_fn([r.prompt for r in batch], **params)
+                if len(outputs) != len(batch):
+                    raise RuntimeError(f"batch returned {len(outputs)} outputs for {len(batch)} prompts")
+            except Exception as exc:
+                for r in batch:
+                    r.future.set_exception(exc)
+                continue
+            for r, out in zip(batch, outputs):
+                r.future.set_result(out)
+
+
+# --------------------------------------------------------------------------- #
+# Hugging-Face pipelines
+# --------------------------------------------------------------------------- #
+_lock = threading.Lock()
+_load_lock = threading.Lock()  # separate, so loading a model does not block other pipelines' callers
+_pipelines: Dict[str, Any] = {}
+_schedulers: Dict[int, BatchingScheduler] = {}
+
+
+def local_pipeline(model: str, **kwargs: Any):
+    """
+    The text-generation pipeline for `model`, loaded once per process so all
+    sessions share it (and its scheduler) instead of each loading a copy.
+    """
+    key = f"{model}|{sorted((k, repr(v)) for k, v in kwargs.items())}"
+    with _load_lock:
+        pipe = _pipelines.get(key)
+        if pipe is None:
+            from transformers import pipeline  # lazy import
+            pipe = _pipelines[key] = pipeline("text-generation", model=model, **kwargs)
+        return pipe
+
+
+def pipeline_batch_fn(pipe) -> BatchFn:
+    """Batch function for a text-generation pipeline: left padding, one sampled answer per prompt."""
+    tokenizer = pipe.tokenizer
+    if tokenizer.pad_token is None:  # GPT-2/LLaMA style tokenizers have no pad token
+        tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"  # decoder-only models continue from the right edge
+
+    def run(prompts: Sequence[str], max_new_tokens: int = 256, temperature: float = 0.7) -> List[str]:
+        outputs = pipe(
+            list(prompts),
+            batch_size=len(prompts),
+            max_new_tokens=max_new_tokens,
+            do_sample=True,
+            temperature=temperature,
+            num_return_sequences=1,
+            pad_token_id=tokenizer.pad_token_id,
+        )
+        return [out[0]["generated_text"] for out in outputs]
+
+    return run
+
+
+def scheduler_for(pipe, max_batch_size: int = BATCH_SIZE, window_s: float = BATCH_WINDOW_S) -> BatchingScheduler:
+    """The process-wide scheduler of a pipeline (created on first use)."""
+    with _lock:
+        scheduler = _schedulers.get(id(pipe))
+        if scheduler is None:
+            name = getattr(getattr(pipe, "model", None), "name_or_path", "") or "local"
+            scheduler = _schedulers[id(pipe)] = BatchingScheduler(pipeline_batch_fn(pipe), max_batch_size,
+                                                                  window_s, name=name)
+        return scheduler
@@ -0,0 +1,164 @@
+# src/utils/bm25.py
+"""
+BM25 inverted index over the FAISS mapping excerpts, and reciprocal-rank
+fusion (RRF) of lexical and dense rankings.
+
+Dense search ranks exact skill names ("Kubernetes", "SAP FI/CO") below vague
+semantic matches; BM25 ranks them first. rag_helpers.search_faiss fuses both:
+
+    rrf(d) = sum over rankings of 1 / (RRF_K + rank_of_d)
+
+The index is CSR-shaped (term → slice of doc ids and term frequencies), so a
+query only touches the postings of its own terms: cost grows with the
+matching documents, not with the corpus. It is persisted as one .npz next to
+index.faiss and rebuilt when the mapping file changes.
+
+Tokens are lower-cased words that keep inner "/ . + # -" (fi/co, node.js,
+c++, c#), plus their parts ("fi", "co"), so both spellings match.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+K1 = 1.5
+B = 0.75
+RRF_K = 60
+TEXT_FIELDS = ("excerpt", "text", "category", "file_name")
+
+_TOKEN = re.compile(r"[a-z0-9à-ÿ][a-z0-9à-ÿ+#./-]*[a-z0-9à-ÿ+#]|[a-z0-9à-ÿ]")
+_PARTS = re.compile(r"[/.\-]+")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for tok in _TOKEN.findall(text.lower()):
+        tokens.append(tok)
+        parts = [p for p in _PARTS.split(tok) if p]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+def doc_text(doc: Mapping) -> str:
+    """Searchable text of a mapping entry: its excerpt plus category and file name."""
+    return " ".join(str(doc[f]) for f in TEXT_FIELDS if doc.get(f))
+
+
+class BM25Index:
+    """Okapi BM25 over documents identified by integer ids (the FAISS row ids)."""
+
+    def __init__(self, terms: Sequence[str], indptr: np.ndarray, doc_idx: np.ndarray, tfs: np.ndarray,
+                 doc_len: np.ndarray, doc_ids: np.ndarray, source: str = ""):
+        self.terms = {t: i for i, t in enumerate(terms)}
+        self.indptr = indptr
+        self.doc_idx = doc_idx          # positions into doc_ids/doc_len
+        self.tfs = tfs
+        self.doc_len = doc_len
+        self.doc_ids = doc_ids
+        self.source = source            # fingerprint of the mapping it was built from
+        n = len(doc_ids)
+        self.avgdl = float(doc_len.mean()) if n else 0.0
+        df = np.diff(indptr).astype(np.float64)
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5)) if n else np.zeros(0)
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @classmethod
+    def build(cls, docs: Mapping, source: str = "") -> "BM25Index":
+        """Index `docs` ({id: mapping entry}); ids must be convertible to int."""
+        postings: Dict[str, Dict[int, int]] = {}
+        doc_ids, doc_len = [], []
+        for pos, (key, doc) in enumerate(docs.items()):
+            tokens = tokenize(doc_text(doc))
+            doc_ids.append(int(key))
+            doc_len.append(len(tokens))
+            for tok in tokens:
+                row = postings.setdefault(tok, {})
+                row[pos] = row.get(pos, 0) + 1
+        terms = sorted(postings)
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        for i, t in enumerate(terms):
+            indptr[i + 1] = indptr[i] + len(postings[t])
+        doc_idx = np.fromiter((p for t in terms for p in postings[t]), dtype=np.int32, count=int(indptr[-1]))
+        tfs = np.fromiter((c for t in terms for c in postings[t].values()), dtype=np.float32, count=int(indptr[-1]))
+        return cls(terms, indptr, doc_idx, tfs, np.asarray(doc_len, dtype=np.float32),
+                   np.asarray(doc_ids, dtype=np.int64), source)
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[int, float]]:
+        """(doc id, score) of the best `top_k` documents containing at least one query term."""
+        rows = [self.terms[t] for t in dict.fromkeys(tokenize(query)) if t in self.terms]
+        if not rows:
+            return []
+        pos_parts, score_parts = [], []
+        for r in rows:
+            lo, hi = self.indptr[r], self.indptr[r + 1]
+            pos, tf = self.doc_idx[lo:hi], self.tfs[lo:hi]
+            norm = K1 * (1 - B + B * self.doc_len[pos] / self.avgdl)
+            pos_parts.append(pos)
+            score_parts.append(self.idf[r] * tf * (K1 + 1) / (tf + norm))
+        pos = np.concatenate(pos_parts)
+        uniq, inverse = np.unique(pos, return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+        k = min(top_k, len(uniq))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(self.doc_ids[uniq[i]]), float(scores[i])) for i in best]
+
+    def postings_touched(self, query: str) -> int:
+        rows = [self.terms[t] for t in dict.fromkeys(tokenize(query)) if t in self.terms]
+        return int(sum(self.indptr[r + 1] - self.indptr[r] for r in rows))
+
+    # ------------------------------------------------------------------ persistence
+    def save(self, path: str) -> None:
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, terms=np.asarray(sorted(self.terms, key=self.terms.get)), indptr=self.indptr,
+                 doc_idx=self.doc_idx, tfs=self.tfs, doc_len=self.doc_len, doc_ids=self.doc_ids,
+                 source=np.asarray(self.source))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["terms"].tolist(), data["indptr"], data["doc_idx"], data["tfs"], data["doc_len"],
+                       data["doc_ids"], str(data["source"]))
+
+
+def source_fingerprint(path: str) -> str:
+    """Size and mtime of the mapping file; a changed mapping invalidates the lexical index."""
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def load_or_build(index_path: str, mapping: Mapping, mapping_path: str) -> BM25Index:
+    """The persisted index if it matches `mapping_path`, else a fresh one (saved for next time)."""
+    source = source_fingerprint(mapping_path)
+    if os.path.exists(index_path):
+        try:
+            index = BM25Index.load(index_path)
+            if index.source == source:
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+    index = BM25Index.build(mapping, source)
+    try:
+        index.save(index_path)
+    except OSError:
+        pass  # read-only deployment: keep the in-memory index
+    return index
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[int]], k: int = RRF_K,
+                           top_k: Optional[int] = None) -> List[Tuple[int, float]]:
+    """Fuse ranked id lists: score = sum of 1 / (k + rank), rank starting at 1."""
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    fused = sorted(scores.items(), key=lambda item: -item[1])
+    return fused[:top_k] if top_k else fused
@@ -1,5 +1,6 @@
 # src/utils/boolean_search.py
 from src.utils.llm_service import LLMService
+from src.utils.llm_metrics import llm_task
 
 def generate_boolean_search(key_skills: list, job_title: str) -> str:
     """
@@ -11,5 +12,6 @@ def generate_boolean_search(key_skills: list, job_title: str) -> str:
         f"Generate a Boolean search query to find candidates with skills: {skills_str}. "
         "Use AND, OR, NOT operators and include synonyms if applicable."
     )
-    result = llm.complete(prompt=prompt, system_message="You are an expert sourcer.")
+    with llm_task("boolean_search"):
+        result = llm.complete(prompt=prompt, system_message="You are an expert sourcer.")
     return result
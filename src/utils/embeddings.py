@@ -0,0 +1,114 @@
+# src/utils/embeddings.py
+"""
+CPU backends for the mpnet sentence encoder (sentence-transformers/all-mpnet-base-v2).
+
+  torch      SentenceTransformer in fp32, the reference
+  int8       the same model with its Linear layers dynamically quantised to
+             int8 (torch.ao.quantization.quantize_dynamic); no extra files
+  onnx       an ONNX export run by onnxruntime; torch is not imported
+  onnx-int8  the ONNX export with int8 weights (onnxruntime dynamic quantisation)
+
+Every backend has the same `encode(sentences) -> float32 array` as
+SentenceTransformer and reproduces its pipeline (mean pooling over the
+attention mask, then L2 normalisation), so the FAISS index built with the
+original model stays valid.
+
+VACALYSER_EMBEDDING_BACKEND picks the backend (default torch). The ONNX
+backends read VACALYSER_EMBEDDING_ONNX_DIR, written by
+
+    python -m tools.export_embedding_model --out vector_databases/mpnet-onnx
+
+If that directory or onnxruntime is missing, load_encoder() falls back to
+torch and says why in `encoder.fallback`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
+EMBEDDING_BACKEND = os.getenv("VACALYSER_EMBEDDING_BACKEND", "torch")
+ONNX_DIR = os.getenv("VACALYSER_EMBEDDING_ONNX_DIR", "vector_databases/mpnet-onnx")
+BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+
+ONNX_FILE = "model.onnx"
+ONNX_INT8_FILE = "model.int8.onnx"
+ONNX_CONFIG_FILE = "encoder.json"  # max_seq_length and padding token of the export
+
+
+class TorchEncoder:
+    """SentenceTransformer, optionally with int8 dynamically quantised Linear layers."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, quantize: bool = False):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        self.backend = "int8" if quantize else "torch"
+        self.fallback: Optional[str] = None
+        self.model = SentenceTransformer(model_name, device="cpu")
+        if quantize:
+            self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def encode(self, sentences: Union[str, Sequence[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        return np.asarray(self.model.encode(sentences, batch_size=batch_size, **kwargs), dtype=np.float32)
+
+
+class OnnxEncoder:
+    """onnxruntime session over an exported transformer; pooling and normalisation in numpy."""
+
+    def __init__(self, model_dir: str = ONNX_DIR, quantized: bool = False, threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer  # the Rust tokenizer alone; transformers would import torch
+
+        path = os.path.join(model_dir, ONNX_INT8_FILE if quantized else ONNX_FILE)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found; run python -m tools.export_embedding_model")
+        self.backend = "onnx-int8" if quantized else "onnx"
+        self.fallback: Optional[str] = None
+        with open(os.path.join(model_dir, ONNX_CONFIG_FILE), encoding="utf-8") as f:
+            config = json.load(f)
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=config["pad_id"], pad_token=config["pad_token"])
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self._inputs = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, sentences: Union[str, Sequence[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts: List[str] = [sentences] if single else list(sentences)
+        chunks = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            batch = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            hidden = self.session.run(None, {k: v for k, v in batch.items() if k in self._inputs})[0]
+            mask = batch["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            chunks.append(pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None))
+        out = np.concatenate(chunks).astype(np.float32) if chunks else np.empty((0, 0), dtype=np.float32)
+        return out[0] if single else out
+
+
+def load_encoder(backend: str = EMBEDDING_BACKEND, model_name: str = EMBEDDING_MODEL_NAME,
+                 onnx_dir: str = ONNX_DIR):
+    """The encoder for `backend`; ONNX backends fall back to torch when their export is unusable."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported embedding backend {backend!r}. Choose one of {', '.join(BACKENDS)}.")
+    if backend.startswith("onnx"):
+        try:
+            return OnnxEncoder(onnx_dir, quantized=backend == "onnx-int8")
+        except (ImportError, OSError) as exc:
+            encoder = TorchEncoder(model_name)
+            encoder.fallback = f"{backend} unavailable ({exc}); using torch"
+            return encoder
+    return TorchEncoder(model_name, quantize=backend == "int8")
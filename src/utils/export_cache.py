@@ -0,0 +1,123 @@
+# src/utils/export_cache.py
+"""
+Bounded in-memory cache of rendered export artefacts (PDF, DOCX, JSON, …).
+
+st.download_button needs its bytes while the page is drawn, so every rerun
+used to re-render every PDF and DOCX on the page, whether or not anyone
+downloaded it. Artefacts are now keyed by (format, content hash) and
+rendered once; the same text or spec on any rerun, in any session, is
+served from the cache.
+
+    data = render_export("pdf", text, export_utils.text_pdf_bytes)
+
+The cache is an LRU bounded by entry count and total bytes
+(VACALYSER_EXPORT_CACHE_ITEMS, default 256; VACALYSER_EXPORT_CACHE_MB,
+default 64); the least recently used artefacts are evicted first. An
+artefact larger than the byte budget is returned but not kept. Renders of
+the same key are not deduplicated across threads: two sessions asking for
+the same new artefact at once both render it, and the second put wins.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from src.utils import llm_metrics
+
+EXPORT_CACHE_ITEMS = int(os.getenv("VACALYSER_EXPORT_CACHE_ITEMS", "256"))
+EXPORT_CACHE_MB = float(os.getenv("VACALYSER_EXPORT_CACHE_MB", "64"))
+
+
+def content_key(fmt: str, content: Any) -> str:
+    """Cache key for `content` rendered as `fmt`; mappings are hashed as sorted compact JSON."""
+    if isinstance(content, str):
+        raw = content.encode("utf-8", "surrogatepass")
+    elif isinstance(content, (bytes, bytearray)):
+        raw = bytes(content)
+    elif isinstance(content, Mapping):
+        raw = json.dumps(dict(content), sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+                         default=str).encode("utf-8")
+    else:
+        raw = repr(content).encode("utf-8")
+    return f"{fmt}:{hashlib.blake2b(raw, digest_size=16).hexdigest()}"
+
+
+class ExportCache:
+    """Thread-safe LRU of rendered artefacts, bounded by entries and bytes."""
+
+    def __init__(self, max_items: int = EXPORT_CACHE_ITEMS, max_bytes: int = int(EXPORT_CACHE_MB * 2**20)):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            self._items[key] = data
+            self.nbytes += len(data)
+            evicted = 0
+            while len(self._items) > self.max_items or self.nbytes > self.max_bytes:
+                _, dropped = self._items.popitem(last=False)
+                self.nbytes -= len(dropped)
+                evicted += 1
+        if evicted:
+            llm_metrics.increment("export_cache_evictions_total", evicted, "Rendered exports evicted from the cache")
+
+    def get_or_render(self, key: str, render: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        fmt = key.split(":", 1)[0]
+        data = self.get(key)
+        if data is not None:
+            llm_metrics.increment("export_cache_hits_total", 1, "Exports served from the cache", format=fmt)
+            return data
+        llm_metrics.increment("export_cache_misses_total", 1, "Exports rendered", format=fmt)
+        data = render()
+        if data is not None:
+            data = bytes(data)
+            self.put(key, data)
+        return data
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._items), "bytes": self.nbytes,
+                "max_items": self.max_items, "max_bytes": self.max_bytes}
+
+
+_cache: Optional[ExportCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_export_cache() -> ExportCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExportCache()
+        return _cache
+
+
+def render_export(fmt: str, content: Any, render: Callable[[Any], Optional[bytes]],
+                  key: Optional[str] = None) -> Optional[bytes]:
+    """render(content) as bytes, rendered at most once per (fmt, content) while cached."""
+    return get_export_cache().get_or_render(key or content_key(fmt, content), lambda: render(content))
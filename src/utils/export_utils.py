@@ -5,17 +5,27 @@ import docx
 from fpdf import FPDF
 import streamlit as st
 
-def export_json(data: dict):
-    """
-    Trigger a Streamlit download of data as JSON.
-    """
-    json_str = json.dumps(data, indent=2)
-    st.download_button("Download JSON", json_str, file_name="job_data.json", mime="application/json")
+from src.components.downloads import deferred_download
 
-def export_word(data: dict):
-    """
-    Create a Word document summarizing the job and trigger download.
-    """
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def _latin1(text) -> str:
+    """The core PDF fonts only cover Latin-1; replace anything else."""
+    return str(text).encode("latin-1", "replace").decode("latin-1")
+
+
+def _pdf_output(pdf: FPDF) -> bytes:
+    out = pdf.output()
+    return out.encode("latin-1") if isinstance(out, str) else bytes(out)  # PyFPDF returns str, fpdf2 bytearray
+
+
+def json_bytes(data: dict) -> bytes:
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def word_bytes(data: dict) -> bytes:
+    """A Word document summarizing the job."""
     doc = docx.Document()
     doc.add_heading(data.get("job_title", "Job Title"), level=0)
     doc.add_paragraph(f"Company: {data.get('company_name', '')}")
@@ -24,26 +34,50 @@ def export_word(data: dict):
     # Add more fields as needed...
     file_stream = io.BytesIO()
     doc.save(file_stream)
-    st.download_button("Download Word", file_stream.getvalue(),
-                       file_name="Job_Specification.docx",
-                       mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+    return file_stream.getvalue()
 
-def export_pdf(data: dict):
-    """
-    Create a simple PDF summarizing the job and trigger download.
-    """
+
+def pdf_bytes(data: dict) -> bytes:
+    """A simple PDF summarizing the job."""
     pdf = FPDF()
     pdf.add_page()
-    pdf.set_font("Arial", 'B', 16)
-    pdf.cell(0, 10, txt=data.get("job_title","Job Title"), ln=True)
-    pdf.set_font("Arial", size=12)
-    pdf.cell(0, 10, txt=f"Company: {data.get('company_name','')}", ln=True)
-    pdf.cell(0, 10, txt=f"Location: {data.get('city','')}", ln=True)
+    pdf.set_font("Helvetica", 'B', 16)
+    pdf.cell(0, 10, txt=_latin1(data.get("job_title","Job Title")), ln=True)
+    pdf.set_font("Helvetica", size=12)
+    pdf.cell(0, 10, txt=_latin1(f"Company: {data.get('company_name','')}"), ln=True)
+    pdf.cell(0, 10, txt=_latin1(f"Location: {data.get('city','')}"), ln=True)
     pdf.ln(5)
-    pdf.multi_cell(0, 10, txt=f"Role Description: {data.get('role_description','')}")
+    pdf.multi_cell(0, 10, txt=_latin1(f"Role Description: {data.get('role_description','')}"))
     pdf.ln(5)
-    # Convert PDF to binary stream
-    pdf_bytes = pdf.output(dest="S").encode('latin-1')
-    st.download_button("Download PDF", pdf_bytes,
-                       file_name="Job_Specification.pdf",
-                       mime="application/pdf")
+    return _pdf_output(pdf)
+
+
+def text_pdf_bytes(text: str) -> bytes:
+    """Plain text as a PDF (simple layout)."""
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Helvetica", size=12)
+    pdf.multi_cell(0, 10, _latin1(text))
+    return _pdf_output(pdf)
+
+
+def export_json(data: dict):
+    """
+    Offer data as a JSON download (rendered on demand, cached by content).
+    """
+    deferred_download("Download JSON", "json", data, json_bytes, file_name="job_data.json",
+                      mime="application/json")
+
+def export_word(data: dict):
+    """
+    Offer a Word document summarizing the job (rendered on demand, cached by content).
+    """
+    deferred_download("Download Word", "docx", data, word_bytes, file_name="Job_Specification.docx",
+                      mime=DOCX_MIME)
+
+def export_pdf(data: dict):
+    """
+    Offer a simple PDF summarizing the job (rendered on demand, cached by content).
+    """
+    deferred_download("Download PDF", "pdf", data, pdf_bytes, file_name="Job_Specification.pdf",
+                      mime="application/pdf")
@@ -6,6 +6,7 @@ import fitz  # PyMuPDF for PDF extraction
 import docx
 import json
 from src.utils.llm_service import LLMService
+from src.utils.llm_metrics import llm_task
 
 def clean_text(text: str) -> str:
     """Basic cleaning of text: remove extra whitespace."""
@@ -22,7 +23,8 @@ def extract_structured_info(raw_text: str, keys: list):
     keys_list = ', '.join(keys)
     prompt = (f"Extract the following fields from the job description text below. Return only JSON:\n"
               f"Fields: {keys_list}\n\nJob Description:\n{raw_text}\n\nJSON Output:")
-    response = llm.complete(prompt, max_tokens=512)
+    with llm_task("extraction"):
+        response = llm.complete(prompt, max_tokens=512)
     try:
         structured_data = json.loads(response)
     except json.JSONDecodeError:
@@ -0,0 +1,71 @@
+# src/utils/fragments.py
+"""
+Fragment-scoped reruns, across Streamlit versions.
+
+A function decorated with @fragment is rerun on its own when a widget inside
+it is used: a click on "Generate Job Advertisement" re-executes that tab's
+body, not the whole wizard page with all its form widgets.
+
+    @fragment
+    def email_panel():
+        if st.button("Generate Outreach Email"):
+            ...
+            rerun_fragment()      # redraw just this panel
+
+Streamlit added fragments in 1.33 (st.experimental_fragment) and made them
+stable as st.fragment in 1.37, together with st.rerun(scope="fragment");
+requirements.txt pins a version that has both. With VACALYSER_FRAGMENTS=0,
+or on a Streamlit older than 1.33, @fragment is a plain call and
+rerun_fragment() a full rerun. FRAGMENTS tells which one is active.
+
+A fragment rerun skips app.main(), so the session autosave that main() runs
+at the end of the script is run after the fragment body instead.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import os
+from typing import Callable
+
+import streamlit as st
+
+_native = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+FRAGMENTS = _native is not None and os.getenv("VACALYSER_FRAGMENTS", "1").lower() not in ("0", "false", "no")
+_FRAGMENT_SCOPE = "scope" in inspect.signature(st.rerun).parameters
+
+
+def fragment(func: Callable) -> Callable:
+    """Run `func` as an independently rerunnable fragment where Streamlit supports it."""
+    if not FRAGMENTS:
+        return func
+
+    @functools.wraps(func)
+    def body(*args, **kwargs):
+        from src.utils import session_store
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            session_store.autosave(st.session_state)
+
+    return _native(body)
+
+
+def _in_fragment_run() -> bool:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return bool(ctx and ctx.fragment_ids_this_run and ctx.current_fragment_id)
+
+
+def rerun_fragment() -> None:
+    """
+    Rerun the calling fragment only. Streamlit refuses a fragment-scoped rerun
+    while the fragment runs as part of a full run, so that (and fragments
+    being off) falls back to a full rerun.
+    """
+    if FRAGMENTS and _FRAGMENT_SCOPE and _in_fragment_run():
+        st.rerun(scope="fragment")
+    st.rerun()
@@ -0,0 +1,132 @@
+# src/utils/grouped_extraction.py
+"""
+Per-step field-group extraction.
+
+Instead of one prompt that must return ~90 keys (and gets cut off at the
+token limit), the keys are split by wizard step (src/config/keys.STEP_KEYS)
+and each group is extracted with a short, focused prompt. Groups run
+concurrently; results are yielded as each group finishes so the caller can
+fill fields progressively, then merged.
+
+    for result in iter_grouped(raw_text, keys, call):
+        st.session_state.update(result.fields)
+
+`call(prompt, max_tokens, schema)` is the provider call (schema may be None).
+Each group goes through structured_output's validate-and-repair path.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from src.config.keys import STEP_KEYS, STEP_TITLES
+from src.utils import structured_output, tracing
+from src.utils.llm_metrics import count_tokens, current_task, llm_task
+
+MAX_WORKERS = int(os.getenv("VACALYSER_EXTRACTION_WORKERS", "4"))
+TOKENS_PER_FIELD = 32   # output budget per key; generous for one-line values
+MIN_GROUP_TOKENS = 128
+
+Call = Callable[[str, int, Optional[dict]], str]
+
+
+@dataclass
+class GroupResult:
+    name: str
+    keys: List[str]
+    fields: Dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+    output_tokens: int = 0
+    repairs: int = 0
+    error: Optional[str] = None
+
+    @property
+    def completeness(self) -> float:
+        return len(self.fields) / len(self.keys) if self.keys else 1.0
+
+
+def key_groups(keys: Iterable[str]) -> Dict[str, List[str]]:
+    """Split `keys` by wizard step (STEP_KEYS order); unknown keys form an "Other" group."""
+    wanted = list(dict.fromkeys(keys))
+    step_of = {k: step for step, ks in STEP_KEYS.items() for k in ks}
+    groups: Dict[str, List[str]] = {}
+    for k in wanted:
+        step = step_of.get(k)
+        name = STEP_TITLES.get(step, "Other") if step is not None else "Other"
+        groups.setdefault(name, []).append(k)
+    return groups
+
+
+def group_max_tokens(keys: List[str]) -> int:
+    return max(MIN_GROUP_TOKENS, TOKENS_PER_FIELD * len(keys))
+
+
+def group_prompt(raw_text: str, name: str, keys: List[str]) -> str:
+    # The job text comes first so every group shares the same prompt prefix.
+    return (
+        f"Job description:\n{raw_text}\n\n"
+        f"Extract the \"{name}\" fields from the job description above. "
+        f"Return ONLY a JSON object with exactly these keys: {keys}. "
+        "Use null when the text does not say.\n\nJSON:"
+    )
+
+
+def _extract_group(raw_text: str, name: str, keys: List[str], call: Call, use_schema: bool,
+                   task: str) -> GroupResult:
+    result = GroupResult(name, keys)
+    budget = group_max_tokens(keys)
+
+    def ask(prompt: str, schema: Optional[dict]) -> str:
+        text = call(prompt, budget, schema if use_schema else None)
+        result.output_tokens += count_tokens(text or "")
+        return text
+
+    start = time.perf_counter()
+    with llm_task(task), tracing.child_span("extract_group", group=name, keys=len(keys)) as sp:
+        try:
+            result.fields, result.repairs = structured_output.extract(
+                group_prompt(raw_text, name, keys), keys, ask, max_repairs=1)
+        except Exception as exc:
+            result.error = f"{type(exc).__name__}: {exc}"
+        sp.set("fields", len(result.fields))
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def iter_grouped(raw_text: str, keys: Iterable[str], call: Call, use_schema: bool = True,
+                 max_workers: int = MAX_WORKERS, task: Optional[str] = None) -> Iterator[GroupResult]:
+    """
+    Extract every step group concurrently; yield each GroupResult as it
+    completes. Calls are labelled `task` (default: the caller's llm_task).
+    """
+    groups = key_groups(keys)
+    task = task or current_task()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(groups)))) as pool:
+        # Each worker runs in a copy of the caller's context so the active trace span carries over.
+        futures = [
+            pool.submit(contextvars.copy_context().run, _extract_group, raw_text, name, ks, call, use_schema, task)
+            for name, ks in groups.items()
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def extract_grouped(raw_text: str, keys: Iterable[str], call: Call, use_schema: bool = True,
+                    max_workers: int = MAX_WORKERS) -> Dict[str, object]:
+    """Run iter_grouped to completion; returns merged fields plus per-group stats."""
+    start = time.perf_counter()
+    results = list(iter_grouped(raw_text, keys, call, use_schema, max_workers))
+    merged: Dict[str, str] = {}
+    for r in results:
+        merged.update(r.fields)
+    return {
+        "fields": merged,
+        "groups": results,
+        "seconds": time.perf_counter() - start,
+        "output_tokens": sum(r.output_tokens for r in results),
+    }
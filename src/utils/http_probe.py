@@ -0,0 +1,55 @@
+# src/utils/http_probe.py
+"""
+Tiny background HTTP server for the process's probe endpoints: /ready and
+/status (warmup) and /metrics (llm_metrics).
+
+    http_probe.serve(port, {"/metrics": lambda: (200, "text/plain", body)})
+
+Each route maps a path prefix to a callable returning (status, content type,
+body bytes). One server is started per port; routes registered for a port
+that already has a server are added to it, so readiness and metrics can
+share a port.
+"""
+
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+
+Response = Tuple[int, str, bytes]
+Route = Callable[[], Response]
+
+_servers: Dict[int, ThreadingHTTPServer] = {}
+_lock = threading.Lock()
+
+
+class _ProbeHandler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802 (http.server API)
+        route = next((fn for prefix, fn in self.server.routes.items() if self.path.startswith(prefix)), None)
+        code, ctype, body = route() if route else (404, "text/plain", b"not found\n")
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # keep probe traffic out of the Streamlit log
+        pass
+
+
+def serve(port: int, routes: Dict[str, Route], host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Serve `routes` on `port` from a daemon thread; None if the port cannot be bound."""
+    with _lock:
+        server = _servers.get(port)
+        if server is None:
+            try:
+                server = ThreadingHTTPServer((host, port), _ProbeHandler)
+            except OSError:
+                # Port already taken (e.g. by another Streamlit worker) – the file outputs still work.
+                return None
+            server.routes = {}
+            _servers[port] = server
+            threading.Thread(target=server.serve_forever, name=f"vacalyser-probe-{port}", daemon=True).start()
+        server.routes.update(routes)
+        return server
@@ -0,0 +1,207 @@
+# src/utils/job_spec.py
+"""
+JobSpec: the job specification as one compact, typed record.
+
+The wizard keeps ~90 spec fields as loose keys in st.session_state, and
+prompts and exports used to take `dict(st.session_state)` copies of all of
+it (widget keys, caches and the uploaded document included). A JobSpec holds
+exactly the STEP_KEYS and GENERATED_KEYS fields, each a str, in __slots__:
+one pointer per field and no per-instance dict, so a spec is ~0.8 KB of
+object overhead instead of a ~5 KB dict, and field values are the same
+string objects as in the session (nothing is copied).
+
+    spec = JobSpec.from_state(st.session_state)
+    spec.job_title, spec["city"], spec.get("salary_range")
+    spec.step(6)                      # read-only view of the step-6 fields, no copy
+    new = spec.replace(city="Berlin") # new version; unchanged fields are shared
+    new.diff(spec)                    # {"city": "Berlin"}
+
+JobSpec is a Mapping, so prompt_layout.build_prompt and friends accept it as
+is. Codecs:
+
+    dumps(spec) / loads(data)   binary: msgpack when installed, compact JSON
+                                otherwise; a positional array of all fields
+                                led by a schema id (loads rejects other schemas)
+    spec.to_dict()              {field: value} of the non-empty fields
+    spec.fingerprint()          digest of the encoding, a cheap version key
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import operator
+import zlib
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from src.config.keys import GENERATED_KEYS, STEP_KEYS
+
+try:
+    import msgpack
+except ImportError:  # optional: JSON arrays are used instead
+    msgpack = None
+
+FIELDS: Tuple[str, ...] = tuple(k for step in sorted(STEP_KEYS) for k in STEP_KEYS[step]) + tuple(GENERATED_KEYS)
+SCHEMA_ID = zlib.crc32(",".join(FIELDS).encode("ascii"))
+_INDEX = {name: i for i, name in enumerate(FIELDS)}
+_STEP_FIELDS = {step: tuple(keys) for step, keys in STEP_KEYS.items()}
+_DEFAULTS = ("",) * len(FIELDS)
+_STR_ONLY = {str}
+
+
+def _text(value: Any) -> str:
+    """Field values are text: None → "", lists → comma-separated, anything else str()."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple, set)):
+        return ", ".join(str(v) for v in value)
+    return str(value)
+
+
+class JobSpec(Mapping):
+    """Job spec; every field in FIELDS is a str attribute (default "").
+
+    Treat instances as immutable — versions are made with replace(), and
+    diff() relies on unchanged fields being the same objects.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, **fields: Any):
+        unknown = set(fields) - _INDEX.keys()
+        if unknown:
+            raise TypeError(f"unknown JobSpec fields: {', '.join(sorted(unknown))}")
+        _fill(self, [_text(fields.get(name)) for name in FIELDS])
+
+    @classmethod
+    def from_state(cls, state: Mapping) -> "JobSpec":
+        """Spec fields of a session state (missing keys become "")."""
+        values = list(map(state.get, FIELDS, _DEFAULTS))
+        if set(map(type, values)) != _STR_ONLY:  # rare: lists, numbers, None from widgets
+            values = [_text(v) for v in values]
+        return cls._from_values(values)
+
+    @classmethod
+    def _from_values(cls, values) -> "JobSpec":
+        spec = cls.__new__(cls)
+        _fill(spec, values)
+        return spec
+
+    # Mapping --------------------------------------------------------------
+    def __getitem__(self, key: str) -> str:
+        if key not in _INDEX:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __contains__(self, key: object) -> bool:
+        return key in _INDEX
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, JobSpec):
+            return self.values_tuple() == other.values_tuple()
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        filled = sum(1 for v in self.values_tuple() if v)
+        return f"JobSpec({self.job_title!r}, {filled}/{len(FIELDS)} fields)"
+
+    def __reduce__(self):
+        return JobSpec._from_values, (self.values_tuple(),)
+
+    # Versions -------------------------------------------------------------
+    def values_tuple(self) -> Tuple[str, ...]:
+        return _ALL_VALUES(self)
+
+    def replace(self, **changes: Any) -> "JobSpec":
+        """New spec with `changes` applied; the other fields share their strings."""
+        unknown = set(changes) - _INDEX.keys()
+        if unknown:
+            raise TypeError(f"unknown JobSpec fields: {', '.join(sorted(unknown))}")
+        spec = JobSpec._from_values(self.values_tuple())
+        for name, value in changes.items():
+            setattr(spec, name, _text(value))
+        return spec
+
+    def diff(self, older: "JobSpec") -> Dict[str, str]:
+        """{field: value in self} for every field that differs from `older`."""
+        return {name: new for name, new, old in zip(FIELDS, _ALL_VALUES(self), _ALL_VALUES(older))
+                if new is not old and new != old}
+
+    def step(self, step: int) -> "StepView":
+        return StepView(self, _STEP_FIELDS[step])
+
+    def to_dict(self) -> Dict[str, str]:
+        return {name: value for name in FIELDS if (value := getattr(self, name))}
+
+    def fingerprint(self) -> str:
+        return hashlib.blake2b(dumps(self), digest_size=16).hexdigest()
+
+
+# One unpacking assignment fills every slot (a generated function, as
+# dataclasses do); attrgetter reads them all back in one call.
+_namespace: Dict[str, Any] = {}
+exec(f"def _fill(self, values):\n    ({', '.join('self.' + name for name in FIELDS)},) = values", _namespace)
+_fill = _namespace["_fill"]
+_ALL_VALUES = operator.attrgetter(*FIELDS)
+
+
+class StepView(Mapping):
+    """Read-only window onto some fields of a JobSpec; reads go to the spec."""
+
+    __slots__ = ("_spec", "_keys")
+
+    def __init__(self, spec: JobSpec, keys: Tuple[str, ...]):
+        self._spec, self._keys = spec, keys
+
+    def __getitem__(self, key: str) -> str:
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self._spec, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"StepView({dict(self)!r})"
+
+
+def dumps(spec: JobSpec) -> bytes:
+    """[SCHEMA_ID, *field values] as msgpack, or compact JSON without msgpack."""
+    values = [SCHEMA_ID, *spec.values_tuple()]
+    if msgpack is not None:
+        return msgpack.packb(values, use_bin_type=True)
+    return json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> JobSpec:
+    """Inverse of dumps() (either encoding); ValueError for another schema or a malformed record."""
+    if data[:1] == b"[":
+        values = json.loads(data)
+    elif msgpack is not None:
+        values = msgpack.unpackb(data, raw=False)
+    else:
+        raise ValueError("msgpack-encoded JobSpec but msgpack is not installed")
+    if not isinstance(values, list) or not values or values[0] != SCHEMA_ID:
+        raise ValueError("not a JobSpec record of this schema")
+    if len(values) != len(FIELDS) + 1 or not all(isinstance(v, str) for v in values[1:]):
+        raise ValueError("malformed JobSpec record")
+    return JobSpec._from_values(values[1:])
+
+
+def from_dict(data: Optional[Mapping]) -> JobSpec:
+    """JobSpec from to_dict() output or any mapping; keys that are not fields are ignored."""
+    return JobSpec.from_state(data or {})
@@ -0,0 +1,201 @@
+# src/utils/json_stream.py
+"""
+Incremental JSON object parsing for streamed LLM output.
+
+JSONObjectStream consumes text chunks as they arrive and hands back every
+top-level key of the first JSON object as soon as its value is complete:
+a string value once its closing quote arrives, an object/array once it closes,
+a number/true/false/null once the following ',' or '}' arrives. Prose or
+```json fences before the object are skipped.
+
+    parser = JSONObjectStream(wanted_keys)
+    for chunk in llm.stream(prompt):
+        for key, value in parser.feed(chunk):
+            ...
+        if parser.done:      # object closed or every wanted key seen
+            break
+
+parse_json_object() is the non-streaming counterpart: it returns the first
+balanced {...} block in a text that parses as a JSON object.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+_STRING_SPECIAL = re.compile(r'["\\]')
+_EXPECT_KEY, _EXPECT_COLON, _EXPECT_VALUE, _IN_VALUE, _AFTER_VALUE = range(5)
+
+
+class JSONObjectStream:
+    """Single-pass scanner; total work is linear in the streamed text."""
+
+    def __init__(self, wanted_keys: Optional[Iterable[str]] = None):
+        self.wanted = set(wanted_keys) if wanted_keys is not None else None
+        self.fields: Dict[str, Any] = {}
+        self.text = ""           # everything fed so far
+        self.closed = False      # top-level object finished
+        self._pos = 0
+        self._depth = 0
+        self._in_str = False
+        self._esc = False
+        self._state = _EXPECT_KEY
+        self._key: Optional[str] = None
+        self._token_start = 0
+
+    @property
+    def done(self) -> bool:
+        """True once the object closed or every wanted key has been seen."""
+        if self.closed:
+            return True
+        return self.wanted is not None and bool(self.wanted) and self.wanted <= self.fields.keys()
+
+    @property
+    def missing(self) -> List[str]:
+        return sorted(self.wanted - self.fields.keys()) if self.wanted is not None else []
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume `chunk`; return the (key, value) pairs completed by it."""
+        if self.closed or not chunk:
+            self.text += chunk or ""
+            return []
+        self.text += chunk
+        out: List[Tuple[str, Any]] = []
+        buf = self.text
+        i = self._pos
+        n = len(buf)
+        while i < n:
+            c = buf[i]
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif c != '"' and c != "\\":
+                    # Jump to the next quote/backslash instead of stepping through the string.
+                    m = _STRING_SPECIAL.search(buf, i)
+                    if m is None:
+                        i = n
+                        break
+                    i = m.start()
+                    continue
+                elif c == "\\":
+                    self._esc = True
+                elif c == '"':
+                    self._in_str = False
+                    if self._depth == 1:
+                        if self._state == _EXPECT_KEY:
+                            self._key = self._loads(buf[self._token_start:i + 1])
+                            self._state = _EXPECT_COLON
+                        elif self._state == _IN_VALUE:
+                            self._emit(buf[self._token_start:i + 1], out)
+                i += 1
+                continue
+
+            if self._depth == 0:
+                if c == "{":
+                    self._depth = 1
+                    self._state = _EXPECT_KEY
+                i += 1
+                continue
+
+            if c == '"':
+                self._in_str = True
+                if self._depth == 1 and self._state in (_EXPECT_KEY, _EXPECT_VALUE):
+                    if self._state == _EXPECT_VALUE:
+                        self._state = _IN_VALUE
+                    self._token_start = i
+            elif c in "{[":
+                if self._depth == 1 and self._state == _EXPECT_VALUE:
+                    self._state = _IN_VALUE
+                    self._token_start = i
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._state == _IN_VALUE:
+                    self._emit(buf[self._token_start:i + 1], out)
+                elif self._depth == 0:
+                    if self._state == _IN_VALUE:
+                        self._emit(buf[self._token_start:i], out)
+                    self.closed = True
+                    i += 1
+                    break
+            elif self._depth == 1:
+                if c == ":" and self._state == _EXPECT_COLON:
+                    self._state = _EXPECT_VALUE
+                elif c == ",":
+                    if self._state == _IN_VALUE:
+                        self._emit(buf[self._token_start:i], out)
+                    self._state = _EXPECT_KEY
+                elif self._state == _EXPECT_VALUE and not c.isspace():
+                    self._state = _IN_VALUE  # bare scalar: number / true / false / null
+                    self._token_start = i
+            i += 1
+        self._pos = i
+        return out
+
+    def _emit(self, raw: str, out: List[Tuple[str, Any]]) -> None:
+        self._state = _AFTER_VALUE
+        key, self._key = self._key, None
+        if key is None:
+            return
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        self.fields[key] = value
+        out.append((key, value))
+
+    @staticmethod
+    def _loads(raw: str) -> Optional[str]:
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+
+def iter_json_fields(chunks: Iterable[str], wanted_keys: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, Any]]:
+    """Yield (key, value) pairs from a chunk stream, stopping as soon as the parser is done."""
+    parser = JSONObjectStream(wanted_keys)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+
+
+def parse_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the first balanced {...} block in `text` that parses as a JSON
+    object (nested objects and braces inside strings are handled), else None.
+    """
+    if not text:
+        return None
+    start = text.find("{")
+    while start != -1:
+        depth = 0
+        in_str = esc = False
+        for i in range(start, len(text)):
+            c = text[i]
+            if in_str:
+                if esc:
+                    esc = False
+                elif c == "\\":
+                    esc = True
+                elif c == '"':
+                    in_str = False
+            elif c == '"':
+                in_str = True
+            elif c == "{":
+                depth += 1
+            elif c == "}":
+                depth -= 1
+                if depth == 0:
+                    try:
+                        value = json.loads(text[start:i + 1])
+                    except ValueError:
+                        break
+                    if isinstance(value, dict):
+                        return value
+                    break
+        start = text.find("{", start + 1)
+    return None
@@ -0,0 +1,56 @@
+# src/utils/label_matching.py
+"""
+Label-based field extraction ("Job Title: …" lines) used as the fallback /
+complement to LLM extraction on the discovery page.
+Kept free of Streamlit so it can be benchmarked and reused outside the app.
+"""
+
+from typing import Dict
+
+LABEL_MAP: Dict[str, str] = {
+    "job_title": "Job Title:", "company_name": "Company Name:", "brand_name": "Brand Name:",
+    "headquarters_location": "HQ Location:", "company_website": "Company Website:",
+    "date_of_employment_start": "Date of Employment Start:", "job_type": "Job Type:",
+    "contract_type": "Contract Type:", "job_level": "Job Level:", "city": "City",
+    "team_structure": "Team Structure:", "role_description": "Role Description:",
+    "reports_to": "Reports To:", "supervises": "Supervises:", "role_type": "Role Type:",
+    "role_priority_projects": "Priority Projects:", "travel_requirements": "Travel Requirements:",
+    "work_schedule": "Work Schedule:", "role_keywords": "Role Keywords:",
+    "decision_making_authority": "Decision Making Authority:", "role_performance_metrics": "Role Performance Metrics:",
+    "task_list": "Task List:", "key_responsibilities": "Key Responsibilities:",
+    "technical_tasks": "Technical Tasks:", "managerial_tasks": "Managerial Tasks:",
+    "administrative_tasks": "Administrative Tasks:", "customer_facing_tasks": "Customer-Facing Tasks:",
+    "internal_reporting_tasks": "Internal Reporting Tasks:", "performance_tasks": "Performance Tasks:",
+    "innovation_tasks": "Innovation Tasks:", "task_prioritization": "Task Prioritization:",
+    "hard_skills": "Hard Skills:", "soft_skills": "Soft Skills:",
+    "must_have_skills": "Must-Have Skills:", "nice_to_have_skills": "Nice-to-Have Skills:",
+    "certifications_required": "Certifications Required:", "language_requirements": "Language Requirements:",
+    "tool_proficiency": "Tool Proficiency:", "domain_expertise": "Domain Expertise:",
+    "leadership_competencies": "Leadership Competencies:", "technical_stack": "Technical Stack:",
+    "industry_experience": "Industry Experience:", "analytical_skills": "Analytical Skills:",
+    "communication_skills": "Communication Skills:", "project_management_skills": "Project Management Skills:",
+    "soft_requirement_details": "Additional Soft Requirements:", "visa_sponsorship": "Visa Sponsorship:",
+    "salary_range": "Salary Range:", "currency": "Currency:", "pay_frequency": "Pay Frequency:",
+    "commission_structure": "Commission Structure:", "bonus_scheme": "Bonus Scheme:",
+    "vacation_days": "Vacation Days:", "flexible_hours": "Flexible Hours:",
+    "remote_work_policy": "Remote Work Policy:", "relocation_assistance": "Relocation Assistance:",
+    "childcare_support": "Childcare Support:", "recruitment_steps": "Recruitment Steps:",
+    "recruitment_timeline": "Recruitment Timeline:", "number_of_interviews": "Number of Interviews:",
+    "interview_format": "Interview Format:", "assessment_tests": "Assessment Tests:",
+    "onboarding_process_overview": "Onboarding Process Overview:", "recruitment_contact_email": "Recruitment Contact Email:",
+    "recruitment_contact_phone": "Recruitment Contact Phone:", "application_instructions": "Application Instructions:"
+}
+
+
+def match_labels(raw_text: str, label_map: Dict[str, str] = LABEL_MAP) -> Dict[str, str]:
+    """Return {key: value} for every known label found in raw_text (value = rest of that line)."""
+    found = {}
+    for key, label in label_map.items():
+        if label in raw_text:
+            try:
+                value = raw_text.split(label, 1)[1].split("\n", 1)[0].strip()
+            except Exception:
+                value = raw_text.split(label, 1)[-1].strip()
+            if value:
+                found[key] = value
+    return found
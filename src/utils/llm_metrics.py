@@ -0,0 +1,345 @@
+# src/utils/llm_metrics.py
+"""
+Per-call LLM metrics: latency, prompt/completion tokens, errors and cache hits,
+labelled by task, provider and model.
+
+Usage at an entry point:
+
+    with track_llm_call("openai", model, prompt) as call:
+        resp = client.chat.completions.create(...)
+        call.set_usage(resp)                   # provider-reported token counts
+        call.completion = resp.choices[0].message.content
+
+Call sites label the *task* without touching function signatures:
+
+    with llm_task("job_ad"):
+        llm.complete(prompt)
+
+Export: render_prometheus() (text exposition format), write_prometheus_file()
+(throttled, path from VACALYSER_METRICS_FILE, written once more at exit) and
+serve_metrics(port) (GET /metrics, port from VACALYSER_METRICS_PORT).
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.utils import http_probe, tracing
+
+METRICS_FILE = os.getenv("VACALYSER_METRICS_FILE", "")
+METRICS_PORT = os.getenv("VACALYSER_METRICS_PORT", "")
+FLUSH_INTERVAL = 5.0  # seconds between metric-file rewrites
+
+LATENCY_BUCKETS: Tuple[float, ...] = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_current_task: contextvars.ContextVar[str] = contextvars.ContextVar("llm_task", default="unlabelled")
+
+_lock = threading.Lock()
+_series: Dict[Tuple[str, str, str], "_Series"] = {}
+_counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+_counter_help: Dict[str, str] = {}
+_last_flush = 0.0
+_flush_lock = threading.Lock()  # one writer of the metrics file at a time
+
+
+class _Series:
+    """Aggregates for one (task, provider, model) label set."""
+    __slots__ = ("calls", "errors", "cache_hits", "latency_sum", "buckets",
+                 "prompt_tokens", "completion_tokens", "cached_prompt_tokens", "prompt_eval_seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # last one = +Inf
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.prompt_eval_seconds = 0.0
+
+
+# --------------------------------------------------------------------------- #
+# Task labels
+# --------------------------------------------------------------------------- #
+@contextmanager
+def llm_task(name: str) -> Iterator[None]:
+    """Label every LLM call made inside the block with `name`."""
+    token = _current_task.set(name)
+    try:
+        yield
+    finally:
+        _current_task.reset(token)
+
+
+def current_task() -> str:
+    return _current_task.get()
+
+
+# --------------------------------------------------------------------------- #
+# Token counting
+# --------------------------------------------------------------------------- #
+_encodings: Dict[str, Any] = {}
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """Count tokens with tiktoken when available, else estimate (~4 chars per token)."""
+    if not text:
+        return 0
+    try:
+        import tiktoken
+    except ImportError:
+        return max(1, len(text) // 4)
+    enc = _encodings.get(model)
+    if enc is None:
+        try:
+            enc = tiktoken.encoding_for_model(model)
+        except Exception:
+            enc = tiktoken.get_encoding("cl100k_base")
+        _encodings[model] = enc
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def _get(obj: Any, name: str) -> Any:
+    """Read a field from either an SDK object or a plain dict."""
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+class LLMCall:
+    """Mutable record filled in by an entry point while the call runs."""
+
+    def __init__(self, provider: str, model: str, prompt: str, task: str):
+        self.provider = provider
+        self.model = model or "unknown"
+        self.prompt = prompt
+        self.task = task
+        self.completion: Optional[str] = None
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+        self.cached_prompt_tokens = 0
+        self.prompt_eval_seconds = 0.0
+        self.error = False
+        self.cache_hit = False
+        self.latency = 0.0
+
+    def set_usage(self, response: Any) -> None:
+        """Take token counts from an OpenAI response (SDK object or dict)."""
+        usage = _get(response, "usage")
+        if usage is None:
+            return
+        self.prompt_tokens = _get(usage, "prompt_tokens")
+        self.completion_tokens = _get(usage, "completion_tokens")
+        details = _get(usage, "prompt_tokens_details")
+        self.cached_prompt_tokens = _get(details, "cached_tokens") or 0
+
+    def set_ollama_stats(self, data: Dict[str, Any]) -> None:
+        """Take token counts from the final Ollama /api/generate message."""
+        if "prompt_eval_count" in data:
+            self.prompt_tokens = data["prompt_eval_count"]
+        if "eval_count" in data:
+            self.completion_tokens = data["eval_count"]
+        if "prompt_eval_duration" in data:
+            self.prompt_eval_seconds = data["prompt_eval_duration"] / 1e9
+
+
+@contextmanager
+def track_llm_call(provider: str, model: str, prompt: str = "", task: Optional[str] = None) -> Iterator[LLMCall]:
+    """
+    Time the enclosed provider call and record it; exceptions count as errors.
+    Inside an active trace the call also becomes an `llm_request` span.
+    """
+    call = LLMCall(provider, model, prompt, task or current_task())
+    with tracing.child_span("llm_request", provider=provider, model=call.model, task=call.task) as s:
+        start = time.perf_counter()
+        try:
+            yield call
+        except GeneratorExit:
+            # A streaming consumer stopped early on purpose; not a failure.
+            s.set("cancelled", True)
+            raise
+        except BaseException:
+            call.error = True
+            raise
+        finally:
+            call.latency = time.perf_counter() - start
+            record_call(call)
+            s.set("prompt_tokens", call.prompt_tokens)
+            s.set("completion_tokens", call.completion_tokens)
+
+
+def record_call(call: LLMCall) -> None:
+    if call.prompt_tokens is None:
+        call.prompt_tokens = count_tokens(call.prompt, call.model)
+    if call.completion_tokens is None:
+        call.completion_tokens = count_tokens(call.completion or "", call.model)
+    key = (call.task, call.provider, call.model)
+    with _lock:
+        s = _series.get(key)
+        if s is None:
+            s = _series[key] = _Series()
+        s.calls += 1
+        s.errors += int(call.error)
+        s.cache_hits += int(call.cache_hit)
+        s.latency_sum += call.latency
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if call.latency <= bound:
+                s.buckets[i] += 1
+                break
+        else:
+            s.buckets[-1] += 1
+        s.prompt_tokens += call.prompt_tokens or 0
+        s.completion_tokens += call.completion_tokens or 0
+        s.cached_prompt_tokens += call.cached_prompt_tokens or 0
+        s.prompt_eval_seconds += call.prompt_eval_seconds or 0.0
+    _maybe_flush()
+
+
+# --------------------------------------------------------------------------- #
+# Generic counters (used by other LLM-layer components)
+# --------------------------------------------------------------------------- #
+def increment(name: str, amount: float = 1.0, help_text: str = "", **labels: str) -> None:
+    """Add `amount` to counter `name` (Prometheus-style name, no prefix) with labels."""
+    key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + amount
+        if help_text:
+            _counter_help.setdefault(name, help_text)
+
+
+def counter_value(name: str, **labels: str) -> float:
+    """Sum of counter `name` over all label sets matching the given labels."""
+    want = {(k, str(v)) for k, v in labels.items()}
+    with _lock:
+        return sum(v for (n, lbl), v in _counters.items() if n == name and want <= set(lbl))
+
+
+# --------------------------------------------------------------------------- #
+# Reading / exporting
+# --------------------------------------------------------------------------- #
+def snapshot() -> List[Dict[str, Any]]:
+    """One dict per (task, provider, model) with totals and mean latency."""
+    with _lock:
+        rows = []
+        for (task, provider, model), s in sorted(_series.items()):
+            rows.append({
+                "task": task, "provider": provider, "model": model,
+                "calls": s.calls, "errors": s.errors, "cache_hits": s.cache_hits,
+                "mean_latency_s": s.latency_sum / s.calls if s.calls else 0.0,
+                "prompt_tokens": s.prompt_tokens, "completion_tokens": s.completion_tokens,
+                "cached_prompt_tokens": s.cached_prompt_tokens,
+                "prompt_eval_seconds": s.prompt_eval_seconds,
+            })
+        return rows
+
+
+def reset() -> None:
+    with _lock:
+        _series.clear()
+        _counters.clear()
+
+
+def _fmt_labels(pairs) -> str:
+    inner = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + inner + "}" if inner else ""
+
+
+def render_prometheus() -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    with _lock:
+        series = sorted(_series.items())
+        counters = sorted(_counters.items())
+        helps = dict(_counter_help)
+
+    def family(name: str, mtype: str, help_text: str):
+        lines.append(f"# HELP vacalyser_{name} {help_text}")
+        lines.append(f"# TYPE vacalyser_{name} {mtype}")
+
+    family("llm_requests_total", "counter", "LLM calls by task, provider and model.")
+    for (task, provider, model), s in series:
+        lines.append(f"vacalyser_llm_requests_total{_fmt_labels([('task', task), ('provider', provider), ('model', model)])} {s.calls}")
+    for metric, attr, help_text in (
+        ("llm_errors_total", "errors", "Failed LLM calls."),
+        ("llm_cache_hits_total", "cache_hits", "LLM calls answered without a provider round trip."),
+        ("llm_prompt_tokens_total", "prompt_tokens", "Prompt tokens sent (provider usage or counted)."),
+        ("llm_completion_tokens_total", "completion_tokens", "Completion tokens received."),
+        ("llm_cached_prompt_tokens_total", "cached_prompt_tokens", "Prompt tokens served from the provider prompt cache."),
+        ("llm_prompt_eval_seconds_total", "prompt_eval_seconds", "Prompt processing time reported by Ollama."),
+    ):
+        family(metric, "counter", help_text)
+        for (task, provider, model), s in series:
+            labels = _fmt_labels([("task", task), ("provider", provider), ("model", model)])
+            lines.append(f"vacalyser_{metric}{labels} {getattr(s, attr)}")
+
+    family("llm_latency_seconds", "histogram", "LLM call latency.")
+    for (task, provider, model), s in series:
+        base = [("task", task), ("provider", provider), ("model", model)]
+        cumulative = 0
+        for bound, n in zip(LATENCY_BUCKETS + (float("inf"),), s.buckets):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"vacalyser_llm_latency_seconds_bucket{_fmt_labels(base + [('le', le)])} {cumulative}")
+        lines.append(f"vacalyser_llm_latency_seconds_sum{_fmt_labels(base)} {s.latency_sum}")
+        lines.append(f"vacalyser_llm_latency_seconds_count{_fmt_labels(base)} {s.calls}")
+
+    seen = set()
+    for (name, labels), value in counters:
+        if name not in seen:
+            family(name, "counter", helps.get(name, name.replace("_", " ")))
+            seen.add(name)
+        lines.append(f"vacalyser_{name}{_fmt_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_file(path: str = "") -> None:
+    """Write the exposition text atomically (e.g. for node_exporter's textfile collector)."""
+    path = path or METRICS_FILE
+    if not path:
+        return
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with _flush_lock:
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(render_prometheus())
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+def _maybe_flush() -> None:
+    global _last_flush
+    if not METRICS_FILE:
+        return
+    now = time.monotonic()
+    with _lock:  # concurrent sessions: only one of them flushes per interval
+        if now - _last_flush < FLUSH_INTERVAL:
+            return
+        _last_flush = now
+    write_prometheus_file()
+
+
+if METRICS_FILE:
+    atexit.register(write_prometheus_file)  # the counts of the last interval
+
+
+def _metrics_response() -> http_probe.Response:
+    return 200, "text/plain; version=0.0.4", render_prometheus().encode("utf-8")
+
+
+def serve_metrics(port: int = 0, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Serve GET /metrics from a daemon thread (started once per process)."""
+    port = port or int(METRICS_PORT or 0)
+    if not port:
+        return None
+    return http_probe.serve(port, {"/metrics": _metrics_response}, host)
@@ -5,16 +5,20 @@ from typing import Optional, List, Dict, Any
 
 import streamlit as st
 
+from src.utils.llm_metrics import track_llm_call
+from src.utils.batching import local_pipeline, scheduler_for
+from src.utils.singleflight import coalesce, request_key
+from src.utils.resilience import call_with_resilience
+
 # ---------- OpenAI client (v1+) ----------
 from openai import OpenAI                         # ➊ pip install --upgrade openai>=1.0
 _openai_api_key = os.getenv("OPENAI_API_KEY") or st.secrets.get("OPENAI_API_KEY")
-openai_client = OpenAI(api_key=_openai_api_key)
+openai_client = OpenAI(api_key=_openai_api_key, max_retries=0)
 
 # ---------- Local model (HF pipeline / Ollama) ----------
 def _load_local_pipeline(model_name: str):
-    """Lazy-load Transformers pipeline only if the user asked for a local model."""
-    from transformers import pipeline
-    return pipeline("text-generation", model=model_name, device_map="auto")
+    """Lazy-load Transformers pipeline only if the user asked for a local model (shared by all sessions)."""
+    return local_pipeline(model_name, device_map="auto")
 
 
 class LLMService:
@@ -29,6 +33,7 @@ class LLMService:
     ):
         self.provider: str = "local" if local_model else "openai"
         self.openai_model: str = default_openai_model
+        self.local_model: Optional[str] = local_model
         self._pipeline = _load_local_pipeline(local_model) if local_model else None
 
     # --------------------------------------------------------------------- public API
@@ -39,10 +44,17 @@ class LLMService:
         temperature: float = 0.7,
         max_tokens: int = 256,
     ) -> str:
-        return (
-            self._complete_openai(prompt, system_message, temperature, max_tokens)
-            if self.provider == "openai"
-            else self._complete_local(prompt, system_message, temperature, max_tokens)
+        # identical requests already in flight are joined rather than sent again
+        model = "gpt-3.5-turbo" if self.provider == "openai" else self.local_model
+        return coalesce(
+            request_key(self.provider, model, system_message, prompt, temperature, max_tokens),
+            lambda: (
+                self._complete_openai(prompt, system_message, temperature, max_tokens)
+                if self.provider == "openai"
+                else self._complete_local(prompt, system_message, temperature, max_tokens)
+            ),
+            provider=self.provider,
+            model=model,
         )
 
     # --------------------------------------------------------------------- providers
@@ -57,13 +69,16 @@ class LLMService:
             [{"role": "system", "content": system_message}] if system_message else []
         ) + [{"role": "user", "content": prompt}]
 
-        resp = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
-        return resp.choices[0].message.content.strip()
+        with track_llm_call("openai", "gpt-3.5-turbo", prompt) as call:
+            resp = call_with_resilience("openai", "gpt-3.5-turbo", lambda: openai_client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            ), prompt=prompt, max_tokens=max_tokens)
+            call.set_usage(resp)
+            call.completion = resp.choices[0].message.content.strip()
+        return call.completion
 
     def _complete_local(
         self,
@@ -77,16 +92,15 @@ class LLMService:
             return ""
 
         full_prompt = f"{system_message}\n{prompt}" if system_message else prompt
-        try:
-            out: List[Dict[str, Any]] = self._pipeline(
-                full_prompt,
-                max_new_tokens=max_tokens,
-                do_sample=True,
-                temperature=temperature,
-                num_return_sequences=1,
-            )
-            generated = out[0]["generated_text"]
-            return generated[len(full_prompt) :].strip() if generated.startswith(full_prompt) else generated.strip()
-        except Exception as exc:
-            st.error(f"Local model generation failed: {exc}")
-            return ""
+        with track_llm_call("local", self.local_model, full_prompt) as call:
+            try:
+                # batched with concurrent prompts of other sessions (src/utils/batching.py)
+                generated = scheduler_for(self._pipeline).submit(
+                    full_prompt, max_new_tokens=max_tokens, temperature=temperature
+                )
+                call.completion = generated[len(full_prompt) :].strip() if generated.startswith(full_prompt) else generated.strip()
+            except Exception as exc:
+                call.error = True
+                st.error(f"Local model generation failed: {exc}")
+                return ""
+        return call.completion
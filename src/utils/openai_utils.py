@@ -6,6 +6,10 @@ from typing import Optional, Sequence, Dict, Any
 import streamlit as st
 from openai import OpenAI, Client                         
 
+from src.utils.batching import local_pipeline, scheduler_for
+from src.utils.llm_metrics import track_llm_call
+from src.utils.resilience import LLMError, call_with_resilience
+
 # --------------------------------------------------------------------------- #
 # Main helper
 # --------------------------------------------------------------------------- #
@@ -59,19 +63,20 @@ class LLMClient:
             if not key:
                 raise RuntimeError("OPENAI_API_KEY is missing.")
 
-            self._client = OpenAI(api_key=key, organization=openai_org)
+            # Retries/backoff/rate limiting live in src.utils.resilience, not in the SDK.
+            self._client = OpenAI(api_key=key, organization=openai_org, max_retries=0)
 
         else:  # local Hugging-Face model
             if local_model is None:
                 raise ValueError("local_model must be given when provider='local'")
             try:
-                from transformers import pipeline  # lazy import
+                import transformers  # noqa: F401  (lazy import)
             except ImportError as exc:  # pragma: no cover
                 raise ImportError("pip install transformers") from exc
 
-            self._pipeline = pipeline(
-                "text-generation",
-                model=local_model,
+            # one pipeline per model and process, so concurrent sessions batch together
+            self._pipeline = local_pipeline(
+                local_model,
                 tokenizer=local_model,
                 device_map=hf_device_map,
             )
@@ -90,7 +95,8 @@ class LLMClient:
         """
         Generate a single text answer.
 
-        Returns the plain string (no role / metadata).
+        Returns the plain string (no role / metadata). Failures raise an
+        LLMError subclass (see src.utils.resilience).
         """
 
         if self.provider == "openai":
@@ -99,34 +105,32 @@ class LLMClient:
                 messages.append({"role": "system", "content": system_message})
             messages.append({"role": "user", "content": prompt})
 
-            try:
-                resp = self._client.chat.completions.create(
+            with track_llm_call("openai", self.model_name, prompt) as call:
+                resp = call_with_resilience("openai", self.model_name, lambda: self._client.chat.completions.create(
                     model=self.model_name,
                     messages=messages,
                     temperature=temperature,
                     max_tokens=max_tokens,
-                )
-            except Exception as err:  # pragma: no cover
-                raise RuntimeError(f"OpenAI request failed → {err}") from err
-
-            return resp.choices[0].message.content.strip()
+                ), prompt=prompt, max_tokens=max_tokens)
+                call.set_usage(resp)
+                call.completion = resp.choices[0].message.content.strip()
+            return call.completion
 
         # --- Local model branch -------------------------------------- #
         assert self._pipeline is not None  # type checker happy
         full_prompt = f"{system_message}\n{prompt}" if system_message else prompt
-        try:
-            out = self._pipeline(
-                full_prompt,
-                max_new_tokens=max_tokens,
-                do_sample=True,
-                temperature=temperature,
-                num_return_sequences=1,
-            )[0]["generated_text"]
+        with track_llm_call("local", self.model_name, full_prompt) as call:
+            try:
+                out = scheduler_for(self._pipeline).submit(
+                    full_prompt, max_new_tokens=max_tokens, temperature=temperature
+                )
+            except Exception as err:  # pragma: no cover
+                raise LLMError(f"Local model generation failed → {err}", provider="local",
+                               model=self.model_name or "") from err
             if out.startswith(full_prompt):
                 out = out[len(full_prompt):]
-            return out.strip()
-        except Exception as err:  # pragma: no cover
-            raise RuntimeError(f"Local model generation failed → {err}") from err
+            call.completion = out.strip()
+        return call.completion
 
     # ------------------------------------------------------------------ #
     # Convenience wrapper for non-chat models (legacy code compatibility)
@@ -0,0 +1,191 @@
+# src/utils/prompt_layout.py
+"""
+Prompt assembly for the step-8 generators with a stable job-context prefix.
+
+Providers reuse work for prompts that start with the same tokens: OpenAI
+serves repeated prefixes (1024+ tokens) from its prompt cache at a discount,
+and Ollama keeps the KV cache of the previous prompt in each runner slot.
+Every generator prompt is therefore laid out as
+
+    JOB CONTEXT header + shared job facts     identical for every task of a session
+    TASK separator + task facts + instruction volatile (task, tone, length …)
+
+The shared facts are rendered in a fixed order with fixed labels and
+normalised whitespace, so the same session state always produces the same
+bytes. Facts only one generator uses stay in its suffix, so no prompt grows
+just to make the prefix longer.
+
+For Ollama the prefix can also be evaluated once and its returned `context`
+passed with each task (LLMService.complete(..., prefix=...), off by default:
+current Ollama detokenizes `context` back into the prompt, so the runner's
+prefix match already gives the same reuse without the extra priming call).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional
+
+from src.utils.label_matching import LABEL_MAP
+
+PREAMBLE = "JOB CONTEXT\n"
+TASK_SEPARATOR = "\n\nTASK\n"
+# Ollama only: the prefix is evaluated as its own turn, so it needs an answer.
+PRIME_INSTRUCTION = "\n\nReply with OK. The task follows in the next message."
+
+# Facts at least three generators use form the shared prefix; the rest is per task.
+CONTEXT_KEYS: List[str] = ["job_title", "company_name", "must_have_skills"]
+TASK_KEYS: Dict[str, List[str]] = {
+    "target_group_analysis": ["job_level"],
+    "job_ad": ["city", "role_description", "key_responsibilities"],
+    "interview_prep": ["key_responsibilities", "soft_skills"],
+    "outreach_email": [],
+    "boolean_search": [],
+}
+
+_WS = re.compile(r"\s+")
+
+
+def _label(key: str) -> str:
+    return LABEL_MAP.get(key, "").rstrip(":").strip() or key.replace("_", " ").capitalize()
+
+
+def _value(value) -> str:
+    if value is None:
+        return ""
+    return _WS.sub(" ", str(value)).strip()
+
+
+def _facts(state: Mapping, keys: List[str]) -> List[str]:
+    """'Label: value' lines for the non-empty keys, in the given order."""
+    return [f"{_label(k)}: {_value(state.get(k))}" for k in keys if _value(state.get(k))]
+
+
+def job_context(state: Mapping) -> str:
+    """The shared prefix: fixed order, fixed labels, empty fields omitted."""
+    return PREAMBLE + "\n".join(_facts(state, CONTEXT_KEYS))
+
+
+@dataclass(frozen=True)
+class Prompt:
+    prefix: str
+    task: str
+
+    @property
+    def text(self) -> str:
+        return self.prefix + TASK_SEPARATOR + self.task
+
+    @property
+    def suffix(self) -> str:
+        """Everything after the shared prefix."""
+        return TASK_SEPARATOR + self.task
+
+
+# --------------------------------------------------------------------------- #
+# Task instructions (the volatile suffix)
+# --------------------------------------------------------------------------- #
+def _benefits(state: Mapping) -> str:
+    benefits = []
+    if state.get("flexible_hours") in ["Yes", "Partial/Flex Schedule"]:
+        benefits.append("flexible working hours")
+    if state.get("remote_work_policy") in ["Hybrid", "Full Remote"]:
+        benefits.append(f"{state.get('remote_work_policy')} work options")
+    if state.get("relocation_assistance") == "Yes":
+        benefits.append("relocation assistance")
+    if state.get("childcare_support") == "Yes":
+        benefits.append("childcare support")
+    if state.get("vacation_days"):
+        benefits.append(f"{_value(state.get('vacation_days'))} paid vacation days")
+    return ", ".join(benefits)
+
+
+def target_group_task(state: Mapping) -> str:
+    return ("Provide an analysis of the target candidate group for this position, including the ideal "
+            "candidate profile (background, experience, skills, motivations) and how to attract them.")
+
+
+def job_ad_task(state: Mapping) -> str:
+    lines = []
+    if not _value(state.get("must_have_skills")) and _value(state.get("hard_skills")):
+        lines.append(f"Required Skills: {_value(state.get('hard_skills'))}")
+    if _benefits(state):
+        lines.append(f"Benefits: {_benefits(state)}")
+    lines.append(f"Write a job advertisement for this position. Tone: {_value(state.get('ad_seniority_tone'))}. "
+                 f"Length: {_value(state.get('ad_length_preference'))}.")
+    lines.append("The ad should be engaging and include a brief company intro, role responsibilities, required "
+                 "qualifications, any benefits, and a call to action.")
+    return "\n".join(lines)
+
+
+def interview_prep_task(state: Mapping) -> str:
+    return ("Create an interview preparation guide for the interviewer of this position. Include:\n"
+            "1. A brief overview of what to look for in a candidate.\n"
+            "2. 5-10 key interview questions (technical and behavioral) to assess required skills and competencies.\n"
+            "3. For each question, notes on what a good answer should include.")
+
+
+def outreach_email_task(state: Mapping) -> str:
+    return ("Write a concise, professional recruitment email to a potential candidate for this position. "
+            "Introduce the company briefly, highlight the role's key points (responsibilities or benefits), "
+            "and include a friendly call to action to apply.")
+
+
+def boolean_search_task(state: Mapping) -> str:
+    return ("Generate a Boolean search string to find resumes for this role, based on its title and "
+            "must-have skills. Use AND, OR, and NOT operators appropriately.")
+
+
+TASKS: Dict[str, Callable[[Mapping], str]] = {
+    "target_group_analysis": target_group_task,
+    "job_ad": job_ad_task,
+    "interview_prep": interview_prep_task,
+    "outreach_email": outreach_email_task,
+    "boolean_search": boolean_search_task,
+}
+
+
+def build_prompt(state: Mapping, task: str) -> Prompt:
+    """Prompt for one of TASKS: shared job-context prefix + task facts + instruction."""
+    return Prompt(job_context(state), "\n".join(_facts(state, TASK_KEYS[task]) + [TASKS[task](state)]))
+
+
+# --------------------------------------------------------------------------- #
+# Ollama context reuse
+# --------------------------------------------------------------------------- #
+def prefix_key(model: str, prefix: str) -> str:
+    return hashlib.sha1(f"{model}\0{prefix}".encode("utf-8")).hexdigest()
+
+
+class PrefixContextCache:
+    """
+    Small LRU of Ollama `context` token arrays keyed by (model, prefix).
+    One instance per user session; a new job spec simply becomes a new key.
+    """
+
+    def __init__(self, max_entries: int = 4):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model: str, prefix: str) -> Optional[List[int]]:
+        key = prefix_key(model, prefix)
+        with self._lock:
+            ctx = self._items.get(key)
+            if ctx is not None:
+                self._items.move_to_end(key)
+            return ctx
+
+    def put(self, model: str, prefix: str, context: List[int]) -> None:
+        key = prefix_key(model, prefix)
+        with self._lock:
+            self._items[key] = list(context)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,362 @@
+# src/utils/resilience.py
+"""
+Resilience for provider calls: typed errors, retries, rate limiting and a
+circuit breaker, shared by every OpenAI entry point.
+
+    text = call_with_resilience("openai", model, lambda: client.chat.completions.create(...),
+                                prompt=prompt, max_tokens=256)
+
+  * 429 / 5xx / timeouts / connection errors are retried with full-jitter
+    exponential backoff; a Retry-After (or retry-after-ms) header is honoured
+    and also pauses the model's rate limiter so other sessions hold off too.
+    Retries stop once VACALYSER_LLM_RETRY_BUDGET_S would be exceeded.
+  * A token bucket per model keeps requests (VACALYSER_LLM_RPM) and estimated
+    tokens (VACALYSER_LLM_TPM) under the account limits, e.g. "500" or
+    "gpt-4o=500,gpt-4o-mini=1000"; unset = unlimited.
+  * After VACALYSER_LLM_BREAKER_FAILURES consecutive failed calls the model's
+    circuit opens and calls fail fast with LLMUnavailableError for
+    VACALYSER_LLM_BREAKER_RESET_S, then one probe call is let through.
+
+Everything raises an LLMError subclass (a RuntimeError, so older
+`except RuntimeError` handlers keep working). Waiting time goes to llm_metrics
+as llm_throttle_seconds_total{reason=rate_limiter|retry_after|backoff}.
+"""
+
+from __future__ import annotations
+
+import email.utils
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+from src.utils import llm_metrics
+
+T = TypeVar("T")
+
+MAX_RETRIES = int(os.getenv("VACALYSER_LLM_MAX_RETRIES", "3"))
+RETRY_BUDGET_S = float(os.getenv("VACALYSER_LLM_RETRY_BUDGET_S", "60"))
+BACKOFF_BASE_S = float(os.getenv("VACALYSER_LLM_BACKOFF_BASE_S", "0.5"))
+BACKOFF_CAP_S = float(os.getenv("VACALYSER_LLM_BACKOFF_CAP_S", "20"))
+BREAKER_FAILURES = int(os.getenv("VACALYSER_LLM_BREAKER_FAILURES", "5"))
+BREAKER_RESET_S = float(os.getenv("VACALYSER_LLM_BREAKER_RESET_S", "30"))
+
+
+# --------------------------------------------------------------------------- #
+# Typed errors
+# --------------------------------------------------------------------------- #
+class LLMError(RuntimeError):
+    """A provider call failed; `retryable` says whether trying again may help."""
+    retryable = False
+
+    def __init__(self, message: str, *, provider: str = "", model: str = "", status: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.provider = provider
+        self.model = model
+        self.status = status
+        self.retry_after = retry_after
+
+
+class LLMRateLimitError(LLMError):
+    """HTTP 429: the account or model limit was hit."""
+    retryable = True
+
+
+class LLMServerError(LLMError):
+    """HTTP 5xx from the provider."""
+    retryable = True
+
+
+class LLMTimeoutError(LLMError):
+    retryable = True
+
+
+class LLMConnectionError(LLMError):
+    retryable = True
+
+
+class LLMRequestError(LLMError):
+    """4xx other than 429 (bad request, auth, unknown model) – retrying will not help."""
+
+
+class LLMUnavailableError(LLMError):
+    """The circuit breaker is open; the call was not attempted."""
+
+
+def _retry_after(headers) -> Optional[float]:
+    if not headers:
+        return None
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return float(ms) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None   # neither seconds nor an HTTP date: fall back to backoff
+    return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+def classify(exc: BaseException, provider: str = "", model: str = "") -> LLMError:
+    """Map an SDK / requests exception to the matching LLMError subclass."""
+    if isinstance(exc, LLMError):
+        return exc
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+    headers = getattr(response, "headers", None)
+    kw = dict(provider=provider, model=model, status=status, retry_after=_retry_after(headers))
+    name = type(exc).__name__
+    message = f"{provider or 'LLM'} request failed ({status or name}): {exc}"
+    if status == 429:
+        return LLMRateLimitError(message, **kw)
+    if status is not None and status >= 500:
+        return LLMServerError(message, **kw)
+    if status is not None and 400 <= status < 500:
+        return LLMRequestError(message, **kw)
+    if "Timeout" in name:
+        return LLMTimeoutError(message, **kw)
+    if "Connection" in name:
+        return LLMConnectionError(message, **kw)
+    return LLMError(message, **kw)
+
+
+# --------------------------------------------------------------------------- #
+# Rate limiter
+# --------------------------------------------------------------------------- #
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, cost: float) -> float:
+        """Take `cost` tokens (possibly going negative); return how long to wait for them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= min(cost, self.capacity)
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def acquire(self, cost: float = 1.0) -> float:
+        """Block until `cost` tokens are available; returns the seconds waited."""
+        wait = self._reserve(cost)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+def _limits(env: str, model: str) -> float:
+    """Per-minute limit for `model` from "N" or "model=N,model=N" (0 = unlimited)."""
+    spec = os.getenv(env, "").strip()
+    if not spec:
+        return 0.0
+    default = 0.0
+    for part in spec.split(","):
+        name, sep, value = part.strip().rpartition("=")
+        try:
+            limit = float(value)
+        except ValueError:
+            continue
+        if not sep:
+            default = limit
+        elif name == model:
+            return limit
+    return default
+
+
+class RateLimiter:
+    """Request and token buckets for one model, plus a Retry-After pause shared by all callers."""
+
+    def __init__(self, rpm: float, tpm: float):
+        # Providers enforce limits over short windows, so allow about one second of burst.
+        self.requests = TokenBucket(rpm / 60.0, max(1.0, rpm / 60.0)) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm / 60.0, max(1.0, tpm / 60.0)) if tpm > 0 else None
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: Callable[[], int]) -> Tuple[float, float]:
+        """
+        Wait out a Retry-After pause, then for a request slot and `tokens()`
+        token budget. Returns (paused, rate_limited) seconds.
+        """
+        with self._lock:
+            paused = max(0.0, self._blocked_until - time.monotonic())
+        if paused:
+            time.sleep(paused)
+        limited = 0.0
+        if self.requests:
+            limited += self.requests.acquire(1)
+        if self.tokens:
+            limited += self.tokens.acquire(tokens())
+        return paused, limited
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller off for `seconds` (the provider sent Retry-After)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+# --------------------------------------------------------------------------- #
+# Circuit breaker
+# --------------------------------------------------------------------------- #
+class CircuitBreaker:
+    """closed → (N consecutive failures) → open → (reset_s) → half-open → one probe."""
+
+    def __init__(self, failures: int = BREAKER_FAILURES, reset_s: float = BREAKER_RESET_S):
+        self.threshold = failures
+        self.reset_s = reset_s
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self.opened_at >= self.reset_s else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_s or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def failure(self) -> bool:
+        """Record a failed call; True when this failure opened the circuit."""
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.opened_at is not None:
+                self.opened_at = time.monotonic()   # failed probe: stay open
+                return False
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+_lock = threading.Lock()
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+
+def limiter_for(provider: str, model: str) -> RateLimiter:
+    with _lock:
+        lim = _limiters.get((provider, model))
+        if lim is None:
+            lim = _limiters[(provider, model)] = RateLimiter(_limits("VACALYSER_LLM_RPM", model),
+                                                             _limits("VACALYSER_LLM_TPM", model))
+        return lim
+
+
+def breaker_for(provider: str, model: str) -> CircuitBreaker:
+    with _lock:
+        br = _breakers.get((provider, model))
+        if br is None:
+            br = _breakers[(provider, model)] = CircuitBreaker()
+        return br
+
+
+def reset() -> None:
+    """Forget all limiter and breaker state (tests, benchmarks)."""
+    with _lock:
+        _limiters.clear()
+        _breakers.clear()
+
+
+# --------------------------------------------------------------------------- #
+# Entry point
+# --------------------------------------------------------------------------- #
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff; a server-provided Retry-After takes precedence."""
+    if retry_after is not None:
+        return retry_after + random.uniform(0, BACKOFF_BASE_S)
+    return random.uniform(0, min(BACKOFF_CAP_S, BACKOFF_BASE_S * 2 ** attempt))
+
+
+def _throttled(provider: str, model: str, reason: str, seconds: float) -> None:
+    if seconds > 0:
+        llm_metrics.increment("llm_throttle_seconds_total", seconds, provider=provider, model=model,
+                              reason=reason, help_text="Seconds spent waiting before LLM calls, by reason.")
+
+
+def call_with_resilience(provider: str, model: str, fn: Callable[[], T], *, prompt: str = "",
+                         max_tokens: int = 0, max_retries: int = MAX_RETRIES) -> T:
+    """
+    Run `fn` (one provider request) under the model's rate limiter and circuit
+    breaker, retrying retryable failures. Raises an LLMError subclass.
+    """
+    breaker = breaker_for(provider, model)
+    if not breaker.allow():
+        llm_metrics.increment("llm_circuit_rejections_total", provider=provider, model=model,
+                              help_text="Calls rejected because the circuit breaker was open.")
+        raise LLMUnavailableError(f"{provider}/{model} is unavailable (circuit open after repeated failures)",
+                                  provider=provider, model=model)
+    limiter = limiter_for(provider, model)
+    cost: Optional[int] = None
+
+    def tokens() -> int:
+        nonlocal cost
+        if cost is None:
+            cost = llm_metrics.count_tokens(prompt) + max_tokens
+        return cost
+
+    deadline = time.monotonic() + RETRY_BUDGET_S
+    attempt = 0
+    while True:
+        # every attempt, retries included, takes its slot from the model's buckets
+        paused, limited = limiter.acquire(tokens)
+        _throttled(provider, model, "retry_after", paused)
+        _throttled(provider, model, "rate_limiter", limited)
+        try:
+            result = fn()
+        except Exception as exc:
+            err = classify(exc, provider, model)
+            delay = backoff_delay(attempt, err.retry_after) if err.retryable else 0.0
+            if not err.retryable or attempt >= max_retries or time.monotonic() + delay > deadline:
+                if isinstance(err, (LLMRequestError, LLMRateLimitError)):
+                    breaker.success()   # the provider answered; it is up, just refusing this call
+                elif breaker.failure():
+                    llm_metrics.increment("llm_circuit_opened_total", provider=provider, model=model,
+                                          help_text="Times a circuit breaker opened.")
+                if err is exc:
+                    raise
+                raise err from exc
+            attempt += 1
+            llm_metrics.increment("llm_retries_total", provider=provider, model=model,
+                                  reason=str(err.status or type(err).__name__),
+                                  help_text="LLM request retries by cause.")
+            if err.retry_after is not None:
+                limiter.pause(delay)
+            _throttled(provider, model, "retry_after" if err.retry_after is not None else "backoff", delay)
+            time.sleep(delay)
+            continue
+        breaker.success()
+        return result
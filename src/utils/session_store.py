@@ -0,0 +1,265 @@
+# src/utils/session_store.py
+"""
+Durable server-side storage of wizard sessions (SQLite, WAL mode).
+
+st.session_state lives in the server process and is gone after a pod restart.
+Every session gets an id in the URL (?sid=…); at the end of each rerun the
+fields that changed since the last save are upserted, and a browser that
+comes back with the same sid after a restart gets its fields restored.
+
+    fields(session_id, key, value, updated_at)  PRIMARY KEY (session_id, key), WITHOUT ROWID
+    sessions(session_id, created_at, updated_at)
+
+Restoring is one range read on the primary key. Saving is one transaction
+with an upsert per changed field (and a delete per removed field), so a rerun
+that changes nothing writes nothing, and editing the job title does not
+rewrite the uploaded document. Change detection keeps, per field, the last
+saved value itself for immutable scalars (an equality check) and a blake2b
+digest of its JSON otherwise.
+
+Persisted fields are the canonical SESSION_KEYS plus keys written through
+store_in_state (track()); widget keys are never persisted, since Streamlit
+refuses values set for buttons and file uploaders. Values must be JSON
+serialisable; anything else is skipped.
+
+VACALYSER_SESSION_STORE=0 disables it, VACALYSER_SESSION_DB sets the file,
+VACALYSER_SESSION_TTL_DAYS how long untouched sessions are kept.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Set, Tuple
+
+from src.utils import llm_metrics
+
+SESSION_STORE_ENABLED = os.getenv("VACALYSER_SESSION_STORE", "1").lower() not in ("0", "false", "no")
+SESSION_DB = os.getenv("VACALYSER_SESSION_DB", ".vacalyser/sessions.db")
+SESSION_TTL_DAYS = float(os.getenv("VACALYSER_SESSION_TTL_DAYS", "30"))
+SID_PARAM = "sid"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fields (
+    session_id TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    value      TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (session_id, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+_SCALARS = (str, int, float, bool, type(None))
+_tracked: Set[str] = set()
+
+
+def track(key: str) -> None:
+    """Persist `key` from now on (store_in_state calls this for the keys it writes)."""
+    _tracked.add(key)
+
+
+def persisted_keys() -> Set[str]:
+    from src.session_state import SESSION_KEYS
+
+    return set(SESSION_KEYS) | _tracked
+
+
+def export_fields(state: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    The persisted fields of `state` (spec, generated outputs, store_in_state
+    keys) for the JSON export – without the uploaded document and without
+    widget keys such as the "Prepare …" buttons, whose values flip between
+    reruns and would change the export's content hash.
+    """
+    return {key: state[key] for key in sorted(persisted_keys()) if key in state and key != "uploaded_file"}
+
+
+class SessionStore:
+    """
+    One SQLite file and one connection shared by all sessions of the process.
+
+    Streamlit runs every rerun on a new ScriptRunner thread, so a connection
+    per thread would be opened (and its PRAGMAs run) on nearly every
+    autosave; the shared connection is serialised by a lock instead.
+    """
+
+    def __init__(self, path: str = SESSION_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; a crash loses at most the last commits
+        self._db.executescript(_SCHEMA)
+
+    def load(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._db.execute("SELECT key, value FROM fields WHERE session_id = ?", (session_id,)).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def save(self, session_id: str, changed: Mapping[str, str], deleted: Iterable[str] = ()) -> int:
+        """Upsert `changed` ({key: JSON text}) and delete `deleted` in one transaction; returns payload bytes."""
+        deleted = list(deleted)
+        if not changed and not deleted:
+            return 0
+        now = time.time()
+        with self._lock:
+            conn = self._db
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO fields (session_id, key, value, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (session_id, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                    [(session_id, key, value, now) for key, value in changed.items()])
+                conn.executemany("DELETE FROM fields WHERE session_id = ? AND key = ?",
+                                 [(session_id, key) for key in deleted])
+                conn.execute("INSERT INTO sessions (session_id, created_at, updated_at) VALUES (?, ?, ?) "
+                             "ON CONFLICT (session_id) DO UPDATE SET updated_at = excluded.updated_at",
+                             (session_id, now, now))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        written = sum(len(k) + len(v) for k, v in changed.items())
+        llm_metrics.increment("session_store_saves_total", 1, "Session autosaves that wrote at least one field")
+        llm_metrics.increment("session_store_fields_written_total", len(changed) + len(deleted),
+                              "Session fields upserted or deleted")
+        llm_metrics.increment("session_store_bytes_written_total", written, "Session field payload bytes written")
+        return written
+
+    def session_ids(self) -> List[str]:
+        """All stored sessions, most recently saved first."""
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT session_id FROM sessions ORDER BY updated_at DESC")]
+
+    def prune(self, max_age_days: float = SESSION_TTL_DAYS) -> int:
+        """Delete sessions untouched for `max_age_days`; returns how many."""
+        cutoff = time.time() - max_age_days * 86400
+        with self._lock:
+            conn = self._db
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                stale = [r[0] for r in conn.execute("SELECT session_id FROM sessions WHERE updated_at < ?", (cutoff,))]
+                conn.executemany("DELETE FROM fields WHERE session_id = ?", [(s,) for s in stale])
+                conn.executemany("DELETE FROM sessions WHERE session_id = ?", [(s,) for s in stale])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return len(stale)
+
+
+class DirtyTracker:
+    """What changed in a session's persisted fields since the last save."""
+
+    def __init__(self):
+        self._saved: Dict[str, Any] = {}   # key → the value (immutable scalars) or a digest of its JSON
+
+    @staticmethod
+    def _fingerprint(value: Any) -> Tuple[Any, Optional[str]]:
+        """(comparison token, JSON text or None if not serialisable)."""
+        try:
+            text = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return None, None
+        if isinstance(value, _SCALARS):
+            return ("v", value), text
+        return ("h", hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()), text
+
+    def diff(self, state: Mapping[str, Any], keys: Iterable[str]) -> Tuple[Dict[str, str], List[str]]:
+        changed: Dict[str, str] = {}
+        present = set()
+        for key in keys:
+            if key not in state:
+                continue
+            present.add(key)
+            value = state[key]
+            saved = self._saved.get(key)
+            # scalars: equality against the saved value, no serialisation
+            if isinstance(value, _SCALARS) and saved is not None and saved[0] == "v" \
+                    and type(saved[1]) is type(value) and saved[1] == value:
+                continue
+            token, text = self._fingerprint(value)
+            if text is not None and token != saved:
+                changed[key] = text
+        deleted = [key for key in self._saved if key not in present]
+        return changed, deleted
+
+    def mark_saved(self, changed: Mapping[str, str], deleted: Iterable[str], state: Mapping[str, Any]) -> None:
+        for key in changed:
+            self._saved[key] = self._fingerprint(state[key])[0]
+        for key in deleted:
+            self._saved.pop(key, None)
+
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SessionStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore(SESSION_DB)
+            _store.prune()
+        return _store
+
+
+def session_id() -> str:
+    """The sid from the URL, or a new one that is put into the URL."""
+    import streamlit as st
+
+    sid = st.query_params.get(SID_PARAM, "")
+    if not sid or len(sid) > 64 or not sid.replace("-", "").isalnum():
+        sid = uuid.uuid4().hex
+        st.query_params[SID_PARAM] = sid
+    return sid
+
+
+def restore(state: MutableMapping[str, Any]) -> Optional[str]:
+    """
+    Once per browser session: take the sid and, if the store has fields for it,
+    put them into `state` (before defaults are filled in). Returns the sid.
+    """
+    if not SESSION_STORE_ENABLED:
+        return None
+    if "_session_sid" in state:
+        return state["_session_sid"]
+    sid = session_id()
+    tracker = DirtyTracker()
+    try:
+        fields = get_store().load(sid)
+    except sqlite3.Error:
+        fields = {}
+    for key, value in fields.items():
+        state[key] = value
+        _tracked.add(key)
+    tracker.mark_saved(fields, (), state)
+    state["_session_sid"], state["_session_tracker"] = sid, tracker
+    return sid
+
+
+def autosave(state: MutableMapping[str, Any]) -> int:
+    """Write the fields that changed since the last save; returns payload bytes (0: nothing changed)."""
+    sid, tracker = state.get("_session_sid"), state.get("_session_tracker")
+    if not SESSION_STORE_ENABLED or sid is None or tracker is None:
+        return 0
+    changed, deleted = tracker.diff(state, persisted_keys())
+    if not changed and not deleted:
+        return 0
+    try:
+        written = get_store().save(sid, changed, deleted)
+    except sqlite3.Error:
+        return 0  # keep the tracker dirty: the next rerun retries
+    tracker.mark_saved(changed, deleted, state)
+    return written
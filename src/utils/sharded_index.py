@@ -0,0 +1,360 @@
+# src/utils/sharded_index.py
+"""
+Sharded FAISS index: documents partitioned across several index files,
+queried concurrently, per-shard top-k merged into a global top-k.
+
+A shard set is a directory:
+
+    shards.json            manifest: dim, metric, partition, shard files, generation
+    g<gen>-shard-of.npy    int16, global document id → shard number (-1: absent)
+    g<gen>-shard-00.faiss  IndexIDMap2 over the shard's vectors, keyed by global id
+    g<gen>-shard-00.pkl    {global id: mapping entry} for that shard
+
+Partitioning is by hash of a document key (the file name by default, so all
+chunks of a document share a shard) or by tenant (one shard per value of a
+mapping field such as "category"; queries may then be restricted to tenants).
+
+Shards are read on first use, so a replica only holds the shards it has
+searched. `search` has the signature of faiss.Index.search and returns global
+ids, and `mapping` is a lazy {id: entry} view, so rag_helpers.search_faiss and
+vector_store.query_vector use a shard set wherever they used one index file.
+
+A rewrite (`write_shards`, `add`) writes new files under a new generation
+and replaces shards.json last. Every file a reader needs, the id → shard
+array included, is named in the manifest, so one manifest read pins a
+consistent set: the old one or the new one. Files used by neither the new
+nor the previous manifest are then deleted, so a replica still on the
+previous manifest can load its shards.
+
+    index = ShardedIndex("vector_databases/shards")
+    distances, ids = index.search(q_emb, 10)                 # all shards
+    distances, ids = index.search(q_emb, 10, tenants=["HR"])  # tenant shards only
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+import pickle
+import threading
+import zlib
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MANIFEST_FILE = "shards.json"
+SHARD_OF_FILE = "shard_of.npy"   # before the array was versioned; read for older manifests
+PARTITIONS = ("hash", "tenant")
+SHARD_THREADS = int(os.getenv("VACALYSER_SHARD_THREADS", "0")) or min(8, os.cpu_count() or 1)
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    """One fan-out pool per process (faiss releases the GIL while searching)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(SHARD_THREADS, thread_name_prefix="faiss-shard")
+        return _pool
+
+
+def is_shard_set(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, MANIFEST_FILE))
+
+
+def hash_shard(key: Any, n_shards: int) -> int:
+    """Stable across processes and runs (unlike hash())."""
+    return zlib.crc32(str(key).encode("utf-8")) % n_shards
+
+
+def _doc_key(doc: Any, field: str, default: Any) -> Any:
+    return doc.get(field, default) if isinstance(doc, dict) else default
+
+
+def _atomic_write(path: str, write) -> None:
+    tmp_path = f"{path}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _save_npy(path: str, array: np.ndarray) -> None:
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+    _atomic_write(path, write)
+
+
+def _save_shard(directory: str, name: str, index, mapping: Dict[int, Dict]) -> Dict[str, Any]:
+    import faiss
+
+    _atomic_write(os.path.join(directory, f"{name}.faiss"), lambda p: faiss.write_index(index, p))
+
+    def write_mapping(tmp_path):
+        with open(tmp_path, "wb") as f:
+            pickle.dump(mapping, f)
+    _atomic_write(os.path.join(directory, f"{name}.pkl"), write_mapping)
+    return {"index": f"{name}.faiss", "mapping": f"{name}.pkl", "count": int(index.ntotal)}
+
+
+def _new_index(dim: int, factory: str, metric: str, train: Optional[np.ndarray] = None):
+    import faiss
+
+    inner = faiss.index_factory(dim, factory, faiss.METRIC_INNER_PRODUCT if metric == "ip" else faiss.METRIC_L2)
+    if not inner.is_trained:
+        inner.train(train)
+    return faiss.IndexIDMap2(inner)
+
+
+def _shard_of_file(manifest: Dict[str, Any]) -> str:
+    return manifest.get("shard_of", SHARD_OF_FILE)
+
+
+def _publish(directory: str, manifest: Dict[str, Any], shard_of: np.ndarray,
+             previous: Optional[Dict[str, Any]]) -> None:
+    """shard_of under this generation, then the manifest; afterwards drop files neither it nor `previous` uses."""
+    manifest["shard_of"] = f"g{manifest['generation']}-shard-of.npy"
+    _save_npy(os.path.join(directory, manifest["shard_of"]), shard_of)
+
+    def write_manifest(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+    _atomic_write(os.path.join(directory, MANIFEST_FILE), write_manifest)
+    manifests = (manifest, previous) if previous else (manifest,)
+    keep = {e[k] for m in manifests for e in m["shards"] for k in ("index", "mapping") if k in e}
+    keep.update(_shard_of_file(m) for m in manifests)
+    for path in glob.glob(os.path.join(directory, "g*-shard-*")) + [os.path.join(directory, SHARD_OF_FILE)]:
+        if os.path.basename(path) not in keep and os.path.exists(path):
+            os.remove(path)
+
+
+def write_shards(embeddings: np.ndarray, mapping: Dict[int, Dict], directory: str, n_shards: int = 4,
+                 partition: str = "hash", key_field: str = "file_name", factory: str = "Flat",
+                 metric: str = "l2") -> Dict[str, Any]:
+    """
+    Partition `embeddings` (row i is document id i of `mapping`) into a shard set.
+    partition="hash": `n_shards` shards by hash of mapping[id][key_field];
+    partition="tenant": one shard per distinct value of mapping[id][key_field].
+    """
+    if partition not in PARTITIONS:
+        raise ValueError(f"Unsupported partition {partition!r}. Choose one of {', '.join(PARTITIONS)}.")
+    os.makedirs(directory, exist_ok=True)
+    ids = np.asarray(sorted(int(k) for k in mapping), dtype=np.int64)
+    docs = {int(k): v for k, v in mapping.items()}
+    keys = [str(_doc_key(docs[i], key_field, i)) for i in ids]
+    if partition == "tenant":
+        tenants = sorted(set(keys))
+        number = {t: n for n, t in enumerate(tenants)}
+        assignment = np.asarray([number[k] for k in keys], dtype=np.int16)
+    else:
+        tenants = []
+        assignment = np.asarray([hash_shard(k, n_shards) for k in keys], dtype=np.int16)
+    n = len(tenants) if partition == "tenant" else n_shards
+
+    previous = load_manifest(directory)
+    generation = previous["generation"] + 1 if previous else 1
+    shards = []
+    for s in range(n):
+        rows = ids[assignment == s]
+        index = _new_index(embeddings.shape[1], factory, metric, embeddings[rows] if len(rows) else None)
+        if len(rows):
+            index.add_with_ids(np.ascontiguousarray(embeddings[rows], dtype=np.float32), rows)
+        entry = _save_shard(directory, f"g{generation}-shard-{s:02d}", index, {int(i): docs[int(i)] for i in rows})
+        if partition == "tenant":
+            entry["tenant"] = tenants[s]
+        shards.append(entry)
+    shard_of = np.full(int(ids.max()) + 1 if len(ids) else 0, -1, dtype=np.int16)
+    shard_of[ids] = assignment
+    manifest = {"dim": int(embeddings.shape[1]), "metric": metric, "partition": partition,
+                "key_field": key_field, "factory": factory, "generation": generation, "shards": shards}
+    _publish(directory, manifest, shard_of, previous)
+    return manifest
+
+
+def load_manifest(directory: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+class _LazyMapping(Mapping):
+    """{global id: entry} that reads a shard's mapping only when one of its ids is looked up."""
+
+    def __init__(self, owner: "ShardedIndex"):
+        self._owner = owner
+
+    def __getitem__(self, key) -> Dict:
+        if not isinstance(key, (int, np.integer)):
+            raise KeyError(key)
+        shard = self._owner.shard_of_id(int(key))
+        if shard < 0:
+            raise KeyError(key)
+        return self._owner._shard(shard)[1][int(key)]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(int(i) for i in np.flatnonzero(self._owner.shard_of >= 0))
+
+    def __len__(self) -> int:
+        return int((self._owner.shard_of >= 0).sum())
+
+
+class ShardedIndex:
+    """Lazily loaded shard set with faiss-style `search` over global ids."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.manifest = load_manifest(directory)
+        if self.manifest is None:
+            raise FileNotFoundError(f"{os.path.join(directory, MANIFEST_FILE)} not found")
+        self.shard_of = np.load(os.path.join(directory, _shard_of_file(self.manifest)))
+        self.d = self.manifest["dim"]
+        self.ntotal = sum(s["count"] for s in self.manifest["shards"])
+        self.mapping = _LazyMapping(self)
+        self._loaded: Dict[int, Tuple[Any, Dict[int, Dict]]] = {}
+        self._locks = [threading.Lock() for _ in self.manifest["shards"]]
+        self._write_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.ntotal
+
+    @property
+    def n_shards(self) -> int:
+        return len(self.manifest["shards"])
+
+    def loaded_shards(self) -> List[int]:
+        return sorted(self._loaded)
+
+    def shard_of_id(self, doc_id: int) -> int:
+        return int(self.shard_of[doc_id]) if 0 <= doc_id < len(self.shard_of) else -1
+
+    def _shard(self, s: int) -> Tuple[Any, Dict[int, Dict]]:
+        shard = self._loaded.get(s)
+        if shard is None:
+            with self._locks[s]:
+                shard = self._loaded.get(s)
+                if shard is None:
+                    import faiss
+
+                    entry = self.manifest["shards"][s]
+                    index = faiss.read_index(os.path.join(self.directory, entry["index"]))
+                    with open(os.path.join(self.directory, entry["mapping"]), "rb") as f:
+                        mapping = pickle.load(f)
+                    shard = self._loaded[s] = (index, mapping)
+        return shard
+
+    def _select(self, tenants: Optional[Iterable[str]]) -> List[int]:
+        if tenants is None:
+            return list(range(self.n_shards))
+        wanted = set(tenants)
+        return [s for s, e in enumerate(self.manifest["shards"]) if e.get("tenant") in wanted]
+
+    def _search_shard(self, s: int, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        index = self._shard(s)[0]
+        if index.ntotal == 0:
+            n = len(queries)
+            return np.full((n, 0), np.inf, dtype=np.float32), np.empty((n, 0), dtype=np.int64)
+        return index.search(queries, min(k, index.ntotal))
+
+    def search(self, queries: np.ndarray, k: int, tenants: Optional[Iterable[str]] = None
+               ) -> Tuple[np.ndarray, np.ndarray]:
+        """(distances, global ids), each (n_queries, k), best first; missing slots are -1 like faiss."""
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        shards = self._select(tenants)
+        if len(shards) == 1:
+            parts = [self._search_shard(shards[0], queries, k)]
+        else:
+            parts = list(_executor().map(lambda s: self._search_shard(s, queries, k), shards))
+        return merge_topk(parts, k, largest=self.manifest["metric"] == "ip", n_queries=len(queries))
+
+    def add(self, embeddings: np.ndarray, docs: Sequence[Dict], tenant: Optional[str] = None) -> List[int]:
+        """
+        Append documents; only the shards that receive them are rewritten.
+        Returns the new global ids. Hash partitions route by the key field,
+        tenant partitions by `tenant` (a new tenant gets a new shard).
+        """
+        import faiss
+
+        with self._write_lock:
+            manifest = json.loads(json.dumps(self.manifest))
+            start = len(self.shard_of)
+            new_ids = np.arange(start, start + len(docs), dtype=np.int64)
+            if manifest["partition"] == "tenant":
+                names = [e.get("tenant") for e in manifest["shards"]]
+                if tenant not in names:
+                    manifest["shards"].append({"tenant": tenant, "count": 0})
+                    names.append(tenant)
+                    self._locks.append(threading.Lock())
+                target = np.full(len(docs), names.index(tenant), dtype=np.int16)
+            else:
+                target = np.asarray([hash_shard(_doc_key(d, manifest["key_field"], i), len(manifest["shards"]))
+                                     for i, d in zip(new_ids, docs)], dtype=np.int16)
+            manifest["generation"] += 1
+            for s in np.unique(target):
+                rows = np.flatnonzero(target == s)
+                entry = manifest["shards"][s]
+                if "index" in entry:
+                    index, mapping = self._shard(int(s))
+                    index, mapping = faiss.clone_index(index), dict(mapping)
+                else:
+                    index, mapping = _new_index(manifest["dim"], manifest["factory"], manifest["metric"],
+                                                embeddings[rows]), {}
+                index.add_with_ids(np.ascontiguousarray(embeddings[rows], dtype=np.float32), new_ids[rows])
+                mapping.update({int(new_ids[r]): docs[r] for r in rows})
+                written = _save_shard(self.directory, f"g{manifest['generation']}-shard-{int(s):02d}", index, mapping)
+                entry.update(written)
+                self._loaded[int(s)] = (index, mapping)
+            # untouched shards keep their (older-generation) files
+            shard_of = np.concatenate([self.shard_of, target])
+            _publish(self.directory, manifest, shard_of, self.manifest)
+            self.manifest, self.shard_of = manifest, shard_of
+            self.ntotal += len(docs)
+            return [int(i) for i in new_ids]
+
+
+def merge_topk(parts: Sequence[Tuple[np.ndarray, np.ndarray]], k: int, largest: bool = False,
+               n_queries: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """Global top-k from per-shard (distances, ids); padded with -1 / ±inf when fewer than k exist."""
+    fill = -np.inf if largest else np.inf
+    if parts:
+        distances = np.concatenate([d for d, _ in parts], axis=1)
+        ids = np.concatenate([i for _, i in parts], axis=1)
+    else:
+        distances = np.empty((n_queries, 0), dtype=np.float32)
+        ids = np.empty((n_queries, 0), dtype=np.int64)
+    distances = np.where(ids < 0, fill, distances)
+    if distances.shape[1] < k:
+        pad = k - distances.shape[1]
+        distances = np.pad(distances, ((0, 0), (0, pad)), constant_values=fill)
+        ids = np.pad(ids, ((0, 0), (0, pad)), constant_values=-1)
+    key = -distances if largest else distances
+    top = np.argpartition(key, k - 1, axis=1)[:, :k] if distances.shape[1] > k else \
+        np.tile(np.arange(k), (len(key), 1))
+    order = np.take_along_axis(key, top, axis=1).argsort(axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+    return np.take_along_axis(distances, top, axis=1).astype(np.float32), np.take_along_axis(ids, top, axis=1)
+
+
+_open_lock = threading.Lock()
+_open: Dict[str, Tuple[int, ShardedIndex]] = {}
+
+
+def open_shard_set(directory: str) -> Optional[ShardedIndex]:
+    """
+    The process-wide ShardedIndex for `directory` (None if there is no shard set).
+    Reopened when shards.json is replaced, so replicas pick up a rewrite.
+    """
+    try:
+        mtime = os.stat(os.path.join(directory, MANIFEST_FILE)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _open_lock:
+        cached = _open.get(directory)
+        if cached is None or cached[0] != mtime:
+            cached = _open[directory] = (mtime, ShardedIndex(directory))
+        return cached[1]
@@ -0,0 +1,120 @@
+# src/utils/singleflight.py
+"""
+Single-flight coalescing of identical in-flight LLM requests.
+
+Two recruiters analysing the same job URL, or a double-clicked Streamlit
+button, send the same prompt twice while the first call is still running.
+Callers with the same request key share one provider call instead:
+
+    key = request_key("openai", model, prompt, system_message, max_tokens, temperature)
+    text = coalesce(key, lambda: provider_call(...), provider="openai", model=model)
+
+The first caller (the leader) runs the call; callers that arrive while it is
+in flight wait for it and get the same result, or the same exception. Nothing
+is kept once the call returns, so this is not a cache: a later identical
+request goes to the provider again.
+
+If the leader is interrupted without a result (e.g. Streamlit stops its
+script run) the waiting callers are not failed with that; the next one in
+line runs the call itself.
+
+Each follower is recorded as an LLM call with cache_hit set (no tokens,
+latency = its wait), i.e. in llm_cache_hits_total{task,provider,model};
+set VACALYSER_LLM_SINGLEFLIGHT=0 to send every request on its own.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from src.utils import llm_metrics
+
+T = TypeVar("T")
+
+SINGLEFLIGHT_ENABLED = os.getenv("VACALYSER_LLM_SINGLEFLIGHT", "1").lower() not in ("0", "false", "no")
+
+
+def request_key(provider: str, model: str, *parts: Any) -> str:
+    """Stable key over everything that determines the provider's answer."""
+    blob = json.dumps([provider, model, *parts], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "finished", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.finished = False  # False: the leader was interrupted without an outcome
+        self.followers = 0
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """Return (result, shared); `shared` is True when another caller's call was reused."""
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                else:
+                    flight.followers += 1
+            if leader:
+                return self._lead(key, flight, fn), False
+            flight.done.wait()
+            if not flight.finished:
+                continue  # the leader gave up; take over (or join whoever did)
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+    def _lead(self, key: str, flight: _Flight, fn: Callable[[], T]) -> T:
+        try:
+            flight.result = fn()
+            flight.finished = True
+            return flight.result
+        except Exception as exc:
+            flight.error = exc
+            flight.finished = True
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+
+_default = SingleFlight()
+
+
+def coalesce(key: str, fn: Callable[[], T], *, provider: str = "", model: str = "",
+             group: Optional[SingleFlight] = None) -> T:
+    """Run `fn` through the process-wide SingleFlight (or `group`) and record coalesced callers as cache hits."""
+    if not SINGLEFLIGHT_ENABLED:
+        return fn()
+    start = time.perf_counter()
+    result, shared = (group or _default).do(key, fn)
+    if shared:
+        call = llm_metrics.LLMCall(provider, model, "", llm_metrics.current_task())
+        call.cache_hit = True
+        call.prompt_tokens = call.completion_tokens = 0
+        call.latency = time.perf_counter() - start
+        llm_metrics.record_call(call)
+    return result
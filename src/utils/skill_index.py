@@ -0,0 +1,189 @@
+# src/utils/skill_index.py
+"""
+Prefix index for skill autocomplete on the skills page.
+
+Skills come from a local taxonomy file (VACALYSER_SKILL_TAXONOMY_PATH) and,
+when it has been built, the corpus skill vocabulary (src/utils/skill_vocab.py,
+weighted by document frequency). A .txt taxonomy has one skill per line,
+with an optional tab-separated weight (higher ranks first):
+
+    # comment lines and blank lines are ignored
+    Stakeholder Management
+    Python<TAB>5
+
+A .csv taxonomy needs a "skill" or "preferredLabel" column; "weight" and
+ESCO-style newline-separated "altLabels" are optional.
+
+Every word start of a skill is a key ("stakeholder management", "management"),
+so "manag" completes "Stakeholder Management". Keys live in one sorted list;
+a prefix is two bisects giving the slice of matching keys. Completions rank
+full-name matches before inner-word matches, then by weight, then shorter
+names. A slice larger than SCAN_LIMIT (short prefixes such as "s") is never
+scanned at request time: its top completions are precomputed at build, so
+every lookup is O(log n) plus at most SCAN_LIMIT candidates.
+
+    index = get_skill_index()
+    index.complete("kube")   # ['Kubernetes', 'Kubeflow', ...]
+"""
+
+from __future__ import annotations
+
+import csv
+import math
+import os
+import re
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+SKILL_TAXONOMY_PATH = os.getenv("VACALYSER_SKILL_TAXONOMY_PATH", "vector_databases/skill_taxonomy.txt")
+SCAN_LIMIT = 512      # larger prefix slices are answered from the precomputed tops
+TOP_N = 32            # completions kept per precomputed prefix
+
+_WORD_START = re.compile(r"(?:^|(?<=[\s/(&+-]))\w")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    return _SPACES.sub(" ", text.strip()).casefold()
+
+
+class SkillIndex:
+    """Sorted word-start keys over weighted skill names."""
+
+    def __init__(self, skills: Dict[str, float]):
+        names, weights, seen = [], [], {}
+        for name, weight in skills.items():
+            name = _SPACES.sub(" ", name.strip())
+            key = normalize(name)
+            if not key:
+                continue
+            if key in seen:                       # case variants: keep the heavier spelling, sum weights
+                i = seen[key]
+                if weight > weights[i]:
+                    names[i] = name
+                weights[i] += weight
+                continue
+            seen[key] = len(names)
+            names.append(name)
+            weights.append(weight)
+        self.skills = names
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self._lengths = np.asarray([len(n) for n in names], dtype=np.int32)
+
+        entries: List[Tuple[str, int, bool]] = []
+        for i, name in enumerate(names):
+            key = normalize(name)
+            for m in _WORD_START.finditer(key):
+                entries.append((key[m.start():], i, m.start() == 0))
+        entries.sort()
+        self.keys = [e[0] for e in entries]
+        self.ids = np.fromiter((e[1] for e in entries), dtype=np.int32, count=len(entries))
+        self.full = np.fromiter((e[2] for e in entries), dtype=bool, count=len(entries))
+        self._tops: Dict[str, List[int]] = {}
+        self._precompute()
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def _rank(self, lo: int, hi: int, limit: int) -> List[int]:
+        ids, full = self.ids[lo:hi], self.full[lo:hi]
+        order = np.lexsort((self._lengths[ids], -self.weights[ids], ~full))
+        ranked, seen = [], set()
+        for j in order:
+            i = int(ids[j])
+            if i not in seen:
+                seen.add(i)
+                ranked.append(i)
+                if len(ranked) == limit:
+                    break
+        return ranked
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        return bisect_left(self.keys, prefix), bisect_left(self.keys, prefix + "\U0010ffff")
+
+    def _precompute(self) -> None:
+        """Top completions of every prefix whose key slice exceeds SCAN_LIMIT."""
+        length, pending = 1, [""]
+        while pending:
+            grown = []
+            for parent in pending:
+                lo, hi = self._range(parent)
+                j = lo
+                while j < hi:
+                    if len(self.keys[j]) < length:
+                        j += 1
+                        continue
+                    prefix = self.keys[j][:length]
+                    p_lo, p_hi = j, self._range(prefix)[1]
+                    if p_hi - p_lo > SCAN_LIMIT:
+                        self._tops[prefix] = self._rank(p_lo, p_hi, TOP_N)
+                        grown.append(prefix)
+                    j = p_hi
+            pending, length = grown, length + 1
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Up to `limit` skills with a word starting with `prefix`, best first."""
+        key = normalize(prefix)
+        if not key:
+            return []
+        top = self._tops.get(key)
+        if top is not None:                           # huge slice: at most TOP_N completions
+            return [self.skills[i] for i in top[:limit]]
+        lo, hi = self._range(key)
+        return [self.skills[i] for i in self._rank(lo, hi, limit)]
+
+
+def read_taxonomy(path: str) -> Dict[str, float]:
+    """{skill: weight} from a .txt (one per line, optional tab + weight) or .csv taxonomy."""
+    skills: Dict[str, float] = {}
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(f):
+                weight = float(row.get("weight") or 1.0)
+                name = row.get("skill") or row.get("preferredLabel") or ""
+                for label in [name, *(row.get("altLabels") or "").splitlines()]:
+                    if label.strip():
+                        skills[label.strip()] = max(skills.get(label.strip(), 0.0), weight)
+            return skills
+        for line in f:
+            if line.lstrip().startswith("#"):
+                continue
+            name, _, weight = line.rstrip("\r\n").partition("\t")
+            if name.strip():
+                skills[name.strip()] = float(weight) if weight.strip() else 1.0
+    return skills
+
+
+def build_index(taxonomy_path: str = SKILL_TAXONOMY_PATH, vocab=None) -> SkillIndex:
+    """Taxonomy skills plus corpus vocabulary phrases (weight 1 + log(1 + df))."""
+    skills = read_taxonomy(taxonomy_path) if os.path.exists(taxonomy_path) else {}
+    if vocab is not None:
+        for phrase, df in zip(vocab.phrases, vocab.df):
+            skills[phrase] = skills.get(phrase, 0.0) + 1.0 + math.log1p(int(df))
+    return SkillIndex(skills)
+
+
+_lock = threading.Lock()
+_index: Optional[SkillIndex] = None
+
+
+def get_skill_index() -> SkillIndex:
+    """The process-wide index, built on first use."""
+    global _index
+    with _lock:
+        if _index is None:
+            from src.utils.skill_vocab import get_vocab
+            _index = build_index(vocab=get_vocab())
+        return _index
+
+
+def complete_skills(prefix: str, limit: int = 10, exclude: Iterable[str] = ()) -> List[str]:
+    """Completions for `prefix`, skipping skills already chosen (case-insensitive)."""
+    skip = {normalize(s) for s in exclude}
+    if not skip:
+        return get_skill_index().complete(prefix, limit)
+    found = get_skill_index().complete(prefix, limit + len(skip))
+    return [s for s in found if normalize(s) not in skip][:limit]
@@ -0,0 +1,194 @@
+# src/utils/skill_vocab.py
+"""
+Precomputed skill vocabulary for rag_suggestions.
+
+Built once, offline, from the mapping excerpts (tools/build_skill_vocab.py):
+
+  * candidate phrases are 1–3-grams inside comma/period-delimited segments,
+    plus whole short segments ("SAP FI/CO", "Stakeholder Management"), not
+    starting or ending with a stop word
+  * kept when they occur in at least MIN_DF documents and in no more than
+    MAX_DF_SHARE of them (filler words); a multi-word phrase must also be
+    cohesive: present in at least MIN_COHESION of the documents that contain
+    its rarest word, so chance neighbours ("python pension") are dropped
+  * a sub-phrase that practically only occurs inside a longer kept phrase
+    ("Power" in "Power BI") is dropped
+  * each phrase keeps its most frequent spelling, its document frequency and
+    a normalised float16 embedding from the rag encoder
+
+Stored as one .npz (VACALYSER_SKILL_VOCAB_PATH). At request time a query is
+one encode plus one matrix-vector product over the phrase embeddings, with a
+small boost for phrases sharing a word with the query and a document-frequency
+prior; no excerpt is tokenised. Without an encoder the lexical overlap alone
+ranks the phrases.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import numpy as np
+
+SKILL_VOCAB_PATH = os.getenv("VACALYSER_SKILL_VOCAB_PATH", "vector_databases/skill_vocab.npz")
+MIN_DF = 2
+MAX_DF_SHARE = 0.3
+MAX_N = 3
+MAX_SEGMENT_WORDS = 4     # short list items are kept whole
+MIN_COHESION = 0.1
+SUBSUMED_SHARE = 0.9      # drop a sub-phrase found inside a longer phrase this often
+LEXICAL_BOOST = 0.15
+DF_PRIOR = 0.05
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our the to we with you your will "
+    "this that who all any can more most other such than very also into over per via "
+    "der die das und oder mit für von zu im in ein eine einer eines wir sie ihr ihre ist sind bei auf als".split()
+)
+
+_SEGMENTS = re.compile(r"[,.;:!?()\[\]|•\n]+(?:\s|$)|\s[-–]\s|\n")
+_WORD = re.compile(r"[^\W_][\w+#./-]*[\w+#]|[^\W_]")
+
+
+def _words(segment: str) -> List[str]:
+    return _WORD.findall(segment)
+
+
+def _key(words: Iterable[str]) -> str:
+    return " ".join(w.lower() for w in words)
+
+
+def doc_phrases(text: str) -> Dict[str, str]:
+    """Candidate phrases of one document: {normalised phrase: surface form}."""
+    found: Dict[str, str] = {}
+    for segment in _SEGMENTS.split(text):
+        words = _words(segment)
+        if not words:
+            continue
+        spans = [(i, i + n) for n in range(1, MAX_N + 1) for i in range(len(words) - n + 1)]
+        if MAX_N < len(words) <= MAX_SEGMENT_WORDS:
+            spans.append((0, len(words)))
+        for i, j in spans:
+            gram = words[i:j]
+            if gram[0].lower() in STOP_WORDS or gram[-1].lower() in STOP_WORDS:
+                continue
+            if all(w.isdigit() for w in gram) or len(_key(gram)) < 2:
+                continue
+            found.setdefault(_key(gram), " ".join(gram))
+    return found
+
+
+class SkillVocab:
+    """Phrases with document frequencies and embeddings; `suggest` ranks them for a query."""
+
+    def __init__(self, phrases: List[str], df: np.ndarray, embeddings: Optional[np.ndarray], model: str = ""):
+        self.phrases = phrases
+        self.df = df
+        self.embeddings = embeddings      # float16, L2-normalised rows (or None)
+        self.model = model
+        self._prior = DF_PRIOR * np.log1p(df) / math.log1p(max(int(df.max()), 1)) if len(df) else np.zeros(0)
+        self._by_word: Dict[str, List[int]] = {}
+        for i, p in enumerate(phrases):
+            for w in set(_key(_words(p)).split()):
+                self._by_word.setdefault(w, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    @classmethod
+    def build(cls, texts: Iterable[str], encoder=None, model: str = "", min_df: int = MIN_DF,
+              max_df_share: float = MAX_DF_SHARE) -> "SkillVocab":
+        df: Counter = Counter()
+        word_df: Counter = Counter()
+        surface: Dict[str, Counter] = {}
+        n_docs = 0
+        for text in texts:
+            n_docs += 1
+            word_df.update({w.lower() for w in _words(text)})
+            for key, form in doc_phrases(text).items():
+                df[key] += 1
+                surface.setdefault(key, Counter())[form] += 1
+        max_df = max(min_df, int(max_df_share * n_docs))
+        kept = {k: c for k, c in df.items() if min_df <= c <= max_df
+                and c >= MIN_COHESION * min(word_df[w] for w in k.split() if w not in STOP_WORDS)}
+        for key, count in list(kept.items()):
+            parts = key.split()
+            for n in range(1, len(parts)):
+                for i in range(len(parts) - n + 1):
+                    sub = " ".join(parts[i:i + n])
+                    if sub in kept and count >= SUBSUMED_SHARE * kept[sub]:
+                        kept.pop(sub)
+        keys = sorted(kept, key=lambda k: (-kept[k], k))
+        phrases = [surface[k].most_common(1)[0][0] for k in keys]
+        embeddings = None
+        if encoder is not None and phrases:
+            emb = np.asarray(encoder.encode(phrases, batch_size=64), dtype=np.float32)
+            emb /= np.clip(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12, None)
+            embeddings = emb.astype(np.float16)
+        return cls(phrases, np.asarray([kept[k] for k in keys], dtype=np.int32), embeddings, model)
+
+    def suggest(self, query: str, top_k: int = 15, encoder=None, exclude: Optional[Set[str]] = None) -> List[str]:
+        """The `top_k` phrases that best match `query`, best first."""
+        if not self.phrases:
+            return []
+        scores = self._prior.copy()
+        words = set(_key(_words(query)).split()) - STOP_WORDS
+        for w in words:
+            for i in self._by_word.get(w, ()):
+                scores[i] += LEXICAL_BOOST
+        if encoder is not None and self.embeddings is not None:
+            q = np.asarray(encoder.encode([query]), dtype=np.float32)[0]
+            if q.shape[0] == self.embeddings.shape[1]:   # else built with another encoder: lexical only
+                q /= max(float(np.linalg.norm(q)), 1e-12)
+                scores += self.embeddings @ q.astype(np.float16)
+            elif not words:
+                return []
+        elif not words:
+            return []
+        skip = {e.lower() for e in (exclude or ())} | {query.strip().lower()}
+        k = min(len(scores), top_k + len(skip))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [self.phrases[i] for i in best if self.phrases[i].lower() not in skip][:top_k]
+
+    def top(self, n: int = 50) -> List[Tuple[str, int]]:
+        """The most frequent phrases with their document frequency."""
+        return [(self.phrases[i], int(self.df[i])) for i in range(min(n, len(self.phrases)))]
+
+    # ------------------------------------------------------------------ persistence
+    def save(self, path: str) -> None:
+        tmp_path = f"{path}.tmp.npz"
+        arrays = {"phrases": np.asarray(self.phrases), "df": self.df, "model": np.asarray(self.model)}
+        if self.embeddings is not None:
+            arrays["embeddings"] = self.embeddings
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SkillVocab":
+        with np.load(path, allow_pickle=False) as data:
+            embeddings = data["embeddings"] if "embeddings" in data.files else None
+            return cls(data["phrases"].tolist(), data["df"], embeddings, str(data["model"]))
+
+
+def excerpt_texts(mapping: Mapping) -> Iterable[str]:
+    for doc in mapping.values():
+        text = doc.get("excerpt") or doc.get("text")
+        if text:
+            yield str(text)
+
+
+_lock = threading.Lock()
+_loaded: Dict[str, Optional[SkillVocab]] = {}
+
+
+def get_vocab(path: str = SKILL_VOCAB_PATH) -> Optional[SkillVocab]:
+    """The vocabulary at `path`, loaded once per process; None if it has not been built."""
+    with _lock:
+        if path not in _loaded:
+            _loaded[path] = SkillVocab.load(path) if os.path.exists(path) else None
+        return _loaded[path]
@@ -0,0 +1,173 @@
+# src/utils/structured_output.py
+"""
+Schema-constrained extraction.
+
+The wizard's extraction keys become a pydantic model and a JSON schema that is
+sent with the request, so the provider constrains decoding to valid output:
+
+  * OpenAI  – response_format={"type": "json_schema", strict} (json_object for
+              older models that lack structured outputs)
+  * Ollama  – "format": <JSON schema>  (set VACALYSER_OLLAMA_FORMAT=json for
+              servers older than 0.5, which only understand "json")
+
+Output is still validated. If it fails, a bounded repair loop sends the
+original request again (so the source text is there for fields a truncated
+answer never reached) with the model's own answer plus the error, up to
+VACALYSER_EXTRACTION_REPAIRS extra round trips. Parse outcomes and repair
+round trips go to llm_metrics (structured_parse_total,
+structured_repair_round_trips_total).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from functools import lru_cache
+from typing import Annotated, Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, ValidationError, create_model
+
+from src.config.keys import STEP_KEYS
+from src.utils import llm_metrics
+from src.utils.json_stream import parse_json_object
+
+MAX_REPAIRS = int(os.getenv("VACALYSER_EXTRACTION_REPAIRS", "2"))
+OLLAMA_FORMAT_MODE = os.getenv("VACALYSER_OLLAMA_FORMAT", "schema")  # "schema" | "json"
+
+# Models that accept response_format={"type": "json_schema"}.
+_JSON_SCHEMA_MODELS = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+
+# Step-1 inputs are what the user gave us, not something to extract.
+_NON_EXTRACTABLE = {"input_url", "uploaded_file", "parsed_data_raw"}
+
+
+class ExtractionParseError(ValueError):
+    """Model output could not be turned into the requested object."""
+
+
+def extraction_keys() -> List[str]:
+    """Every wizard field the model may fill, in STEP_KEYS order."""
+    return [k for step in sorted(STEP_KEYS) for k in STEP_KEYS[step] if k not in _NON_EXTRACTABLE]
+
+
+def to_text(value: Any) -> Any:
+    """Wizard fields are text; accept the shapes models like to return instead."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, (list, tuple)):
+        return ", ".join(to_text(v) or "" for v in value if v is not None)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+_Text = Annotated[Optional[str], BeforeValidator(to_text)]
+
+
+@lru_cache(maxsize=32)
+def _schema_model(keys: Tuple[str, ...]) -> Type[BaseModel]:
+    fields = {k: (_Text, None) for k in keys}
+    return create_model("JobSpecExtraction", __config__=ConfigDict(extra="ignore"), **fields)
+
+
+def schema_model(keys: Iterable[str]) -> Type[BaseModel]:
+    """pydantic model with one optional text field per key (cached per key set)."""
+    return _schema_model(tuple(keys))
+
+
+def json_schema(keys: Iterable[str]) -> Dict[str, Any]:
+    """
+    Strict-mode compatible JSON schema: every key required, nullable string,
+    no additional properties.
+    """
+    keys = list(keys)
+    return {
+        "type": "object",
+        "properties": {k: {"type": ["string", "null"]} for k in keys},
+        "required": keys,
+        "additionalProperties": False,
+    }
+
+
+def openai_response_format(schema: Dict[str, Any], model: str) -> Dict[str, Any]:
+    if model.startswith(_JSON_SCHEMA_MODELS):
+        return {"type": "json_schema", "json_schema": {"name": "job_spec", "strict": True, "schema": schema}}
+    return {"type": "json_object"}
+
+
+def ollama_format(schema: Dict[str, Any]) -> Any:
+    return "json" if OLLAMA_FORMAT_MODE == "json" else schema
+
+
+def validate_fields(data: Dict[str, Any], keys: Iterable[str]) -> Dict[str, str]:
+    """Coerce/validate an already-parsed object; returns only the non-null fields."""
+    try:
+        return schema_model(keys).model_validate(data).model_dump(exclude_none=True)
+    except ValidationError as err:
+        raise ExtractionParseError(f"schema validation failed: {err.error_count()} error(s)") from err
+
+
+def parse_and_validate(text: str, keys: Iterable[str]) -> Dict[str, str]:
+    data = parse_json_object(text or "")
+    if data is None:
+        raise ExtractionParseError("no JSON object found in the answer")
+    return validate_fields(data, keys)
+
+
+def repair_prompt(bad_output: str, error: str, keys: List[str], request: str = "") -> str:
+    """The original `request` first (it holds the source text; also a cacheable prefix), then the fix-up."""
+    return (
+        (f"{request}\n\n" if request else "")
+        + f"Your previous answer could not be used ({error}).\n"
+        f"Return ONLY a JSON object with exactly these keys: {keys}. "
+        "Use null when a value is unknown. No prose, no code fences.\n\n"
+        f"Previous answer:\n{bad_output[:4000]}"
+    )
+
+
+def record_parse(ok: bool) -> None:
+    llm_metrics.increment("structured_parse_total", outcome="ok" if ok else "failed",
+                          task=llm_metrics.current_task(),
+                          help_text="Structured-output parse attempts by outcome.")
+
+
+def repair(text: str, keys: Iterable[str], call: Callable[[str, Dict[str, Any]], str],
+           max_repairs: int = MAX_REPAIRS, request: str = "") -> Tuple[Dict[str, str], int]:
+    """
+    Validate `text`; on failure ask again via call(prompt, schema) up to
+    `max_repairs` times, repeating `request` (the prompt that produced `text`)
+    in each repair prompt. Returns (fields, repair_round_trips) or raises
+    ExtractionParseError once the budget is spent.
+    """
+    keys = list(keys)
+    schema = json_schema(keys)
+    for attempt in range(max_repairs + 1):
+        try:
+            fields = parse_and_validate(text, keys)
+        except ExtractionParseError as err:
+            record_parse(False)
+            if attempt == max_repairs:
+                raise
+            llm_metrics.increment("structured_repair_round_trips_total", task=llm_metrics.current_task(),
+                                  help_text="Extra LLM round trips spent repairing invalid structured output.")
+            text = call(repair_prompt(text or "", str(err), keys, request), schema)
+            continue
+        record_parse(True)
+        return fields, attempt
+    raise ExtractionParseError("repair budget exhausted")  # pragma: no cover
+
+
+def extract(prompt: str, keys: Iterable[str], call: Callable[[str, Dict[str, Any]], str],
+            max_repairs: int = MAX_REPAIRS) -> Tuple[Dict[str, str], int]:
+    """One schema-constrained request plus bounded repairs; see repair()."""
+    keys = list(keys)
+    return repair(call(prompt, json_schema(keys)), keys, call, max_repairs, request=prompt)
+
+
+def parse_failure_rate(task: Optional[str] = None) -> float:
+    labels = {"task": task} if task else {}
+    failed = llm_metrics.counter_value("structured_parse_total", outcome="failed", **labels)
+    ok = llm_metrics.counter_value("structured_parse_total", outcome="ok", **labels)
+    return failed / (failed + ok) if failed + ok else 0.0
@@ -1,5 +1,6 @@
 # src/utils/target_group_analyzer.py
 from src.utils.llm_service import LLMService
+from src.utils.llm_metrics import llm_task
 
 def analyze_target_group(job_title: str, company: str, role_description: str) -> str:
     """
@@ -12,5 +13,6 @@ def analyze_target_group(job_title: str, company: str, role_description: str) ->
         f"{role_description}\n\n"
         "Answer in a clear paragraph."
     )
-    result = llm.complete(prompt=prompt, system_message="You are a recruiter assistant.")
+    with llm_task("target_group_analysis"):
+        result = llm.complete(prompt=prompt, system_message="You are a recruiter assistant.")
     return result
@@ -0,0 +1,247 @@
+# src/utils/tracing.py
+"""
+Lightweight span tracing for multi-stage pipelines (e.g. "Analyze Sources").
+
+    with span("discovery", source="url") as root:
+        with span("fetch_url", url=url):
+            ...
+        with span("llm_call") as s:
+            s.set("response_chars", len(text))
+
+Spans nest through a contextvar. When a root span ends, the whole trace is
+kept in a small in-memory ring (for the debug summary) and exported to:
+
+  * VACALYSER_TRACE_FILE      – one JSON trace per line (default: off)
+  * VACALYSER_OTLP_ENDPOINT   – OTLP/HTTP JSON, e.g. http://localhost:4318/v1/traces
+
+Set VACALYSER_TRACING=0 to turn span recording off entirely.
+"""
+
+from __future__ import annotations
+
+import collections
+import contextvars
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+import requests
+
+TRACING_ENABLED = os.getenv("VACALYSER_TRACING", "1").lower() not in ("0", "false", "no")
+TRACE_FILE = os.getenv("VACALYSER_TRACE_FILE", "")
+OTLP_ENDPOINT = os.getenv("VACALYSER_OTLP_ENDPOINT", "")
+SERVICE_NAME = os.getenv("VACALYSER_SERVICE_NAME", "vacalyser")
+MAX_RECENT_TRACES = 50
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+_lock = threading.Lock()
+_open_traces: Dict[str, List["Span"]] = {}
+_recent: Deque[Dict[str, Any]] = collections.deque(maxlen=MAX_RECENT_TRACES)
+
+
+class Span:
+    """One timed stage; `attributes` are free-form key/values shown in exports."""
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = dict(attributes)
+        self.error: Optional[str] = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns or time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name, "trace_id": self.trace_id, "span_id": self.span_id,
+            "parent_id": self.parent_id, "start_ns": self.start_ns, "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms, "attributes": self.attributes, "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Returned when tracing is disabled so call sites never need to check."""
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Open a span under the current one (or start a new trace)."""
+    if not TRACING_ENABLED:
+        yield _NoopSpan()
+        return
+    parent = _current_span.get()
+    trace_id = parent.trace_id if parent else secrets.token_hex(16)
+    s = Span(name, trace_id, parent.span_id if parent else None, attributes)
+    with _lock:
+        _open_traces.setdefault(trace_id, []).append(s)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as exc:
+        s.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current_span.reset(token)
+        if parent is None:
+            _finish_trace(s)
+
+
+def child_span(name: str, **attributes: Any):
+    """Like span(), but only records when a trace is already active."""
+    if _current_span.get() is None:
+        return _null_context()
+    return span(name, **attributes)
+
+
+@contextmanager
+def _null_context() -> Iterator[_NoopSpan]:
+    yield _NoopSpan()
+
+
+def traced(name: Optional[str] = None):
+    """Decorator form of span()."""
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --------------------------------------------------------------------------- #
+# Finishing / exporting
+# --------------------------------------------------------------------------- #
+def _finish_trace(root: Span) -> None:
+    with _lock:
+        spans = _open_traces.pop(root.trace_id, [])
+    trace = {
+        "trace_id": root.trace_id,
+        "name": root.name,
+        "duration_ms": root.duration_ms,
+        "spans": [s.to_dict() for s in spans],
+    }
+    with _lock:
+        _recent.append(trace)
+    if TRACE_FILE:
+        _write_json(trace)
+    if OTLP_ENDPOINT:
+        # Never hold up the UI on a collector round trip.
+        threading.Thread(target=_post_otlp, args=(spans,), daemon=True).start()
+
+
+def _write_json(trace: Dict[str, Any]) -> None:
+    try:
+        with _lock, open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(trace, default=str) + "\n")
+    except OSError:
+        pass
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: List[Span]) -> Dict[str, Any]:
+    """Build an OTLP/HTTP JSON ExportTraceServiceRequest body."""
+    otlp_spans = []
+    for s in spans:
+        item = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            item["parentSpanId"] = s.parent_id
+        otlp_spans.append(item)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "vacalyser.tracing"}, "spans": otlp_spans}],
+    }]}
+
+
+def _post_otlp(spans: List[Span]) -> None:
+    try:
+        requests.post(OTLP_ENDPOINT, json=to_otlp(spans), timeout=5)
+    except requests.RequestException:
+        pass
+
+
+# --------------------------------------------------------------------------- #
+# Reading
+# --------------------------------------------------------------------------- #
+def recent_traces(name: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Finished traces, newest last; optionally only those whose root is `name`."""
+    with _lock:
+        traces = list(_recent)
+    return [t for t in traces if name is None or t["name"] == name]
+
+
+def get_trace(trace_id: str) -> Optional[Dict[str, Any]]:
+    with _lock:
+        for t in _recent:
+            if t["trace_id"] == trace_id:
+                return t
+    return None
+
+
+def summarize(trace: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Flatten a trace into rows (depth-first, in start order) with each span's
+    duration and its share of the root span.
+    """
+    spans = sorted(trace["spans"], key=lambda s: s["start_ns"])
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for s in spans:
+        children.setdefault(s["parent_id"], []).append(s)
+    total = trace["duration_ms"] or 1.0
+    rows: List[Dict[str, Any]] = []
+
+    def walk(parent_id: Optional[str], depth: int) -> None:
+        for s in children.get(parent_id, []):
+            rows.append({
+                "stage": "  " * depth + s["name"],
+                "ms": round(s["duration_ms"], 1),
+                "share": f"{s['duration_ms'] / total:.0%}",
+                "error": s["error"] or "",
+            })
+            walk(s["span_id"], depth + 1)
+
+    walk(None, 0)
+    return rows
@@ -4,11 +4,13 @@ import faiss
 import numpy as np
 import pickle
 from typing import List
-from openai_utils import OpenAIUtils
+
+from src.utils.sharded_index import open_shard_set, write_shards
 
 VECTOR_BASE_DIR = "vector_bases"
 INDEX_FILE = os.path.join(VECTOR_BASE_DIR, "job_index.faiss")
 DATA_FILE = os.path.join(VECTOR_BASE_DIR, "job_vectors.pkl")
+SHARDS_DIR = os.path.join(VECTOR_BASE_DIR, "shards")  # when present, used instead of the single index
 
 def ensure_dirs():
     if not os.path.exists(VECTOR_BASE_DIR):
@@ -43,16 +45,24 @@ def load_index():
     except Exception:
         return None, []
 
-def add_to_index(text: str, metadata_item):
+def shard_store(n_shards: int = 4, partition: str = "hash", key_field: str = "id"):
     """
-    Embed text and add to index with associated metadata.
+    Split the single-file index into a shard set under SHARDS_DIR
+    (see src/utils/sharded_index.py). Later adds rewrite only the shard they land in.
     """
-    ensure_dirs()
-    openai = OpenAIUtils()
-    emb_response = openai.chat_completion(
-        prompt=f"Embed this text for vector indexing:\n{text}",
-        system_message="You are an embedding generator."
-    )
+    idx, metadata = load_index()
+    if idx is None:
+        raise FileNotFoundError(f"{INDEX_FILE} not found")
+    vectors = idx.reconstruct_n(0, idx.ntotal)
+    return write_shards(vectors, dict(enumerate(metadata)), SHARDS_DIR, n_shards=n_shards,
+                        partition=partition, key_field=key_field)
+
+def _embed(text: str, system_message: str) -> np.ndarray:
+    """
+    Ask the LLM for a vector representation of text (1 x dim float32).
+    """
+    from src.utils.openai_utils import LLMClient  # lazy: needs an API key
+    emb_response = LLMClient().chat(text, system_message=system_message)
     # If using real embeddings, use OpenAI embedding API:
     # embeddings = get_openai_embeddings(text)
     # But here we simulate with ChatCompletion for example (not real).
@@ -60,8 +70,17 @@ def add_to_index(text: str, metadata_item):
         vector = np.fromstring(emb_response.replace("[", "").replace("]", ""), sep=",")
     except Exception:
         vector = np.random.rand(1536).astype('float32')  # fallback random
-    vector = np.array([vector], dtype='float32')
+    return np.array([vector], dtype='float32')
 
+def add_vector(vector: np.ndarray, metadata_item):
+    """
+    Add a precomputed (1 x dim) vector with its metadata to the on-disk index.
+    """
+    shards = open_shard_set(SHARDS_DIR)
+    if shards is not None:
+        shards.add(vector, [metadata_item])
+        return
+    ensure_dirs()
     idx, metadata = load_index()
     if idx is None:
         idx = init_index(dim=len(vector[0]))
@@ -70,27 +89,36 @@ def add_to_index(text: str, metadata_item):
     metadata.append(metadata_item)
     save_index(idx, metadata)
 
-def query_index(query: str, top_k: int = 5) -> List:
+def add_to_index(text: str, metadata_item):
     """
-    Query the FAISS index for nearest entries to the query text.
+    Embed text and add to index with associated metadata.
+    """
+    vector = _embed(f"Embed this text for vector indexing:\n{text}", "You are an embedding generator.")
+    add_vector(vector, metadata_item)
+
+def query_vector(qvec: np.ndarray, top_k: int = 5) -> List:
     """
+    Return metadata of the top_k nearest entries to a precomputed (1 x dim) vector.
+    """
+    shards = open_shard_set(SHARDS_DIR)
+    if shards is not None:
+        _, indices = shards.search(qvec, top_k)
+        return [shards.mapping[int(i)] for i in indices[0] if i in shards.mapping]
     idx, metadata = load_index()
     if idx is None:
         return []
-    openai = OpenAIUtils()
-    emb_response = openai.chat_completion(
-        prompt=f"Embed this query for vector search:\n{query}",
-        system_message="You are an embedding generator."
-    )
-    try:
-        qvec = np.fromstring(emb_response.replace("[", "").replace("]", ""), sep=",")
-    except Exception:
-        qvec = np.random.rand(1536).astype('float32')
-    qvec = np.array([qvec], dtype='float32')
-
     distances, indices = idx.search(qvec, top_k)
     results = []
     for i in indices[0]:
         if i < len(metadata):
             results.append(metadata[i])
     return results
+
+def query_index(query: str, top_k: int = 5) -> List:
+    """
+    Query the FAISS index for nearest entries to the query text.
+    """
+    if not os.path.exists(INDEX_FILE) and open_shard_set(SHARDS_DIR) is None:
+        return []
+    qvec = _embed(f"Embed this query for vector search:\n{query}", "You are an embedding generator.")
+    return query_vector(qvec, top_k)
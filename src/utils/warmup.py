@@ -0,0 +1,204 @@
+# src/utils/warmup.py
+"""
+Process-start warm-up for the heavy resources used by the wizard.
+
+Stages (each one is timed):
+  1. embedding_model – load the mpnet encoder (backend per VACALYSER_EMBEDDING_BACKEND) + FAISS index
+  2. encode_search   – run one dummy encode and one FAISS search
+  3. ollama          – ask Ollama to load the local model and keep it resident
+
+Readiness depends on the embedding stages only. The Ollama stage is
+best-effort: OpenAI-only deployments (or an Ollama that is down) still become
+ready, and its outcome is recorded under stages["ollama"]. state is
+"pending", "running", "ready" or "failed".
+
+Readiness is published in two ways:
+  • a JSON status file (READINESS_FILE) that is rewritten after every stage
+  • GET /ready (200/503) and GET /status on VACALYSER_READINESS_PORT (http_probe)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from dotenv import load_dotenv
+
+from src.utils import http_probe
+
+load_dotenv()  # Load environment variables from .env
+READINESS_FILE = os.getenv("VACALYSER_READINESS_FILE", "/tmp/vacalyser_ready.json")
+READINESS_PORT = os.getenv("VACALYSER_READINESS_PORT", "")
+OLLAMA_API_URL = os.getenv("OLLAMA_API_URL", "http://127.0.0.1:11434")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2:3b")
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+WARMUP_OLLAMA = os.getenv("VACALYSER_WARMUP_OLLAMA", "1") not in ("0", "false", "no")
+
+_status: Dict[str, Any] = {"ready": False, "state": "pending", "stages": {}}
+_status_lock = threading.Lock()
+_warmup_thread: Optional[threading.Thread] = None
+
+
+def _write_status() -> None:
+    """Atomically rewrite the readiness file with the current status."""
+    tmp_path = f"{READINESS_FILE}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_status, f, indent=2)
+        os.replace(tmp_path, READINESS_FILE)
+    except OSError:
+        # A read-only filesystem must not break the app – the HTTP probe still works.
+        pass
+
+
+def _run_stage(name: str, fn: Callable[[], Any]) -> bool:
+    """Run one warm-up stage, record its duration and outcome."""
+    start = time.perf_counter()
+    try:
+        detail = fn()
+        ok = True
+        error = None
+    except Exception as exc:
+        detail = None
+        ok = False
+        error = f"{type(exc).__name__}: {exc}"
+    with _status_lock:
+        _status["stages"][name] = {
+            "ok": ok,
+            "seconds": round(time.perf_counter() - start, 3),
+            "detail": detail,
+            "error": error,
+        }
+        _write_status()
+    return ok
+
+
+# --------------------------------------------------------------------------- #
+# Stages
+# --------------------------------------------------------------------------- #
+def warm_embedding_model() -> Dict[str, Any]:
+    """Load the embedding model and (if present) the FAISS index."""
+    import rag_helpers
+
+    rag_helpers.init_faiss_index()
+    if rag_helpers.EMBEDDING_MODEL is None:
+        raise RuntimeError("embedding model could not be loaded")
+    encoder = rag_helpers.EMBEDDING_MODEL
+    return {"index_loaded": rag_helpers.INDEX_LOADED, "index_error": rag_helpers.INDEX_ERROR,
+            "backend": encoder.backend, "fallback": encoder.fallback}
+
+
+def warm_encode_and_search() -> Dict[str, Any]:
+    """Run one dummy encode + search so lazy kernels and caches are initialised."""
+    import numpy as np
+    import rag_helpers
+
+    q_emb = rag_helpers.EMBEDDING_MODEL.encode(["warm-up query"]).astype(np.float32)
+    searched = False
+    if rag_helpers.FAISS_INDEX is not None:
+        rag_helpers.FAISS_INDEX.search(q_emb, 1)
+        searched = True
+    return {"dim": int(q_emb.shape[1]), "searched": searched}
+
+
+def warm_ollama() -> Dict[str, Any]:
+    """
+    Load the local model into Ollama and pin it with keep_alive.
+    An empty prompt makes Ollama load the model without generating anything.
+    """
+    resp = requests.post(
+        f"{OLLAMA_API_URL}/api/generate",
+        json={"model": OLLAMA_MODEL, "prompt": "", "keep_alive": OLLAMA_KEEP_ALIVE, "stream": False},
+        timeout=300,
+    )
+    resp.raise_for_status()
+    return {"model": OLLAMA_MODEL, "keep_alive": OLLAMA_KEEP_ALIVE}
+
+
+# --------------------------------------------------------------------------- #
+# Orchestration
+# --------------------------------------------------------------------------- #
+def run_warmup(include_ollama: bool = WARMUP_OLLAMA) -> Dict[str, Any]:
+    """
+    Run all warm-up stages in order and flip readiness if the embedding stages
+    succeeded (the Ollama stage is best-effort). Returns a copy of the final status dict.
+    """
+    with _status_lock:
+        _status.update({"ready": False, "state": "running", "stages": {}, "started_at": time.time()})
+        _write_status()
+
+    total_start = time.perf_counter()
+    ok = _run_stage("embedding_model", warm_embedding_model)
+    if ok:
+        ok = _run_stage("encode_search", warm_encode_and_search)
+    if include_ollama:
+        # Independent of the embedding stages and not required for readiness.
+        _run_stage("ollama", warm_ollama)
+
+    with _status_lock:
+        _status["ready"] = ok
+        _status["state"] = "ready" if ok else "failed"
+        _status["total_seconds"] = round(time.perf_counter() - total_start, 3)
+        _write_status()
+        return json.loads(json.dumps(_status))
+
+
+def start_warmup() -> threading.Thread:
+    """Start warm-up once per process in a daemon thread (idempotent)."""
+    global _warmup_thread
+    with _status_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=run_warmup, name="vacalyser-warmup", daemon=True)
+            _warmup_thread.start()
+        thread = _warmup_thread
+    if READINESS_PORT:
+        serve_readiness(int(READINESS_PORT))
+    return thread
+
+
+def is_ready() -> bool:
+    with _status_lock:
+        return bool(_status["ready"])
+
+
+def get_state() -> str:
+    with _status_lock:
+        return _status["state"]
+
+
+def get_status() -> Dict[str, Any]:
+    with _status_lock:
+        return json.loads(json.dumps(_status))
+
+
+def _ready_response() -> http_probe.Response:
+    if is_ready():
+        return 200, "text/plain", b"ready\n"
+    return 503, "text/plain", f"{get_state()}\n".encode("utf-8")
+
+
+def _status_response() -> http_probe.Response:
+    return 200, "application/json", json.dumps(get_status()).encode("utf-8")
+
+
+def serve_readiness(port: int, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Expose /ready and /status on a background HTTP server (started once)."""
+    return http_probe.serve(port, {"/ready": _ready_response, "/status": _status_response}, host)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Warm up Vacalyser models and report readiness.")
+    parser.add_argument("--skip-ollama", action="store_true", help="Do not contact the Ollama server.")
+    args = parser.parse_args()
+
+    result = run_warmup(include_ollama=not args.skip_ollama)
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["ready"] else 1)
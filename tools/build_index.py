@@ -0,0 +1,312 @@
+# tools/build_index.py
+"""
+Build vector_databases/index.faiss and index.pkl (the id → document mapping
+rag_helpers.search_faiss reads) from a corpus of CVs and job ads.
+
+    python -m tools.build_index data/input
+    python -m tools.build_index data/input ads.jsonl --workers 4 --batch-size 512
+    python -m tools.build_index data/input --resume        # continue an interrupted build
+    python -m tools.build_index data/input --shards 8      # hash-partitioned shard set
+    python -m tools.build_index data/input --partition tenant --key-field category
+
+Inputs are directories (PDF / DOCX / TXT, searched recursively; the first
+sub-directory under the root is the category, as in data/input/ACCOUNTANT/…)
+and JSONL files (one {"text", "category"?, "file_name"?} object per line).
+
+Pipeline:
+  1. extract + chunk   text per document, cleaned and cut into overlapping
+                       word windows (--chunk-words / --overlap); one FAISS row
+                       and one mapping entry (with an "excerpt") per chunk
+  2. encode            chunks in batches of --batch-size across --workers
+                       processes, each with its own encoder (backend per
+                       VACALYSER_EMBEDDING_BACKEND) and an even share of the
+                       CPU threads
+  3. write             index and mapping are written to temp files in the
+                       target directory and moved into place with os.replace;
+                       with --shards N (or --partition tenant) a shard set is
+                       written to --shards-dir instead (src/utils/sharded_index.py)
+
+Every encoded batch is saved under --checkpoint-dir together with the chunk
+manifest and a fingerprint of the inputs and settings. --resume reuses the
+batches already there, as long as the fingerprint matches; otherwise the
+build starts over. The directory is removed after a successful build.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.embeddings import EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME, ONNX_DIR
+from src.utils.preprocessing import clean_text
+
+EXTENSIONS = (".pdf", ".docx", ".txt")
+CHUNK_WORDS = 200
+OVERLAP = 40
+MANIFEST_FILE = "manifest.json"
+CHUNKS_FILE = "chunks.pkl"
+
+
+# --------------------------------------------------------------------------- #
+# 1. Extract + chunk
+# --------------------------------------------------------------------------- #
+def discover(inputs: Sequence[str]) -> List[Tuple[str, str]]:
+    """(path, category) of every supported file under the input directories, sorted."""
+    found = []
+    for root in inputs:
+        if os.path.isfile(root):
+            found.append((root, ""))
+            continue
+        for dirpath, _, files in os.walk(root):
+            rel = os.path.relpath(dirpath, root)
+            category = "" if rel == "." else rel.split(os.sep)[0]
+            found.extend((os.path.join(dirpath, f), category) for f in files if f.lower().endswith(EXTENSIONS))
+    return sorted(found)
+
+
+def extract_text(path: str) -> str:
+    lower = path.lower()
+    if lower.endswith(".pdf"):
+        import fitz  # PyMuPDF, as in src/utils/extraction.py
+
+        with fitz.open(path) as doc:
+            return "\n".join(page.get_text() for page in doc)
+    if lower.endswith(".docx"):
+        import docx
+
+        return "\n".join(p.text for p in docx.Document(path).paragraphs)
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def chunk_words(text: str, size: int = CHUNK_WORDS, overlap: int = OVERLAP) -> List[str]:
+    """Windows of `size` words, each starting `size - overlap` words after the previous one."""
+    words = text.split()
+    step = max(1, size - overlap)
+    return [" ".join(words[i:i + size]) for i in range(0, max(len(words) - overlap, 1), step) if words[i:i + size]]
+
+
+def _chunk_file(job: Tuple[str, str, int, int]) -> Tuple[str, List[Dict]]:
+    path, category, size, overlap = job
+    try:
+        text = clean_text(extract_text(path))
+    except Exception as exc:  # one broken file must not stop the build
+        return f"{path}: {exc}", []
+    return "", [{"file_name": os.path.basename(path), "file_path": path, "category": category,
+                 "chunk": i, "excerpt": chunk} for i, chunk in enumerate(chunk_words(text, size, overlap))]
+
+
+def _jsonl_docs(path: str, size: int, overlap: int) -> Iterable[Dict]:
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            doc = json.loads(line)
+            name = doc.get("file_name") or f"{os.path.basename(path)}:{line_no}"
+            for i, chunk in enumerate(chunk_words(clean_text(doc.get("text", "")), size, overlap)):
+                yield {"file_name": name, "file_path": path, "category": doc.get("category", ""),
+                       "chunk": i, "excerpt": chunk}
+
+
+def collect_chunks(inputs: Sequence[str], size: int, overlap: int, pool) -> Tuple[List[Dict], int, List[str]]:
+    """All chunks in input order, the number of documents and extraction errors."""
+    jsonl = [p for p in inputs if p.lower().endswith(".jsonl")]
+    files = discover([p for p in inputs if p not in jsonl])
+    chunks, errors, docs = [], [], len(files)
+    for error, file_chunks in pool.map(_chunk_file, [(p, c, size, overlap) for p, c in files], chunksize=16):
+        if error:
+            errors.append(error)
+            docs -= 1
+        chunks.extend(file_chunks)
+    for path in jsonl:
+        for chunk in _jsonl_docs(path, size, overlap):
+            docs += chunk["chunk"] == 0
+            chunks.append(chunk)
+    return chunks, docs, errors
+
+
+# --------------------------------------------------------------------------- #
+# 2. Encode (worker processes)
+# --------------------------------------------------------------------------- #
+_encoder = None
+
+
+def _init_worker(backend: str, model: str, onnx_dir: str, threads: int) -> None:
+    global _encoder
+    from src.utils.embeddings import OnnxEncoder, TorchEncoder
+
+    if backend.startswith("onnx"):
+        try:
+            _encoder = OnnxEncoder(onnx_dir, quantized=backend == "onnx-int8", threads=threads)
+            return
+        except (ImportError, OSError):
+            backend = "torch"  # the same fallback as load_encoder
+    import torch
+
+    torch.set_num_threads(threads)
+    _encoder = TorchEncoder(model, quantize=backend == "int8")
+
+
+def _encode_batch(job: Tuple[int, List[str], str]) -> Tuple[int, int]:
+    batch_no, texts, out_path = job
+    emb = _encoder.encode(texts, batch_size=64).astype(np.float32)
+    tmp_path = f"{out_path}.tmp.npy"
+    np.save(tmp_path, emb)
+    os.replace(tmp_path, out_path)
+    return batch_no, len(texts)
+
+
+# --------------------------------------------------------------------------- #
+# 3. Write
+# --------------------------------------------------------------------------- #
+def write_index(embeddings: np.ndarray, mapping: Dict[int, Dict], index_path: str, mapping_path: str,
+                factory: str = "Flat") -> None:
+    """Write both files via temp files + os.replace: readers never see a partial file."""
+    import faiss
+
+    index = faiss.index_factory(embeddings.shape[1], factory)
+    if not index.is_trained:
+        index.train(embeddings)
+    index.add(embeddings)
+    for path in (index_path, mapping_path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    faiss.write_index(index, f"{index_path}.tmp")
+    with open(f"{mapping_path}.tmp", "wb") as f:
+        pickle.dump(mapping, f)
+    os.replace(f"{mapping_path}.tmp", mapping_path)
+    os.replace(f"{index_path}.tmp", index_path)
+
+
+def fingerprint(inputs: Sequence[str], settings: Dict) -> str:
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode())
+    for path in sorted(inputs):
+        paths = [p for p, _ in discover([path])] if os.path.isdir(path) else [path]
+        for p in paths:
+            st = os.stat(p)
+            digest.update(f"{p}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def _load_checkpoint(checkpoint_dir: str, fp: str) -> Optional[List[Dict]]:
+    try:
+        with open(os.path.join(checkpoint_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            if json.load(f).get("fingerprint") != fp:
+                return None
+        with open(os.path.join(checkpoint_dir, CHUNKS_FILE), "rb") as f:
+            return pickle.load(f)
+    except (OSError, ValueError, pickle.UnpicklingError):
+        return None
+
+
+def _save_checkpoint(checkpoint_dir: str, fp: str, chunks: List[Dict], settings: Dict) -> None:
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    with open(os.path.join(checkpoint_dir, CHUNKS_FILE), "wb") as f:
+        pickle.dump(chunks, f)
+    with open(os.path.join(checkpoint_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fp, "settings": settings, "chunks": len(chunks)}, f, indent=2)
+
+
+def build(args) -> Dict[str, float]:
+    settings = {"backend": args.backend, "model": args.model, "chunk_words": args.chunk_words,
+                "overlap": args.overlap, "batch_size": args.batch_size}
+    fp = fingerprint(args.inputs, settings)
+    threads = max(1, (os.cpu_count() or 1) // args.workers)
+    ctx = multiprocessing.get_context("spawn")  # no fork after torch / faiss threads exist
+    report: Dict[str, float] = {"workers": args.workers}
+
+    chunks = _load_checkpoint(args.checkpoint_dir, fp) if args.resume else None
+    with ProcessPoolExecutor(args.workers, mp_context=ctx) as pool:
+        start = time.perf_counter()
+        if chunks is None:
+            shutil.rmtree(args.checkpoint_dir, ignore_errors=True)
+            chunks, docs, errors = collect_chunks(args.inputs, args.chunk_words, args.overlap, pool)
+            for error in errors:
+                print(f"skipped {error}", file=sys.stderr)
+            _save_checkpoint(args.checkpoint_dir, fp, chunks, settings)
+        else:
+            docs = len({(c["file_path"], c["file_name"]) for c in chunks})
+            print(f"resuming: {len(chunks)} chunks from {args.checkpoint_dir}")
+        report.update(docs=docs, chunks=len(chunks), extract_s=time.perf_counter() - start)
+    if not chunks:
+        raise SystemExit("no text found in the inputs")
+
+    batches = [(i, [c["excerpt"] for c in chunks[s:s + args.batch_size]],
+                os.path.join(args.checkpoint_dir, f"batch_{i:06d}.npy"))
+               for i, s in enumerate(range(0, len(chunks), args.batch_size))]
+    todo = [b for b in batches if not os.path.exists(b[2])]
+    print(f"{docs} documents → {len(chunks)} chunks; encoding {len(todo)} of {len(batches)} batches "
+          f"with {args.workers} worker(s) × {threads} thread(s)")
+    start, done = time.perf_counter(), 0
+    with ProcessPoolExecutor(args.workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(args.backend, args.model, args.onnx_dir, threads)) as pool:
+        for batch_no, n in pool.map(_encode_batch, todo):
+            done += n
+            elapsed = time.perf_counter() - start
+            print(f"  batch {batch_no + 1}/{len(batches)}  {done} chunks  {done / elapsed:.1f} chunks/s", flush=True)
+    encode_s = time.perf_counter() - start
+    report.update(encode_s=encode_s, encoded_chunks=done, chunks_per_s=done / encode_s if done else 0.0)
+
+    start = time.perf_counter()
+    embeddings = np.concatenate([np.load(path) for _, _, path in batches])
+    if args.shards or args.partition == "tenant":
+        from src.utils.sharded_index import write_shards
+        manifest = write_shards(embeddings, dict(enumerate(chunks)), args.shards_dir, n_shards=args.shards or 1,
+                                partition=args.partition, key_field=args.key_field, factory=args.factory)
+        report["shards"] = len(manifest["shards"])
+    else:
+        write_index(embeddings, dict(enumerate(chunks)), args.index, args.mapping, args.factory)
+    report["write_s"] = time.perf_counter() - start
+    report["docs_per_s"] = docs / (report["extract_s"] + encode_s + report["write_s"])
+    if not args.keep_checkpoint:
+        shutil.rmtree(args.checkpoint_dir, ignore_errors=True)
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="corpus directories and/or .jsonl files")
+    parser.add_argument("--index", default="vector_databases/index.faiss")
+    parser.add_argument("--mapping", default="vector_databases/index.pkl")
+    parser.add_argument("--factory", default="Flat", help="faiss.index_factory string, e.g. IVF1024,Flat")
+    parser.add_argument("--shards", type=int, default=0, help="hash-partition into this many shard files")
+    parser.add_argument("--partition", choices=("hash", "tenant"), default="hash")
+    parser.add_argument("--key-field", default="file_name", help="mapping field hashed / used as tenant")
+    parser.add_argument("--shards-dir", default="vector_databases/shards")
+    parser.add_argument("--backend", default=EMBEDDING_BACKEND)
+    parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    parser.add_argument("--onnx-dir", default=ONNX_DIR)
+    parser.add_argument("--workers", type=int, default=max(1, min(4, os.cpu_count() or 1)))
+    parser.add_argument("--batch-size", type=int, default=256, help="chunks per encode task and checkpoint")
+    parser.add_argument("--chunk-words", type=int, default=CHUNK_WORDS)
+    parser.add_argument("--overlap", type=int, default=OVERLAP)
+    parser.add_argument("--checkpoint-dir", default="vector_databases/.build")
+    parser.add_argument("--resume", action="store_true", help="reuse encoded batches of an interrupted build")
+    parser.add_argument("--keep-checkpoint", action="store_true")
+    parser.add_argument("--report", help="write timings as JSON")
+    args = parser.parse_args(argv)
+
+    report = build(args)
+    target = f"{report['shards']} shards in {args.shards_dir}" if "shards" in report else f"{args.index}, {args.mapping}"
+    print(f"{report['docs']} documents, {report['chunks']} chunks → {target}")
+    print(f"extract {report['extract_s']:.1f}s · encode {report['encode_s']:.1f}s "
+          f"({report['chunks_per_s']:.1f} chunks/s) · write {report['write_s']:.1f}s · {report['docs_per_s']:.1f} docs/s")
+    print("The BM25 index is rebuilt on next start; rebuild the skill vocabulary with python -m tools.build_skill_vocab.")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), **report}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
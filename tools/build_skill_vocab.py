@@ -0,0 +1,60 @@
+# tools/build_skill_vocab.py
+"""
+Build the skill vocabulary used by rag_suggestions (src/utils/skill_vocab.py)
+from the excerpts in the FAISS id mapping.
+
+    python -m tools.build_skill_vocab
+    python -m tools.build_skill_vocab --mapping vector_databases/index.pkl --min-df 3 --no-embeddings
+
+Embeddings come from the rag encoder (VACALYSER_EMBEDDING_BACKEND); without
+them suggestions fall back to word overlap and document frequency.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import pickle
+import sys
+import time
+
+from src.utils.skill_vocab import MAX_DF_SHARE, MIN_DF, SKILL_VOCAB_PATH, SkillVocab, excerpt_texts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mapping", default="vector_databases/index.pkl")
+    parser.add_argument("--out", default=SKILL_VOCAB_PATH)
+    parser.add_argument("--min-df", type=int, default=MIN_DF)
+    parser.add_argument("--max-df-share", type=float, default=MAX_DF_SHARE)
+    parser.add_argument("--model", help="encoder model (default: the rag encoder's)")
+    parser.add_argument("--no-embeddings", action="store_true")
+    parser.add_argument("--show", type=int, default=20, help="print the most frequent phrases")
+    args = parser.parse_args(argv)
+
+    with open(args.mapping, "rb") as f:
+        mapping = pickle.load(f)
+    texts = list(excerpt_texts(mapping))
+    if not texts:
+        print(f"{args.mapping}: no entry has an 'excerpt' or 'text' field; nothing to build from.", file=sys.stderr)
+        return 1
+
+    encoder, model = None, ""
+    if not args.no_embeddings:
+        from src.utils.embeddings import EMBEDDING_MODEL_NAME, load_encoder
+        model = args.model or EMBEDDING_MODEL_NAME
+        encoder = load_encoder(model_name=model)
+    start = time.perf_counter()
+    vocab = SkillVocab.build(texts, encoder=encoder, model=model, min_df=args.min_df,
+                             max_df_share=args.max_df_share)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    vocab.save(args.out)
+    print(f"{len(vocab)} phrases from {len(texts)} documents in {time.perf_counter() - start:.1f}s "
+          f"→ {args.out} ({os.path.getsize(args.out) / 2**20:.1f} MiB)")
+    for phrase, df in vocab.top(args.show):
+        print(f"  {df:>6}  {phrase}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
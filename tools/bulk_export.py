@@ -0,0 +1,70 @@
+# tools/bulk_export.py
+"""
+Export many job specs at once into a zip archive (src/utils/bulk_export.py):
+one JSON / DOCX / PDF per spec, plus the generated job ad where there is one.
+
+Specs come from the saved wizard sessions (the session store's SQLite file,
+most recently saved first) or from a JSON-lines file with one spec per line.
+
+    python -m tools.bulk_export --out exports.zip
+    python -m tools.bulk_export --out exports.zip --formats pdf --limit 50
+    python -m tools.bulk_export --specs specs.jsonl --out exports.zip --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from typing import Iterator, Mapping
+
+from src.utils.bulk_export import CHUNK_SIZE, FORMATS, bulk_export
+from src.utils.session_store import SESSION_DB, SessionStore
+
+
+def _session_specs(db: str, limit: int) -> Iterator[Mapping]:
+    store = SessionStore(db)
+    for sid in store.session_ids()[:limit or None]:
+        yield store.load(sid)
+
+
+def _jsonl_specs(path: str, limit: int) -> Iterator[Mapping]:
+    with open(path, encoding="utf-8") as f:
+        n = 0
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+                n += 1
+                if n == limit:
+                    return
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="zip archive to write")
+    parser.add_argument("--specs", help="JSON-lines file of specs (default: saved sessions)")
+    parser.add_argument("--sessions", default=SESSION_DB, help="session store database")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="0 renders in-process")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="specs per worker task")
+    parser.add_argument("--limit", type=int, default=0, help="export at most this many specs")
+    args = parser.parse_args(argv)
+
+    if args.specs:
+        specs = _jsonl_specs(args.specs, args.limit)
+    elif os.path.exists(args.sessions):
+        specs = _session_specs(args.sessions, args.limit)
+    else:
+        print(f"no session store at {args.sessions}; pass --specs", file=sys.stderr)
+        return 1
+    tmp = f"{args.out}.tmp"
+    stats = bulk_export(specs, tmp, args.formats, args.workers, args.chunk_size)
+    os.replace(tmp, args.out)
+    print(f"{stats['specs']} specs, {stats['files']} files, {stats['bytes'] / 2**20:.1f} MiB rendered "
+          f"in {stats['seconds']:.1f} s ({stats['specs'] / max(stats['seconds'], 1e-9):.0f} specs/s) → {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# tools/export_embedding_model.py
+"""
+Export the mpnet sentence encoder for the ONNX embedding backends
+(src/utils/embeddings.py):
+
+  <out>/model.onnx        fp32 transformer, dynamic batch and sequence axes
+  <out>/model.int8.onnx   the same with int8 weights (onnxruntime dynamic quantisation)
+  <out>/tokenizer.json    plus encoder.json (max length, padding), so the
+                          runtime needs neither torch nor the hub
+
+After exporting, both files are checked against the original
+SentenceTransformer on a few sentences (cosine similarity of the embeddings).
+
+    python -m tools.export_embedding_model --out vector_databases/mpnet-onnx
+    VACALYSER_EMBEDDING_BACKEND=onnx-int8 streamlit run app.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import inspect
+import json
+import os
+import sys
+
+import numpy as np
+
+from src.utils.embeddings import (EMBEDDING_MODEL_NAME, ONNX_CONFIG_FILE, ONNX_DIR, ONNX_FILE, ONNX_INT8_FILE,
+                                  OnnxEncoder)
+
+PARITY_SENTENCES = [
+    "Senior Python developer with Kubernetes experience",
+    "Wir suchen eine Pflegefachkraft (m/w/d) in Teilzeit",
+    "Remote data engineer, Spark, Airflow, dbt",
+    "Key responsibilities: stakeholder management and roadmap planning",
+]
+
+
+def export(model_name: str, out_dir: str, opset: int = 14) -> None:
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer, tokenizer = st_model[0].auto_model.eval(), st_model.tokenizer
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, ONNX_CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump({"model": model_name, "max_seq_length": st_model.max_seq_length,
+                   "pad_token": tokenizer.pad_token, "pad_id": tokenizer.pad_token_id}, f, indent=2)
+
+    sample = tokenizer(PARITY_SENTENCES[:2], padding=True, return_tensors="pt")
+    names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+    axes = {n: {0: "batch", 1: "sequence"} for n in names}
+    axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    # TorchScript exporter: passes the inputs by name (MPNet's third positional argument is
+    # position_ids, not token_type_ids); newer torch defaults to the dynamo exporter instead
+    legacy = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(transformer, ({n: sample[n] for n in names},), os.path.join(out_dir, ONNX_FILE),
+                          input_names=names, output_names=["last_hidden_state"], dynamic_axes=axes,
+                          opset_version=opset, do_constant_folding=True, **legacy)
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(os.path.join(out_dir, ONNX_FILE), os.path.join(out_dir, ONNX_INT8_FILE),
+                     weight_type=QuantType.QInt8)
+
+
+def parity(model_name: str, out_dir: str) -> dict:
+    """Cosine similarity between the original embeddings and each exported variant."""
+    from sentence_transformers import SentenceTransformer
+
+    reference = SentenceTransformer(model_name, device="cpu").encode(PARITY_SENTENCES)
+    report = {}
+    for quantized in (False, True):
+        emb = OnnxEncoder(out_dir, quantized=quantized).encode(PARITY_SENTENCES)
+        cos = np.sum(reference * emb, axis=1) / (np.linalg.norm(reference, axis=1) * np.linalg.norm(emb, axis=1))
+        report["onnx-int8" if quantized else "onnx"] = float(cos.min())
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    parser.add_argument("--out", default=ONNX_DIR)
+    parser.add_argument("--opset", type=int, default=14)
+    parser.add_argument("--min-cosine", type=float, default=0.99,
+                        help="exit 1 if an export's embeddings fall below this similarity")
+    args = parser.parse_args(argv)
+
+    export(args.model, args.out, args.opset)
+    report = parity(args.model, args.out)
+    for backend, cos in report.items():
+        size = os.path.getsize(os.path.join(args.out, ONNX_INT8_FILE if backend == "onnx-int8" else ONNX_FILE))
+        print(f"{backend:<10} {size / 2**20:7.1f} MiB  min cosine vs original {cos:.5f}")
+    return 0 if min(report.values()) >= args.min_cosine else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+# tools/load_test.py
+"""
+Concurrent-session load generator for the wizard's LLM traffic.
+
+Each simulated session runs what a recruiter triggers in the wizard:
+  1. discovery   – "Analyze Sources" extraction prompt over a synthetic job ad
+  2. step 8      – target group analysis, job advertisement, interview prep
+
+Sessions run in parallel threads (Streamlit also runs each session in its own
+thread) against a backend entry point of your choice:
+
+    --entry service   src.services.llm_service.LLMService (provider via --provider)
+    --entry client    src.utils.openai_utils.LLMClient (OpenAI API)
+    --entry llama     functions.fetch_from_llama (Ollama API)
+
+By default an in-process stub server (tools/stub_llm_server.py) is started;
+pass --base-url to target an already running stub instead.
+
+    python -m tools.load_test --sessions 50 --concurrency 20 --latency-ms 300 --tokens-per-sec 40
+    python -m tools.load_test --entry client --sessions 20 --max-concurrency 8 --out load.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from tools.stub_llm_server import add_config_arguments, config_from_args, percentile, start_stub_server
+
+STEP8_TASKS = ("target_group_analysis", "job_ad", "interview_prep")
+
+
+def discovery_prompt(raw_text: str, keys: List[str]) -> str:
+    return (
+        f"Extract the following information from the job description below and return as JSON with these keys: {keys}.\n\n"
+        f"{raw_text}\n\nOutput JSON:"
+    )
+
+
+def step8_prompt(task: str, spec: Dict[str, str]) -> str:
+    if task == "target_group_analysis":
+        return (f"Position: {spec['job_title']}\nCompany: {spec.get('company_name', '')}\n"
+                f"Required Skills: {spec.get('must_have_skills', '')}\n"
+                "Provide an analysis of the target candidate group for this position, including the ideal "
+                "candidate profile (background, experience, skills, motivations) and how to attract them.")
+    if task == "job_ad":
+        return (f"Write a job advertisement for the following position:\nJob Title: {spec['job_title']}\n"
+                f"Role Description: {spec.get('role_description', '')}\n"
+                f"Key Responsibilities: {spec.get('key_responsibilities', '')}\n"
+                "The ad should be engaging and include a brief company intro, role responsibilities, required "
+                "qualifications, any benefits, and a call to action.")
+    return (f"You are preparing to interview candidates for the position of {spec['job_title']}. "
+            "Create an interview preparation guide for the interviewer with 5-10 key questions.\n"
+            f"Must-Have Skills: {spec.get('must_have_skills', '')}\n")
+
+
+def build_backend(entry: str, provider: str, base_url: str, model: str) -> Callable[..., str]:
+    """
+    Return call(prompt, max_tokens, schema=None) -> text for the chosen entry point,
+    pointed at base_url. The client entry point has no schema support and ignores it.
+    """
+    os.environ["OLLAMA_API_URL"] = base_url
+    os.environ["OPENAI_BASE_URL"] = f"{base_url}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-load-test-placeholder")
+
+    if entry == "service":
+        from src.services.llm_service import LLMService
+        svc = LLMService(provider=provider, ollama_api_url=base_url, ollama_model=model, openai_model=model)
+        return lambda prompt, max_tokens, schema=None: svc.complete(prompt=prompt, max_tokens=max_tokens, schema=schema)
+    if entry == "client":
+        from src.utils.openai_utils import LLMClient
+        client = LLMClient(provider="openai", openai_model=model)
+        return lambda prompt, max_tokens, schema=None: client.chat(prompt, max_tokens=max_tokens)
+    if entry == "llama":
+        from functions import fetch_from_llama
+        return lambda prompt, max_tokens, schema=None: fetch_from_llama(prompt, model=model, format=schema)
+    raise ValueError(f"unknown entry point: {entry}")
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.session_times: List[float] = []
+        self.client_queue: List[float] = []
+        self.errors: Dict[str, int] = {}
+
+    def request(self, stage: str, seconds: float, ok: bool):
+        with self._lock:
+            self.latencies.setdefault(stage, []).append(seconds)
+            if not ok:
+                self.errors[stage] = self.errors.get(stage, 0) + 1
+
+    def session(self, queued: float, total: float):
+        with self._lock:
+            self.client_queue.append(queued)
+            self.session_times.append(total)
+
+
+def run_session(call: Callable[..., str], session_id: int, scheduled_at: float,
+                rec: Recorder, keys: List[str], structured: bool = False) -> None:
+    from benchmarks import corpus
+    from src.utils import structured_output
+    from src.utils.llm_metrics import llm_task
+
+    def discover(prompt: str, max_tokens: int) -> bool:
+        # Same validate-and-repair path as the wizard; only the schema is optional.
+        fields, _ = structured_output.extract(
+            prompt, keys, lambda p, schema: call(p, max_tokens, schema if structured else None))
+        return bool(fields)
+
+    started = time.perf_counter()
+    raw_text = corpus.job_ad_text("small", seed=session_id)
+    spec = corpus.spec_dict(seed=session_id)
+    steps = [("discovery", discovery_prompt(raw_text, keys), 512)]
+    steps += [(task, step8_prompt(task, spec), 256) for task in STEP8_TASKS]
+    for stage, prompt, max_tokens in steps:
+        t0 = time.perf_counter()
+        ok = True
+        try:
+            with llm_task(stage):
+                ok = discover(prompt, max_tokens) if stage == "discovery" else bool(call(prompt, max_tokens))
+        except Exception:
+            ok = False
+        rec.request(stage, time.perf_counter() - t0, ok)
+    rec.session(started - scheduled_at, time.perf_counter() - started)
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered) if ordered else 0.0,
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1] if ordered else 0.0,
+    }
+
+
+def _server_stats(base_url: str, reset: bool = False) -> Dict:
+    path = "/stats/reset" if reset else "/stats"
+    req = urllib.request.Request(f"{base_url}{path}", data=b"{}" if reset else None, method="POST" if reset else "GET")
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return json.loads(resp.read())
+    except Exception:
+        return {}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=0, help="parallel sessions (default: all)")
+    parser.add_argument("--arrival-ms", type=float, default=0.0, help="gap between session arrivals")
+    parser.add_argument("--entry", choices=["service", "client", "llama"], default="service")
+    parser.add_argument("--provider", choices=["ollama", "openai"], default="ollama")
+    parser.add_argument("--model", default="llama3.2:3b")
+    parser.add_argument("--base-url", help="use a running stub/server instead of starting one")
+    parser.add_argument("--structured", action="store_true",
+                        help="send the field schema with discovery requests (OpenAI response_format / Ollama format)")
+    parser.add_argument("--out", help="write the report as JSON")
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = start_stub_server(config_from_args(args))
+        base_url = server.url
+    _server_stats(base_url, reset=True)
+
+    from src.config.keys import STEP_KEYS
+    from src.utils import llm_metrics, structured_output
+    keys = [k for step in range(2, 9) for k in STEP_KEYS[step]]
+    call = build_backend(args.entry, args.provider, base_url, args.model)
+    rec = Recorder()
+    workers = args.concurrency or args.sessions
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i in range(args.sessions):
+            pool.submit(run_session, call, i, time.perf_counter(), rec, keys, args.structured)
+            if args.arrival_ms:
+                time.sleep(args.arrival_ms / 1000)
+    wall = time.perf_counter() - wall_start
+
+    n_requests = sum(len(v) for v in rec.latencies.values())
+    report = {
+        "config": {"sessions": args.sessions, "concurrency": workers, "entry": args.entry,
+                   "provider": args.provider, "base_url": base_url, "structured": args.structured},
+        "wall_seconds": wall,
+        "throughput": {"sessions_per_sec": args.sessions / wall, "requests_per_sec": n_requests / wall},
+        "session_latency": _summary(rec.session_times),
+        "client_queue_wait": _summary(rec.client_queue),
+        "request_latency": {stage: _summary(v) for stage, v in rec.latencies.items()},
+        "errors": rec.errors,
+        "server": _server_stats(base_url),
+        "llm_metrics": llm_metrics.snapshot(),
+        "structured_output": {
+            "parse_failure_rate": structured_output.parse_failure_rate("discovery"),
+            "repair_round_trips": llm_metrics.counter_value("structured_repair_round_trips_total"),
+        },
+        "resilience": {
+            "retries": llm_metrics.counter_value("llm_retries_total"),
+            "throttle_seconds": {reason: llm_metrics.counter_value("llm_throttle_seconds_total", reason=reason)
+                                 for reason in ("rate_limiter", "retry_after", "backoff")},
+            "circuit_rejections": llm_metrics.counter_value("llm_circuit_rejections_total"),
+        },
+    }
+
+    print(f"{args.sessions} sessions / {n_requests} requests in {wall:.2f}s  "
+          f"→ {report['throughput']['sessions_per_sec']:.2f} sessions/s, "
+          f"{report['throughput']['requests_per_sec']:.2f} req/s")
+    print(f"session latency  p50 {report['session_latency']['p50']:.2f}s  p99 {report['session_latency']['p99']:.2f}s")
+    print(f"client queueing  p50 {report['client_queue_wait']['p50']:.2f}s  p99 {report['client_queue_wait']['p99']:.2f}s")
+    if report["server"]:
+        print(f"server queueing  p50 {report['server']['queue_wait_p50']:.2f}s  "
+              f"p99 {report['server']['queue_wait_p99']:.2f}s  (max in flight {report['server']['max_in_flight']})")
+    print(f"discovery parse failures {report['structured_output']['parse_failure_rate']:.1%}  "
+          f"repair round trips {report['structured_output']['repair_round_trips']:.0f}")
+    res = report["resilience"]
+    print(f"retries {res['retries']:.0f}  throttled "
+          + "  ".join(f"{k} {v:.1f}s" for k, v in res["throttle_seconds"].items())
+          + f"  circuit rejections {res['circuit_rejections']:.0f}"
+          + (f"  server 429s {report['server'].get('throttled', 0)}" if report["server"] else ""))
+    for stage, s in report["request_latency"].items():
+        print(f"  {stage:<24} p50 {s['p50']:.2f}s  p95 {s['p95']:.2f}s  p99 {s['p99']:.2f}s  errors {rec.errors.get(stage, 0)}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if server:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# tools/shard_index.py
+"""
+Split an existing single-file index (index.faiss + index.pkl) into a shard
+set (src/utils/sharded_index.py) without re-encoding anything.
+
+    python -m tools.shard_index --shards 8
+    python -m tools.shard_index --partition tenant --key-field category
+    python -m tools.shard_index --index vector_bases/job_index.faiss --mapping vector_bases/job_vectors.pkl \\
+        --out vector_bases/shards --key-field id
+
+rag_helpers uses VACALYSER_SHARDS_DIR (default vector_databases/shards) as
+soon as it holds a shard set; vector_store uses vector_bases/shards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import pickle
+import sys
+import time
+
+from src.utils.sharded_index import PARTITIONS, write_shards
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index", default="vector_databases/index.faiss")
+    parser.add_argument("--mapping", default="vector_databases/index.pkl")
+    parser.add_argument("--out", default="vector_databases/shards")
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--partition", choices=PARTITIONS, default="hash")
+    parser.add_argument("--key-field", default="file_name", help="mapping field hashed / used as tenant")
+    parser.add_argument("--factory", default="Flat", help="faiss.index_factory string for each shard")
+    args = parser.parse_args(argv)
+
+    import faiss
+
+    start = time.perf_counter()
+    index = faiss.read_index(args.index)
+    with open(args.mapping, "rb") as f:
+        mapping = pickle.load(f)
+    if isinstance(mapping, list):  # vector_store keeps a positional list
+        mapping = dict(enumerate(mapping))
+    if len(mapping) != index.ntotal:
+        print(f"{args.mapping} has {len(mapping)} entries but {args.index} has {index.ntotal} vectors",
+              file=sys.stderr)
+        return 1
+    vectors = index.reconstruct_n(0, index.ntotal)
+    metric = "ip" if index.metric_type == faiss.METRIC_INNER_PRODUCT else "l2"
+    manifest = write_shards(vectors, {int(k): v for k, v in mapping.items()}, args.out, n_shards=args.shards,
+                            partition=args.partition, key_field=args.key_field, factory=args.factory,
+                            metric=metric)
+    print(f"{index.ntotal} vectors → {len(manifest['shards'])} shards in {args.out} "
+          f"(generation {manifest['generation']}, {time.perf_counter() - start:.1f}s)")
+    for entry in manifest["shards"]:
+        print(f"  {entry['index']:<24} {entry['count']:>9}" + (f"  {entry['tenant']}" if "tenant" in entry else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,543 @@
+# tools/stub_llm_server.py
+"""
+Local stand-in for Ollama and the OpenAI Chat Completions API, for load tests.
+
+Implements:
+  POST /api/generate          Ollama generate (stream=true → NDJSON, default like Ollama)
+  GET  /api/tags              Ollama model list
+  POST /v1/chat/completions   OpenAI chat (stream=true → SSE chunks)
+  GET  /v1/models             OpenAI model list
+  GET  /stats                 server-side counters incl. queue wait percentiles
+  POST /stats/reset
+
+Latency model: a request first waits for one of --max-concurrency slots (queueing,
+like a single Ollama runner), then sleeps --latency-ms ± --jitter-ms plus the
+prompt tokens not covered by the prefix cache at --prefill-tokens-per-sec (time to
+first token), then emits tokens at --tokens-per-sec.
+
+Prefix cache model: Ollama keeps the tokens of the last prompt in each runner
+slot and only evaluates what follows the longest common prefix (prompt_eval_count
+reports those tokens); a request `context` is decoded back into tokens in front
+of the prompt. OpenAI serves prefixes of 1024+ tokens in 128-token steps from
+its prompt cache and reports them as usage.prompt_tokens_details.cached_tokens.
+
+Failure model: --error-rate answers that fraction with HTTP 500; --rpm-limit
+answers requests beyond that many per minute with HTTP 429 and a Retry-After
+header, like an account rate limit. --slow-rate stalls that fraction of requests
+for an extra --slow-ms before the first token (a busy or swapping local model).
+
+    python -m tools.stub_llm_server --port 11434 --latency-ms 300 --tokens-per-sec 40
+    OLLAMA_API_URL=http://127.0.0.1:11434 OPENAI_BASE_URL=http://127.0.0.1:11434/v1 streamlit run app.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_LOREM = (
+    "We are looking for a motivated professional to join our growing team and help "
+    "shape products used by thousands of customers every day while learning from "
+    "experienced colleagues in a supportive hybrid environment"
+).split()
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 200.0          # time to first token
+    jitter_ms: float = 50.0
+    tokens_per_sec: float = 50.0       # 0 → emit everything at once
+    completion_tokens: int = 64
+    max_concurrency: int = 1           # Ollama serves one request per runner by default
+    error_rate: float = 0.0            # fraction of requests answered with HTTP 500
+    malformed_rate: float = 0.0        # fraction of unconstrained JSON replies cut off mid-object
+    prefill_tokens_per_sec: float = 0.0  # prompt processing rate for uncached tokens; 0 → free
+    prefix_cache: bool = True
+    rpm_limit: float = 0.0             # requests per minute before HTTP 429; 0 → unlimited
+    slow_rate: float = 0.0             # fraction of requests that stall before the first token …
+    slow_ms: float = 10000.0           # … for this much extra time (a busy or swapping local model)
+    seed: Optional[int] = None
+
+
+class StubStats:
+    """Thread-safe request counters and queue-wait samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with getattr(self, "_lock", threading.Lock()):
+            self.requests: Dict[str, int] = {}
+            self.errors = 0
+            self.in_flight = 0
+            self.max_in_flight = 0
+            self.queue_waits: List[float] = []
+            self.throttled = 0
+            self.prompt_tokens = 0
+            self.cached_prompt_tokens = 0
+            self.prefill_seconds = 0.0
+            self.completion_tokens = 0
+
+    def start(self, endpoint: str):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def finish(self, queue_wait: float, prompt_tokens: int, completion_tokens: int, error: bool,
+               cached_tokens: int = 0, prefill_seconds: float = 0.0):
+        with self._lock:
+            self.in_flight -= 1
+            self.queue_waits.append(queue_wait)
+            self.prompt_tokens += prompt_tokens
+            self.cached_prompt_tokens += cached_tokens
+            self.prefill_seconds += prefill_seconds
+            self.completion_tokens += completion_tokens
+            self.errors += int(error)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            waits = sorted(self.queue_waits)
+            return {
+                "requests": dict(self.requests),
+                "errors": self.errors,
+                "throttled": self.throttled,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_prompt_tokens": self.cached_prompt_tokens,
+                "prefill_seconds": self.prefill_seconds,
+                "completion_tokens": self.completion_tokens,
+                "queue_wait_p50": percentile(waits, 50),
+                "queue_wait_p99": percentile(waits, 99),
+                "queue_wait_max": waits[-1] if waits else 0.0,
+            }
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 for empty input)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class Vocab:
+    """Word-level token ids, so Ollama `context` arrays can be decoded again."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        self._words: List[str] = []
+
+    def encode(self, text: str) -> List[int]:
+        with self._lock:
+            out = []
+            for word in text.split():
+                i = self._ids.get(word)
+                if i is None:
+                    i = self._ids[word] = len(self._words)
+                    self._words.append(word)
+                out.append(i)
+            return out
+
+    def decode(self, ids: List[int]) -> str:
+        with self._lock:
+            return " ".join(self._words[i] for i in ids if isinstance(i, int) and 0 <= i < len(self._words))
+
+
+class PrefixCache:
+    """
+    Remembers recent prompts as token-id tuples and reports how many leading
+    tokens of a new prompt are already cached. `entries` is the number of
+    cached prompts (Ollama: one per runner slot); `min_tokens`/`step` model
+    OpenAI's 1024-token minimum and 128-token granularity.
+    """
+
+    def __init__(self, entries: int, min_tokens: int = 0, step: int = 1):
+        self.entries = max(1, entries)
+        self.min_tokens = min_tokens
+        self.step = max(1, step)
+        self._lock = threading.Lock()
+        self._cached: List[Tuple[int, ...]] = []   # most recently used last
+
+    @staticmethod
+    def _common(a: Tuple[int, ...], b: List[int]) -> int:
+        n = min(len(a), len(b))
+        i = 0
+        while i < n and a[i] == b[i]:
+            i += 1
+        return i
+
+    def lookup(self, ids: List[int]) -> int:
+        """Cached prefix length for `ids`; the prompt then replaces its best-matching entry."""
+        with self._lock:
+            best, best_len = None, 0
+            for pos, entry in enumerate(self._cached):
+                n = self._common(entry, ids)
+                if n > best_len:
+                    best, best_len = pos, n
+            if best is not None:
+                self._cached.pop(best)
+            elif len(self._cached) >= self.entries:
+                self._cached.pop(0)
+            self._cached.append(tuple(ids))
+        if best_len < self.min_tokens:
+            return 0
+        return best_len // self.step * self.step
+
+
+def _schema_keys(req: Dict) -> Optional[List[str]]:
+    """Property names of a JSON schema sent as Ollama `format` or OpenAI `response_format`."""
+    fmt = req.get("format")
+    if isinstance(fmt, dict):
+        return list((fmt.get("properties") or {}).keys())
+    rf = req.get("response_format") or {}
+    if rf.get("type") == "json_schema":
+        return list(((rf.get("json_schema") or {}).get("schema") or {}).get("properties", {}).keys())
+    return None
+
+
+def _reply_tokens(prompt: str, n: int, rng: random.Random, req: Optional[Dict] = None,
+                  malformed_rate: float = 0.0, limit: Optional[int] = None) -> List[str]:
+    """
+    Build the reply as a token list. Prompts that ask for JSON get a JSON object
+    whose keys are the quoted identifiers found in the prompt (the wizard lists them),
+    or the schema's properties when the request is schema-constrained. JSON replies
+    stop at the request's token `limit` like a real model would (constrained or not),
+    and unconstrained ones are cut off mid-object with probability `malformed_rate`.
+    """
+    req = req or {}
+    schema_keys = _schema_keys(req)
+    constrained = schema_keys is not None or req.get("format") == "json" or \
+        (req.get("response_format") or {}).get("type") == "json_object"
+    if schema_keys is not None or "json" in prompt.lower():
+        keys = schema_keys or list(dict.fromkeys(re.findall(r"['\"]([a-z][a-z0-9_]{2,})['\"]", prompt))) or ["job_title"]
+        body = json.dumps({k: f"stub {k.replace('_', ' ')}" for k in keys})
+        tokens = re.findall(r"\S+\s*", body)
+        if not constrained and malformed_rate and rng.random() < malformed_rate:
+            tokens = tokens[: max(1, len(tokens) * 3 // 5)]
+        return tokens[:limit] if limit else tokens
+    return [rng.choice(_LOREM) + " " for _ in range(n)]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StubLLMServer"
+
+    # ------------------------------------------------------------------ helpers
+    def log_message(self, *args):
+        pass
+
+    def _json(self, code: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b"{}"
+        try:
+            return json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            return {}
+
+    def _start_chunked(self, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_chunked(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    # ------------------------------------------------------------------ routing
+    def do_GET(self):  # noqa: N802
+        if self.path.startswith("/stats"):
+            self._json(200, self.server.stats.snapshot())
+        elif self.path.startswith("/api/tags"):
+            self._json(200, {"models": [{"name": "llama3.2:3b"}]})
+        elif self.path.startswith("/v1/models"):
+            self._json(200, {"object": "list", "data": [{"id": "gpt-4o", "object": "model"}]})
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_POST(self):  # noqa: N802
+        if self.path.startswith("/stats/reset"):
+            self._read_json()
+            self.server.stats.reset()
+            self._json(200, {"ok": True})
+        elif self.path.startswith("/api/generate"):
+            self._handle_stream(self._ollama_generate, self._read_json())
+        elif self.path.startswith("/v1/chat/completions"):
+            self._handle_stream(self._openai_chat, self._read_json())
+        else:
+            self._read_json()
+            self._json(404, {"error": "not found"})
+
+    def _handle_stream(self, endpoint, req: Dict):
+        retry_after = self.server.admit()
+        if retry_after is not None:
+            self._json(429, {"error": {"message": "stub: rate limit reached", "type": "requests"}},
+                       headers={"Retry-After": f"{retry_after:.0f}", "retry-after-ms": f"{retry_after * 1000:.0f}"})
+            return
+        # Clients may hang up mid-stream (early-stopping extraction); that is not an error.
+        try:
+            endpoint(req)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    # ------------------------------------------------------------------ endpoints
+    def _ollama_generate(self, req: Dict):
+        vocab = self.server.vocab
+        context = [i for i in req.get("context") or [] if isinstance(i, int)]
+        prompt = req.get("prompt", "")
+        ids = context + vocab.encode(prompt)
+        if context:
+            prompt = vocab.decode(context) + " " + prompt
+        limit = (req.get("options") or {}).get("num_predict")  # like Ollama: top-level num_predict is ignored
+        n_predict = int(limit or self.server.config.completion_tokens)
+        stream = req.get("stream", True)
+        model = req.get("model", "llama3.2:3b")
+
+        with self.server.request_slot("ollama") as slot:
+            if slot.failed:
+                self._json(500, {"error": "stub: injected failure"})
+                return
+            cached = slot.prefill(ids, self.server.kv_cache)
+            tokens = _reply_tokens(prompt, min(n_predict, self.server.config.completion_tokens), slot.rng,
+                                   req, self.server.config.malformed_rate, int(limit) if limit else None)
+            slot.account(len(ids), len(tokens))
+            done_payload = {
+                "model": model, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ"), "response": "",
+                "done": True, "done_reason": "stop",
+                "context": ids + vocab.encode("".join(tokens)),
+                "prompt_eval_count": len(ids) - cached, "eval_count": len(tokens),
+                "prompt_eval_duration": int(slot.first_token_delay * 1e9),
+                "total_duration": 0, "load_duration": 0, "eval_duration": 0,
+            }
+            if stream:
+                self._start_chunked("application/x-ndjson")
+                for tok in slot.emit(tokens):
+                    self._chunk((json.dumps({"model": model, "response": tok, "done": False}) + "\n").encode())
+                done_payload["total_duration"] = int(slot.elapsed() * 1e9)
+                self._chunk((json.dumps(done_payload) + "\n").encode())
+                self._end_chunked()
+            else:
+                text = "".join(slot.emit(tokens))
+                done_payload.update(response=text, total_duration=int(slot.elapsed() * 1e9))
+                self._json(200, done_payload)
+
+    def _openai_chat(self, req: Dict):
+        messages = req.get("messages") or []
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        limit = req.get("max_tokens") or req.get("max_completion_tokens")
+        max_tokens = int(limit or self.server.config.completion_tokens)
+        model = req.get("model", "gpt-4o")
+        stream = bool(req.get("stream"))
+        cid = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+        with self.server.request_slot("openai") as slot:
+            if slot.failed:
+                self._json(500, {"error": {"message": "stub: injected failure", "type": "server_error"}})
+                return
+            ids = self.server.vocab.encode(prompt)
+            cached = slot.prefill(ids, self.server.prompt_cache)
+            tokens = _reply_tokens(prompt, min(max_tokens, self.server.config.completion_tokens), slot.rng,
+                                   req, self.server.config.malformed_rate, int(limit) if limit else None)
+            usage = {"prompt_tokens": len(ids), "completion_tokens": len(tokens),
+                     "total_tokens": len(ids) + len(tokens),
+                     "prompt_tokens_details": {"cached_tokens": cached}}
+            slot.account(usage["prompt_tokens"], usage["completion_tokens"])
+            if stream:
+                self._start_chunked("text/event-stream")
+                for tok in slot.emit(tokens):
+                    chunk = {"id": cid, "object": "chat.completion.chunk", "created": int(time.time()),
+                             "model": model, "choices": [{"index": 0, "delta": {"content": tok},
+                                                          "finish_reason": None}]}
+                    self._chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+                final = {"id": cid, "object": "chat.completion.chunk", "created": int(time.time()),
+                         "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                         "usage": usage}
+                self._chunk(f"data: {json.dumps(final)}\n\n".encode())
+                self._chunk(b"data: [DONE]\n\n")
+                self._end_chunked()
+            else:
+                text = "".join(slot.emit(tokens))
+                self._json(200, {
+                    "id": cid, "object": "chat.completion", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                                 "finish_reason": "stop"}],
+                    "usage": usage,
+                })
+
+
+class _Slot:
+    """Context object for one admitted request: timing, RNG and accounting."""
+
+    def __init__(self, server: "StubLLMServer", endpoint: str):
+        self.server = server
+        self.endpoint = endpoint
+        self.rng = random.Random(None if server.config.seed is None else server.config.seed + id(self))
+        self.queue_wait = 0.0
+        self.first_token_delay = 0.0
+        self.failed = False
+        self.cached_tokens = 0
+        self.prefill_seconds = 0.0
+        self._tokens = (0, 0)
+        self._admitted_at = 0.0
+
+    def __enter__(self):
+        cfg = self.server.config
+        self.server.stats.start(self.endpoint)
+        queued_at = time.perf_counter()
+        self.server.slots.acquire()
+        self._admitted_at = time.perf_counter()
+        self.queue_wait = self._admitted_at - queued_at
+        self.failed = self.rng.random() < cfg.error_rate
+        self.first_token_delay = max(0.0, (cfg.latency_ms + self.rng.uniform(-cfg.jitter_ms, cfg.jitter_ms)) / 1000)
+        if self.rng.random() < cfg.slow_rate:
+            self.first_token_delay += cfg.slow_ms / 1000
+        return self
+
+    def __exit__(self, *exc):
+        self.server.slots.release()
+        self.server.stats.finish(self.queue_wait, *self._tokens, error=self.failed or exc[0] is not None,
+                                 cached_tokens=self.cached_tokens, prefill_seconds=self.prefill_seconds)
+        return False
+
+    def prefill(self, ids: List[int], cache: "PrefixCache") -> int:
+        """Look the prompt up in `cache`; uncached tokens add to the first-token delay."""
+        cfg = self.server.config
+        self.cached_tokens = cache.lookup(ids) if cfg.prefix_cache else 0
+        if cfg.prefill_tokens_per_sec > 0:
+            self.prefill_seconds = (len(ids) - self.cached_tokens) / cfg.prefill_tokens_per_sec
+            self.first_token_delay += self.prefill_seconds
+        return self.cached_tokens
+
+    def account(self, prompt_tokens: int, completion_tokens: int):
+        self._tokens = (prompt_tokens, completion_tokens)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._admitted_at
+
+    def emit(self, tokens: List[str]) -> Iterator[str]:
+        """Yield tokens paced by the configured first-token delay and token rate."""
+        time.sleep(self.first_token_delay)
+        rate = self.server.config.tokens_per_sec
+        for tok in tokens:
+            if rate > 0:
+                time.sleep(1.0 / rate)
+            yield tok
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default backlog (5) refuses bursts of simultaneous callers
+
+    def __init__(self, address: Tuple[str, int], config: StubConfig):
+        super().__init__(address, _StubHandler)
+        self.config = config
+        self.stats = StubStats()
+        self.slots = threading.BoundedSemaphore(max(1, config.max_concurrency))
+        self.vocab = Vocab()
+        self.kv_cache = PrefixCache(entries=config.max_concurrency)
+        self.prompt_cache = PrefixCache(entries=256, min_tokens=1024, step=128)
+        self._rpm_lock = threading.Lock()
+        self._rpm_tokens = max(1.0, config.rpm_limit / 60.0)
+        self._rpm_stamp = time.monotonic()
+
+    def admit(self) -> Optional[float]:
+        """None if the request is within --rpm-limit, else seconds until it would be."""
+        rate = self.config.rpm_limit / 60.0
+        if rate <= 0:
+            return None
+        with self._rpm_lock:
+            now = time.monotonic()
+            burst = max(1.0, rate)
+            self._rpm_tokens = min(burst, self._rpm_tokens + (now - self._rpm_stamp) * rate)
+            self._rpm_stamp = now
+            if self._rpm_tokens >= 1.0:
+                self._rpm_tokens -= 1.0
+                return None
+        with self.stats._lock:
+            self.stats.throttled += 1
+        return (1.0 - self._rpm_tokens) / rate
+
+    def request_slot(self, endpoint: str) -> _Slot:
+        return _Slot(self, endpoint)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub_server(config: Optional[StubConfig] = None, host: str = "127.0.0.1",
+                      port: int = 0) -> StubLLMServer:
+    """Start a stub server in a daemon thread (port 0 → pick a free port)."""
+    server = StubLLMServer((host, port), config or StubConfig())
+    threading.Thread(target=server.serve_forever, name="stub-llm", daemon=True).start()
+    return server
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """Shared CLI flags for the stub latency model (also used by the load generator)."""
+    parser.add_argument("--latency-ms", type=float, default=StubConfig.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=StubConfig.jitter_ms)
+    parser.add_argument("--tokens-per-sec", type=float, default=StubConfig.tokens_per_sec)
+    parser.add_argument("--completion-tokens", type=int, default=StubConfig.completion_tokens)
+    parser.add_argument("--max-concurrency", type=int, default=StubConfig.max_concurrency)
+    parser.add_argument("--error-rate", type=float, default=StubConfig.error_rate)
+    parser.add_argument("--malformed-rate", type=float, default=StubConfig.malformed_rate)
+    parser.add_argument("--prefill-tokens-per-sec", type=float, default=StubConfig.prefill_tokens_per_sec)
+    parser.add_argument("--no-prefix-cache", dest="prefix_cache", action="store_false")
+    parser.add_argument("--rpm-limit", type=float, default=StubConfig.rpm_limit)
+    parser.add_argument("--slow-rate", type=float, default=StubConfig.slow_rate)
+    parser.add_argument("--slow-ms", type=float, default=StubConfig.slow_ms)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, tokens_per_sec=args.tokens_per_sec,
+        completion_tokens=args.completion_tokens, max_concurrency=args.max_concurrency,
+        error_rate=args.error_rate, malformed_rate=args.malformed_rate,
+        prefill_tokens_per_sec=args.prefill_tokens_per_sec, prefix_cache=args.prefix_cache,
+        rpm_limit=args.rpm_limit, slow_rate=args.slow_rate, slow_ms=args.slow_ms, seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    srv = StubLLMServer((args.host, args.port), config_from_args(args))
+    print(f"Stub LLM server listening on {srv.url}  (Ollama: {srv.url}, OpenAI: {srv.url}/v1)")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
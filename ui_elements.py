@@ -7,7 +7,11 @@ from functions import (
     safe_int
 )
 from llm_choice import get_llm
-from rag_helpers import search_faiss
+from src.utils.llm_metrics import llm_task
+from src.utils.resilience import LLMError
+from rag_helpers import search_faiss, suggest_skills
+from src.components.drag_drop_skills import skill_autocomplete
+from src.utils.fragments import fragment, rerun_fragment
 from prompts import generate_job_ad, generate_interview_guide
 from ui_styling import apply_base_styling
 
@@ -367,11 +371,15 @@ def role_description_page():
             st.session_state["current_section"] += 1
             st.rerun()
 
-def rag_suggestions(query_text: str):
+def rag_suggestions(query_text: str, top_k: int = 15):
     """
-    Attempt to retrieve tokens from local FAISS index. 
-    We'll do a search for 'query_text', then parse the 'excerpt' field.
+    Ranked skill phrases for 'query_text' from the precomputed vocabulary
+    (python -m tools.build_skill_vocab). Without one, we fall back to
+    a FAISS search and parse the 'excerpt' field.
     """
+    phrases = suggest_skills(query_text, top_k=top_k)
+    if phrases is not None:
+        return phrases
     results = search_faiss(query_text, top_k=3)
     tokens = []
     for res in results:
@@ -446,10 +454,15 @@ def task_scope_page():
             jt = get_from_session_state("job_title","some role")
             prompt = f"List 8 relevant tasks for a {jt}, short bullet form."
             llm = get_llm()
-            resp = llm(prompt)
-            st.write("**LLM Tasks (raw):**")
-            st.write(resp)
-            st.info("Copy/paste or manually add above, or parse them further if desired.")
+            try:
+                with llm_task("task_suggestions"):
+                    resp = llm(prompt)
+            except LLMError as e:
+                st.error(f"LLM request failed: {e}")
+            else:
+                st.write("**LLM Tasks (raw):**")
+                st.write(resp)
+                st.info("Copy/paste or manually add above, or parse them further if desired.")
 
     st.markdown("---")
     st.subheader("Autonomy Level")
@@ -474,6 +487,43 @@ def task_scope_page():
 #-----------------------------------
 # 6) REQUIRED SKILLS & COMPETENCIES
 #-----------------------------------
+_SKILL_BUCKETS = [
+    # (state key, label used in headings and buttons, autocomplete prompt)
+    ("must_have_hard", "Must-Have Hard", "Add Hard Skill to Must-Have:"),
+    ("must_have_soft", "Must-Have Soft", "Add Soft Skill to Must-Have:"),
+    ("nice_have_hard", "Nice-to-Have Hard", "Add Hard Skill to Nice-to-Have:"),
+    ("nice_have_soft", "Nice-to-Have Soft", "Add Soft Skill to Nice-to-Have:"),
+]
+
+def _skill_set(key):
+    return set([s.strip() for s in get_from_session_state(key, "").split(",") if s.strip()])
+
+@fragment
+def _skill_bucket(key, label, prompt):
+    """One skill category with its remove/add buttons; a click reruns only this bucket."""
+    skills = _skill_set(key)
+    chosen = set().union(*(_skill_set(k) for k, _, _ in _SKILL_BUCKETS))  # not offered again as completions
+
+    st.subheader(f"{label} Skills")
+    if skills:
+        st.caption(f"Click any skill to remove it from {label}.")
+        for skill in list(skills):
+            if st.button(f"Remove '{skill}' from {label}"):
+                skills.discard(skill)
+                store_in_state(key, ", ".join(skills))
+                rerun_fragment()
+
+    new_skill, picked = skill_autocomplete(prompt, key=f"add_{key.replace('_have', '')}", exclude=chosen)
+    if picked:
+        skills.add(picked)
+        store_in_state(key, ", ".join(skills))
+        rerun_fragment()
+    if st.button(f"Add {label}"):
+        if new_skill.strip():
+            skills.add(new_skill.strip())
+            store_in_state(key, ", ".join(skills))
+            rerun_fragment()
+
 def skills_competencies_page():
     apply_base_styling()
     show_sidebar_links()
@@ -486,13 +536,7 @@ def skills_competencies_page():
     """)
 
     # Must-Have Hard
-    must_hard_raw = set([s.strip() for s in get_from_session_state("must_have_hard","").split(",") if s.strip()])
-    # Must-Have Soft
-    must_soft_raw = set([s.strip() for s in get_from_session_state("must_have_soft","").split(",") if s.strip()])
-    # Nice-Have Hard
-    nice_hard_raw = set([s.strip() for s in get_from_session_state("nice_have_hard","").split(",") if s.strip()])
-    # Nice-Have Soft
-    nice_soft_raw = set([s.strip() for s in get_from_session_state("nice_have_soft","").split(",") if s.strip()])
+    must_hard_raw = _skill_set("must_have_hard")
 
     colA, colB = st.columns([1,1])
     with colA:
@@ -503,9 +547,14 @@ def skills_competencies_page():
             else:
                 prompt = "List the top 10 short skills: 5 Hard, 5 Soft. Each as one line."
             llm = get_llm()
-            ans = llm(prompt)
-            st.markdown("**LLM Suggestions (raw):**")
-            st.write(ans)
+            try:
+                with llm_task("skill_suggestions"):
+                    ans = llm(prompt)
+            except LLMError as e:
+                st.error(f"LLM request failed: {e}")
+            else:
+                st.markdown("**LLM Suggestions (raw):**")
+                st.write(ans)
 
     with colB:
         st.write("**Or get Skills from local CV index** (FAISS search).")
@@ -522,78 +571,9 @@ def skills_competencies_page():
                         store_in_state("must_have_hard", ", ".join(must_hard_raw))
                         st.rerun()
 
-    st.markdown("---")
-
-    # Must-Have Hard
-    st.subheader("Must-Have Hard Skills")
-    if must_hard_raw:
-        st.caption("Currently assigned Must-Have Hard Skills. Click to remove.")
-        for skill in list(must_hard_raw):
-            if st.button(f"Remove '{skill}' from Must-Have Hard"):
-                must_hard_raw.discard(skill)
-                store_in_state("must_have_hard", ", ".join(must_hard_raw))
-                st.rerun()
-
-    new_must_hard = st.text_input("Add Hard Skill to Must-Have:")
-    if st.button("Add Must-Have Hard"):
-        if new_must_hard.strip():
-            must_hard_raw.add(new_must_hard.strip())
-            store_in_state("must_have_hard", ", ".join(must_hard_raw))
-            st.rerun()
-
-    st.markdown("---")
-    # Must-Have Soft
-    st.subheader("Must-Have Soft Skills")
-    if must_soft_raw:
-        st.caption("Click any skill to remove it from Must-Have Soft.")
-        for skill in list(must_soft_raw):
-            if st.button(f"Remove '{skill}' from Must-Have Soft"):
-                must_soft_raw.discard(skill)
-                store_in_state("must_have_soft", ", ".join(must_soft_raw))
-                st.rerun()
-
-    new_must_soft = st.text_input("Add Soft Skill to Must-Have:")
-    if st.button("Add Must-Have Soft"):
-        if new_must_soft.strip():
-            must_soft_raw.add(new_must_soft.strip())
-            store_in_state("must_have_soft", ", ".join(must_soft_raw))
-            st.rerun()
-
-    st.markdown("---")
-    # Nice-to-Have Hard
-    st.subheader("Nice-to-Have Hard Skills")
-    if nice_hard_raw:
-        st.caption("Click any skill to remove it from Nice-to-Have Hard.")
-        for skill in list(nice_hard_raw):
-            if st.button(f"Remove '{skill}' from Nice-to-Have Hard"):
-                nice_hard_raw.discard(skill)
-                store_in_state("nice_have_hard", ", ".join(nice_hard_raw))
-                st.rerun()
-
-    new_nice_hard = st.text_input("Add Hard Skill to Nice-to-Have:")
-    if st.button("Add Nice-to-Have Hard"):
-        if new_nice_hard.strip():
-            nice_hard_raw.add(new_nice_hard.strip())
-            store_in_state("nice_have_hard", ", ".join(nice_hard_raw))
-            st.rerun()
-
-    st.markdown("---")
-    # Nice-to-Have Soft
-    st.subheader("Nice-to-Have Soft Skills")
-    if nice_soft_raw:
-        st.caption("Click any skill to remove it from Nice-to-Have Soft.")
-        for skill in list(nice_soft_raw):
-            if st.button(f"Remove '{skill}' from Nice-to-Have Soft"):
-                nice_soft_raw.discard(skill)
-                store_in_state("nice_have_soft", ", ".join(nice_soft_raw))
-                st.rerun()
-
-    new_nice_soft = st.text_input("Add Soft Skill to Nice-to-Have:")
-    if st.button("Add Nice-to-Have Soft"):
-        if new_nice_soft.strip():
-            nice_soft_raw.add(new_nice_soft.strip())
-            store_in_state("nice_have_soft", ", ".join(nice_soft_raw))
-            st.rerun()
+    for key, label, prompt in _SKILL_BUCKETS:
+        st.markdown("---")
+        _skill_bucket(key, label, prompt)
 
     # Next/Back
     colA, colB = st.columns([1,1])
@@ -796,14 +776,14 @@ def summary_outputs_page():
     colGen1, colGen2 = st.columns(2)
     with colGen1:
         if st.button("🎯 Generate Job Ad"):
-            job_details = dict(st.session_state)
+            job_details = st.session_state  # read-only here; no copy of the whole session
             job_ad = generate_job_ad(job_details)
             st.subheader("Generated Job Ad")
             st.write(job_ad)
 
     with colGen2:
         if st.button("📝 Generate Interview Guide"):
-            job_details = dict(st.session_state)
+            job_details = st.session_state  # read-only here; no copy of the whole session
             guide = generate_interview_guide(job_details, "HR")
             st.subheader("Interview Preparation Guide")
             st.write(guide)